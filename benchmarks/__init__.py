@@ -0,0 +1,27 @@
+"""Performance benchmarks for JARVIS hot paths.
+
+Two suites, each run in its own process:
+
+- micro: the pure-Python engines (bank transaction auto-matching, Bilant
+  formulas, marketing KPI formulas, e-Factura XML parsing, analytics query
+  entity extraction). No database or network needed.
+- db: repository list queries (invoices, bank transactions, CRM clients,
+  BioStar punch logs) against a local PostgreSQL seeded with synthetic data;
+  see benchmarks/db.py for the BENCH_DATABASE_URL requirements.
+
+Input data comes from benchmarks/generators.py: seeded, so every run at a
+given scale times exactly the same data. Scales are small / medium / large
+(x1 / x5 / x25) or any numeric factor.
+
+Usage (from the repository root):
+
+    python -m benchmarks --suite micro --output benchmarks/results/base.json
+    # ... change code ...
+    python -m benchmarks --suite micro --compare benchmarks/results/base.json
+
+The run exits non-zero when a benchmark's min time regresses by more than
+--max-regression percent against --compare, or when a per-item time exceeds
+its entry in benchmarks/budgets.json (budgets apply at the scale they were
+set for). Results are JSON: run metadata (commit, Python, platform, scale)
+plus min / median / mean / stdev per benchmark.
+"""
@@ -0,0 +1,63 @@
+"""Command-line entry point: python -m benchmarks --help"""
+
+import argparse
+import importlib
+import os
+import sys
+
+from . import harness
+
+DEFAULT_BUDGETS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'budgets.json')
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m benchmarks',
+                                     description='Run the JARVIS performance benchmarks.')
+    parser.add_argument('--suite', choices=['micro', 'db'], default='micro')
+    parser.add_argument('--scale', default='small',
+                        help='small, medium, large or a numeric factor (default: small)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--filter', dest='name_filter', help='only run benchmarks whose name contains this')
+    parser.add_argument('--output', help='write results JSON here')
+    parser.add_argument('--compare', metavar='BASELINE', help='results JSON to compare against')
+    parser.add_argument('--max-regression', type=float, default=20.0,
+                        help='fail when a min time grows by more than this percent (default: 20)')
+    parser.add_argument('--budgets', default=DEFAULT_BUDGETS,
+                        help='budgets JSON (per-item µs); pass "" to skip')
+    args = parser.parse_args(argv)
+
+    try:
+        harness.parse_scale(args.scale)
+    except ValueError:
+        parser.error(f'invalid scale: {args.scale}')
+
+    importlib.import_module(f'benchmarks.{args.suite}')
+    document = harness.run(args.suite, args.scale, repeat=args.repeat, name_filter=args.name_filter)
+    if args.output:
+        harness.save(document, args.output)
+        print(f'\nResults written to {args.output}')
+
+    failed = False
+    if args.compare:
+        rows, regressions = harness.compare(harness.load(args.compare), document, args.max_regression)
+        if not rows:
+            print(f'\nNothing comparable in {args.compare} (different scale or benchmarks).')
+        else:
+            print(f'\n{"benchmark":<44} {"baseline ms":>12} {"current ms":>12} {"change":>8}')
+            for row in rows:
+                print(f"{row['name']:<44} {row['baseline_ms']:>12.3f} {row['current_ms']:>12.3f} "
+                      f"{row['change_percent']:>+7.1f}%")
+        for row in regressions:
+            print(f"REGRESSION {row['name']}: {row['change_percent']:+.1f}% (limit {args.max_regression}%)")
+            failed = True
+
+    if args.budgets and os.path.exists(args.budgets):
+        for name, actual, limit in harness.check_budgets(document, harness.load(args.budgets)):
+            print(f'OVER BUDGET {name}: {actual:.3f} µs per item (budget {limit} µs)')
+            failed = True
+
+    return 1 if failed else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
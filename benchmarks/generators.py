@@ -0,0 +1,301 @@
+"""Deterministic synthetic data for the benchmarks.
+
+Every generator takes a size and a seed and builds its data from its own
+random.Random(seed), so the same arguments always produce the same rows,
+run after run and machine after machine. Shapes follow what the code under
+test reads (invoice/transaction dicts, UBL 2.1 e-Factura XML, BioStar punch
+rows, crm_clients rows, Balanta DataFrames and Bilant template rows).
+"""
+
+import random
+from datetime import date, datetime, time, timedelta
+from xml.sax.saxutils import escape
+
+SUPPLIERS = [
+    'Dedeman SRL', 'Altex Romania SRL', 'eMAG Marketplace', 'OMV Petrom Marketing SRL',
+    'Orange Romania SA', 'Vodafone Romania SA', 'Enel Energie Muntenia SA', 'Engie Romania SA',
+    'Kaufland Romania SCS', 'Lidl Discount SRL', 'Auchan Romania SA', 'Metro Cash & Carry Romania SRL',
+    'Porsche Inter Auto Romania SRL', 'Autonom Services SA', 'Fan Courier Express SRL',
+    'Cargus SRL', 'Google Ireland Ltd', 'Meta Platforms Ireland Ltd', 'Microsoft Romania SRL',
+    'Digi Romania SA', 'Mol Romania Petroleum Products SRL', 'Rompetrol Downstream SRL',
+    'Ikea Romania SA', 'Selgros Cash & Carry SRL', 'Arabesque SRL', 'Hornbach Centrala SRL',
+]
+COMPANIES = ['Autoworld Prestige SRL', 'Autoworld Premium SRL', 'Autoworld Next SRL', 'Autoworld Holding SRL']
+COMPANY_CUIS = ['RO14129735', 'RO22215071', 'RO35218440', 'RO40108327']
+DEPARTMENTS = ['Sales', 'Aftersales', 'Service', 'Marketing', 'HR', 'IT', 'Finance', 'Logistics']
+BRANDS = ['Volkswagen', 'Audi', 'Skoda', 'Porsche', 'Seat', 'Cupra', 'Toyota', 'Dacia']
+CITIES = ['Bucuresti', 'Cluj-Napoca', 'Timisoara', 'Iasi', 'Constanta', 'Brasov', 'Ploiesti', 'Oradea']
+FIRST_NAMES = ['Andrei', 'Maria', 'Ioana', 'Alexandru', 'Elena', 'Mihai', 'Ana', 'Stefan',
+               'Cristina', 'Gabriel', 'Raluca', 'Bogdan', 'Ștefania', 'Vlad', 'Irina', 'Radu']
+LAST_NAMES = ['Popescu', 'Ionescu', 'Popa', 'Dumitru', 'Stan', 'Stoica', 'Gheorghe', 'Matei',
+              'Ciobanu', 'Rusu', 'Munteanu', 'Constantinescu', 'Marinescu', 'Țurcanu']
+CURRENCIES = ['RON'] * 17 + ['EUR'] * 3
+EUR_RON = 4.97
+
+
+def _amount(rng, low=50, high=25000):
+    # Log-uniform: many small invoices, a long tail of large ones
+    return round(low * (high / low) ** rng.random(), 2)
+
+
+def _day(rng, start, days):
+    return start + timedelta(days=rng.randrange(days))
+
+
+def _person(rng):
+    return f'{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}'
+
+
+def invoices(n, seed=1, start=date(2025, 1, 1), days=365):
+    """Invoice dicts as the invoice matcher and list endpoints see them."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        currency = rng.choice(CURRENCIES)
+        value = _amount(rng)
+        rows.append({
+            'id': i + 1,
+            'supplier': rng.choice(SUPPLIERS),
+            'invoice_number': f'BENCH-{i + 1:07d}',
+            'invoice_date': _day(rng, start, days),
+            'invoice_value': value,
+            'currency': currency,
+            'value_ron': round(value * EUR_RON, 2) if currency == 'EUR' else value,
+            'value_eur': value if currency == 'EUR' else round(value / EUR_RON, 2),
+            'status': rng.choice(['new', 'new', 'processed', 'paid']),
+            'payment_status': rng.choice(['not_paid', 'not_paid', 'paid']),
+            'company': rng.choice(COMPANIES),
+            'department': rng.choice(DEPARTMENTS),
+            'brand': rng.choice(BRANDS),
+            'responsible': _person(rng),
+        })
+    return rows
+
+
+def bank_transactions(n, invoice_rows=None, seed=2, match_ratio=0.6):
+    """Bank statement transactions; about match_ratio of them pay one of
+    invoice_rows (same amount, paid 0-45 days later, supplier name as the
+    bank spells it), the rest are noise."""
+    rng = random.Random(seed)
+    invoice_rows = invoice_rows or []
+    rows = []
+    for i in range(n):
+        company = rng.randrange(len(COMPANIES))
+        if invoice_rows and rng.random() < match_ratio:
+            inv = rng.choice(invoice_rows)
+            supplier = inv['supplier']
+            txn_date = inv['invoice_date'] + timedelta(days=rng.randrange(46))
+            amount = inv['value_ron'] if rng.random() < 0.9 else round(inv['value_ron'] * rng.uniform(0.97, 1.03), 2)
+            # Banks truncate and upper-case the counterparty
+            matched = supplier if rng.random() < 0.7 else supplier.upper().replace(' SRL', '').replace(' SA', '')
+        else:
+            supplier = rng.choice(SUPPLIERS)
+            txn_date = _day(rng, date(2025, 1, 1), 400)
+            amount = _amount(rng)
+            matched = supplier if rng.random() < 0.5 else None
+        rows.append({
+            'id': i + 1,
+            'statement_file': 'bench',
+            'company_name': COMPANIES[company],
+            'company_cui': COMPANY_CUIS[company],
+            'transaction_date': txn_date,
+            'description': f'POS {supplier.upper()} {rng.randrange(10**6):06d} {rng.choice(CITIES).upper()}',
+            'vendor_name': supplier.split(' ')[0].upper(),
+            'matched_supplier': matched,
+            'amount': -amount,
+            'currency': 'RON',
+            'status': 'pending',
+        })
+    return rows
+
+
+def efactura_xml(n, lines=10, seed=3):
+    """UBL 2.1 e-Factura invoices (CIUS-RO shape) as XML strings."""
+    rng = random.Random(seed)
+    docs = []
+    for i in range(n):
+        seller = rng.choice(SUPPLIERS)
+        buyer = rng.randrange(len(COMPANIES))
+        issue = _day(rng, date(2025, 1, 1), 365)
+        items = []
+        net = 0
+        for line in range(1, lines + 1):
+            qty = rng.randint(1, 20)
+            price = _amount(rng, 5, 2000)
+            amount = round(qty * price, 2)
+            net += amount
+            items.append(f'''
+    <cac:InvoiceLine>
+        <cbc:ID>{line}</cbc:ID>
+        <cbc:InvoicedQuantity unitCode="H87">{qty}</cbc:InvoicedQuantity>
+        <cbc:LineExtensionAmount currencyID="RON">{amount:.2f}</cbc:LineExtensionAmount>
+        <cac:Item>
+            <cbc:Name>{escape(rng.choice(['Piesa', 'Manopera', 'Consumabil', 'Abonament']))} {rng.randrange(10**5):05d}</cbc:Name>
+            <cac:SellersItemIdentification><cbc:ID>SKU{rng.randrange(10**6):06d}</cbc:ID></cac:SellersItemIdentification>
+            <cac:CommodityClassification><cbc:ItemClassificationCode listID="CPV">{rng.randrange(10**7, 10**8)}-{rng.randrange(10)}</cbc:ItemClassificationCode></cac:CommodityClassification>
+            <cac:ClassifiedTaxCategory><cbc:ID>S</cbc:ID><cbc:Percent>19</cbc:Percent><cac:TaxScheme><cbc:ID>VAT</cbc:ID></cac:TaxScheme></cac:ClassifiedTaxCategory>
+        </cac:Item>
+        <cac:Price><cbc:PriceAmount currencyID="RON">{price:.2f}</cbc:PriceAmount></cac:Price>
+    </cac:InvoiceLine>''')
+        net = round(net, 2)
+        vat = round(net * 0.19, 2)
+        docs.append(f'''<?xml version="1.0" encoding="UTF-8"?>
+<Invoice xmlns="urn:oasis:names:specification:ubl:schema:xsd:Invoice-2"
+         xmlns:cac="urn:oasis:names:specification:ubl:schema:xsd:CommonAggregateComponents-2"
+         xmlns:cbc="urn:oasis:names:specification:ubl:schema:xsd:CommonBasicComponents-2">
+    <cbc:CustomizationID>urn:cen.eu:en16931:2017#compliant#urn:efactura.mfinante.ro:CIUS-RO:1.0.1</cbc:CustomizationID>
+    <cbc:ID>EF{i + 1:07d}</cbc:ID>
+    <cbc:IssueDate>{issue.isoformat()}</cbc:IssueDate>
+    <cbc:DueDate>{(issue + timedelta(days=30)).isoformat()}</cbc:DueDate>
+    <cbc:InvoiceTypeCode>380</cbc:InvoiceTypeCode>
+    <cbc:Note>Factura generata automat</cbc:Note>
+    <cbc:DocumentCurrencyCode>RON</cbc:DocumentCurrencyCode>
+    <cac:AccountingSupplierParty><cac:Party>
+        <cac:PostalAddress><cbc:StreetName>Str. Industriilor {rng.randint(1, 200)}</cbc:StreetName><cbc:CityName>{rng.choice(CITIES)}</cbc:CityName><cac:Country><cbc:IdentificationCode>RO</cbc:IdentificationCode></cac:Country></cac:PostalAddress>
+        <cac:PartyTaxScheme><cbc:CompanyID>RO{rng.randrange(10**6, 10**8)}</cbc:CompanyID><cac:TaxScheme><cbc:ID>VAT</cbc:ID></cac:TaxScheme></cac:PartyTaxScheme>
+        <cac:PartyLegalEntity><cbc:RegistrationName>{escape(seller)}</cbc:RegistrationName><cbc:CompanyID>J40/{rng.randrange(10**4)}/{rng.randint(1995, 2024)}</cbc:CompanyID></cac:PartyLegalEntity>
+    </cac:Party></cac:AccountingSupplierParty>
+    <cac:AccountingCustomerParty><cac:Party>
+        <cac:PostalAddress><cbc:StreetName>Bd. Pipera 1</cbc:StreetName><cbc:CityName>Voluntari</cbc:CityName><cac:Country><cbc:IdentificationCode>RO</cbc:IdentificationCode></cac:Country></cac:PostalAddress>
+        <cac:PartyTaxScheme><cbc:CompanyID>{COMPANY_CUIS[buyer]}</cbc:CompanyID><cac:TaxScheme><cbc:ID>VAT</cbc:ID></cac:TaxScheme></cac:PartyTaxScheme>
+        <cac:PartyLegalEntity><cbc:RegistrationName>{COMPANIES[buyer]}</cbc:RegistrationName></cac:PartyLegalEntity>
+    </cac:Party></cac:AccountingCustomerParty>
+    <cac:PaymentMeans><cbc:PaymentMeansCode>42</cbc:PaymentMeansCode><cac:PayeeFinancialAccount><cbc:ID>RO49AAAA1B31007593840000</cbc:ID></cac:PayeeFinancialAccount></cac:PaymentMeans>
+    <cac:TaxTotal>
+        <cbc:TaxAmount currencyID="RON">{vat:.2f}</cbc:TaxAmount>
+        <cac:TaxSubtotal><cbc:TaxableAmount currencyID="RON">{net:.2f}</cbc:TaxableAmount><cbc:TaxAmount currencyID="RON">{vat:.2f}</cbc:TaxAmount><cac:TaxCategory><cbc:ID>S</cbc:ID><cbc:Percent>19</cbc:Percent><cac:TaxScheme><cbc:ID>VAT</cbc:ID></cac:TaxScheme></cac:TaxCategory></cac:TaxSubtotal>
+    </cac:TaxTotal>
+    <cac:LegalMonetaryTotal>
+        <cbc:LineExtensionAmount currencyID="RON">{net:.2f}</cbc:LineExtensionAmount>
+        <cbc:TaxExclusiveAmount currencyID="RON">{net:.2f}</cbc:TaxExclusiveAmount>
+        <cbc:TaxInclusiveAmount currencyID="RON">{net + vat:.2f}</cbc:TaxInclusiveAmount>
+        <cbc:PayableAmount currencyID="RON">{net + vat:.2f}</cbc:PayableAmount>
+    </cac:LegalMonetaryTotal>{''.join(items)}
+</Invoice>
+''')
+    return docs
+
+
+def punch_logs(users, days, seed=4, start=date(2025, 9, 1)):
+    """BioStar punch rows: IN around 08:30 and OUT around 17:30 on workdays,
+    with the occasional extra badge-in at lunch."""
+    rng = random.Random(seed)
+    rows = []
+    for u in range(users):
+        user_id = str(1000 + u)
+        for d in range(days):
+            day = start + timedelta(days=d)
+            if day.weekday() >= 5 or rng.random() < 0.05:
+                continue
+            shift = [(8 * 60 + 30, 'IN'), (17 * 60 + 30, 'OUT')]
+            if rng.random() < 0.3:
+                shift[1:1] = [(12 * 60 + 30, 'OUT'), (13 * 60 + 15, 'IN')]
+            for minute, direction in shift:
+                at = datetime.combine(day, time()) + timedelta(minutes=minute + rng.randint(-25, 25),
+                                                               seconds=rng.randrange(60))
+                rows.append({
+                    'biostar_event_id': f'bench-{len(rows) + 1}',
+                    'biostar_user_id': user_id,
+                    'event_datetime': at,
+                    'direction': direction,
+                    'device_id': str(540000 + rng.randrange(6)),
+                    'door_name': rng.choice(['Intrare principala', 'Service', 'Showroom']),
+                })
+    return rows
+
+
+def crm_clients(n, seed=5):
+    """crm_clients rows: mostly people, some companies."""
+    rng = random.Random(seed)
+    rows = []
+    for i in range(n):
+        is_company = rng.random() < 0.2
+        name = (f'{rng.choice(LAST_NAMES)} {rng.choice(["Auto", "Trans", "Construct", "Logistic"])} SRL'
+                if is_company else _person(rng))
+        rows.append({
+            'display_name': name,
+            'name_normalized': name.lower(),
+            'client_type': 'company' if is_company else 'person',
+            'phone': f'07{rng.randrange(10**8):08d}',
+            'email': f'client{i + 1}@example.ro',
+            'city': rng.choice(CITIES),
+            'company_name': name if is_company else None,
+            'responsible': _person(rng),
+            'nr_reg': f'J40/{rng.randrange(10**5)}/{rng.randint(2000, 2024)}' if is_company else None,
+        })
+    return rows
+
+
+def balanta(accounts, seed=6):
+    """Balanta (trial balance) DataFrame: Cont, SFD, SFC with a header row,
+    as the uploaded Excel arrives."""
+    import pandas as pd
+    rng = random.Random(seed)
+    synthetic = sorted({f'{rng.randint(1, 7)}{rng.randrange(100):02d}{rng.choice(["", str(rng.randint(1, 9))])}'
+                        for _ in range(accounts * 2)})[:accounts]
+    rows = [['Cont', 'SFD', 'SFC']]
+    for acct in synthetic:
+        debit = rng.random() < 0.6
+        value = _amount(rng, 10, 500000)
+        rows.append([acct, value if debit else 0.0, 0.0 if debit else value])
+    return pd.DataFrame(rows)
+
+
+def bilant_template(rows, seed=7):
+    """Bilant template rows: groups of CT-formula detail rows, each closed by
+    an RD total row ('rd. 01 la 05' style, already expanded)."""
+    rng = random.Random(seed)
+    template = []
+    nr = 0
+    while nr < rows:
+        group = []
+        for _ in range(min(5, rows - nr)):
+            nr += 1
+            prefixes = [f'{rng.randint(1, 7)}{rng.randrange(100):02d}' for _ in range(rng.randint(1, 4))]
+            formula = prefixes[0] + ''.join(rng.choice(['+', '-']) + p for p in prefixes[1:])
+            if rng.random() < 0.2:
+                formula += f'+/-{rng.randint(1, 7)}{rng.randrange(100):02d}'
+            group.append(f'{nr:02d}')
+            template.append({'id': nr, 'nr_rd': f'{nr:02d}', 'description': f'Rand {nr} (ct.{formula})',
+                             'formula_ct': formula, 'formula_rd': '', 'sort_order': nr})
+        nr += 1
+        template.append({'id': nr, 'nr_rd': f'{nr:02d}', 'description': f'TOTAL (rd. {group[0]} la {group[-1]})',
+                         'formula_ct': '', 'formula_rd': '+'.join(group), 'sort_order': nr})
+    return template
+
+
+def kpi_columns(variables, rows, seed=8):
+    """Column-wise KPI inputs for the marketing formula engine."""
+    rng = random.Random(seed)
+    return {name: [rng.uniform(1, 1000) for _ in range(rows)] for name in variables}
+
+
+def analytics_entities(per_kind, seed=9):
+    """Known entity names for the AI query parser, by kind."""
+    rng = random.Random(seed)
+    suppliers = list(SUPPLIERS)
+    while len(suppliers) < per_kind:
+        suppliers.append(f'{rng.choice(LAST_NAMES)} {rng.choice(["Distributie", "Service", "Import", "Grup"])} SRL')
+    return {
+        'companies': COMPANIES,
+        'departments': DEPARTMENTS,
+        'brands': BRANDS,
+        'suppliers': sorted(set(suppliers))[:per_kind],
+    }
+
+
+def analytics_queries(n, entities, seed=10):
+    """Chat messages with analytics intent mentioning known entities."""
+    rng = random.Random(seed)
+    templates = [
+        'cat am cheltuit cu {supplier} in {department} luna trecuta?',
+        'top 5 furnizori pentru {company} in ultimele 3 luni',
+        'show total spending by department for {brand} this year',
+        'compara costurile {department} intre {company} si trimestrul trecut',
+        'how much did we pay {supplier} for {brand} service in 2025?',
+        'evolutia facturilor de la {supplier} pe ultimele 6 luni, grupat pe luna',
+    ]
+    return [rng.choice(templates).format(
+        supplier=rng.choice(entities['suppliers']), department=rng.choice(entities['departments']),
+        company=rng.choice(entities['companies']), brand=rng.choice(entities['brands']),
+    ) for _ in range(n)]
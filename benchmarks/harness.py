@@ -0,0 +1,204 @@
+"""Benchmark registry, timing, JSON results, comparison and budgets."""
+
+import gc
+import importlib.abc
+import importlib.machinery
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+import types
+from datetime import datetime, timezone
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JARVIS_DIR = os.path.join(ROOT, 'jarvis')
+
+# Multipliers applied to each benchmark's base sizes
+SCALES = {'small': 1, 'medium': 5, 'large': 25}
+
+_registry = {}
+
+
+def benchmark(name, suite, unit='item'):
+    """Register a benchmark.
+
+    The decorated function takes the scale factor and returns (n, fn): the
+    number of units one call of fn processes, and the zero-argument callable
+    to time. Everything done before returning (data generation, seeding,
+    imports) is setup and is not timed.
+    """
+    def decorator(setup):
+        _registry[name] = {'name': name, 'suite': suite, 'unit': unit, 'setup': setup}
+        return setup
+    return decorator
+
+
+def registered(suite=None, name_filter=None):
+    return [b for b in _registry.values()
+            if (suite is None or b['suite'] == suite)
+            and (not name_filter or name_filter in b['name'])]
+
+
+def parse_scale(value):
+    """'small' / 'medium' / 'large' or a plain factor such as 0.1 or 3."""
+    if value in SCALES:
+        return SCALES[value]
+    factor = float(value)
+    if factor <= 0:
+        raise ValueError(f'Scale must be positive: {value}')
+    return factor
+
+
+def scaled(base, scale, minimum=1):
+    return max(minimum, int(round(base * scale)))
+
+
+def time_benchmark(bench, scale, repeat=5, warmup=1):
+    """Run setup once, then warmup + repeat timed calls with GC disabled."""
+    n, fn = bench['setup'](scale)
+    for _ in range(warmup):
+        fn()
+
+    timings = []
+    gc_was_enabled = gc.isenabled()
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            fn()
+            timings.append(time.perf_counter() - t0)
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+
+    best = min(timings)
+    return {
+        'suite': bench['suite'],
+        'unit': bench['unit'],
+        'n': n,
+        'repeat': repeat,
+        'min_ms': round(best * 1000, 4),
+        'median_ms': round(statistics.median(timings) * 1000, 4),
+        'mean_ms': round(statistics.mean(timings) * 1000, 4),
+        'stdev_ms': round(statistics.stdev(timings) * 1000, 4) if len(timings) > 1 else 0.0,
+        'per_item_us': round(best * 1e6 / n, 4) if n else None,
+    }
+
+
+def run(suite, scale_name, repeat=5, name_filter=None, log=print):
+    """Run every benchmark of a suite; returns the results document."""
+    scale = parse_scale(scale_name)
+    results = {}
+    for bench in registered(suite, name_filter):
+        result = time_benchmark(bench, scale, repeat=repeat)
+        results[bench['name']] = result
+        log(f"{bench['name']:<44} n={result['n']:<8} min {result['min_ms']:>10.3f} ms  "
+            f"median {result['median_ms']:>10.3f} ms  {result['per_item_us'] or 0:>10.3f} µs/{bench['unit']}")
+    return {'meta': _meta(suite, scale_name, repeat), 'results': results}
+
+
+def _meta(suite, scale_name, repeat):
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                                capture_output=True, text=True, timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'suite': suite,
+        'scale': str(scale_name),
+        'repeat': repeat,
+        'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+
+
+def save(document, path):
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write('\n')
+
+
+def load(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare(baseline, current, max_regression_percent=20.0):
+    """Compare min timings of the benchmarks present in both runs.
+
+    Returns (rows, regressions); a benchmark regresses when its min time
+    grew by more than max_regression_percent. Runs at different scales are
+    not comparable and yield no rows.
+    """
+    rows, regressions = [], []
+    if baseline['meta'].get('scale') != current['meta'].get('scale'):
+        return rows, regressions
+    for name, cur in current['results'].items():
+        base = baseline['results'].get(name)
+        if not base or not base.get('min_ms'):
+            continue
+        change = (cur['min_ms'] - base['min_ms']) / base['min_ms'] * 100
+        row = {'name': name, 'baseline_ms': base['min_ms'], 'current_ms': cur['min_ms'],
+               'change_percent': round(change, 1)}
+        rows.append(row)
+        if change > max_regression_percent:
+            regressions.append(row)
+    return rows, regressions
+
+
+def check_budgets(document, budgets):
+    """Check per-item timings against a budgets document.
+
+    budgets = {"scale": "small", "budgets": {name: max_per_item_us}}.
+    Budgets only apply to runs at the scale they were set for; returns the
+    list of (name, per_item_us, budget_us) that exceed their budget.
+    """
+    if str(budgets.get('scale')) != document['meta'].get('scale'):
+        return []
+    failures = []
+    for name, limit in budgets.get('budgets', {}).items():
+        result = document['results'].get(name)
+        if result and result['per_item_us'] is not None and result['per_item_us'] > limit:
+            failures.append((name, result['per_item_us'], limit))
+    return failures
+
+
+class _BarePackageFinder(importlib.abc.MetaPathFinder, importlib.abc.Loader):
+    """Import jarvis packages without running their __init__.py.
+
+    Section packages register Flask blueprints and import routes (and with
+    them the database pool) from __init__; the engines under test are plain
+    modules that need none of that. Only used by the micro suite, which runs
+    in its own process.
+    """
+
+    def find_spec(self, fullname, path=None, target=None):
+        rel = os.path.join(JARVIS_DIR, *fullname.split('.'))
+        if os.path.isfile(os.path.join(rel, '__init__.py')):
+            spec = importlib.machinery.ModuleSpec(fullname, self, is_package=True)
+            spec.submodule_search_locations = [rel]
+            return spec
+        return None
+
+    def create_module(self, spec):
+        module = types.ModuleType(spec.name)
+        module.__path__ = list(spec.submodule_search_locations)
+        return module
+
+    def exec_module(self, module):
+        pass
+
+
+def use_bare_packages():
+    if JARVIS_DIR not in sys.path:
+        sys.path.insert(0, JARVIS_DIR)
+    if not any(isinstance(f, _BarePackageFinder) for f in sys.meta_path):
+        sys.meta_path.insert(0, _BarePackageFinder())
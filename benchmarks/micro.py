@@ -0,0 +1,112 @@
+"""Micro-benchmarks for the pure-Python engines (no database, no network)."""
+
+from . import generators
+from .harness import benchmark, scaled, use_bare_packages
+
+use_bare_packages()
+
+KPI_FORMULAS = [
+    'spent / leads',
+    'clicks / impressions * 100',
+    '(likes + comments + shares) / impressions * 100',
+    'budget / cpc * cvr_lead / 100 * cvr_car / 100',
+]
+
+
+@benchmark('invoice_matcher.auto_match_transactions', 'micro', unit='transaction')
+def _auto_match(scale):
+    from accounting.statements.invoice_matcher import auto_match_transactions
+    invoices = generators.invoices(scaled(500, scale))
+    transactions = generators.bank_transactions(scaled(50, scale), invoices)
+    return len(transactions), lambda: auto_match_transactions(transactions, invoices, use_ai=False)
+
+
+@benchmark('bilant.process_bilant_from_template', 'micro', unit='row')
+def _bilant(scale):
+    from accounting.bilant.formula_engine import process_bilant_from_template
+    df = generators.balanta(scaled(400, scale))
+    template = generators.bilant_template(scaled(120, scale))
+    return len(template), lambda: process_bilant_from_template(df, template)
+
+
+def _kpi_rows(rows):
+    from marketing.services import formula_engine as fe
+    data = []
+    for i, formula in enumerate(KPI_FORMULAS):
+        cols = generators.kpi_columns(fe.extract_variables(formula), rows, seed=100 + i)
+        names = list(cols)
+        data.append((formula, cols, [dict(zip(names, vals)) for vals in zip(*cols.values())]))
+    return fe, data
+
+
+@benchmark('marketing_formula.evaluate_uncached', 'micro', unit='row')
+def _kpi_uncached(scale):
+    # parse + validate + compile on every call: the cost of a cache miss
+    fe, data = _kpi_rows(scaled(500, scale))
+
+    def fn():
+        for formula, _, rows in data:
+            for row in rows:
+                fe.clear_cache()
+                fe.evaluate(formula, row)
+    return sum(len(rows) for _, _, rows in data), fn
+
+
+@benchmark('marketing_formula.evaluate', 'micro', unit='row')
+def _kpi_cached(scale):
+    fe, data = _kpi_rows(scaled(5000, scale))
+
+    def fn():
+        for formula, _, rows in data:
+            for row in rows:
+                fe.evaluate(formula, row)
+    return sum(len(rows) for _, _, rows in data), fn
+
+
+@benchmark('marketing_formula.evaluate_many', 'micro', unit='row')
+def _kpi_many(scale):
+    fe, data = _kpi_rows(scaled(5000, scale))
+
+    def fn():
+        for formula, cols, _ in data:
+            fe.evaluate_many(formula, cols)
+    return sum(len(rows) for _, _, rows in data), fn
+
+
+@benchmark('efactura.parse_invoice_xml', 'micro', unit='invoice')
+def _efactura(scale):
+    from core.connectors.efactura.xml_parser import parse_invoice_xml
+    docs = generators.efactura_xml(scaled(50, scale), lines=20)
+
+    def fn():
+        for doc in docs:
+            parse_invoice_xml(doc)
+    return len(docs), fn
+
+
+@benchmark('query_parser.extract_entities', 'micro', unit='query')
+def _entities(scale):
+    from ai_agent.services.entity_matcher import EntityMatcher
+    from ai_agent.services.query_parser import ParsedQuery, _extract_entities
+    entities = generators.analytics_entities(scaled(2000, scale))
+    matcher = EntityMatcher(entities)
+    queries = [q.lower() for q in generators.analytics_queries(scaled(500, scale), entities)]
+
+    def fn():
+        for q in queries:
+            _extract_entities(q, matcher, ParsedQuery())
+    return len(queries), fn
+
+
+@benchmark('query_parser.parse_query', 'micro', unit='query')
+def _parse_query(scale):
+    from ai_agent.services.entity_matcher import EntityMatcher
+    from ai_agent.services.query_parser import parse_query
+    entities = generators.analytics_entities(scaled(2000, scale))
+    matcher = EntityMatcher(entities)
+    queries = generators.analytics_queries(scaled(500, scale), entities)
+
+    def fn():
+        for q in queries:
+            parse_query(q, matcher)
+    return len(queries), fn
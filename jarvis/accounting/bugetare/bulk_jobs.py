@@ -0,0 +1,220 @@
+"""Bulk invoice parsing as background jobs.
+
+Uploads are stored once in bulk_upload_files (one row per file, grouped by
+batch_id) and a job is queued; the request returns immediately. The job
+parses the batch with bounded concurrency (BULK_PARSE_CONCURRENCY threads —
+parsing is dominated by poppler subprocesses and Claude calls), writes each
+file's result as soon as it is ready so clients polling the status endpoint
+see partial results, and finishes with one batched duplicate check.
+
+File content is dropped once a file is parsed; batches are purged after
+BULK_UPLOAD_RETENTION_DAYS.
+
+Two flavours share the machinery:
+    bulk_parse_invoices  — /api/invoices/bulk-parse (InvoiceService.parse_invoice)
+    bulk_process_report  — /api/bulk/process (bulk_processor summary report)
+"""
+
+import json
+import logging
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime
+
+import psycopg2
+
+from core.base_repository import BaseRepository
+from core.jobs import task, enqueue, set_progress, JobRepository
+
+logger = logging.getLogger('jarvis.bugetare.bulk_jobs')
+
+BULK_PARSE_CONCURRENCY = int(os.environ.get('BULK_PARSE_CONCURRENCY', '4'))
+BULK_UPLOAD_RETENTION_DAYS = 7
+
+
+class BulkUploadRepository(BaseRepository):
+
+    def store_batch(self, files, created_by=None):
+        """Store uploaded files. Returns the new batch_id.
+
+        Args:
+            files: [(filename, content_bytes_or_None, error_or_None)] — files
+                   rejected up front are stored as failed, without content.
+        """
+        from psycopg2.extras import execute_values
+        batch_id = uuid.uuid4().hex
+        rows = [
+            (batch_id, position, filename,
+             psycopg2.Binary(content) if content is not None else None,
+             len(content) if content is not None else 0,
+             'failed' if error else 'pending', error, created_by)
+            for position, (filename, content, error) in enumerate(files)
+        ]
+
+        def _work(cursor):
+            execute_values(cursor, '''
+                INSERT INTO bulk_upload_files
+                    (batch_id, position, filename, content, size_bytes, status, error, created_by)
+                VALUES %s
+            ''', rows)
+        self.execute_many(_work)
+        return batch_id
+
+    def pending(self, batch_id):
+        return self.query_all('''
+            SELECT id, position, filename FROM bulk_upload_files
+            WHERE batch_id = %s AND status = 'pending'
+            ORDER BY position
+        ''', (batch_id,))
+
+    def count(self, batch_id):
+        row = self.query_one('SELECT COUNT(*) AS n FROM bulk_upload_files WHERE batch_id = %s', (batch_id,))
+        return row['n'] if row else 0
+
+    def content(self, file_id):
+        row = self.query_one('SELECT content FROM bulk_upload_files WHERE id = %s', (file_id,))
+        return bytes(row['content']) if row and row.get('content') is not None else None
+
+    def finish(self, file_id, result=None, error=None):
+        """Record a file's outcome and drop its content."""
+        return self.execute('''
+            UPDATE bulk_upload_files
+            SET status = %s, result = %s::jsonb, error = %s, content = NULL, finished_at = NOW()
+            WHERE id = %s
+        ''', ('failed' if error else 'done',
+              json.dumps(result, default=str) if result is not None else None,
+              error, file_id))
+
+    def mark_duplicates(self, batch_id, invoice_numbers):
+        """Flag parsed files whose invoice_number is in invoice_numbers. Returns count."""
+        return self.execute('''
+            UPDATE bulk_upload_files SET duplicate = TRUE
+            WHERE batch_id = %s AND status = 'done'
+            AND (result->>'invoice_number') = ANY(%s)
+        ''', (batch_id, sorted(invoice_numbers)))
+
+    def results(self, batch_id):
+        return self.query_all('''
+            SELECT position, filename, status, result, error, duplicate
+            FROM bulk_upload_files WHERE batch_id = %s ORDER BY position
+        ''', (batch_id,))
+
+    def purge(self, days=BULK_UPLOAD_RETENTION_DAYS):
+        return self.execute('''
+            DELETE FROM bulk_upload_files WHERE created_at < NOW() - make_interval(days => %s)
+        ''', (days,))
+
+
+_repo = BulkUploadRepository()
+_job_repo = JobRepository()
+
+
+def submit_batch(task_name, files, user_id):
+    """Store files and queue a bulk job. Returns the job id."""
+    batch_id = _repo.store_batch(files, created_by=user_id)
+    job_id, _ = enqueue(task_name, {'batch_id': batch_id}, created_by=user_id)
+    return job_id
+
+
+def get_batch_job(job_id, task_name, user):
+    """Return the job if it is a `task_name` job visible to `user`, else None."""
+    job = _job_repo.get(job_id)
+    if not job or job['task'] != task_name:
+        return None
+    if job.get('created_by') != user.id and not user.can_access_settings:
+        return None
+    return job
+
+
+def batch_results(job):
+    return _repo.results((job.get('payload') or {}).get('batch_id'))
+
+
+def _run_batch(batch_id, parse_one):
+    """Run parse_one(row, content) over the batch's pending files concurrently.
+
+    parse_one returns (result, error). Progress is reported per finished file.
+    """
+    rows = _repo.pending(batch_id)
+    total = _repo.count(batch_id)
+    done = total - len(rows)
+    set_progress(done, total, 'Parsing')
+
+    def _work(row):
+        try:
+            content = _repo.content(row['id'])
+            if content is None:
+                result, error = None, 'File content missing'
+            else:
+                result, error = parse_one(row, content)
+        except Exception as e:
+            logger.exception(f"Bulk parse failed for {row['filename']}")
+            result, error = None, str(e) or type(e).__name__
+        _repo.finish(row['id'], result=result, error=error)
+        return row
+
+    with ThreadPoolExecutor(max_workers=max(1, BULK_PARSE_CONCURRENCY),
+                            thread_name_prefix='bulk-parse') as pool:
+        for future in as_completed([pool.submit(_work, row) for row in rows]):
+            done += 1
+            set_progress(done, total, future.result()['filename'])
+    return total
+
+
+@task(timeout=1800, max_attempts=2)
+def bulk_parse_invoices(batch_id):
+    """Parse an uploaded batch with InvoiceService, then flag duplicates in one query."""
+    from accounting.invoices.services import InvoiceService
+    from accounting.invoices.repositories import InvoiceRepository
+    service = InvoiceService()
+
+    def _parse(row, content):
+        result = service.parse_invoice(content, row['filename'])
+        return (result.data, None) if result.success else (None, result.error or 'Parse failed')
+
+    total = _run_batch(batch_id, _parse)
+    set_progress(total, total, 'Checking duplicates')
+
+    parsed = [r for r in _repo.results(batch_id) if r['status'] == 'done']
+    numbers = [(r.get('result') or {}).get('invoice_number') for r in parsed]
+    existing = InvoiceRepository().existing_numbers(numbers)
+    duplicates = _repo.mark_duplicates(batch_id, existing) if existing else 0
+    return {'total': total, 'parsed': len(parsed), 'failed': total - len(parsed),
+            'duplicates': duplicates}
+
+
+def restore_dates(invoice):
+    """date_parsed round-trips through JSON as a string; the report needs datetimes."""
+    value = invoice.get('date_parsed')
+    if isinstance(value, str):
+        try:
+            invoice['date_parsed'] = datetime.fromisoformat(value)
+        except ValueError:
+            invoice['date_parsed'] = None
+    return invoice
+
+
+@task(timeout=1800, max_attempts=2)
+def bulk_process_report(batch_id):
+    """Parse an uploaded batch with bulk_processor and build the summary report."""
+    from accounting.bugetare.bulk_processor import parse_bulk_file, build_bulk_report
+
+    def _parse(row, content):
+        invoice = parse_bulk_file(content, row['filename'])
+        if invoice is None:
+            return None, 'No text could be extracted'
+        return invoice, None
+
+    _run_batch(batch_id, _parse)
+    invoices = [restore_dates(r['result']) for r in _repo.results(batch_id)
+                if r['status'] == 'done' and r.get('result')]
+    return build_bulk_report(invoices)
+
+
+@task(priority=-10)
+def purge_bulk_uploads():
+    """Delete stored bulk upload batches past retention."""
+    count = _repo.purge()
+    if count:
+        logger.info(f'Cleanup: purged {count} bulk upload files (>{BULK_UPLOAD_RETENTION_DAYS} days)')
@@ -20,6 +20,7 @@ import PyPDF2
 import json
 
 from ai_agent.providers.base_provider import BaseProvider
+from .parse_cache import AI_MODEL, PARSE_CACHE_VERSION, cached_parse, mark_uncacheable, record_usage
 
 # AI parsing support
 try:
@@ -716,6 +717,9 @@ def parse_invoice_with_ai(text: str, api_key: str = None) -> dict:
         - invoice_number, invoice_date, invoice_value, currency
         - supplier, supplier_vat, customer_vat, customer_name
         - items: dict of item_name -> value (line items from the invoice)
+
+    Results are cached by the SHA-256 of the text sent to the model (see
+    parse_cache); regex parsing upstream is cheaper than a cache round trip.
     """
     if not AI_ENABLED:
         return {'items': {}}
@@ -725,6 +729,12 @@ def parse_invoice_with_ai(text: str, api_key: str = None) -> dict:
     if not api_key:
         return {'items': {}}
 
+    text = text[:8000]  # Limit text to avoid token limits
+    return cached_parse('bulk_ai', text, f'{PARSE_CACHE_VERSION}:{AI_MODEL}',
+                        lambda: _parse_invoice_with_ai(text, api_key))
+
+
+def _parse_invoice_with_ai(text: str, api_key: str) -> dict:
     try:
         client = anthropic.Anthropic(api_key=api_key)
 
@@ -749,13 +759,14 @@ If a field cannot be found, use null. For items, include ALL items found on the
 IMPORTANT: Return ONLY valid JSON, no explanations.
 
 Invoice text:
-{text[:8000]}"""  # Limit text to avoid token limits
+{text}"""
 
         response = client.messages.create(
-            model="claude-sonnet-4-20250514",
+            model=AI_MODEL,
             max_tokens=2048,
             messages=[{"role": "user", "content": prompt}]
         )
+        record_usage(response)
 
         response_text = response.content[0].text
         result = BaseProvider._extract_json(response_text)
@@ -768,9 +779,18 @@ Invoice text:
 
     except Exception as e:
         print(f"AI invoice parsing error: {e}")
+        mark_uncacheable()
         return {'items': {}}
 
 
+def parse_bulk_file(file_bytes: bytes, filename: str) -> Optional[dict]:
+    """Extract text from one file and parse it. Returns None when no text was found."""
+    text = extract_text_from_bytes(file_bytes, filename)
+    if not text:
+        return None
+    return parse_invoice_auto(text, filename)
+
+
 def process_bulk_invoices(files: list[tuple[bytes, str]]) -> dict:
     """
     Process multiple invoice files and generate a summary report.
@@ -789,11 +809,17 @@ def process_bulk_invoices(files: list[tuple[bytes, str]]) -> dict:
     invoices = []
 
     for file_bytes, filename in files:
-        text = extract_text_from_bytes(file_bytes, filename)
-        if text:
-            result = parse_invoice_auto(text, filename)
+        result = parse_bulk_file(file_bytes, filename)
+        if result is not None:
             invoices.append(result)
 
+    return build_bulk_report(invoices)
+
+
+def build_bulk_report(invoices: list[dict]) -> dict:
+    """Aggregate parsed invoices into the bulk summary report (see process_bulk_invoices)."""
+    invoices = list(invoices)
+
     # Sort by date
     invoices.sort(key=lambda x: x.get('date_parsed') or datetime.min)
 
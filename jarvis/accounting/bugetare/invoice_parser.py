@@ -10,6 +10,9 @@ import json
 import tempfile
 
 from ai_agent.providers.base_provider import BaseProvider
+from .parse_cache import (
+    AI_MODEL, PARSE_CACHE_VERSION, cached_parse, fingerprint, mark_uncacheable, record_usage,
+)
 
 
 def normalize_vat_number(vat: str) -> str:
@@ -201,12 +204,13 @@ ADVERTISING INVOICE LINE ITEMS:
     })
 
     response = client.messages.create(
-        model="claude-sonnet-4-20250514",
+        model=AI_MODEL,
         max_tokens=4096,
         messages=[
             {"role": "user", "content": content}
         ]
     )
+    record_usage(response)
 
     # Parse the response
     response_text = response.content[0].text
@@ -239,9 +243,14 @@ ADVERTISING INVOICE LINE ITEMS:
 
 
 def parse_invoice_from_bytes(file_bytes: bytes, filename: str, api_key: Optional[str] = None) -> dict:
-    """Parse invoice from uploaded file bytes."""
+    """Parse invoice from uploaded file bytes (cached by content, see parse_cache)."""
     ext = os.path.splitext(filename)[1].lower()
+    version = f'{PARSE_CACHE_VERSION}:{AI_MODEL}:{ext}'
+    return cached_parse('ai', file_bytes, version,
+                        lambda: _parse_invoice_from_bytes(file_bytes, ext, api_key))
 
+
+def _parse_invoice_from_bytes(file_bytes: bytes, ext: str, api_key: Optional[str]) -> dict:
     with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
         tmp.write(file_bytes)
         tmp_path = tmp.name
@@ -269,6 +278,7 @@ def extract_missing_fields_with_ai(file_path: str, missing_fields: list, api_key
         api_key = os.environ.get('ANTHROPIC_API_KEY')
 
     if not api_key:
+        mark_uncacheable()
         return {}
 
     client = anthropic.Anthropic(api_key=api_key)
@@ -330,12 +340,13 @@ IMPORTANT:
     content.append({"type": "text", "text": prompt})
 
     response = client.messages.create(
-        model="claude-sonnet-4-20250514",
+        model=AI_MODEL,
         max_tokens=512,
         messages=[
             {"role": "user", "content": content}
         ]
     )
+    record_usage(response)
 
     # Parse the response
     response_text = response.content[0].text
@@ -355,6 +366,7 @@ IMPORTANT:
 
         return result
     except (json.JSONDecodeError, ValueError):
+        mark_uncacheable()
         return {}
 
 
@@ -368,6 +380,7 @@ def extract_line_items_with_ai(file_path: str, api_key: Optional[str] = None) ->
         api_key = os.environ.get('ANTHROPIC_API_KEY')
 
     if not api_key:
+        mark_uncacheable()
         return []
 
     client = anthropic.Anthropic(api_key=api_key)
@@ -426,12 +439,13 @@ IMPORTANT:
 
     try:
         response = client.messages.create(
-            model="claude-sonnet-4-20250514",
+            model=AI_MODEL,
             max_tokens=4096,
             messages=[
                 {"role": "user", "content": content}
             ]
         )
+        record_usage(response)
 
         response_text = response.content[0].text
         result = BaseProvider._extract_json(response_text)
@@ -443,6 +457,7 @@ IMPORTANT:
         return []
     except Exception as e:
         print(f"AI line items extraction error: {e}")
+        mark_uncacheable()
         return []
 
 
@@ -832,9 +847,15 @@ def parse_with_template(file_path: str, template: dict) -> dict:
 
 
 def parse_invoice_with_template_from_bytes(file_bytes: bytes, filename: str, template: dict) -> dict:
-    """Parse invoice from uploaded file bytes using a template."""
+    """Parse invoice from uploaded file bytes using a template (cached by content
+    and template fingerprint, see parse_cache)."""
     ext = os.path.splitext(filename)[1].lower()
+    version = f'{PARSE_CACHE_VERSION}:{fingerprint(template)}:{ext}'
+    return cached_parse('template', file_bytes, version,
+                        lambda: _parse_invoice_with_template_from_bytes(file_bytes, ext, template))
+
 
+def _parse_invoice_with_template_from_bytes(file_bytes: bytes, ext: str, template: dict) -> dict:
     with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
         tmp.write(file_bytes)
         tmp_path = tmp.name
@@ -1133,7 +1154,7 @@ Return ONLY the JSON, no other text."""
         })
 
         response = client.messages.create(
-            model="claude-sonnet-4-20250514",
+            model=AI_MODEL,
             max_tokens=2048,
             messages=[
                 {"role": "user", "content": content}
@@ -1195,11 +1216,19 @@ def auto_detect_and_parse(file_bytes: bytes, filename: str, templates: list[dict
         templates: List of all available templates
         api_key: Optional Anthropic API key
 
+    Results are cached by file content + templates fingerprint + model, so
+    re-uploads of the same document skip extraction and AI calls entirely.
+
     Returns:
         Parsed invoice data with 'auto_detected_template' field if template was matched
     """
     ext = os.path.splitext(filename)[1].lower()
+    version = f'{PARSE_CACHE_VERSION}:{AI_MODEL}:{fingerprint(templates)}:{ext}'
+    return cached_parse('auto', file_bytes, version,
+                        lambda: _auto_detect_and_parse(file_bytes, ext, templates, api_key))
+
 
+def _auto_detect_and_parse(file_bytes: bytes, ext: str, templates: list[dict], api_key: Optional[str]) -> dict:
     # Create temp file for processing
     with tempfile.NamedTemporaryFile(suffix=ext, delete=False) as tmp:
         tmp.write(file_bytes)
@@ -1240,6 +1269,7 @@ def auto_detect_and_parse(file_bytes: bytes, filename: str, templates: list[dict
                 except Exception as e:
                     # AI fallback failed, continue with template results
                     print(f"AI fallback failed for missing fields: {e}")
+                    mark_uncacheable()
 
             # Extract line items if template parsing didn't produce any
             # Template-based parsing only gets header fields — line items need AI vision
@@ -1251,6 +1281,7 @@ def auto_detect_and_parse(file_bytes: bytes, filename: str, templates: list[dict
                         result['line_items_source'] = 'ai_extraction'
                 except Exception as e:
                     print(f"AI line items extraction failed: {e}")
+                    mark_uncacheable()
 
             return result
         else:
@@ -1316,7 +1347,7 @@ IMPORTANT: Return ONLY the JSON object, no explanation or additional text."""
 
     try:
         response = client.messages.create(
-            model="claude-sonnet-4-20250514",
+            model=AI_MODEL,
             max_tokens=1024,
             messages=[{"role": "user", "content": prompt}]
         )
@@ -0,0 +1,240 @@
+"""Content-addressed cache for invoice parse results.
+
+Re-uploading the same document (e-Factura duplicates, retries, bulk re-runs)
+used to repeat text extraction, template matching and paid Claude calls. Parse
+results are now stored in invoice_parse_cache under
+
+    sha256(kind : sha256(content) : version)
+
+where `version` folds in PARSE_CACHE_VERSION, the AI model and — for template
+parses — a fingerprint of the template(s) involved, so editing a template or
+switching model never serves a stale parse.
+
+The cost of the Claude calls made while computing a result is metered (see
+record_usage) and stored with the entry; every hit adds it to
+invoice_parse_cache_stats.saved_usd. The table is bounded by
+INVOICE_PARSE_CACHE_MAX_MB: after each store the least recently hit entries
+beyond the budget are evicted.
+
+The cache is strictly best-effort — any database error degrades to an
+uncached parse.
+"""
+
+import contextvars
+import hashlib
+import json
+import logging
+import os
+
+from core.base_repository import BaseRepository
+
+logger = logging.getLogger('jarvis.bugetare.parse_cache')
+
+# Model used by every invoice-parsing Claude call
+AI_MODEL = 'claude-sonnet-4-20250514'
+
+# Bump when parser output changes shape to invalidate every cached result
+PARSE_CACHE_VERSION = 1
+
+# USD per million (input, output) tokens
+MODEL_PRICING = {
+    'claude-sonnet-4-20250514': (3.0, 15.0),
+}
+
+MAX_CACHE_BYTES = int(os.environ.get('INVOICE_PARSE_CACHE_MAX_MB', '200')) * 1024 * 1024
+
+
+# ── Usage meter ──
+
+class _Meter:
+    __slots__ = ('cost_usd', 'calls', 'cacheable')
+
+    def __init__(self):
+        self.cost_usd = 0.0
+        self.calls = 0
+        self.cacheable = True
+
+
+_meter = contextvars.ContextVar('invoice_parse_meter', default=None)
+
+
+def usage_cost(usage, model=AI_MODEL):
+    """Dollar cost of an Anthropic `response.usage` block."""
+    price_in, price_out = MODEL_PRICING.get(model, MODEL_PRICING[AI_MODEL])
+    input_tokens = getattr(usage, 'input_tokens', 0) or 0
+    output_tokens = getattr(usage, 'output_tokens', 0) or 0
+    return (input_tokens * price_in + output_tokens * price_out) / 1_000_000
+
+
+def record_usage(response, model=AI_MODEL):
+    """Charge a Claude response to the parse currently being computed (if any)."""
+    meter = _meter.get()
+    if meter is None:
+        return
+    try:
+        meter.cost_usd += usage_cost(response.usage, model)
+    except Exception:
+        pass
+    meter.calls += 1
+
+
+def mark_uncacheable():
+    """Flag the current parse as degraded (e.g. an AI fallback failed) so a
+    transient error is not pinned in the cache."""
+    meter = _meter.get()
+    if meter is not None:
+        meter.cacheable = False
+
+
+# ── Keys ──
+
+def content_digest(content):
+    if isinstance(content, str):
+        content = content.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def fingerprint(obj):
+    """Stable short hash of a JSON-able object (templates, template lists)."""
+    payload = json.dumps(obj, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()[:16]
+
+
+def cache_key(kind, digest, version):
+    return hashlib.sha256(f'{kind}:{digest}:{version}'.encode('utf-8')).hexdigest()
+
+
+# ── Repository ──
+
+class ParseCacheRepository(BaseRepository):
+
+    def hit(self, key):
+        """Return the cached result and record the hit, or None on a miss."""
+        row = self.execute('''
+            WITH hit AS (
+                UPDATE invoice_parse_cache
+                SET hit_count = hit_count + 1, last_hit_at = NOW()
+                WHERE cache_key = %s
+                RETURNING kind, result, cost_usd
+            ), tally AS (
+                INSERT INTO invoice_parse_cache_stats (kind, hits, saved_usd)
+                SELECT kind, 1, cost_usd FROM hit
+                ON CONFLICT (kind) DO UPDATE
+                SET hits = invoice_parse_cache_stats.hits + 1,
+                    saved_usd = invoice_parse_cache_stats.saved_usd + EXCLUDED.saved_usd
+            )
+            SELECT result FROM hit
+        ''', (key,), returning=True)
+        if not row or not isinstance(row.get('result'), dict):
+            return None
+        return row['result']
+
+    def store(self, key, kind, digest, version, payload, cost_usd, max_bytes=MAX_CACHE_BYTES):
+        """Insert a serialized result, count the miss and evict beyond max_bytes."""
+        def _work(cursor):
+            cursor.execute('''
+                INSERT INTO invoice_parse_cache
+                    (cache_key, kind, content_sha256, parser_version, result, size_bytes, cost_usd)
+                VALUES (%s, %s, %s, %s, %s::jsonb, %s, %s)
+                ON CONFLICT (cache_key) DO NOTHING
+            ''', (key, kind, digest, str(version), payload, len(payload), cost_usd))
+            self._tally_miss(cursor, kind)
+            return self._evict(cursor, max_bytes)
+        return self.execute_many(_work)
+
+    def record_miss(self, kind):
+        self.execute_many(lambda cursor: self._tally_miss(cursor, kind))
+
+    def evict(self, max_bytes=MAX_CACHE_BYTES):
+        """Drop least recently hit entries until the cache fits max_bytes."""
+        return self.execute_many(lambda cursor: self._evict(cursor, max_bytes))
+
+    def clear(self):
+        return self.execute('DELETE FROM invoice_parse_cache')
+
+    def stats(self):
+        totals = self.query_one('''
+            SELECT COUNT(*) AS entries, COALESCE(SUM(size_bytes), 0) AS size_bytes
+            FROM invoice_parse_cache
+        ''') or {}
+        by_kind = self.query_all('''
+            SELECT kind, hits, misses, saved_usd
+            FROM invoice_parse_cache_stats ORDER BY kind
+        ''')
+        hits = sum(int(r['hits'] or 0) for r in by_kind)
+        misses = sum(int(r['misses'] or 0) for r in by_kind)
+        lookups = hits + misses
+        return {
+            'entries': int(totals.get('entries') or 0),
+            'size_bytes': int(totals.get('size_bytes') or 0),
+            'max_bytes': MAX_CACHE_BYTES,
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': round(hits / lookups, 4) if lookups else 0.0,
+            'saved_usd': round(sum(float(r['saved_usd'] or 0) for r in by_kind), 4),
+            'by_kind': by_kind,
+        }
+
+    @staticmethod
+    def _tally_miss(cursor, kind):
+        cursor.execute('''
+            INSERT INTO invoice_parse_cache_stats (kind, misses) VALUES (%s, 1)
+            ON CONFLICT (kind) DO UPDATE
+            SET misses = invoice_parse_cache_stats.misses + 1
+        ''', (kind,))
+
+    @staticmethod
+    def _evict(cursor, max_bytes):
+        cursor.execute('''
+            DELETE FROM invoice_parse_cache c
+            USING (
+                SELECT cache_key,
+                       SUM(size_bytes) OVER (ORDER BY last_hit_at DESC, cache_key) AS running
+                FROM invoice_parse_cache
+            ) ranked
+            WHERE ranked.cache_key = c.cache_key AND ranked.running > %s
+        ''', (max_bytes,))
+        return cursor.rowcount
+
+
+_repo = ParseCacheRepository()
+
+
+def cached_parse(kind, content, version, compute, cacheable=None):
+    """Return compute() for this content, served from the cache when possible.
+
+    Args:
+        kind: Parser family ('auto', 'template', 'ai', 'bulk_ai') — part of the key.
+        content: Raw file bytes (or extracted text) the result depends on.
+        version: Everything else the result depends on (model, template fingerprint).
+        compute: Zero-arg callable producing the result dict.
+        cacheable: Optional predicate on the result; falsy → not stored.
+    """
+    digest = content_digest(content)
+    key = cache_key(kind, digest, version)
+
+    try:
+        cached = _repo.hit(key)
+    except Exception as e:
+        logger.warning(f'Parse cache lookup failed: {e}')
+        cached = None
+    if cached is not None:
+        return cached
+
+    meter = _Meter()
+    token = _meter.set(meter)
+    try:
+        result = compute()
+    finally:
+        _meter.reset(token)
+
+    try:
+        if (meter.cacheable and isinstance(result, dict) and not result.get('parse_error')
+                and (cacheable is None or cacheable(result))):
+            payload = json.dumps(result, default=str)
+            _repo.store(key, kind, digest, version, payload, round(meter.cost_usd, 6))
+        else:
+            _repo.record_miss(kind)
+    except Exception as e:
+        logger.warning(f'Parse cache store failed: {e}')
+    return result
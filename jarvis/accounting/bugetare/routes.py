@@ -25,96 +25,143 @@ def bulk_processor():
 
 # ============== API Routes ==============
 
-@bugetare_bp.route('/api/bulk/process', methods=['POST'])
-@login_required
-def api_bulk_process():
-    """Process multiple uploaded invoices and return summary."""
-    from accounting.bugetare.bulk_processor import process_bulk_invoices
-    from database import refresh_connection_pool
-
+def _collect_pdfs():
+    """Read uploaded PDFs as (filename, bytes, None) batch entries, or return an error response."""
     if 'files[]' not in request.files:
-        return jsonify({'success': False, 'error': 'No files uploaded'}), 400
+        return None, (jsonify({'success': False, 'error': 'No files uploaded'}), 400)
 
     files = request.files.getlist('files[]')
     if not files or all(f.filename == '' for f in files):
-        return jsonify({'success': False, 'error': 'No files selected'}), 400
+        return None, (jsonify({'success': False, 'error': 'No files selected'}), 400)
+
+    batch = [(f.filename, f.read(), None) for f in files
+             if f.filename and f.filename.lower().endswith('.pdf')]
+    if not batch:
+        return None, (jsonify({'success': False, 'error': 'No valid PDF files found'}), 400)
+    return batch, None
+
+
+def _shape_report(report):
+    """JSON shape of a bulk_processor report returned to clients."""
+    return {
+        'invoices': [{
+            'filename': inv.get('filename'),
+            'invoice_number': inv.get('invoice_number'),
+            'invoice_date': inv.get('invoice_date'),
+            'invoice_value': inv.get('invoice_value'),
+            'currency': inv.get('currency'),
+            'supplier': inv.get('supplier'),
+            'customer_vat': inv.get('customer_vat'),
+            'customer_name': inv.get('customer_name'),
+            'invoice_type': inv.get('invoice_type'),
+            'campaigns': inv.get('campaigns', {})
+        } for inv in report.get('invoices', [])],
+        'total': report.get('total', 0),
+        'count': report.get('count', 0),
+        'currency': report.get('currency', 'RON'),
+        'by_month': report.get('by_month', {}),
+        'by_campaign': report.get('by_campaign', {}),
+        'by_supplier': report.get('by_supplier', {})
+    }
+
+
+def _excel_response(report):
+    from accounting.bugetare.bulk_processor import generate_excel_report
+    excel_bytes = generate_excel_report(report)
 
-    # Collect file data
-    file_data = []
-    for f in files:
-        if f.filename and f.filename.lower().endswith('.pdf'):
-            file_bytes = f.read()
-            file_data.append((file_bytes, f.filename))
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f'Invoice_Report_{timestamp}.xlsx'
 
-    if not file_data:
-        return jsonify({'success': False, 'error': 'No valid PDF files found'}), 400
+    return Response(
+        excel_bytes,
+        mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        headers={'Content-Disposition': f'attachment; filename={filename}'}
+    )
+
+
+@bugetare_bp.route('/api/bulk/process', methods=['POST'])
+@login_required
+def api_bulk_process():
+    """Queue uploaded invoices for bulk processing. Returns the job id (202).
+
+    Poll GET /api/bulk/jobs/<job_id> for progress; the report is included once
+    the job has succeeded.
+    """
+    from accounting.bugetare.bulk_jobs import submit_batch
+
+    batch, error = _collect_pdfs()
+    if error:
+        return error
 
     try:
-        report = process_bulk_invoices(file_data)
-        # Refresh connection pool after bulk processing
-        refresh_connection_pool()
-        return jsonify({
-            'success': True,
-            'report': {
-                'invoices': [{
-                    'filename': inv.get('filename'),
-                    'invoice_number': inv.get('invoice_number'),
-                    'invoice_date': inv.get('invoice_date'),
-                    'invoice_value': inv.get('invoice_value'),
-                    'currency': inv.get('currency'),
-                    'supplier': inv.get('supplier'),
-                    'customer_vat': inv.get('customer_vat'),
-                    'customer_name': inv.get('customer_name'),
-                    'invoice_type': inv.get('invoice_type'),
-                    'campaigns': inv.get('campaigns', {})
-                } for inv in report.get('invoices', [])],
-                'total': report.get('total', 0),
-                'count': report.get('count', 0),
-                'currency': report.get('currency', 'RON'),
-                'by_month': report.get('by_month', {}),
-                'by_campaign': report.get('by_campaign', {}),
-                'by_supplier': report.get('by_supplier', {})
-            }
-        })
+        job_id = submit_batch('bulk_process_report', batch, current_user.id)
+        return jsonify({'success': True, 'job_id': job_id, 'total': len(batch),
+                        'status_url': f'/api/bulk/jobs/{job_id}'}), 202
     except Exception as e:
         return safe_error_response(e)
 
 
-@bugetare_bp.route('/api/bulk/export', methods=['POST'])
+@bugetare_bp.route('/api/bulk/jobs/<int:job_id>', methods=['GET'])
 @login_required
-def api_bulk_export():
-    """Export bulk processing results to Excel."""
-    from accounting.bugetare.bulk_processor import generate_excel_report, process_bulk_invoices
-
-    if 'files[]' not in request.files:
-        return jsonify({'success': False, 'error': 'No files uploaded'}), 400
+def api_bulk_job_status(job_id):
+    """Progress, per-file status and (once finished) the summary report of a bulk job."""
+    from accounting.bugetare.bulk_jobs import get_batch_job, batch_results
+
+    job = get_batch_job(job_id, 'bulk_process_report', current_user)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    files = [{'filename': row['filename'], 'status': row['status'], 'error': row['error']}
+             for row in batch_results(job)]
+    succeeded = job['status'] == 'succeeded'
+    return jsonify({
+        'success': True,
+        'status': job['status'],
+        'progress': job.get('progress'),
+        'done': job['status'] in ('succeeded', 'failed', 'cancelled'),
+        'error': job.get('last_error') if job['status'] == 'failed' else None,
+        'files': files,
+        'report': _shape_report(job.get('result') or {}) if succeeded else None,
+        'export_url': f'/api/bulk/jobs/{job_id}/export' if succeeded else None,
+    })
+
+
+@bugetare_bp.route('/api/bulk/jobs/<int:job_id>/export', methods=['GET'])
+@login_required
+def api_bulk_job_export(job_id):
+    """Export the report of a finished bulk job to Excel."""
+    from accounting.bugetare.bulk_jobs import get_batch_job, restore_dates
 
-    files = request.files.getlist('files[]')
-    if not files or all(f.filename == '' for f in files):
-        return jsonify({'success': False, 'error': 'No files selected'}), 400
+    job = get_batch_job(job_id, 'bulk_process_report', current_user)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    if job['status'] != 'succeeded':
+        return jsonify({'success': False, 'error': f"Job is {job['status']}"}), 409
 
-    # Collect file data
-    file_data = []
-    for f in files:
-        if f.filename and f.filename.lower().endswith('.pdf'):
-            file_bytes = f.read()
-            file_data.append((file_bytes, f.filename))
+    try:
+        report = job.get('result') or {}
+        for inv in report.get('invoices', []):
+            restore_dates(inv)
+        return _excel_response(report)
+    except Exception as e:
+        return safe_error_response(e)
 
-    if not file_data:
-        return jsonify({'success': False, 'error': 'No valid PDF files found'}), 400
 
-    try:
-        report = process_bulk_invoices(file_data)
-        excel_bytes = generate_excel_report(report)
+@bugetare_bp.route('/api/bulk/export', methods=['POST'])
+@login_required
+def api_bulk_export():
+    """Queue uploaded invoices for bulk processing; download from the returned export_url."""
+    from accounting.bugetare.bulk_jobs import submit_batch
 
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'Invoice_Report_{timestamp}.xlsx'
+    batch, error = _collect_pdfs()
+    if error:
+        return error
 
-        return Response(
-            excel_bytes,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+    try:
+        job_id = submit_batch('bulk_process_report', batch, current_user.id)
+        return jsonify({'success': True, 'job_id': job_id, 'total': len(batch),
+                        'status_url': f'/api/bulk/jobs/{job_id}',
+                        'export_url': f'/api/bulk/jobs/{job_id}/export'}), 202
     except Exception as e:
         return safe_error_response(e)
 
@@ -123,8 +170,6 @@ def api_bulk_export():
 @login_required
 def api_bulk_export_json():
     """Export bulk processing results from JSON data to Excel."""
-    from accounting.bugetare.bulk_processor import generate_excel_report
-
     data = request.get_json()
     if not data or 'report' not in data:
         return jsonify({'success': False, 'error': 'No report data provided'}), 400
@@ -140,16 +185,7 @@ def api_bulk_export_json():
                 except Exception:
                     inv['date_parsed'] = None
 
-        excel_bytes = generate_excel_report(report)
-
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f'Invoice_Report_{timestamp}.xlsx'
-
-        return Response(
-            excel_bytes,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
-            headers={'Content-Disposition': f'attachment; filename={filename}'}
-        )
+        return _excel_response(report)
     except Exception as e:
         return safe_error_response(e)
 
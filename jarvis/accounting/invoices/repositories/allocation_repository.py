@@ -6,6 +6,11 @@ from core.base_repository import BaseRepository
 
 logger = logging.getLogger('jarvis.allocations')
 
+# Resolves a free-text responsible name to users.id inside the write
+# (idx_users_lower_name). Names with no matching user stay NULL until
+# resolve_responsibles() links them.
+RESPONSIBLE_USER_SQL = '(SELECT id FROM users WHERE LOWER(name) = LOWER(%s) ORDER BY id LIMIT 1)'
+
 
 class AllocationRepository(BaseRepository):
 
@@ -51,6 +56,10 @@ class AllocationRepository(BaseRepository):
                 updates.append(f'{field} = %s')
                 params.append(value)
 
+        if responsible is not None:
+            updates.append(f'responsible_user_id = {RESPONSIBLE_USER_SQL}')
+            params.append(responsible)
+
         if not updates:
             return False
 
@@ -58,6 +67,26 @@ class AllocationRepository(BaseRepository):
         query = f"UPDATE allocations SET {', '.join(updates)} WHERE id = %s"
         return self.execute(query, params) > 0
 
+    def resolve_responsibles(self):
+        """Link allocations whose responsible name matches a user but has no
+        responsible_user_id yet (user created or renamed after the write).
+
+        Scans only the unresolved rows (idx_allocations_unresolved_responsible).
+        Returns the number of allocations linked.
+        """
+        return self.execute('''
+            UPDATE allocations a
+            SET responsible_user_id = u.id
+            FROM (
+                SELECT DISTINCT ON (LOWER(name)) id, LOWER(name) AS name_lower
+                FROM users
+                ORDER BY LOWER(name), id
+            ) u
+            WHERE a.responsible_user_id IS NULL
+              AND a.responsible IS NOT NULL
+              AND LOWER(a.responsible) = u.name_lower
+        ''')
+
     def delete(self, allocation_id):
         """Delete an allocation."""
         return self.execute('DELETE FROM allocations WHERE id = %s', (allocation_id,)) > 0
@@ -5,7 +5,9 @@ import logging
 
 from database import dict_from_row
 from core.base_repository import BaseRepository
+from accounting.invoices.repositories.allocation_repository import RESPONSIBLE_USER_SQL
 from core.cache import _cache_lock, _is_cache_valid
+from core.metrics import cache_result
 
 logger = logging.getLogger('jarvis.invoices')
 
@@ -99,9 +101,9 @@ class InvoiceRepository(BaseRepository):
                         responsible = row['manager_name']
                         responsible_user_id = row.get('manager_user_id')
 
-                cursor.execute('''
+                cursor.execute(f'''
                     INSERT INTO allocations (invoice_id, company, brand, department, subdepartment, allocation_percent, allocation_value, responsible, responsible_user_id, reinvoice_to, reinvoice_brand, reinvoice_department, reinvoice_subdepartment, locked, comment, line_item_index)
-                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, COALESCE(%s, {RESPONSIBLE_USER_SQL}), %s, %s, %s, %s, %s, %s, %s)
                     RETURNING id
                 ''', (
                     invoice_id,
@@ -113,6 +115,7 @@ class InvoiceRepository(BaseRepository):
                     allocation_value,
                     responsible,
                     responsible_user_id,
+                    responsible or None,
                     dist.get('reinvoice_to'),
                     dist.get('reinvoice_brand'),
                     dist.get('reinvoice_department'),
@@ -252,7 +255,7 @@ class InvoiceRepository(BaseRepository):
 
         cache_key = f"{limit}:{offset}:{company}:{start_date}:{end_date}:{department}:{subdepartment}:{brand}:{status}:{payment_status}:{include_deleted}:{responsible_user_id}"
 
-        if _is_cache_valid(_invoices_cache) and _invoices_cache.get('key') == cache_key:
+        if cache_result('invoices', _is_cache_valid(_invoices_cache) and _invoices_cache.get('key') == cache_key):
             return _invoices_cache['data']
 
         params = []
@@ -612,6 +615,16 @@ class InvoiceRepository(BaseRepository):
             return {'exists': True, 'invoice': row}
         return {'exists': False, 'invoice': None}
 
+    def existing_numbers(self, invoice_numbers):
+        """Batched check_number_exists: the subset of numbers already in the database."""
+        numbers = sorted({n for n in invoice_numbers if n})
+        if not numbers:
+            return set()
+        rows = self.query_all('''
+            SELECT DISTINCT invoice_number FROM invoices WHERE invoice_number = ANY(%s)
+        ''', (numbers,))
+        return {r['invoice_number'] for r in rows}
+
     def search(self, query, filters=None, responsible_user_id=None):
         """Search invoices by supplier, invoice number, or value."""
         filters = filters or {}
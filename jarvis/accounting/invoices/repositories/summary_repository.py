@@ -20,6 +20,16 @@ _summary_cache = {
 }
 
 
+# EUR rate for invoices stored without one: the BNR rate in force on the
+# invoice date (bnr_exchange_rates), 5.0 only if no rate is stored yet
+_BNR_EUR_RATE_JOIN = '''LEFT JOIN LATERAL (
+                SELECT r.rate FROM bnr_exchange_rates r
+                WHERE i.exchange_rate IS NULL AND r.currency = 'EUR'
+                AND r.rate_date <= i.invoice_date
+                ORDER BY r.rate_date DESC LIMIT 1
+            ) bnr ON TRUE'''
+
+
 def clear_summary_cache():
     """Clear the summary cache only."""
     global _summary_cache
@@ -48,7 +58,7 @@ class SummaryRepository(BaseRepository):
         if cache_entry and (time.time() - cache_entry['timestamp']) < _summary_cache['ttl']:
             return cache_entry['data']
 
-        query = '''
+        query = f'''
             SELECT
                 a.company,
                 SUM(CASE WHEN i.invoice_value > 0 AND i.value_ron IS NOT NULL
@@ -56,11 +66,12 @@ class SummaryRepository(BaseRepository):
                     ELSE a.allocation_value END) as total_value_ron,
                 SUM(CASE WHEN i.invoice_value > 0 AND i.value_eur IS NOT NULL
                     THEN a.allocation_value * i.value_eur / i.invoice_value
-                    ELSE a.allocation_value / COALESCE(i.exchange_rate, 5.0) END) as total_value_eur,
+                    ELSE a.allocation_value / COALESCE(i.exchange_rate, bnr.rate, 5.0) END) as total_value_eur,
                 COUNT(DISTINCT a.invoice_id) as invoice_count,
-                AVG(COALESCE(i.exchange_rate, 5.0)) as avg_exchange_rate
+                AVG(COALESCE(i.exchange_rate, bnr.rate, 5.0)) as avg_exchange_rate
             FROM allocations a
             JOIN invoices i ON a.invoice_id = i.id
+            {_BNR_EUR_RATE_JOIN}
             WHERE i.deleted_at IS NULL
         '''
         params = []
@@ -103,7 +114,7 @@ class SummaryRepository(BaseRepository):
         if cache_entry and (time.time() - cache_entry['timestamp']) < _summary_cache['ttl']:
             return cache_entry['data']
 
-        query = '''
+        query = f'''
             SELECT
                 a.company,
                 a.department,
@@ -113,11 +124,12 @@ class SummaryRepository(BaseRepository):
                     ELSE a.allocation_value END) as total_value_ron,
                 SUM(CASE WHEN i.invoice_value > 0 AND i.value_eur IS NOT NULL
                     THEN a.allocation_value * i.value_eur / i.invoice_value
-                    ELSE a.allocation_value / COALESCE(i.exchange_rate, 5.0) END) as total_value_eur,
+                    ELSE a.allocation_value / COALESCE(i.exchange_rate, bnr.rate, 5.0) END) as total_value_eur,
                 COUNT(DISTINCT a.invoice_id) as invoice_count,
-                AVG(COALESCE(i.exchange_rate, 5.0)) as avg_exchange_rate
+                AVG(COALESCE(i.exchange_rate, bnr.rate, 5.0)) as avg_exchange_rate
             FROM allocations a
             JOIN invoices i ON a.invoice_id = i.id
+            {_BNR_EUR_RATE_JOIN}
             WHERE i.deleted_at IS NULL
         '''
         params = []
@@ -163,16 +175,16 @@ class SummaryRepository(BaseRepository):
         if cache_entry and (time.time() - cache_entry['timestamp']) < _summary_cache['ttl']:
             return cache_entry['data']
 
-        query = '''
+        query = f'''
             SELECT a.brand,
                    SUM(CASE WHEN i.invoice_value > 0 AND i.value_ron IS NOT NULL
                        THEN a.allocation_value * i.value_ron / i.invoice_value
                        ELSE a.allocation_value END) as total_value_ron,
                    SUM(CASE WHEN i.invoice_value > 0 AND i.value_eur IS NOT NULL
                        THEN a.allocation_value * i.value_eur / i.invoice_value
-                       ELSE a.allocation_value / COALESCE(i.exchange_rate, 5.0) END) as total_value_eur,
+                       ELSE a.allocation_value / COALESCE(i.exchange_rate, bnr.rate, 5.0) END) as total_value_eur,
                    COUNT(DISTINCT a.invoice_id) as invoice_count,
-                   AVG(COALESCE(i.exchange_rate, 5.0)) as avg_exchange_rate,
+                   AVG(COALESCE(i.exchange_rate, bnr.rate, 5.0)) as avg_exchange_rate,
                    STRING_AGG(DISTINCT i.invoice_number, ', ') as invoice_numbers,
                    JSON_AGG(JSON_BUILD_OBJECT(
                        'department', a.department,
@@ -184,7 +196,7 @@ class SummaryRepository(BaseRepository):
                            ELSE a.allocation_value END,
                        'value_eur', CASE WHEN i.invoice_value > 0 AND i.value_eur IS NOT NULL
                            THEN a.allocation_value * i.value_eur / i.invoice_value
-                           ELSE a.allocation_value / COALESCE(i.exchange_rate, 5.0) END,
+                           ELSE a.allocation_value / COALESCE(i.exchange_rate, bnr.rate, 5.0) END,
                        'percent', ROUND(a.allocation_percent),
                        'reinvoice_to', a.reinvoice_to,
                        'reinvoice_brand', a.reinvoice_brand,
@@ -194,6 +206,7 @@ class SummaryRepository(BaseRepository):
                    )) as split_values
             FROM allocations a
             JOIN invoices i ON a.invoice_id = i.id
+            {_BNR_EUR_RATE_JOIN}
             WHERE i.deleted_at IS NULL
         '''
         params = []
@@ -239,7 +252,7 @@ class SummaryRepository(BaseRepository):
         if cache_entry and (time.time() - cache_entry['timestamp']) < _summary_cache['ttl']:
             return cache_entry['data']
 
-        query = '''
+        query = f'''
             SELECT
                 i.supplier,
                 SUM(CASE WHEN i.invoice_value > 0 AND i.value_ron IS NOT NULL
@@ -247,11 +260,12 @@ class SummaryRepository(BaseRepository):
                     ELSE a.allocation_value END) as total_value_ron,
                 SUM(CASE WHEN i.invoice_value > 0 AND i.value_eur IS NOT NULL
                     THEN a.allocation_value * i.value_eur / i.invoice_value
-                    ELSE a.allocation_value / COALESCE(i.exchange_rate, 5.0) END) as total_value_eur,
+                    ELSE a.allocation_value / COALESCE(i.exchange_rate, bnr.rate, 5.0) END) as total_value_eur,
                 COUNT(DISTINCT a.invoice_id) as invoice_count,
-                AVG(COALESCE(i.exchange_rate, 5.0)) as avg_exchange_rate
+                AVG(COALESCE(i.exchange_rate, bnr.rate, 5.0)) as avg_exchange_rate
             FROM allocations a
             JOIN invoices i ON a.invoice_id = i.id
+            {_BNR_EUR_RATE_JOIN}
             WHERE i.deleted_at IS NULL
         '''
         params = []
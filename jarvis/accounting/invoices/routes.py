@@ -109,7 +109,10 @@ def submit_invoice():
 @invoices_bp.route('/api/invoices/bulk-parse', methods=['POST'])
 @login_required
 def api_bulk_parse():
-    """Parse multiple uploaded invoices using AI. Returns array of parse results."""
+    """Queue a batch of uploaded invoices for AI parsing. Returns the job id (202).
+
+    Poll GET /api/invoices/bulk-parse/<job_id> for progress and results.
+    """
     if not _check_invoice_perm('add'):
         return jsonify({'success': False, 'error': 'Permission denied'}), 403
 
@@ -120,30 +123,49 @@ def api_bulk_parse():
         return jsonify({'success': False, 'error': 'Maximum 20 files per batch'}), 400
 
     allowed_extensions = {'.pdf', '.jpg', '.jpeg', '.png', '.tiff', '.tif'}
-    results = []
+    batch = []
     for f in files:
         _, ext = os.path.splitext(f.filename.lower())
         if ext not in allowed_extensions:
-            results.append({'filename': f.filename, 'success': False, 'error': f'File type {ext} not allowed'})
+            batch.append((f.filename, None, f'File type {ext} not allowed'))
             continue
         file_data = f.read()
         if len(file_data) > 50 * 1024 * 1024:
-            results.append({'filename': f.filename, 'success': False, 'error': 'File too large (max 50MB)'})
+            batch.append((f.filename, None, 'File too large (max 50MB)'))
             continue
-        result = _service.parse_invoice(file_data, f.filename)
-        if result.success:
-            inv_num = result.data.get('invoice_number', '')
-            dup = _invoice_repo.check_number_exists(inv_num) if inv_num else {'exists': False}
-            results.append({
-                'filename': f.filename,
-                'success': True,
-                'data': result.data,
-                'duplicate': dup.get('exists', False),
-            })
-        else:
-            results.append({'filename': f.filename, 'success': False, 'error': result.error})
+        batch.append((f.filename, file_data, None))
 
-    return jsonify({'success': True, 'results': results})
+    from accounting.bugetare.bulk_jobs import submit_batch
+    job_id = submit_batch('bulk_parse_invoices', batch, current_user.id)
+    return jsonify({'success': True, 'job_id': job_id, 'total': len(batch)}), 202
+
+
+@invoices_bp.route('/api/invoices/bulk-parse/<int:job_id>', methods=['GET'])
+@login_required
+def api_bulk_parse_status(job_id):
+    """Progress and (partial) per-file results of a bulk parse job."""
+    from accounting.bugetare.bulk_jobs import get_batch_job, batch_results
+    job = get_batch_job(job_id, 'bulk_parse_invoices', current_user)
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+
+    results = []
+    for row in batch_results(job):
+        entry = {'filename': row['filename'], 'status': row['status']}
+        if row['status'] == 'done':
+            entry.update(success=True, data=row['result'], duplicate=row['duplicate'])
+        elif row['status'] == 'failed':
+            entry.update(success=False, error=row['error'])
+        results.append(entry)
+
+    return jsonify({
+        'success': True,
+        'status': job['status'],
+        'progress': job.get('progress'),
+        'done': job['status'] in ('succeeded', 'failed', 'cancelled'),
+        'error': job.get('last_error') if job['status'] == 'failed' else None,
+        'results': results,
+    })
 
 
 @invoices_bp.route('/api/invoices/bulk-submit', methods=['POST'])
@@ -227,6 +249,17 @@ def api_parse_invoice():
     return jsonify({'success': False, 'error': result.error}), result.status_code
 
 
+@invoices_bp.route('/api/parse-cache/stats')
+@login_required
+@handle_api_errors
+def api_parse_cache_stats():
+    """Parse cache size, hit rate and AI spend avoided."""
+    if not _check_invoice_perm('view'):
+        return jsonify({'success': False, 'error': 'Permission denied'}), 403
+    from accounting.bugetare.parse_cache import ParseCacheRepository
+    return jsonify({'success': True, 'stats': ParseCacheRepository().stats()})
+
+
 @invoices_bp.route('/api/parse-existing/<path:filepath>')
 @login_required
 @handle_api_errors
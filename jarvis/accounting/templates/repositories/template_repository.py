@@ -33,7 +33,7 @@ class TemplateRepository(BaseRepository):
         """Get all invoice templates (with caching)."""
         global _templates_cache
 
-        if _is_cache_valid(_templates_cache):
+        if _is_cache_valid(_templates_cache, 'templates'):
             return _templates_cache['data']
 
         templates = self.query_all('SELECT * FROM invoice_templates ORDER BY name')
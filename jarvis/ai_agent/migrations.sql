@@ -95,6 +95,7 @@ CREATE TABLE IF NOT EXISTS ai_agent.messages (
     -- Message content
     role VARCHAR(20) NOT NULL,                -- user, assistant, system
     content TEXT NOT NULL,
+    content_tokens INTEGER,                   -- Estimated tokens of content (context budgeting)
 
     -- Token tracking
     input_tokens INTEGER DEFAULT 0,
@@ -114,6 +115,7 @@ CREATE TABLE IF NOT EXISTS ai_agent.messages (
 );
 
 CREATE INDEX IF NOT EXISTS idx_messages_conversation ON ai_agent.messages(conversation_id);
+CREATE INDEX IF NOT EXISTS idx_messages_conversation_recent ON ai_agent.messages(conversation_id, created_at DESC, id DESC);
 CREATE INDEX IF NOT EXISTS idx_messages_created ON ai_agent.messages(created_at);
 
 -- ============================================================
@@ -135,6 +135,9 @@ class Message:
     output_tokens: int = 0
     cost: Decimal = field(default_factory=lambda: Decimal("0"))
 
+    # Estimated tokens of `content` when replayed as context (set on insert)
+    content_tokens: Optional[int] = None
+
     rag_sources: List[Dict[str, Any]] = field(default_factory=list)
     model_config_id: Optional[int] = None
     response_time_ms: Optional[int] = None
@@ -219,6 +222,30 @@ class LLMResponse:
     model: str
     finish_reason: Optional[str] = None
     tool_calls: List[Dict[str, Any]] = field(default_factory=list)
+    # input_tokens includes cached prompt tokens; these break them down
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    ttft_ms: Optional[int] = None  # time to first token (whole call when not streaming)
+
+
+@dataclass
+class LLMUsage:
+    """Token usage accumulated over the LLM calls of one chat turn."""
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cache_read_tokens: int = 0
+    cache_write_tokens: int = 0
+    calls: int = 0
+    ttft_ms: Optional[int] = None  # of the first call — what the user waits for
+
+    def add(self, response: LLMResponse) -> None:
+        self.input_tokens += response.input_tokens
+        self.output_tokens += response.output_tokens
+        self.cache_read_tokens += response.cache_read_tokens
+        self.cache_write_tokens += response.cache_write_tokens
+        if self.calls == 0:
+            self.ttft_ms = response.ttft_ms
+        self.calls += 1
 
 
 @dataclass
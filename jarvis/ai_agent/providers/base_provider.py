@@ -4,19 +4,68 @@ Base Provider
 Abstract base class for LLM providers.
 """
 
+import functools
 import json
 import logging
+import threading
 from abc import ABC, abstractmethod
 from typing import List, Dict, Any, Optional, Generator, Tuple
 
+from core.metrics import Counter, external_call
 from ..models import LLMResponse
 
 logger = logging.getLogger('jarvis.ai_agent.providers.base')
 
+LLM_TOKENS = Counter('jarvis_llm_tokens_total', 'LLM tokens used', ['provider', 'model', 'kind'])
+
+# Provider methods timed as external calls (jarvis_external_call_*{service=<provider>})
+_INSTRUMENTED_METHODS = ('generate', 'generate_structured', 'generate_stream')
+_active = threading.local()
+
+
+def _count_tokens(provider, response):
+    if isinstance(response, LLMResponse):
+        LLM_TOKENS.inc(response.input_tokens or 0, provider=provider, model=response.model, kind='input')
+        LLM_TOKENS.inc(response.output_tokens or 0, provider=provider, model=response.model, kind='output')
+
+
+def _instrument(method, func):
+    if method == 'generate_stream':
+        @functools.wraps(func)
+        def stream(self, *args, **kwargs):
+            with external_call(self.name, method):
+                for chunk, final in func(self, *args, **kwargs):
+                    if final is not None:
+                        _count_tokens(self.name, final)
+                    yield chunk, final
+        return stream
+
+    @functools.wraps(func)
+    def call(self, *args, **kwargs):
+        # generate_structured may fall back to generate(): time the outer call only
+        if getattr(_active, 'depth', 0):
+            result = func(self, *args, **kwargs)
+        else:
+            _active.depth = 1
+            try:
+                with external_call(self.name, method):
+                    result = func(self, *args, **kwargs)
+            finally:
+                _active.depth = 0
+        _count_tokens(self.name, result)
+        return result
+    return call
+
 
 class BaseProvider(ABC):
     """Abstract base class for LLM providers."""
 
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for method in _INSTRUMENTED_METHODS:
+            if method in cls.__dict__:
+                setattr(cls, method, _instrument(method, cls.__dict__[method]))
+
     @property
     @abstractmethod
     def name(self) -> str:
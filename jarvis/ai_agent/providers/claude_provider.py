@@ -5,6 +5,7 @@ Anthropic Claude LLM provider implementation.
 """
 
 import os
+import time
 from typing import List, Dict, Any, Optional, Generator, Tuple
 
 import anthropic
@@ -13,9 +14,13 @@ from core.utils.logging_config import get_logger
 from ..models import LLMResponse
 from ..exceptions import LLMProviderError, LLMRateLimitError, LLMAuthenticationError
 from .base_provider import BaseProvider
+from .client_pool import get_client
 
 logger = get_logger('jarvis.ai_agent.providers.claude')
 
+# Prompt-cache breakpoint (5-minute TTL, refreshed on every hit)
+CACHE_CONTROL = {'type': 'ephemeral'}
+
 
 class ClaudeProvider(BaseProvider):
     """Anthropic Claude LLM provider."""
@@ -24,6 +29,40 @@ class ClaudeProvider(BaseProvider):
     def name(self) -> str:
         return "claude"
 
+    def _client(self, key: str) -> anthropic.Anthropic:
+        return get_client(self.name, key, lambda: anthropic.Anthropic(api_key=key))
+
+    @staticmethod
+    def _system_blocks(system: str, cache_prefix: Optional[str] = None) -> List[dict]:
+        """System prompt as text blocks with a prompt-cache breakpoint.
+
+        With cache_prefix (the static head of the prompt) the breakpoint goes
+        after it, so turns that differ only in RAG/analytics context still hit
+        the cache. Otherwise the whole prompt is cached, which pays off across
+        tool-loop iterations of the same turn.
+        """
+        if cache_prefix and system.startswith(cache_prefix) and len(system) > len(cache_prefix):
+            return [
+                {'type': 'text', 'text': cache_prefix, 'cache_control': CACHE_CONTROL},
+                {'type': 'text', 'text': system[len(cache_prefix):]},
+            ]
+        return [{'type': 'text', 'text': system, 'cache_control': CACHE_CONTROL}]
+
+    @staticmethod
+    def _cached_tools(tools: List[dict]) -> List[dict]:
+        """Tool schemas with a breakpoint on the last one (caches the whole tool list)."""
+        return tools[:-1] + [{**tools[-1], 'cache_control': CACHE_CONTROL}]
+
+    @staticmethod
+    def _usage(usage) -> Tuple[int, int, int, int]:
+        """(input incl. cached, output, cache read, cache write) token counts."""
+        if not usage:
+            return 0, 0, 0, 0
+        cache_read = getattr(usage, 'cache_read_input_tokens', 0) or 0
+        cache_write = getattr(usage, 'cache_creation_input_tokens', 0) or 0
+        return (usage.input_tokens + cache_read + cache_write, usage.output_tokens,
+                cache_read, cache_write)
+
     def generate(
         self,
         model_name: str,
@@ -42,7 +81,8 @@ class ClaudeProvider(BaseProvider):
             max_tokens: Maximum tokens to generate
             temperature: Sampling temperature (0.0-1.0 for Claude)
             api_key: API key (optional, falls back to ANTHROPIC_API_KEY env)
-            **kwargs: Additional options (system prompt, etc.)
+            **kwargs: Additional options (system prompt, tools,
+                system_cache_prefix — static head of the system prompt)
 
         Returns:
             LLMResponse with content and token counts
@@ -71,7 +111,7 @@ class ClaudeProvider(BaseProvider):
         temperature = max(0.0, min(1.0, temperature))
 
         try:
-            client = anthropic.Anthropic(api_key=key)
+            client = self._client(key)
 
             # Build request parameters
             request_params = {
@@ -81,18 +121,21 @@ class ClaudeProvider(BaseProvider):
                 'messages': formatted_messages,
             }
 
-            # Add system message if present
+            # Add system message if present (cached — it is mostly static)
             if system_content:
-                request_params['system'] = system_content
+                request_params['system'] = self._system_blocks(
+                    system_content, kwargs.get('system_cache_prefix'))
 
             # Add tools if provided
             tools = kwargs.pop('tools', None)
             if tools:
-                request_params['tools'] = tools
+                request_params['tools'] = self._cached_tools(tools)
 
             logger.debug(f"Claude API request: model={model_name}, messages={len(formatted_messages)}, tools={len(tools) if tools else 0}")
 
+            started = time.monotonic()
             response = client.messages.create(**request_params)
+            ttft_ms = int((time.monotonic() - started) * 1000)
 
             # Extract content and tool calls from response
             content = ""
@@ -108,10 +151,10 @@ class ClaudeProvider(BaseProvider):
                     })
 
             # Get token counts from usage
-            input_tokens = response.usage.input_tokens if response.usage else 0
-            output_tokens = response.usage.output_tokens if response.usage else 0
+            input_tokens, output_tokens, cache_read, cache_write = self._usage(response.usage)
 
-            logger.debug(f"Claude API response: tokens_in={input_tokens}, tokens_out={output_tokens}, tool_calls={len(tool_calls)}")
+            logger.debug(f"Claude API response: tokens_in={input_tokens}, tokens_out={output_tokens}, "
+                         f"cache_read={cache_read}, cache_write={cache_write}, tool_calls={len(tool_calls)}")
 
             return LLMResponse(
                 content=content,
@@ -120,6 +163,9 @@ class ClaudeProvider(BaseProvider):
                 model=model_name,
                 finish_reason=response.stop_reason,
                 tool_calls=tool_calls,
+                cache_read_tokens=cache_read,
+                cache_write_tokens=cache_write,
+                ttft_ms=ttft_ms,
             )
 
         except anthropic.RateLimitError as e:
@@ -175,7 +221,7 @@ class ClaudeProvider(BaseProvider):
         }]
 
         try:
-            client = anthropic.Anthropic(api_key=key)
+            client = self._client(key)
             request_params = {
                 'model': model_name,
                 'max_tokens': max_tokens,
@@ -315,7 +361,7 @@ class ClaudeProvider(BaseProvider):
         temperature = max(0.0, min(1.0, temperature))
 
         try:
-            client = anthropic.Anthropic(api_key=key)
+            client = self._client(key)
 
             request_params = {
                 'model': model_name,
@@ -324,16 +370,20 @@ class ClaudeProvider(BaseProvider):
                 'messages': formatted_messages,
             }
             if system_content:
-                request_params['system'] = system_content
+                request_params['system'] = self._system_blocks(
+                    system_content, kwargs.get('system_cache_prefix'))
 
+            ttft_ms = None
+            started = time.monotonic()
             with client.messages.stream(**request_params) as stream:
                 for text in stream.text_stream:
+                    if ttft_ms is None:
+                        ttft_ms = int((time.monotonic() - started) * 1000)
                     yield (text, None)
 
                 final = stream.get_final_message()
 
-            input_tokens = final.usage.input_tokens if final.usage else 0
-            output_tokens = final.usage.output_tokens if final.usage else 0
+            input_tokens, output_tokens, cache_read, cache_write = self._usage(final.usage)
             content = ""
             if final.content:
                 content = final.content[0].text
@@ -344,6 +394,9 @@ class ClaudeProvider(BaseProvider):
                 output_tokens=output_tokens,
                 model=model_name,
                 finish_reason=final.stop_reason,
+                cache_read_tokens=cache_read,
+                cache_write_tokens=cache_write,
+                ttft_ms=ttft_ms,
             ))
 
         except anthropic.RateLimitError as e:
@@ -0,0 +1,44 @@
+"""
+Provider Client Pool
+
+Process-wide cache of SDK clients keyed by (provider, api_key).
+
+The Anthropic/OpenAI/Groq SDK clients are thread-safe and hold an httpx
+connection pool, so reusing one per key keeps connections alive across chat
+turns and tool iterations instead of paying a TLS handshake on every call.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable
+
+MAX_CLIENTS = 32
+
+_clients: 'OrderedDict[tuple, Any]' = OrderedDict()
+_lock = threading.Lock()
+
+
+def get_client(provider: str, api_key: str, factory: Callable[[], Any]) -> Any:
+    """Return the cached client for (provider, api_key), creating it with factory().
+
+    Least recently used clients are dropped beyond MAX_CLIENTS (e.g. after
+    key rotation); the SDK closes their connections when garbage collected.
+    """
+    cache_key = (provider, hashlib.sha256(api_key.encode()).hexdigest())
+    with _lock:
+        client = _clients.get(cache_key)
+        if client is not None:
+            _clients.move_to_end(cache_key)
+            return client
+        client = factory()
+        _clients[cache_key] = client
+        while len(_clients) > MAX_CLIENTS:
+            _clients.popitem(last=False)
+        return client
+
+
+def clear_clients() -> None:
+    """Drop all cached clients (tests, key rotation)."""
+    with _lock:
+        _clients.clear()
@@ -15,6 +15,7 @@ from core.utils.logging_config import get_logger
 from ..models import LLMResponse
 from ..exceptions import LLMProviderError, LLMRateLimitError, LLMAuthenticationError
 from .base_provider import BaseProvider
+from .client_pool import get_client
 
 logger = get_logger('jarvis.ai_agent.providers.grok')
 
@@ -29,11 +30,11 @@ class GrokProvider(BaseProvider):
         return "grok"
 
     def _get_client(self, api_key: Optional[str] = None) -> openai.OpenAI:
-        """Create OpenAI client pointed at xAI endpoint."""
+        """Return the pooled OpenAI client pointed at xAI endpoint."""
         key = api_key or os.environ.get('XAI_API_KEY')
         if not key:
             raise LLMAuthenticationError("XAI_API_KEY not found")
-        return openai.OpenAI(api_key=key, base_url=XAI_BASE_URL)
+        return get_client(self.name, key, lambda: openai.OpenAI(api_key=key, base_url=XAI_BASE_URL))
 
     def generate(
         self,
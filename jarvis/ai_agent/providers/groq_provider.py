@@ -12,6 +12,7 @@ from core.utils.logging_config import get_logger
 from ..models import LLMResponse
 from ..exceptions import LLMProviderError, LLMRateLimitError, LLMAuthenticationError
 from .base_provider import BaseProvider
+from .client_pool import get_client
 
 logger = get_logger('jarvis.ai_agent.providers.groq')
 
@@ -78,7 +79,7 @@ class GroqProvider(BaseProvider):
         tools = kwargs.pop('tools', None)
 
         try:
-            client = Groq(api_key=key)
+            client = get_client(self.name, key, lambda: Groq(api_key=key))
 
             logger.debug(f"Groq API request: model={model_name}, messages={len(formatted_messages)}, tools={len(tools) if tools else 0}")
 
@@ -168,7 +169,7 @@ class GroqProvider(BaseProvider):
         temperature = max(0.0, min(2.0, temperature))
 
         try:
-            client = Groq(api_key=key)
+            client = get_client(self.name, key, lambda: Groq(api_key=key))
             response = client.chat.completions.create(
                 model=model_name,
                 messages=formatted_messages,
@@ -255,7 +256,7 @@ class GroqProvider(BaseProvider):
         temperature = max(0.0, min(2.0, temperature))
 
         try:
-            client = Groq(api_key=key)
+            client = get_client(self.name, key, lambda: Groq(api_key=key))
 
             response = client.chat.completions.create(
                 model=model_name,
@@ -6,6 +6,7 @@ OpenAI GPT LLM provider implementation.
 
 import json as json_module
 import os
+import time
 from typing import List, Dict, Any, Optional, Generator, Tuple
 
 import openai
@@ -14,6 +15,7 @@ from core.utils.logging_config import get_logger
 from ..models import LLMResponse
 from ..exceptions import LLMProviderError, LLMRateLimitError, LLMAuthenticationError
 from .base_provider import BaseProvider
+from .client_pool import get_client
 
 logger = get_logger('jarvis.ai_agent.providers.openai')
 
@@ -75,7 +77,7 @@ class OpenAIProvider(BaseProvider):
         tools = kwargs.pop('tools', None)
 
         try:
-            client = openai.OpenAI(api_key=key)
+            client = get_client(self.name, key, lambda: openai.OpenAI(api_key=key))
 
             logger.debug(f"OpenAI API request: model={model_name}, messages={len(formatted_messages)}, tools={len(tools) if tools else 0}")
 
@@ -88,7 +90,9 @@ class OpenAIProvider(BaseProvider):
             if tools:
                 create_kwargs['tools'] = tools
 
+            started = time.monotonic()
             response = client.chat.completions.create(**create_kwargs)
+            ttft_ms = int((time.monotonic() - started) * 1000)
 
             # Extract content from response
             content = ""
@@ -98,6 +102,7 @@ class OpenAIProvider(BaseProvider):
             # Get token counts from usage
             input_tokens = response.usage.prompt_tokens if response.usage else 0
             output_tokens = response.usage.completion_tokens if response.usage else 0
+            cache_read_tokens = self._cached_tokens(response.usage)
 
             finish_reason = response.choices[0].finish_reason if response.choices else None
 
@@ -120,6 +125,8 @@ class OpenAIProvider(BaseProvider):
                 model=model_name,
                 finish_reason=finish_reason,
                 tool_calls=tool_calls,
+                cache_read_tokens=cache_read_tokens,
+                ttft_ms=ttft_ms,
             )
 
         except openai.RateLimitError as e:
@@ -164,7 +171,7 @@ class OpenAIProvider(BaseProvider):
         temperature = max(0.0, min(2.0, temperature))
 
         try:
-            client = openai.OpenAI(api_key=key)
+            client = get_client(self.name, key, lambda: openai.OpenAI(api_key=key))
             response = client.chat.completions.create(
                 model=model_name,
                 messages=formatted_messages,
@@ -187,6 +194,12 @@ class OpenAIProvider(BaseProvider):
                 model_name, messages, max_tokens, temperature, api_key, **kwargs
             )
 
+    @staticmethod
+    def _cached_tokens(usage) -> int:
+        """Prompt tokens served from OpenAI's automatic prompt cache."""
+        details = getattr(usage, 'prompt_tokens_details', None) if usage else None
+        return getattr(details, 'cached_tokens', 0) or 0
+
     def format_messages(
         self,
         messages: List[Dict[str, str]],
@@ -246,8 +259,9 @@ class OpenAIProvider(BaseProvider):
         temperature = max(0.0, min(2.0, temperature))
 
         try:
-            client = openai.OpenAI(api_key=key)
+            client = get_client(self.name, key, lambda: openai.OpenAI(api_key=key))
 
+            started = time.monotonic()
             response = client.chat.completions.create(
                 model=model_name,
                 messages=formatted_messages,
@@ -260,12 +274,16 @@ class OpenAIProvider(BaseProvider):
             full_content = ""
             input_tokens = 0
             output_tokens = 0
+            cache_read_tokens = 0
             finish_reason = None
+            ttft_ms = None
 
             for chunk in response:
                 if chunk.choices:
                     delta = chunk.choices[0].delta
                     if delta and delta.content:
+                        if ttft_ms is None:
+                            ttft_ms = int((time.monotonic() - started) * 1000)
                         full_content += delta.content
                         yield (delta.content, None)
                     if chunk.choices[0].finish_reason:
@@ -274,6 +292,7 @@ class OpenAIProvider(BaseProvider):
                 if chunk.usage:
                     input_tokens = chunk.usage.prompt_tokens or 0
                     output_tokens = chunk.usage.completion_tokens or 0
+                    cache_read_tokens = self._cached_tokens(chunk.usage)
 
             yield (None, LLMResponse(
                 content=full_content,
@@ -281,6 +300,8 @@ class OpenAIProvider(BaseProvider):
                 output_tokens=output_tokens,
                 model=model_name,
                 finish_reason=finish_reason,
+                cache_read_tokens=cache_read_tokens,
+                ttft_ms=ttft_ms,
             ))
 
         except openai.RateLimitError as e:
@@ -6,6 +6,7 @@ from typing import Optional, List
 from core.base_repository import BaseRepository
 from core.utils.logging_config import get_logger
 from ..models import Message, MessageRole
+from ..tokens import estimate_tokens, ESTIMATE_TOKENS_SQL
 
 logger = get_logger('jarvis.ai_agent.repo.message')
 
@@ -14,16 +15,19 @@ class MessageRepository(BaseRepository):
     """Repository for Message entities."""
 
     def create(self, message: Message) -> Message:
-        """Create a new message."""
+        """Create a new message (with its content token count)."""
+        if message.content_tokens is None:
+            message.content_tokens = estimate_tokens(message.content)
+
         def _work(cursor):
             cursor.execute("""
                 INSERT INTO ai_agent.messages (
-                    conversation_id, role, content,
+                    conversation_id, role, content, content_tokens,
                     input_tokens, output_tokens, cost,
                     rag_sources, model_config_id, response_time_ms,
                     created_at
                 ) VALUES (
-                    %(conversation_id)s, %(role)s, %(content)s,
+                    %(conversation_id)s, %(role)s, %(content)s, %(content_tokens)s,
                     %(input_tokens)s, %(output_tokens)s, %(cost)s,
                     %(rag_sources)s, %(model_config_id)s, %(response_time_ms)s,
                     NOW()
@@ -33,6 +37,7 @@ class MessageRepository(BaseRepository):
                 'conversation_id': message.conversation_id,
                 'role': message.role.value,
                 'content': message.content,
+                'content_tokens': message.content_tokens,
                 'input_tokens': message.input_tokens,
                 'output_tokens': message.output_tokens,
                 'cost': str(message.cost),
@@ -74,21 +79,35 @@ class MessageRepository(BaseRepository):
         """, (conversation_id, limit, offset))
         return [self._row_to_message(row) for row in rows]
 
-    def get_recent_for_context(self, conversation_id: int, limit: int = 10) -> List[Message]:
-        """Get recent messages for building context (chronological order)."""
-        rows = self.query_all("""
-            SELECT id, conversation_id, role, content,
-                   input_tokens, output_tokens, cost,
-                   rag_sources, model_config_id, response_time_ms,
-                   created_at
-            FROM ai_agent.messages
-            WHERE conversation_id = %s
-            ORDER BY created_at DESC
-            LIMIT %s
-        """, (conversation_id, limit))
-        messages = [self._row_to_message(row) for row in rows]
-        messages.reverse()
-        return messages
+    def get_context_window(self, conversation_id: int, token_budget: int,
+                           limit: int = 10, before_id: Optional[int] = None) -> List[Message]:
+        """Newest messages whose summed content_tokens fit token_budget (chronological).
+
+        The running total is a window SUM over the last `limit` messages'
+        stored counts, so only the selected rows' content is read.
+        """
+        rows = self.query_all(f"""
+            WITH recent AS (
+                SELECT id,
+                       SUM(tokens) OVER (ORDER BY created_at DESC, id DESC) AS running_tokens
+                FROM (
+                    SELECT id, created_at, COALESCE(content_tokens, {ESTIMATE_TOKENS_SQL}) AS tokens
+                    FROM ai_agent.messages
+                    WHERE conversation_id = %s AND (%s::int IS NULL OR id < %s)
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s
+                ) newest
+            )
+            SELECT m.id, m.conversation_id, m.role, m.content, m.content_tokens,
+                   m.input_tokens, m.output_tokens, m.cost,
+                   m.rag_sources, m.model_config_id, m.response_time_ms,
+                   m.created_at
+            FROM recent r
+            JOIN ai_agent.messages m ON m.id = r.id
+            WHERE r.running_tokens <= %s
+            ORDER BY m.created_at, m.id
+        """, (conversation_id, before_id, before_id, limit, token_budget))
+        return [self._row_to_message(row) for row in rows]
 
     def count_by_conversation(self, conversation_id: int) -> int:
         """Count messages in a conversation."""
@@ -118,6 +137,7 @@ class MessageRepository(BaseRepository):
             input_tokens=row['input_tokens'] or 0,
             output_tokens=row['output_tokens'] or 0,
             cost=Decimal(str(row['cost'])) if row['cost'] else Decimal("0"),
+            content_tokens=row.get('content_tokens'),
             rag_sources=rag_sources,
             model_config_id=row['model_config_id'],
             response_time_ms=row['response_time_ms'],
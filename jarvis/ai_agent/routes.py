@@ -669,6 +669,15 @@ def api_tools_check():
         return jsonify({'error': str(e)}), 500
 
 
+@ai_agent_bp.route('/api/tools/stats', methods=['GET'])
+@login_required
+@ai_agent_required
+def api_tool_stats():
+    """Per-tool call counts, latency and cache hits for this worker process."""
+    from ai_agent.tools import tool_executor
+    return jsonify({'tools': tool_executor.stats()})
+
+
 @ai_agent_bp.route('/api/rag-source-permissions', methods=['GET'])
 @login_required
 @ai_agent_required
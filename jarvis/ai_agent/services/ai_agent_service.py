@@ -5,6 +5,7 @@ Main orchestration service for AI Agent conversations.
 Handles chat requests, context management, and provider coordination.
 """
 
+import json
 import time
 from concurrent.futures import ThreadPoolExecutor
 from decimal import Decimal
@@ -13,10 +14,11 @@ from typing import Optional, List, Dict, Any
 from core.utils.logging_config import get_logger
 from ..models import (
     Conversation, Message, MessageRole, ConversationStatus,
-    ModelConfig, LLMProvider, ChatResponse, ServiceResult,
+    ModelConfig, LLMProvider, LLMUsage, ChatResponse, ServiceResult,
     RAGSource, RAGSourceType,
 )
 from ..config import AIAgentConfig
+from ..tokens import estimate_tokens
 from ..exceptions import (
     AIAgentError, ConversationNotFoundError, LLMProviderError,
     ConfigurationError,
@@ -32,15 +34,6 @@ from .query_parser import parse_query, classify_complexity
 logger = get_logger('jarvis.ai_agent.service')
 
 
-def estimate_tokens(text: str) -> int:
-    """Approximate token count from text length.
-
-    Uses ~4 chars per token heuristic (accurate within ~10-15% for English).
-    Slightly conservative to avoid context window overflows.
-    """
-    return max(1, len(text) // 3)
-
-
 class AIAgentService:
     """
     Main AI Agent service for handling conversations.
@@ -84,6 +77,7 @@ class AIAgentService:
 
         self._settings_cache: Optional[Dict[str, str]] = None
         self._settings_cache_time: float = 0
+        self._settings_version: int = 0  # bumped when loaded settings change
 
         self._rag_source_perms_cache: Dict[int, List[RAGSourceType]] = {}
         self._rag_source_perms_cache_time: Dict[int, float] = {}
@@ -92,6 +86,13 @@ class AIAgentService:
         self._active_models_cache: Optional[List[ModelConfig]] = None
         self._active_models_cache_time: float = 0
 
+        # Static system prompt head, keyed by (date, has_tools)
+        self._static_prompt_cache: Dict[tuple, str] = {}
+        # Head + page section, keyed by (date, settings version, has_tools, page)
+        self._prompt_prefix_cache: Dict[tuple, str] = {}
+
+        self._knowledge_service = None
+
         # Thread pool for parallel RAG + analytics
         self._executor = ThreadPoolExecutor(max_workers=3)
 
@@ -119,6 +120,8 @@ class AIAgentService:
             if all_settings.get('ai_max_tokens') is not None:
                 self.config.DEFAULT_MAX_TOKENS = int(all_settings['ai_max_tokens'])
 
+            if all_settings != self._settings_cache:
+                self._settings_version += 1
             self._settings_cache = all_settings
             self._settings_cache_time = now
         except Exception as e:
@@ -425,7 +428,7 @@ class AIAgentService:
                 content=user_message,
                 model_config_id=model_config.id,
             )
-            saved_user_msg = self.message_repo.create(user_msg)  # noqa: F841
+            saved_user_msg = self.message_repo.create(user_msg)
 
             # 4. Retrieve RAG + analytics + knowledge context (parallel, skip for simple queries)
             rag_sources = []
@@ -507,6 +510,7 @@ class AIAgentService:
                 learned_patterns=learned_patterns,
             )
             system_prompt_tokens = estimate_tokens(system_prompt)
+            system_prefix = self._system_prompt_prefix(bool(tool_schemas))
 
             # 7. Build context messages (token-aware)
             context_messages = self._build_context_messages(
@@ -514,6 +518,7 @@ class AIAgentService:
                 current_message=user_message,
                 model_config=model_config,
                 system_prompt_tokens=system_prompt_tokens,
+                current_message_id=saved_user_msg.id,
             )
 
             llm_response = provider.generate(
@@ -523,36 +528,34 @@ class AIAgentService:
                 temperature=float(model_config.default_temperature),
                 api_key=model_config.api_key_encrypted,
                 system=system_prompt,
+                system_cache_prefix=system_prefix,
                 tools=tool_schemas,
             )
 
             # 7b. Tool call loop — execute tools and re-query LLM (provider-agnostic)
-            total_input_tokens = llm_response.input_tokens
-            total_output_tokens = llm_response.output_tokens
+            usage = LLMUsage()
+            usage.add(llm_response)
             tool_results_log = []
             max_tool_iterations = 5
 
             while llm_response.tool_calls and max_tool_iterations > 0:
                 max_tool_iterations -= 1
-                from ai_agent.tools import tool_registry
+                from ai_agent.tools import tool_executor
 
                 # Build assistant message with tool calls (provider-specific format)
                 context_messages.append(provider.build_tool_call_message(llm_response))
 
-                # Execute each tool
+                # Execute tools (read-only ones concurrently, memoised per conversation)
+                results = tool_executor.run(
+                    llm_response.tool_calls, user_id=user_id, conversation_id=conversation_id,
+                )
                 tool_results = []
-                for tc in llm_response.tool_calls:
-                    result = tool_registry.execute(
-                        name=tc['name'],
-                        params=tc['input'],
-                        user_id=user_id,
-                    )
+                for tc, result in zip(llm_response.tool_calls, results):
                     tool_results_log.append({
                         'tool': tc['name'],
                         'input': tc['input'],
                         'output_preview': str(result)[:500],
                     })
-                    import json
                     tool_results.append({
                         'tool_call_id': tc['id'],
                         'name': tc['name'],
@@ -570,10 +573,10 @@ class AIAgentService:
                     temperature=float(model_config.default_temperature),
                     api_key=model_config.api_key_encrypted,
                     system=system_prompt,
+                    system_cache_prefix=system_prefix,
                     tools=tool_schemas,
                 )
-                total_input_tokens += llm_response.input_tokens
-                total_output_tokens += llm_response.output_tokens
+                usage.add(llm_response)
 
             if tool_results_log:
                 logger.info(f"Tool calls in conv {conversation_id}: {[t['tool'] for t in tool_results_log]}")
@@ -581,8 +584,11 @@ class AIAgentService:
             # 8. Calculate cost
             cost = self._calculate_cost(
                 model_config=model_config,
-                input_tokens=total_input_tokens,
-                output_tokens=total_output_tokens,
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                cache_read_tokens=usage.cache_read_tokens,
+                cache_write_tokens=usage.cache_write_tokens,
+                ttft_ms=usage.ttft_ms,
             )
 
             # 9. Calculate response time
@@ -605,8 +611,8 @@ class AIAgentService:
                 conversation_id=conversation_id,
                 role=MessageRole.ASSISTANT,
                 content=llm_response.content,
-                input_tokens=total_input_tokens,
-                output_tokens=total_output_tokens,
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
                 cost=cost,
                 model_config_id=model_config.id,
                 response_time_ms=response_time_ms,
@@ -615,7 +621,7 @@ class AIAgentService:
             saved_assistant_msg = self.message_repo.create(assistant_msg)
 
             # 11. Update conversation stats
-            total_tokens = total_input_tokens + total_output_tokens
+            total_tokens = usage.input_tokens + usage.output_tokens
             self.conversation_repo.update_stats(
                 conversation_id=conversation_id,
                 tokens=total_tokens,
@@ -714,7 +720,7 @@ class AIAgentService:
                 content=user_message,
                 model_config_id=model_config.id,
             )
-            self.message_repo.create(user_msg)
+            saved_user_msg = self.message_repo.create(user_msg)
 
             # 3. Skip RAG/analytics for simple queries (greetings, thanks, etc.)
             rag_sources = []
@@ -806,6 +812,7 @@ class AIAgentService:
                 page_context=page_context,
             )
             system_prompt_tokens = estimate_tokens(system_prompt)
+            system_prefix = self._system_prompt_prefix(bool(tool_schemas), page_context)
 
             # 6. Build context messages (token-aware)
             context_messages = self._build_context_messages(
@@ -813,12 +820,12 @@ class AIAgentService:
                 current_message=user_message,
                 model_config=model_config,
                 system_prompt_tokens=system_prompt_tokens,
+                current_message_id=saved_user_msg.id,
             )
 
             tools_used = False
             tools_used_names = []
-            total_input_tokens = 0
-            total_output_tokens = 0
+            usage = LLMUsage()
             llm_response = None
 
             # 7a. Tool path — non-streaming call + tool loop (provider-agnostic)
@@ -832,50 +839,34 @@ class AIAgentService:
                     temperature=float(model_config.default_temperature),
                     api_key=model_config.api_key_encrypted,
                     system=system_prompt,
+                    system_cache_prefix=system_prefix,
                     tools=tool_schemas,
                 )
-                total_input_tokens += llm_response.input_tokens
-                total_output_tokens += llm_response.output_tokens
+                usage.add(llm_response)
 
                 # Tool call loop
                 max_tool_iterations = 5
                 while llm_response.tool_calls and max_tool_iterations > 0:
                     max_tool_iterations -= 1
                     tools_used = True
-                    from ai_agent.tools import tool_registry as _tr
+                    from ai_agent.tools import tool_executor
 
                     yield f"event: status\ndata: {json.dumps({'status': 'Using tools...'})}\n\n"
 
                     # Build assistant message (provider-specific format)
                     context_messages.append(provider.build_tool_call_message(llm_response))
 
-                    # Execute tools (parallel if multiple)
+                    # Execute tools (read-only ones concurrently, memoised per conversation)
                     tool_calls = llm_response.tool_calls
+                    results = tool_executor.run(tool_calls, user_id=user_id, conversation_id=conversation_id)
                     tool_results = []
-
-                    if len(tool_calls) > 1:
-                        futures = {}
-                        for tc in tool_calls:
-                            tools_used_names.append(tc['name'])
-                            futures[tc['id']] = self._executor.submit(
-                                _tr.execute, name=tc['name'], params=tc['input'], user_id=user_id
-                            )
-                        for tc in tool_calls:
-                            result = futures[tc['id']].result(timeout=10)
-                            tool_results.append({
-                                'tool_call_id': tc['id'],
-                                'name': tc['name'],
-                                'content': json.dumps(result, default=str),
-                            })
-                    else:
-                        for tc in tool_calls:
-                            tools_used_names.append(tc['name'])
-                            result = _tr.execute(name=tc['name'], params=tc['input'], user_id=user_id)
-                            tool_results.append({
-                                'tool_call_id': tc['id'],
-                                'name': tc['name'],
-                                'content': json.dumps(result, default=str),
-                            })
+                    for tc, result in zip(tool_calls, results):
+                        tools_used_names.append(tc['name'])
+                        tool_results.append({
+                            'tool_call_id': tc['id'],
+                            'name': tc['name'],
+                            'content': json.dumps(result, default=str),
+                        })
 
                     # Build tool result messages (provider-specific format)
                     context_messages.extend(provider.build_tool_result_messages(tool_results))
@@ -889,10 +880,10 @@ class AIAgentService:
                         temperature=float(model_config.default_temperature),
                         api_key=model_config.api_key_encrypted,
                         system=system_prompt,
+                        system_cache_prefix=system_prefix,
                         tools=tool_schemas,
                     )
-                    total_input_tokens += llm_response.input_tokens
-                    total_output_tokens += llm_response.output_tokens
+                    usage.add(llm_response)
 
                 # Emit the buffered response as chunks
                 content = llm_response.content or ''
@@ -911,13 +902,13 @@ class AIAgentService:
                     temperature=float(model_config.default_temperature),
                     api_key=model_config.api_key_encrypted,
                     system=system_prompt,
+                    system_cache_prefix=system_prefix,
                 ):
                     if text_chunk is not None:
                         yield f"event: token\ndata: {json.dumps({'content': text_chunk})}\n\n"
                     if final_response is not None:
                         llm_response = final_response
-                        total_input_tokens = llm_response.input_tokens
-                        total_output_tokens = llm_response.output_tokens
+                        usage.add(llm_response)
 
             if not llm_response:
                 yield f"event: error\ndata: {json.dumps({'error': 'No response from LLM'})}\n\n"
@@ -926,8 +917,11 @@ class AIAgentService:
             # 8. Post-stream: save message, update stats
             cost = self._calculate_cost(
                 model_config=model_config,
-                input_tokens=total_input_tokens,
-                output_tokens=total_output_tokens,
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
+                cache_read_tokens=usage.cache_read_tokens,
+                cache_write_tokens=usage.cache_write_tokens,
+                ttft_ms=usage.ttft_ms,
             )
             response_time_ms = int((time.time() - start_time) * 1000)
 
@@ -946,8 +940,8 @@ class AIAgentService:
                 conversation_id=conversation_id,
                 role=MessageRole.ASSISTANT,
                 content=llm_response.content,
-                input_tokens=total_input_tokens,
-                output_tokens=total_output_tokens,
+                input_tokens=usage.input_tokens,
+                output_tokens=usage.output_tokens,
                 cost=cost,
                 model_config_id=model_config.id,
                 response_time_ms=response_time_ms,
@@ -955,7 +949,7 @@ class AIAgentService:
             )
             saved_msg = self.message_repo.create(assistant_msg)
 
-            total_tokens = total_input_tokens + total_output_tokens
+            total_tokens = usage.input_tokens + usage.output_tokens
             self.conversation_repo.update_stats(
                 conversation_id=conversation_id,
                 tokens=total_tokens,
@@ -1081,19 +1075,23 @@ class AIAgentService:
         current_message: str,
         model_config: Optional[ModelConfig] = None,
         system_prompt_tokens: int = 0,
+        current_message_id: Optional[int] = None,
     ) -> List[Dict[str, str]]:
         """
         Build message context for LLM call with token-aware trimming.
 
         Fills the context window from newest to oldest messages, stopping
         when the token budget is exhausted.  Always includes the current
-        user message.
+        user message.  Selection runs in SQL over the token counts stored
+        with each message, so history is never re-estimated.
 
         Args:
             conversation_id: Conversation ID
             current_message: Current user message
             model_config: Model config (for context_window budget)
             system_prompt_tokens: Estimated tokens used by system prompt + RAG
+            current_message_id: ID of the already-saved current message
+                (excluded from history — it is appended last)
 
         Returns:
             List of message dicts for LLM
@@ -1110,27 +1108,14 @@ class AIAgentService:
         # Safety margin (10%) to account for estimation error
         available = int(available * 0.9)
 
-        # Get recent messages (newest first from DB, reversed to chronological)
-        recent_messages = self.message_repo.get_recent_for_context(
+        # Newest messages that fit the budget, chronological
+        selected = self.message_repo.get_context_window(
             conversation_id=conversation_id,
+            token_budget=available,
             limit=self.config.MAX_CONTEXT_MESSAGES,
+            before_id=current_message_id,
         )
-
-        # Add messages from most recent backward, respecting budget
-        selected = []
-        used_tokens = 0
-        for msg in reversed(recent_messages):
-            msg_tokens = estimate_tokens(msg.content)
-            if used_tokens + msg_tokens > available:
-                logger.debug(
-                    f"Context trimmed: {len(recent_messages) - len(selected)} messages dropped "
-                    f"({used_tokens}/{available} tokens used)"
-                )
-                break
-            selected.append(msg)
-            used_tokens += msg_tokens
-
-        selected.reverse()
+        used_tokens = sum(msg.content_tokens or 0 for msg in selected)
 
         # Convert to LLM format
         context = [{'role': msg.role.value, 'content': msg.content} for msg in selected]
@@ -1150,8 +1135,7 @@ class AIAgentService:
             return None
 
         try:
-            known_entities = self.analytics_service.get_entity_names()
-            parsed = parse_query(user_message, known_entities)
+            parsed = parse_query(user_message, self.analytics_service.get_entity_matcher())
 
             if not parsed.is_analytics:
                 return None
@@ -1210,9 +1194,10 @@ class AIAgentService:
     def _get_learned_patterns(self, query: str) -> List[str]:
         """Get learned patterns relevant to the current query."""
         try:
-            from .knowledge_service import KnowledgeService
-            svc = KnowledgeService(self.config)
-            return svc.get_relevant_patterns(query, limit=5)
+            if self._knowledge_service is None:
+                from .knowledge_service import KnowledgeService
+                self._knowledge_service = KnowledgeService(self.config)
+            return self._knowledge_service.get_relevant_patterns(query, limit=5)
         except Exception as e:
             logger.debug(f"Knowledge retrieval skipped: {e}")
             return []
@@ -1257,6 +1242,11 @@ class AIAgentService:
         Build system prompt for LLM with domain knowledge, tool examples,
         Romanian glossary, and learned patterns from user feedback.
 
+        The prompt starts with _system_prompt_prefix(has_tools, page_context)
+        — identical for every request from the same page on a given day —
+        followed by the per-request sections, so providers can prompt-cache
+        the prefix.
+
         Args:
             rag_context: Optional RAG context to include
             analytics_context: Optional analytics data to include
@@ -1267,9 +1257,80 @@ class AIAgentService:
         Returns:
             Complete system prompt
         """
+        sections = [self._system_prompt_prefix(has_tools, page_context)]
+
+        if learned_patterns:
+            patterns_text = '\n'.join(f'- {p}' for p in learned_patterns)
+            sections.append(f"""LEARNED PATTERNS (from past successful interactions):
+{patterns_text}
+
+Use these patterns to improve your responses when they are relevant to the current query.""")
+
+        if analytics_context:
+            sections.append(f"""ANALYTICS DATA (live aggregations from JARVIS database):
+{analytics_context}
+
+Present this data clearly using markdown tables. Include totals where appropriate.""")
+
+        if rag_context:
+            sections.append(f"""CONTEXT FROM JARVIS DATABASE:
+{rag_context}""")
+
+        if not analytics_context and not rag_context and not has_tools:
+            sections.append("Note: No specific context was retrieved for this query. Answer based on your general knowledge about the JARVIS platform.")
+
+        return '\n\n'.join(sections)
+
+    def _system_prompt_prefix(self, has_tools: bool, page_context: Optional[str] = None) -> str:
+        """Static head plus the current-page section (memoized).
+
+        Keyed by (day, settings version, has_tools, page): nothing in it
+        depends on the user or the message, so one entry serves everyone
+        on that page and it stays a stable prompt-cache prefix.
+        """
+        from datetime import date
+
+        page_desc = self._describe_page(page_context)
+        day = date.today()
+        key = (day, self._settings_version, has_tools, page_desc)
+        cached = self._prompt_prefix_cache.get(key)
+        if cached is not None:
+            return cached
+
+        sections = [self._static_system_prompt(has_tools)]
+
+        # Inject page context so the model knows what the user is looking at
+        if page_desc:
+            sections.append(f"""CURRENT PAGE CONTEXT:
+The user is currently viewing: {page_desc}
+Use this context to interpret ambiguous questions. For example:
+- On the CRM page, "client" / "cel mai mare client" means a car buyer/customer — use get_top_clients or search_clients, NOT get_top_suppliers.
+- On the Accounting page, "furnizor" means an invoice supplier — use get_top_suppliers or search_invoices.
+- On the HR page, prefer HR tools (search_hr_events, search_bonuses) over others.""")
+
+        prefix = '\n\n'.join(sections)
+        # Only today's entries for the current settings are ever hit again
+        self._prompt_prefix_cache = {
+            k: v for k, v in self._prompt_prefix_cache.items()
+            if k[0] == day and k[1] == self._settings_version
+        }
+        self._prompt_prefix_cache[key] = prefix
+        return prefix
+
+    def _static_system_prompt(self, has_tools: bool) -> str:
+        """Request-independent head of the system prompt (memoized per day).
+
+        Domain description, tool rules and glossary. Kept byte-identical
+        between requests so it forms a stable prompt-cache prefix.
+        """
         from datetime import date
 
-        today = date.today().strftime('%d.%m.%Y')
+        day = date.today()
+        cached = self._static_prompt_cache.get((day, has_tools))
+        if cached is not None:
+            return cached
+
+        today = day.strftime('%d.%m.%Y')
 
         base_prompt = f"""You are JARVIS, an intelligent AI assistant for the JARVIS enterprise platform used by AUTOWORLD — a group of car dealerships in Romania (Toyota, Lexus, Porsche, Bentley, Lamborghini).
 
@@ -1295,16 +1356,6 @@ Response guidelines:
 
         sections = [base_prompt]
 
-        # Inject page context so the model knows what the user is looking at
-        page_desc = self._describe_page(page_context)
-        if page_desc:
-            sections.append(f"""CURRENT PAGE CONTEXT:
-The user is currently viewing: {page_desc}
-Use this context to interpret ambiguous questions. For example:
-- On the CRM page, "client" / "cel mai mare client" means a car buyer/customer — use get_top_clients or search_clients, NOT get_top_suppliers.
-- On the Accounting page, "furnizor" means an invoice supplier — use get_top_suppliers or search_invoices.
-- On the HR page, prefer HR tools (search_hr_events, search_bonuses) over others.""")
-
         if has_tools:
             sections.append("""TOOL USAGE — MANDATORY:
 You have tools that query the JARVIS database in real-time. You MUST use them when the user asks about data.
@@ -1342,47 +1393,58 @@ total/totaluri = total(s), aprobare = approval, tranzacție = transaction, extra
 buget = budget, proiect = project, ultima/ultimele = last/recent, câte/câți = how many,
 arată = show, caută = search, dosare = dossiers (car sales files), vânzări = sales""")
 
-        if learned_patterns:
-            patterns_text = '\n'.join(f'- {p}' for p in learned_patterns)
-            sections.append(f"""LEARNED PATTERNS (from past successful interactions):
-{patterns_text}
-
-Use these patterns to improve your responses when they are relevant to the current query.""")
-
-        if analytics_context:
-            sections.append(f"""ANALYTICS DATA (live aggregations from JARVIS database):
-{analytics_context}
+        prompt = '\n\n'.join(sections)
+        # Only today's entries are ever hit again
+        self._static_prompt_cache = {k: v for k, v in self._static_prompt_cache.items() if k[0] == day}
+        self._static_prompt_cache[(day, has_tools)] = prompt
+        return prompt
 
-Present this data clearly using markdown tables. Include totals where appropriate.""")
-
-        if rag_context:
-            sections.append(f"""CONTEXT FROM JARVIS DATABASE:
-{rag_context}""")
-
-        if not analytics_context and not rag_context and not has_tools:
-            sections.append("Note: No specific context was retrieved for this query. Answer based on your general knowledge about the JARVIS platform.")
-
-        return '\n\n'.join(sections)
+    # Prompt-cache pricing relative to the base input rate, per provider.
+    # Claude charges 1.25x to write the cache and 0.1x to read it; OpenAI
+    # caches automatically and bills cached tokens at half price.
+    _CACHE_WRITE_RATE = {'claude': Decimal('1.25')}
+    _CACHE_READ_RATE = {'claude': Decimal('0.1'), 'openai': Decimal('0.5')}
 
     def _calculate_cost(
         self,
         model_config: ModelConfig,
         input_tokens: int,
         output_tokens: int,
+        cache_read_tokens: int = 0,
+        cache_write_tokens: int = 0,
+        ttft_ms: Optional[int] = None,
     ) -> Decimal:
         """
-        Calculate cost for a request.
+        Calculate cost for a request and log its cache/latency profile.
 
         Args:
             model_config: Model configuration with pricing
-            input_tokens: Input token count
+            input_tokens: Input token count (including cached tokens)
             output_tokens: Output token count
+            cache_read_tokens: Input tokens served from the prompt cache
+            cache_write_tokens: Input tokens written to the prompt cache
+            ttft_ms: Time to first token of the first LLM call
 
         Returns:
             Total cost as Decimal
         """
-        input_cost = (Decimal(input_tokens) / 1000) * model_config.cost_per_1k_input
+        provider = model_config.provider.value
+        rate = model_config.cost_per_1k_input / 1000
+        uncached = max(0, input_tokens - cache_read_tokens - cache_write_tokens)
+        input_cost = (
+            uncached * rate
+            + cache_write_tokens * rate * self._CACHE_WRITE_RATE.get(provider, Decimal(1))
+            + cache_read_tokens * rate * self._CACHE_READ_RATE.get(provider, Decimal(1))
+        )
         output_cost = (Decimal(output_tokens) / 1000) * model_config.cost_per_1k_output
+
+        if input_tokens:
+            logger.info(
+                f"LLM usage: model={model_config.model_name}, ttft={ttft_ms}ms, "
+                f"input={input_tokens}, cache_read={cache_read_tokens} "
+                f"({cache_read_tokens * 100 // input_tokens}%), cache_write={cache_write_tokens}, "
+                f"output={output_tokens}"
+            )
         return input_cost + output_cost
 
     def _auto_title_conversation(
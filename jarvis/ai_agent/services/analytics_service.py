@@ -6,18 +6,40 @@ Wraps existing SummaryRepository and transaction summary functions
 with a unified interface for the AI agent.
 """
 
+import threading
 import time
 from typing import Optional, Dict, Any, List
 from decimal import Decimal
 
 from core.database import get_db, get_cursor, release_db, dict_from_row
 from core.utils.logging_config import get_logger
+from .entity_matcher import EntityMatcher
 
 logger = get_logger('jarvis.ai_agent.services.analytics')
 
-# Cache for entity names (companies, departments, brands, suppliers)
-_entity_cache: Dict[str, Any] = {}
-_entity_cache_ttl = 300  # 5 minutes
+# Known entity names (companies, departments, brands, suppliers) and the
+# matcher built from them. Every ENTITY_REFRESH_SECONDS only new names are
+# read — department_structure lists (small) and suppliers of invoices
+# inserted since the last seen id — and added to the matcher. A full reload
+# every ENTITY_FULL_RELOAD_SECONDS drops deleted/renamed suppliers.
+ENTITY_REFRESH_SECONDS = 60
+ENTITY_FULL_RELOAD_SECONDS = 3600
+_STRUCTURE_KINDS = ('companies', 'departments', 'brands')
+
+_entity_lock = threading.Lock()
+_entities: Dict[str, Any] = {
+    'names': None,          # kind -> sorted names
+    'matcher': None,        # EntityMatcher over names
+    'invoice_id': 0,        # highest invoices.id already read
+    'refreshed_at': 0.0,
+    'loaded_at': 0.0,
+}
+
+
+def clear_entity_cache() -> None:
+    """Forget loaded entity names (next lookup does a full reload)."""
+    with _entity_lock:
+        _entities.update(names=None, matcher=None, invoice_id=0, refreshed_at=0.0, loaded_at=0.0)
 
 
 class AnalyticsService:
@@ -352,62 +374,100 @@ class AnalyticsService:
             release_db(conn)
 
     def get_entity_names(self) -> Dict[str, List[str]]:
-        """Get known entity names for query matching. Cached for 5 minutes."""
-        global _entity_cache
-
-        if _entity_cache and (time.time() - _entity_cache.get('_ts', 0)) < _entity_cache_ttl:
-            return _entity_cache
+        """Get known entity names for query matching (kind -> names)."""
+        self._refresh_entities()
+        return _entities['names']
+
+    def get_entity_matcher(self) -> EntityMatcher:
+        """Matcher over get_entity_names(), for parse_query."""
+        self._refresh_entities()
+        return _entities['matcher']
+
+    def _refresh_entities(self) -> None:
+        if _entities['matcher'] is not None and time.time() - _entities['refreshed_at'] < ENTITY_REFRESH_SECONDS:
+            return
+        with _entity_lock:
+            now = time.time()
+            if _entities['matcher'] is not None and now - _entities['refreshed_at'] < ENTITY_REFRESH_SECONDS:
+                return
+            conn = get_db()
+            try:
+                cursor = get_cursor(conn)
+                if _entities['matcher'] is None or now - _entities['loaded_at'] >= ENTITY_FULL_RELOAD_SECONDS:
+                    self._reload_entities(cursor)
+                    _entities['loaded_at'] = now
+                else:
+                    self._update_entities(cursor)
+            except Exception as e:
+                logger.error(f"Entity names query failed: {e}")
+                if _entities['matcher'] is None:
+                    _entities['names'] = {'companies': [], 'departments': [], 'brands': [], 'suppliers': []}
+                    _entities['matcher'] = EntityMatcher()
+            finally:
+                release_db(conn)
+            _entities['refreshed_at'] = now
+
+    def _reload_entities(self, cursor) -> None:
+        names = self._query_structure_names(cursor)
+        invoice_id, suppliers = self._query_new_suppliers(cursor, 0)
+        names['suppliers'] = suppliers
+        _entities.update(names=names, matcher=EntityMatcher(names), invoice_id=invoice_id)
+        logger.debug(f"Entity matcher loaded: {len(_entities['matcher'])} names")
+
+    def _update_entities(self, cursor) -> None:
+        names = dict(_entities['names'])
+        matcher = _entities['matcher']
+        structure = self._query_structure_names(cursor)
+        invoice_id, new_suppliers = self._query_new_suppliers(cursor, _entities['invoice_id'])
+
+        fresh = {}
+        for kind in _STRUCTURE_KINDS:
+            if set(structure[kind]) != set(names[kind]):
+                fresh[kind] = structure[kind]
+        if any(set(names[kind]) - set(fresh[kind]) for kind in fresh):
+            # A structure name went away: rebuild rather than keep matching it
+            names.update(structure)
+            matcher = EntityMatcher(names)
+        else:
+            names.update(fresh)
+            matcher.add(fresh)
 
-        conn = get_db()
-        try:
-            cursor = get_cursor(conn)
+        known = set(names['suppliers'])
+        added = [s for s in new_suppliers if s not in known]
+        if added:
+            names['suppliers'] = sorted(known.union(added))
+            matcher.add({'suppliers': added})
 
-            # Companies from department_structure
-            cursor.execute('''
-                SELECT DISTINCT company FROM department_structure
-                WHERE company IS NOT NULL AND company != ''
-                ORDER BY company
-            ''')
-            companies = [row['company'] for row in cursor.fetchall()]
+        _entities.update(names=names, matcher=matcher, invoice_id=invoice_id)
 
-            # Departments
-            cursor.execute('''
-                SELECT DISTINCT department FROM department_structure
-                WHERE department IS NOT NULL AND department != ''
-                ORDER BY department
-            ''')
-            departments = [row['department'] for row in cursor.fetchall()]
-
-            # Brands
-            cursor.execute('''
-                SELECT DISTINCT brand FROM department_structure
-                WHERE brand IS NOT NULL AND brand != ''
-                ORDER BY brand
-            ''')
-            brands = [row['brand'] for row in cursor.fetchall()]
+    @staticmethod
+    def _query_structure_names(cursor) -> Dict[str, List[str]]:
+        """Companies, departments and brands from department_structure."""
+        cursor.execute('''
+            SELECT
+                ARRAY(SELECT DISTINCT company FROM department_structure
+                      WHERE company IS NOT NULL AND company != '' ORDER BY company) AS companies,
+                ARRAY(SELECT DISTINCT department FROM department_structure
+                      WHERE department IS NOT NULL AND department != '' ORDER BY department) AS departments,
+                ARRAY(SELECT DISTINCT brand FROM department_structure
+                      WHERE brand IS NOT NULL AND brand != '' ORDER BY brand) AS brands
+        ''')
+        row = cursor.fetchone()
+        return {kind: list(row[kind] or []) for kind in _STRUCTURE_KINDS}
 
-            # Suppliers (from invoices)
-            cursor.execute('''
-                SELECT DISTINCT supplier FROM invoices
-                WHERE supplier IS NOT NULL AND supplier != '' AND deleted_at IS NULL
-                ORDER BY supplier
-            ''')
-            suppliers = [row['supplier'] for row in cursor.fetchall()]
-
-            result = {
-                'companies': companies,
-                'departments': departments,
-                'brands': brands,
-                'suppliers': suppliers,
-                '_ts': time.time(),
-            }
-            _entity_cache.update(result)
-            return result
-        except Exception as e:
-            logger.error(f"Entity names query failed: {e}")
-            return {'companies': [], 'departments': [], 'brands': [], 'suppliers': []}
-        finally:
-            release_db(conn)
+    @staticmethod
+    def _query_new_suppliers(cursor, after_id: int):
+        """(highest invoice id, distinct suppliers) of invoices with id > after_id."""
+        cursor.execute('''
+            SELECT COALESCE(MAX(id), %s) AS max_id,
+                   ARRAY_AGG(DISTINCT supplier) FILTER (
+                       WHERE supplier IS NOT NULL AND supplier != '' AND deleted_at IS NULL
+                   ) AS suppliers
+            FROM invoices
+            WHERE id > %s
+        ''', (after_id, after_id))
+        row = cursor.fetchone()
+        return row['max_id'], list(row['suppliers'] or [])
 
     def format_as_context(self, results: List[Dict[str, Any]]) -> str:
         """Format analytics results as markdown for LLM context injection."""
@@ -13,6 +13,7 @@ from typing import List, Optional, Tuple
 from collections import OrderedDict
 
 from core.utils.logging_config import get_logger
+from core.metrics import cache_result, external_call, track_cache_size
 from ..config import AIAgentConfig
 from ..exceptions import EmbeddingError, ConfigurationError
 
@@ -22,6 +23,7 @@ logger = get_logger('jarvis.ai_agent.services.embedding')
 _QUERY_CACHE: OrderedDict[str, Tuple[List[float], float]] = OrderedDict()
 _QUERY_CACHE_MAX = 256
 _QUERY_CACHE_TTL = 600  # 10 minutes
+track_cache_size('query_embeddings', lambda: len(_QUERY_CACHE))
 
 # Provider definitions in priority order (first match wins)
 _EMBEDDING_PROVIDERS = [
@@ -164,21 +166,20 @@ class EmbeddingService:
         if use_cache:
             cache_key = hashlib.md5(text.encode('utf-8')).hexdigest()
             cached = _QUERY_CACHE.get(cache_key)
+            if cache_result('query_embeddings', bool(cached) and (time.time() - cached[1]) < _QUERY_CACHE_TTL):
+                _QUERY_CACHE.move_to_end(cache_key)
+                return cached[0]
             if cached:
-                embedding, ts = cached
-                if (time.time() - ts) < _QUERY_CACHE_TTL:
-                    _QUERY_CACHE.move_to_end(cache_key)
-                    return embedding
-                else:
-                    del _QUERY_CACHE[cache_key]
+                del _QUERY_CACHE[cache_key]
 
         try:
-            if self._provider_name == 'openai':
-                embedding = self._embed_openai(text)
-            elif self._provider_name == 'gemini':
-                embedding = self._embed_gemini(text)
-            else:
-                raise ConfigurationError(f"Unknown provider: {self._provider_name}")
+            with external_call(self._provider_name, 'embedding'):
+                if self._provider_name == 'openai':
+                    embedding = self._embed_openai(text)
+                elif self._provider_name == 'gemini':
+                    embedding = self._embed_gemini(text)
+                else:
+                    raise ConfigurationError(f"Unknown provider: {self._provider_name}")
 
             logger.debug(f"Generated embedding: {len(embedding)} dims via {self._provider_name}")
 
@@ -219,12 +220,13 @@ class EmbeddingService:
             raise ConfigurationError("No embedding provider available")
 
         try:
-            if self._provider_name == 'openai':
-                return self._batch_openai(texts, batch_size)
-            elif self._provider_name == 'gemini':
-                return self._batch_gemini(texts, batch_size)
-            else:
-                raise ConfigurationError(f"Unknown provider: {self._provider_name}")
+            with external_call(self._provider_name, 'embedding_batch'):
+                if self._provider_name == 'openai':
+                    return self._batch_openai(texts, batch_size)
+                elif self._provider_name == 'gemini':
+                    return self._batch_gemini(texts, batch_size)
+                else:
+                    raise ConfigurationError(f"Unknown provider: {self._provider_name}")
         except (EmbeddingError, ConfigurationError):
             raise
         except Exception as e:
@@ -0,0 +1,149 @@
+"""
+Entity Matcher
+
+Aho–Corasick automaton over the known entity names (companies, suppliers,
+departments, brands) used by the query parser. One pass over the message
+finds every entity it mentions, however many names are loaded — instead of
+one substring test per name.
+
+Matching is case- and diacritic-insensitive ("Ștefănești" == "stefanesti")
+and respects word boundaries, so "Dacia" does not match inside "Daciana".
+Names can be added after construction (new suppliers); only the failure
+links are recomputed.
+"""
+
+import threading
+import unicodedata
+from collections import deque
+from dataclasses import dataclass
+from typing import Dict, Iterable, List, Tuple
+
+
+def normalize(text: str) -> str:
+    """Casefold, strip diacritics and collapse whitespace."""
+    decomposed = unicodedata.normalize('NFKD', text)
+    stripped = ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return ' '.join(stripped.casefold().split())
+
+
+@dataclass(frozen=True)
+class EntityMatch:
+    """One entity occurrence in a normalized message: text[start:end]."""
+    kind: str
+    name: str
+    start: int
+    end: int
+
+    @property
+    def length(self) -> int:
+        return self.end - self.start
+
+    def overlaps(self, other: 'EntityMatch') -> bool:
+        return self.start < other.end and other.start < self.end
+
+
+class EntityMatcher:
+    """Multi-pattern matcher for entity names, grouped by kind."""
+
+    def __init__(self, entities: Dict[str, Iterable[str]] = None):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._own: List[List[int]] = [[]]      # patterns ending exactly at a state
+        self._out: List[List[int]] = [[]]      # own + those reachable via failure links
+        self._patterns: List[Tuple[str, str, str]] = []   # (kind, name, normalized)
+        self._seen = set()                     # (kind, normalized)
+        self._lock = threading.Lock()
+        if entities:
+            self.add(entities)
+
+    def __len__(self) -> int:
+        return len(self._patterns)
+
+    def add(self, entities: Dict[str, Iterable[str]]) -> int:
+        """Add names by kind ({'suppliers': [...], ...}). Returns names added."""
+        with self._lock:
+            added = 0
+            for kind, names in entities.items():
+                for name in names:
+                    if name and self._insert(kind, name):
+                        added += 1
+            if added:
+                self._link()
+            return added
+
+    def find(self, text: str) -> List[EntityMatch]:
+        """All whole-word entity occurrences in text, in order of their end."""
+        text = normalize(text)
+        matches = []
+        with self._lock:
+            state = 0
+            for i, ch in enumerate(text):
+                while state and ch not in self._goto[state]:
+                    state = self._fail[state]
+                state = self._goto[state].get(ch, 0)
+                for idx in self._out[state]:
+                    kind, name, pattern = self._patterns[idx]
+                    start, end = i + 1 - len(pattern), i + 1
+                    if _bounded(text, pattern, start, end):
+                        matches.append(EntityMatch(kind, name, start, end))
+        return matches
+
+    # ── Internals ──
+
+    def _insert(self, kind: str, name: str) -> bool:
+        pattern = normalize(name)
+        if not pattern or (kind, pattern) in self._seen:
+            return False
+        self._seen.add((kind, pattern))
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._own.append([])
+                self._out.append([])
+            state = nxt
+        self._own[state].append(len(self._patterns))
+        self._patterns.append((kind, name, pattern))
+        return True
+
+    def _link(self) -> None:
+        """(Re)compute failure links and outputs breadth-first."""
+        queue = deque()
+        for child in self._goto[0].values():
+            self._fail[child] = 0
+            self._out[child] = list(self._own[child])
+            queue.append(child)
+        while queue:
+            state = queue.popleft()
+            for ch, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and ch not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(ch, 0)
+                self._out[child] = self._own[child] + self._out[self._fail[child]]
+                queue.append(child)
+
+
+def _bounded(text: str, pattern: str, start: int, end: int) -> bool:
+    """Whole-word check: no letter/digit glued to either edge of the match."""
+    if pattern[0].isalnum() and start > 0 and text[start - 1].isalnum():
+        return False
+    if pattern[-1].isalnum() and end < len(text) and text[end].isalnum():
+        return False
+    return True
+
+
+def longest_non_overlapping(matches: Iterable[EntityMatch], prefer: Tuple[str, ...] = ()) -> List[EntityMatch]:
+    """Resolve overlapping matches: longest wins, then kinds earlier in
+    `prefer`, then leftmost. Returned longest first."""
+    rank = {kind: i for i, kind in enumerate(prefer)}
+    ordered = sorted(matches, key=lambda m: (-m.length, rank.get(m.kind, len(rank)), m.start))
+    kept: List[EntityMatch] = []
+    for m in ordered:
+        if not any(m.overlaps(k) for k in kept):
+            kept.append(m)
+    return kept
@@ -2,15 +2,17 @@
 Query Parser
 
 Lightweight intent detection and entity extraction for analytics queries.
-Uses keyword matching and regex — no LLM call needed.
+Uses keyword matching, regex and an Aho–Corasick entity matcher — no LLM
+call needed.
 """
 
 import re
 from dataclasses import dataclass, field
 from datetime import date, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Union
 
 from core.utils.logging_config import get_logger
+from .entity_matcher import EntityMatcher, longest_non_overlapping
 
 logger = get_logger('jarvis.ai_agent.services.query_parser')
 
@@ -111,12 +113,16 @@ class ParsedQuery:
     complexity: str = 'default'  # 'simple', 'default', or 'complex'
 
 
-def parse_query(user_message: str, known_entities: Optional[Dict[str, List[str]]] = None) -> ParsedQuery:
+def parse_query(
+    user_message: str,
+    known_entities: Optional[Union[EntityMatcher, Dict[str, List[str]]]] = None,
+) -> ParsedQuery:
     """Parse a user message for analytics intent and extract filters.
 
     Args:
         user_message: The raw user message
-        known_entities: Dict with keys 'companies', 'departments', 'brands', 'suppliers'
+        known_entities: EntityMatcher (AnalyticsService.get_entity_matcher), or a
+            dict with keys 'companies', 'departments', 'brands', 'suppliers'
 
     Returns:
         ParsedQuery with intent and extracted entities
@@ -297,32 +303,34 @@ def _extract_dates(msg_lower: str) -> Dict[str, str]:
     return result
 
 
-def _extract_entities(msg_lower: str, known_entities: Dict[str, List[str]], result: ParsedQuery):
-    """Match known entity names in the message."""
-    # Check companies
-    for company in known_entities.get('companies', []):
-        if company.lower() in msg_lower:
-            result.filters['company'] = company
-            break
-
-    # Check suppliers (only if not already matched as company)
-    if 'supplier' not in result.filters:
-        for supplier in known_entities.get('suppliers', []):
-            if supplier.lower() in msg_lower:
-                result.filters['supplier'] = supplier
-                break
-
-    # Check departments
-    for dept in known_entities.get('departments', []):
-        if dept.lower() in msg_lower:
-            result.filters['department'] = dept
-            break
-
-    # Check brands
-    for brand in known_entities.get('brands', []):
-        if brand.lower() in msg_lower:
-            result.filters['brand'] = brand
-            break
+# Kinds whose names can overlap ("Autoworld" the company vs "Autoworld
+# Service SRL" the supplier); the longer mention wins, companies on a tie
+_PARTY_KINDS = ('companies', 'suppliers')
+
+_ENTITY_FILTERS = {
+    'companies': 'company',
+    'suppliers': 'supplier',
+    'departments': 'department',
+    'brands': 'brand',
+}
+
+
+def _extract_entities(
+    msg_lower: str,
+    known_entities: Union[EntityMatcher, Dict[str, List[str]]],
+    result: ParsedQuery,
+):
+    """Match known entity names in the message (longest mention per kind)."""
+    matcher = known_entities if isinstance(known_entities, EntityMatcher) else EntityMatcher(known_entities)
+    matches = matcher.find(msg_lower)
+
+    party = longest_non_overlapping((m for m in matches if m.kind in _PARTY_KINDS), prefer=_PARTY_KINDS)
+    other = sorted((m for m in matches if m.kind not in _PARTY_KINDS), key=lambda m: (-m.length, m.start))
+
+    for m in party + other:
+        key = _ENTITY_FILTERS.get(m.kind)
+        if key and key not in result.filters:
+            result.filters[key] = m.name
 
 
 def _detect_group_by(msg_lower: str, result: ParsedQuery) -> Optional[str]:
@@ -0,0 +1,19 @@
+"""
+Token estimation
+
+Shared by the message repository (count stored per message at insert) and
+the AI agent service (budgeting the current turn and system prompt).
+"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate token count from text length.
+
+    Uses ~4 chars per token heuristic (accurate within ~10-15% for English).
+    Slightly conservative to avoid context window overflows.
+    """
+    return max(1, len(text) // 3)
+
+
+# Same estimate in SQL, for rows stored before content_tokens existed
+ESTIMATE_TOKENS_SQL = 'GREATEST(1, length(content) / 3)'
@@ -11,8 +11,12 @@ Usage:
 
     # Execute a tool call
     result = tool_registry.execute('search_invoices', {'supplier': 'Google'}, user_id=1)
+
+    # Execute one LLM turn's tool calls (concurrent, memoised per conversation)
+    results = tool_executor.run(llm_response.tool_calls, user_id=1, conversation_id=42)
 """
 
 from .registry import ToolRegistry, tool_registry
+from .executor import ToolExecutor, tool_executor
 
-__all__ = ['ToolRegistry', 'tool_registry']
+__all__ = ['ToolRegistry', 'tool_registry', 'ToolExecutor', 'tool_executor']
@@ -0,0 +1,192 @@
+"""Tool Executor — runs the tool calls of one LLM turn.
+
+Shared by AIAgentService.chat and chat_stream:
+- read-only tools run concurrently, each bounded by its timeout
+- mutating tools run one at a time, in call order, and invalidate the
+  conversation's memo
+- read-only results are memoised per (conversation, tool, args, user) for
+  TOOL_CACHE_TTL seconds — the model often repeats the same query across
+  tool iterations and follow-up turns
+- per-tool latency, error, timeout and cache-hit counters (stats())
+"""
+
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from typing import Any, Dict, List, Optional
+
+from .registry import ToolRegistry, tool_registry
+
+logger = logging.getLogger('jarvis.ai_agent.tools.executor')
+
+TOOL_MAX_WORKERS = int(os.environ.get('AI_AGENT_TOOL_WORKERS', '4'))
+TOOL_TIMEOUT = float(os.environ.get('AI_AGENT_TOOL_TIMEOUT', '10'))       # seconds, per call
+TOOL_CACHE_TTL = float(os.environ.get('AI_AGENT_TOOL_CACHE_TTL', '120'))  # seconds
+TOOL_CACHE_SIZE = 1000
+
+
+class _ToolStats:
+    __slots__ = ('calls', 'errors', 'timeouts', 'cache_hits', 'total_ms', 'max_ms')
+
+    def __init__(self):
+        self.calls = self.errors = self.timeouts = self.cache_hits = 0
+        self.total_ms = self.max_ms = 0.0
+
+    def as_dict(self) -> dict:
+        executed = self.calls - self.cache_hits
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'timeouts': self.timeouts,
+            'cache_hits': self.cache_hits,
+            'avg_ms': round(self.total_ms / executed, 1) if executed else None,
+            'max_ms': round(self.max_ms, 1),
+        }
+
+
+class ToolExecutor:
+    """Executes LLM tool calls against a ToolRegistry."""
+
+    def __init__(
+        self,
+        registry: ToolRegistry,
+        max_workers: int = TOOL_MAX_WORKERS,
+        timeout: float = TOOL_TIMEOUT,
+        cache_ttl: float = TOOL_CACHE_TTL,
+        cache_size: int = TOOL_CACHE_SIZE,
+    ):
+        self._registry = registry
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='ai-tool')
+        self._timeout = timeout
+        self._cache_ttl = cache_ttl
+        self._cache_size = cache_size
+        self._cache: 'OrderedDict[tuple, tuple]' = OrderedDict()  # key -> (expires_at, result)
+        self._stats: Dict[str, _ToolStats] = {}
+        self._lock = threading.Lock()
+
+    # ── Public API ──
+
+    def run(
+        self,
+        tool_calls: List[dict],
+        user_id: int,
+        conversation_id: Optional[int] = None,
+        user_permissions: Optional[set] = None,
+    ) -> List[Any]:
+        """Execute tool calls ({id, name, input}); returns results in call order.
+
+        Failures and timeouts come back as {'error': ...} results, like
+        ToolRegistry.execute, so the model can see and react to them.
+        """
+        results: List[Any] = [None] * len(tool_calls)
+        pending = []  # (index, future, started, deadline, cache_key)
+
+        for i, tc in enumerate(tool_calls):
+            name, params = tc['name'], tc.get('input') or {}
+            tool = self._registry.get_tool(name)
+
+            if tool is None or not tool.read_only:
+                # Mutating (or unknown) tools: wait for everything issued
+                # before them, run inline, then forget memoised reads.
+                self._drain(pending, tool_calls, results)
+                started = time.monotonic()
+                results[i] = self._registry.execute(name, params, user_id, user_permissions)
+                self._record(name, started, results[i])
+                if tool is not None:
+                    self.invalidate(conversation_id)
+                continue
+
+            key = self._cache_key(conversation_id, name, params, user_id)
+            cached = self._cache_get(key)
+            if cached is not None:
+                results[i] = cached
+                self._record(name, None, cached, cache_hit=True)
+                continue
+
+            started = time.monotonic()
+            future = self._pool.submit(self._registry.execute, name, params, user_id, user_permissions)
+            pending.append((i, future, started, started + (tool.timeout or self._timeout), key))
+
+        self._drain(pending, tool_calls, results)
+        return results
+
+    def invalidate(self, conversation_id: Optional[int] = None) -> None:
+        """Drop memoised results for a conversation (all conversations if None)."""
+        with self._lock:
+            if conversation_id is None:
+                self._cache.clear()
+            else:
+                for key in [k for k in self._cache if k[0] == conversation_id]:
+                    del self._cache[key]
+
+    def stats(self) -> Dict[str, dict]:
+        """Per-tool counters and latency since process start."""
+        with self._lock:
+            return {name: s.as_dict() for name, s in sorted(self._stats.items())}
+
+    # ── Internals ──
+
+    def _drain(self, pending, tool_calls, results) -> None:
+        for i, future, started, deadline, key in pending:
+            name = tool_calls[i]['name']
+            try:
+                result = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except FutureTimeout:
+                logger.warning(f"Tool '{name}' timed out after {deadline - started:.0f}s")
+                result = {'error': f'Tool {name} timed out'}
+                self._record(name, started, result, timed_out=True)
+            else:
+                self._record(name, started, result)
+                if not (isinstance(result, dict) and 'error' in result):
+                    self._cache_put(key, result)
+            results[i] = result
+        pending.clear()
+
+    @staticmethod
+    def _cache_key(conversation_id, name, params, user_id) -> tuple:
+        return (conversation_id, name, json.dumps(params, sort_keys=True, default=str), user_id)
+
+    def _cache_get(self, key):
+        if key[0] is None or self._cache_ttl <= 0:  # memoised within a conversation only
+            return None
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            if entry[0] < time.monotonic():
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+            return entry[1]
+
+    def _cache_put(self, key, result) -> None:
+        if key[0] is None or self._cache_ttl <= 0:
+            return
+        with self._lock:
+            self._cache[key] = (time.monotonic() + self._cache_ttl, result)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+
+    def _record(self, name, started, result, cache_hit=False, timed_out=False) -> None:
+        elapsed_ms = (time.monotonic() - started) * 1000 if started is not None else 0.0
+        with self._lock:
+            s = self._stats.setdefault(name, _ToolStats())
+            s.calls += 1
+            if cache_hit:
+                s.cache_hits += 1
+                return
+            s.total_ms += elapsed_ms
+            s.max_ms = max(s.max_ms, elapsed_ms)
+            if timed_out:
+                s.timeouts += 1
+            elif isinstance(result, dict) and 'error' in result:
+                s.errors += 1
+
+
+# Global executor over the global registry
+tool_executor = ToolExecutor(tool_registry)
@@ -6,6 +6,9 @@ Each tool has:
 - input_schema: JSON Schema for parameters
 - handler: Python callable(params, user_id) -> dict
 - permission: optional permission key required to use the tool
+- read_only: False for tools that change data (never memoised or run
+  concurrently by ToolExecutor)
+- timeout: optional per-tool time limit in seconds (ToolExecutor default otherwise)
 """
 
 import logging
@@ -17,7 +20,8 @@ logger = logging.getLogger('jarvis.ai_agent.tools')
 class Tool:
     """A single tool that the AI can invoke."""
 
-    __slots__ = ('name', 'description', 'input_schema', 'handler', 'permission')
+    __slots__ = ('name', 'description', 'input_schema', 'handler', 'permission',
+                 'read_only', 'timeout')
 
     def __init__(
         self,
@@ -26,12 +30,16 @@ class Tool:
         input_schema: dict,
         handler: Callable[[dict, int], dict],
         permission: Optional[str] = None,
+        read_only: bool = True,
+        timeout: Optional[float] = None,
     ):
         self.name = name
         self.description = description
         self.input_schema = input_schema
         self.handler = handler
         self.permission = permission
+        self.read_only = read_only
+        self.timeout = timeout
 
 
 class ToolRegistry:
@@ -47,16 +55,23 @@ class ToolRegistry:
         input_schema: dict,
         handler: Callable[[dict, int], dict],
         permission: Optional[str] = None,
+        read_only: bool = True,
+        timeout: Optional[float] = None,
     ):
-        """Register a tool."""
+        """Register a tool. Pass read_only=False for tools that write data."""
         self._tools[name] = Tool(
             name=name,
             description=description,
             input_schema=input_schema,
             handler=handler,
             permission=permission,
+            read_only=read_only,
+            timeout=timeout,
         )
 
+    def get_tool(self, name: str) -> Optional[Tool]:
+        return self._tools.get(name)
+
     def get_schemas(self, user_permissions: Optional[set] = None) -> List[dict]:
         """Get tool schemas formatted for Claude/OpenAI tool_use.
 
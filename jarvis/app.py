@@ -1,6 +1,8 @@
 # Version: 2026-02-18-docker
 import sys
 import os
+import hmac
+import time
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 from flask import Flask, request, jsonify, redirect, send_from_directory
@@ -20,9 +22,35 @@ from models import load_structure
 from core.auth.models import User
 from core.auth.repositories import UserRepository
 from database import ping_db
+from core.metrics import Histogram, cache_result, render as render_metrics, track_cache_size
 
 _user_repo = UserRepository()
 
+# Loaded users per worker: {user_id: (User, loaded_at)}. Shared by the
+# Flask-Login user_loader and the mobile JWT bridge.
+_user_cache = {}
+_USER_CACHE_TTL = 60
+track_cache_size('users', lambda: len(_user_cache))
+
+REQUEST_SECONDS = Histogram('jarvis_http_request_duration_seconds', 'HTTP request latency by route',
+                            ['method', 'endpoint', 'status'])
+
+
+def _load_cached_user(user_id):
+    """Return the User for user_id (cached per-worker, 60s TTL), or None."""
+    uid = int(user_id)
+    now = time.time()
+    cached = _user_cache.get(uid)
+    if cache_result('users', bool(cached) and (now - cached[1]) < _USER_CACHE_TTL):
+        return cached[0]
+    user_data = _user_repo.get_by_id(uid)
+    if user_data:
+        user = User(user_data)
+        _user_cache[uid] = (user, now)
+        return user
+    _user_cache.pop(uid, None)
+    return None
+
 
 # ============== App Factory ==============
 
@@ -89,31 +117,15 @@ def _configure_app(flask_app: Flask, config: AppConfig):
 
 def _setup_login_manager(flask_app: Flask):
     """Configure Flask-Login."""
-    import time
-
     login_manager = LoginManager()
     login_manager.init_app(flask_app)
     login_manager.login_view = 'auth.login'
     login_manager.login_message = 'Please log in to access this page.'
 
-    _user_cache = {}
-    _USER_CACHE_TTL = 60
-
     @login_manager.user_loader
     def load_user(user_id):
         """Load user by ID for Flask-Login (cached per-worker, 60s TTL)."""
-        uid = int(user_id)
-        now = time.time()
-        cached = _user_cache.get(uid)
-        if cached and (now - cached[1]) < _USER_CACHE_TTL:
-            return cached[0]
-        user_data = _user_repo.get_by_id(uid)
-        if user_data:
-            user = User(user_data)
-            _user_cache[uid] = (user, now)
-            return user
-        _user_cache.pop(uid, None)
-        return None
+        return _load_cached_user(user_id)
 
 
 def _register_blueprints(flask_app: Flask):
@@ -187,6 +199,9 @@ def _register_blueprints(flask_app: Flask):
     from core.approvals import approvals_bp
     flask_app.register_blueprint(approvals_bp, url_prefix='/approvals')
 
+    from core.jobs import jobs_bp
+    flask_app.register_blueprint(jobs_bp)
+
     from marketing import marketing_bp
     flask_app.register_blueprint(marketing_bp, url_prefix='/marketing')
 
@@ -214,6 +229,9 @@ def _register_blueprints(flask_app: Flask):
     from carpark import carpark_bp
     flask_app.register_blueprint(carpark_bp)
 
+    from core.events import events_bp
+    flask_app.register_blueprint(events_bp)
+
 
 def _register_hooks(flask_app: Flask):
     """Register before/after request hooks and approval notification handlers."""
@@ -236,9 +254,12 @@ def _register_hooks(flask_app: Flask):
         user_id = payload.get('sub')
         if not user_id:
             return
-        user_data = _user_repo.get_by_id(user_id)
-        if user_data:
-            _fl_login(User(user_data))
+        try:
+            user = _load_cached_user(user_id)
+        except (TypeError, ValueError):
+            return
+        if user:
+            _fl_login(user)
 
     @flask_app.after_request
     def _mobile_cors(response):
@@ -260,9 +281,12 @@ def _register_hooks(flask_app: Flask):
     @flask_app.after_request
     def _log_slow_requests(response):
         start = getattr(request, '_start_time', None)
-        if start and request.path.startswith('/api/'):
+        if start:
             elapsed = _time.time() - start
-            if elapsed > 1.0:
+            rule = request.url_rule.rule if request.url_rule else 'unmatched'
+            REQUEST_SECONDS.observe(elapsed, method=request.method, endpoint=rule,
+                                    status=f'{response.status_code // 100}xx')
+            if elapsed > 1.0 and request.path.startswith('/api/'):
                 app_logger.warning(f'Slow request: {request.method} {request.path} — {elapsed:.2f}s (status={response.status_code})')
         return response
 
@@ -295,7 +319,7 @@ def _register_hooks(flask_app: Flask):
             response.headers['Cache-Control'] = 'public, max-age=3600'
             return response
         if response.content_type and 'application/json' in response.content_type:
-            if response.status_code == 200 and response.data:
+            if response.status_code == 200 and response.data and 'ETag' not in response.headers:
                 if_none_match = request.headers.get('If-None-Match')
                 if if_none_match:
                     import hashlib
@@ -316,6 +340,10 @@ def _register_hooks(flask_app: Flask):
     from core.approvals.handlers import register_approval_hooks
     register_approval_hooks()
 
+    # Server-push change events (SSE)
+    from core.events.handlers import register_event_hooks
+    register_event_hooks()
+
 
 def _register_error_handlers(flask_app: Flask):
     """Register global error handlers."""
@@ -376,6 +404,19 @@ def _register_routes(flask_app: Flask):
             'version': '2026-02-18'
         }), http_code
 
+    @flask_app.route('/metrics')
+    def metrics():
+        """Prometheus scrape endpoint, aggregated across workers. Disabled unless METRICS_TOKEN is set."""
+        token = os.environ.get('METRICS_TOKEN')
+        if not token:
+            return 'Not found', 404
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f'Bearer {token}'.encode()):
+            return 'Unauthorized', 401
+        resp = flask_app.response_class(render_metrics(), mimetype='text/plain; version=0.0.4; charset=utf-8')
+        resp.headers['Cache-Control'] = 'no-store'
+        return resp
+
     @flask_app.route('/')
     @login_required
     def index():
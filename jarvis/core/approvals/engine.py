@@ -11,7 +11,7 @@ from .condition_eval import ConditionEvaluator
 from . import hooks
 from .repositories import (
     FlowRepository, RequestRepository, DecisionRepository,
-    AuditRepository, DelegationRepository,
+    AuditRepository, DelegationRepository, InboxRepository,
 )
 
 logger = logging.getLogger('jarvis.core.approvals.engine')
@@ -49,6 +49,7 @@ class ApprovalEngine:
         self._decision_repo = DecisionRepository()
         self._audit_repo = AuditRepository()
         self._delegation_repo = DelegationRepository()
+        self._inbox_repo = InboxRepository()
 
     # ════════════════════════════════════════════
     # Public API
@@ -139,6 +140,7 @@ class ApprovalEngine:
         else:
             self._request_repo.update_status(
                 request_id, 'pending', current_step_id=first_step['id'])
+            self._sync_inbox(request_id)
             self._audit_repo.log(request_id, 'step_advanced', actor_type='system', details={
                 'step_name': first_step['name'], 'step_order': first_step['step_order'],
             })
@@ -203,6 +205,7 @@ class ApprovalEngine:
         # Update to in_progress if still pending
         if req['status'] == 'pending':
             self._request_repo.update_status(request_id, 'in_progress')
+        self._sync_inbox(request_id)
 
         hooks.fire('approval.decided', {
             'request_id': request_id, 'entity_type': req['entity_type'],
@@ -217,6 +220,7 @@ class ApprovalEngine:
                 resolved_at=datetime.now(timezone.utc),
                 resolution_note=comment,
             )
+            self._sync_inbox(request_id)
             self._audit_repo.log(request_id, 'request_rejected', decided_by, details={
                 'step_name': step['name'], 'comment': comment,
             })
@@ -229,6 +233,7 @@ class ApprovalEngine:
         if decision == 'returned':
             self._request_repo.update_status(request_id, 'on_hold',
                                              resolution_note=comment)
+            self._sync_inbox(request_id)
             self._audit_repo.log(request_id, 'request_returned', decided_by, details={
                 'step_name': step['name'], 'comment': comment,
             })
@@ -261,6 +266,7 @@ class ApprovalEngine:
                         resolved_at=datetime.now(timezone.utc),
                         current_step_id=None,
                     )
+                    self._sync_inbox(request_id)
                     self._audit_repo.log(request_id, 'request_approved',
                                          actor_type='system', details={
                         'final_step': step['name'],
@@ -275,6 +281,7 @@ class ApprovalEngine:
                         request_id, 'pending',
                         current_step_id=next_step['id'],
                     )
+                    self._sync_inbox(request_id)
                     self._audit_repo.log(request_id, 'step_advanced',
                                          actor_type='system', details={
                         'from_step': step['name'],
@@ -305,6 +312,7 @@ class ApprovalEngine:
             resolved_at=datetime.now(timezone.utc),
             resolution_note=reason,
         )
+        self._sync_inbox(request_id)
         self._audit_repo.log(request_id, 'cancelled', cancelled_by, details={
             'reason': reason,
         })
@@ -365,6 +373,8 @@ class ApprovalEngine:
                 approver_user_id=target_user_id,
             )
             self._request_repo.update_status(request_id, 'pending')
+            # The step itself was reassigned — every request sitting on it moves
+            self.refresh_inbox_for_step(step['id'])
             self._audit_repo.log(request_id, 'escalated', actor_id,
                                  actor_type=actor_type, details={
                 'reason': reason, 'step_name': step['name'],
@@ -393,6 +403,7 @@ class ApprovalEngine:
                     request_id, 'pending',
                     current_step_id=esc_step['id'],
                 )
+                self._sync_inbox(request_id)
                 self._audit_repo.log(request_id, 'escalated', actor_id,
                                      actor_type=actor_type, details={
                     'reason': reason, 'from_step': step['name'],
@@ -422,6 +433,35 @@ class ApprovalEngine:
         """Badge count for UI."""
         return self._request_repo.get_pending_queue_count(user_id)
 
+    def refresh_inbox_for_step(self, step_id):
+        """Recompute inboxes after a step's approver configuration changed."""
+        try:
+            return self._inbox_repo.refresh_step(step_id)
+        except Exception as e:
+            logger.error(f'Inbox refresh failed for step {step_id}: {e}')
+            return []
+
+    def refresh_inbox_for_delegation(self, delegation_id):
+        """Recompute inboxes after a delegation was created or revoked."""
+        try:
+            return self._inbox_repo.refresh_for_delegation(delegation_id)
+        except Exception as e:
+            logger.error(f'Inbox refresh failed for delegation {delegation_id}: {e}')
+            return []
+
+    def reconcile_inbox(self):
+        """Diff approval_inbox against the live rules and repair any drift."""
+        result = self._inbox_repo.reconcile()
+        if any(result.values()):
+            logger.info(f'Approval inbox reconciled: {result}')
+        return result
+
+    def rebuild_inbox(self):
+        """Rebuild approval_inbox from scratch. Returns the new row count."""
+        count = self._inbox_repo.rebuild()
+        logger.info(f'Approval inbox rebuilt: {count} rows')
+        return count
+
     def get_history_for_entity(self, entity_type, entity_id):
         """Full approval history for an entity."""
         return self._request_repo.get_by_entity(entity_type, entity_id)
@@ -466,6 +506,7 @@ class ApprovalEngine:
                     resolved_at=datetime.now(timezone.utc),
                     resolution_note=f"Auto-expired after {item['auto_reject_after_hours']}h",
                 )
+                self._sync_inbox(item['request_id'])
                 self._audit_repo.log(
                     item['request_id'], 'expired',
                     actor_type='scheduler',
@@ -481,6 +522,14 @@ class ApprovalEngine:
     # Internal
     # ════════════════════════════════════════════
 
+    def _sync_inbox(self, request_id):
+        """Recompute inbox rows for one request. Never raises — the scheduled
+        reconcile repairs anything missed here."""
+        try:
+            self._inbox_repo.refresh_requests([request_id])
+        except Exception as e:
+            logger.error(f'Inbox sync failed for request {request_id}: {e}')
+
     def _find_matching_flow(self, entity_type, context):
         """Find highest-priority active flow that matches."""
         flows = self._flow_repo.get_active_flows_for_entity_type(entity_type)
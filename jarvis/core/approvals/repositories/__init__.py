@@ -4,8 +4,9 @@ from .request_repo import RequestRepository
 from .decision_repo import DecisionRepository
 from .audit_repo import AuditRepository
 from .delegation_repo import DelegationRepository
+from .inbox_repo import InboxRepository
 
 __all__ = [
     'FlowRepository', 'RequestRepository', 'DecisionRepository',
-    'AuditRepository', 'DelegationRepository',
+    'AuditRepository', 'DelegationRepository', 'InboxRepository',
 ]
@@ -0,0 +1,193 @@
+"""Repository for approval_inbox — materialised per-user approval queue.
+
+One row per (user, open request) the user may currently decide on. Rows are
+recomputed for the affected requests whenever the engine changes a request,
+a step's approver changes, or a delegation is created/revoked; queue reads
+and badge counts (RequestRepository.get_pending_for_user /
+get_pending_queue_count) are then plain index lookups on user_id.
+
+The eligibility rules mirror ApprovalEngine._is_authorized:
+direct assignment, role match, context approver, stakeholder approvers and
+active delegations — excluding the requester and anyone who already decided
+on the current step.
+"""
+
+import logging
+from core.base_repository import BaseRepository
+
+logger = logging.getLogger('jarvis.core.approvals.inbox_repo')
+
+
+# Eligible (user, request) pairs for open requests matching {scope}.
+_ELIGIBLE_SQL = '''
+    WITH open_req AS (
+        SELECT r.id, r.current_step_id, r.requested_by, r.entity_type, r.flow_id,
+               r.context_snapshot, s.approver_type, s.approver_user_id,
+               s.approver_role_name
+        FROM approval_requests r
+        JOIN approval_steps s ON s.id = r.current_step_id
+        WHERE r.status IN ('pending', 'in_progress')
+        {scope}
+    ),
+    candidates AS (
+        -- Direct user assignment
+        SELECT o.id AS request_id, o.current_step_id AS step_id,
+               o.approver_user_id AS user_id, 'direct' AS reason
+        FROM open_req o
+        WHERE o.approver_user_id IS NOT NULL
+        UNION ALL
+        -- Role-based assignment
+        SELECT o.id, o.current_step_id, u.id, 'role'
+        FROM open_req o
+        JOIN roles rl ON rl.name = o.approver_role_name
+        JOIN users u ON u.role_id = rl.id
+        UNION ALL
+        -- Context-driven approver (ad-hoc selection at submit time)
+        SELECT o.id, o.current_step_id,
+               (o.context_snapshot->>'approver_user_id')::int, 'context'
+        FROM open_req o
+        WHERE o.approver_type = 'context_approver'
+        AND o.context_snapshot->>'approver_user_id' ~ '^[0-9]+$'
+        UNION ALL
+        -- Multi-stakeholder context approvers
+        SELECT o.id, o.current_step_id, sid::int, 'stakeholder'
+        FROM open_req o
+        CROSS JOIN LATERAL jsonb_array_elements_text(
+            CASE WHEN jsonb_typeof(o.context_snapshot->'stakeholder_approver_ids') = 'array'
+                 THEN o.context_snapshot->'stakeholder_approver_ids'
+                 ELSE '[]'::jsonb END
+        ) AS sid
+        WHERE o.approver_type = 'context_approver'
+        AND sid ~ '^[0-9]+$'
+        UNION ALL
+        -- Active delegation
+        SELECT o.id, o.current_step_id, d.delegate_id, 'delegation'
+        FROM open_req o
+        JOIN approval_delegations d ON d.delegator_id = o.approver_user_id
+        WHERE d.is_active = TRUE
+        AND NOW() BETWEEN d.starts_at AND d.ends_at
+        AND (d.entity_type IS NULL OR d.entity_type = o.entity_type)
+        AND (d.flow_id IS NULL OR d.flow_id = o.flow_id)
+    )
+    SELECT DISTINCT ON (c.user_id, c.request_id)
+           c.user_id, c.request_id, c.step_id, c.reason
+    FROM candidates c
+    JOIN open_req o ON o.id = c.request_id
+    WHERE c.user_id <> o.requested_by
+    AND NOT EXISTS (
+        SELECT 1 FROM approval_decisions ad
+        WHERE ad.request_id = c.request_id AND ad.step_id = c.step_id
+        AND ad.decided_by = c.user_id
+    )
+    ORDER BY c.user_id, c.request_id, c.reason
+'''
+
+_SCOPE_REQUESTS = 'AND r.id = ANY(%s)'
+
+
+class InboxRepository(BaseRepository):
+
+    def refresh_requests(self, request_ids):
+        """Recompute inbox rows for the given requests (open or closed).
+
+        Returns the sorted list of user ids whose inbox changed.
+        """
+        ids = [int(i) for i in request_ids if i]
+        if not ids:
+            return []
+
+        def _work(cursor):
+            cursor.execute('''
+                DELETE FROM approval_inbox WHERE request_id = ANY(%s)
+                RETURNING user_id, request_id, step_id
+            ''', (ids,))
+            before = {(r['user_id'], r['request_id'], r['step_id']) for r in cursor.fetchall()}
+            after = self._insert_eligible(cursor, _SCOPE_REQUESTS, (ids,))
+            return sorted({key[0] for key in before ^ after})
+        return self.execute_many(_work)
+
+    def refresh_step(self, step_id):
+        """Recompute rows for open requests sitting on a step (approver changed)."""
+        rows = self.query_all('''
+            SELECT id FROM approval_requests
+            WHERE current_step_id = %s AND status IN ('pending', 'in_progress')
+        ''', (step_id,))
+        return self.refresh_requests([r['id'] for r in rows])
+
+    def refresh_for_approvers(self, approver_user_ids):
+        """Recompute rows for open requests whose step approver is one of these
+        users — used when their delegations change."""
+        approver_ids = [int(u) for u in approver_user_ids if u]
+        if not approver_ids:
+            return []
+        rows = self.query_all('''
+            SELECT r.id FROM approval_requests r
+            JOIN approval_steps s ON s.id = r.current_step_id
+            WHERE r.status IN ('pending', 'in_progress')
+            AND s.approver_user_id = ANY(%s)
+        ''', (approver_ids,))
+        return self.refresh_requests([r['id'] for r in rows])
+
+    def refresh_for_delegation(self, delegation_id):
+        """Recompute rows affected by a delegation being created or revoked."""
+        row = self.query_one(
+            'SELECT delegator_id FROM approval_delegations WHERE id = %s', (delegation_id,))
+        if not row:
+            return []
+        return self.refresh_for_approvers([row['delegator_id']])
+
+    def reconcile(self):
+        """Consistency check: diff the table against the live rules and repair.
+
+        Catches drift the event-driven refreshes cannot see — role changes,
+        delegation windows opening/closing by time, manual SQL.
+
+        Returns:
+            dict with 'added', 'removed', 'updated' row counts
+        """
+        def _work(cursor):
+            cursor.execute('''
+                CREATE TEMP TABLE _inbox_expected ON COMMIT DROP AS
+            ''' + _ELIGIBLE_SQL.format(scope=''))
+            cursor.execute('''
+                DELETE FROM approval_inbox i
+                WHERE NOT EXISTS (
+                    SELECT 1 FROM _inbox_expected e
+                    WHERE e.user_id = i.user_id AND e.request_id = i.request_id
+                )
+            ''')
+            removed = cursor.rowcount
+            cursor.execute('''
+                UPDATE approval_inbox i
+                SET step_id = e.step_id, reason = e.reason
+                FROM _inbox_expected e
+                WHERE e.user_id = i.user_id AND e.request_id = i.request_id
+                AND (i.step_id <> e.step_id OR i.reason <> e.reason)
+            ''')
+            updated = cursor.rowcount
+            cursor.execute('''
+                INSERT INTO approval_inbox (user_id, request_id, step_id, reason)
+                SELECT user_id, request_id, step_id, reason FROM _inbox_expected
+                ON CONFLICT (user_id, request_id) DO NOTHING
+            ''')
+            added = cursor.rowcount
+            return {'added': added, 'removed': removed, 'updated': updated}
+        return self.execute_many(_work)
+
+    def rebuild(self):
+        """Rebuild the whole table from scratch. Returns the new row count."""
+        def _work(cursor):
+            cursor.execute('DELETE FROM approval_inbox')
+            return len(self._insert_eligible(cursor, '', ()))
+        return self.execute_many(_work)
+
+    @staticmethod
+    def _insert_eligible(cursor, scope, params):
+        cursor.execute(
+            'INSERT INTO approval_inbox (user_id, request_id, step_id, reason) '
+            + _ELIGIBLE_SQL.format(scope=scope)
+            + ' ON CONFLICT (user_id, request_id) DO NOTHING'
+            + ' RETURNING user_id, request_id, step_id',
+            params,
+        )
+        return {(r['user_id'], r['request_id'], r['step_id']) for r in cursor.fetchall()}
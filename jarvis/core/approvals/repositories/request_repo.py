@@ -115,13 +115,11 @@ class RequestRepository(BaseRepository):
     def get_pending_for_user(self, user_id, entity_type=None):
         """Get requests pending this user's decision.
 
-        Checks:
-        - Direct assignment (step.approver_user_id = user)
-        - Role match (user's role matches step.approver_role_name)
-        - Context-driven approver (context_snapshot->>'approver_user_id')
-        - Active delegations
+        Reads the materialised approval_inbox (see InboxRepository), which
+        already resolves direct assignment, role match, context approvers,
+        stakeholders, delegations and prior decisions on the current step.
         """
-        params = [user_id, user_id, user_id, str(user_id), user_id, user_id, user_id]
+        params = [user_id]
         entity_filter = ''
         if entity_type:
             entity_filter = 'AND r.entity_type = %s'
@@ -132,42 +130,13 @@ class RequestRepository(BaseRepository):
                    s.name as current_step_name,
                    u.name as requested_by_name, u.email as requested_by_email,
                    EXTRACT(EPOCH FROM (NOW() - r.requested_at)) / 3600.0 as waiting_hours
-            FROM approval_requests r
+            FROM approval_inbox i
+            JOIN approval_requests r ON r.id = i.request_id
             JOIN approval_flows f ON f.id = r.flow_id
             JOIN approval_steps s ON s.id = r.current_step_id
             JOIN users u ON u.id = r.requested_by
-            WHERE r.status IN ('pending', 'in_progress')
-            AND r.requested_by != %s
-            AND (
-                -- Direct user assignment
-                s.approver_user_id = %s
-                -- Role-based assignment
-                OR s.approver_role_name IN (
-                    SELECT rl.name FROM roles rl
-                    JOIN users usr ON usr.role_id = rl.id
-                    WHERE usr.id = %s
-                )
-                -- Context-driven approver (ad-hoc selection at submit time)
-                OR (s.approver_type = 'context_approver'
-                    AND r.context_snapshot->>'approver_user_id' = %s)
-                -- Multi-stakeholder context approver
-                OR (s.approver_type = 'context_approver'
-                    AND r.context_snapshot->'stakeholder_approver_ids' @> to_jsonb(%s::int))
-                -- Active delegation
-                OR s.approver_user_id IN (
-                    SELECT d.delegator_id FROM approval_delegations d
-                    WHERE d.delegate_id = %s AND d.is_active = TRUE
-                    AND NOW() BETWEEN d.starts_at AND d.ends_at
-                    AND (d.entity_type IS NULL OR d.entity_type = r.entity_type)
-                    AND (d.flow_id IS NULL OR d.flow_id = r.flow_id)
-                )
-            )
-            -- Exclude requests the user already decided on for this step
-            AND NOT EXISTS (
-                SELECT 1 FROM approval_decisions ad
-                WHERE ad.request_id = r.id AND ad.step_id = r.current_step_id
-                AND ad.decided_by = %s
-            )
+            WHERE i.user_id = %s
+            AND r.status IN ('pending', 'in_progress')
             {entity_filter}
             ORDER BY
                 CASE r.priority
@@ -180,38 +149,9 @@ class RequestRepository(BaseRepository):
         ''', params)
 
     def get_pending_queue_count(self, user_id):
-        """Fast count for badge."""
-        row = self.query_one('''
-            SELECT COUNT(DISTINCT r.id) as cnt
-            FROM approval_requests r
-            JOIN approval_steps s ON s.id = r.current_step_id
-            WHERE r.status IN ('pending', 'in_progress')
-            AND r.requested_by != %s
-            AND (
-                s.approver_user_id = %s
-                OR s.approver_role_name IN (
-                    SELECT rl.name FROM roles rl
-                    JOIN users usr ON usr.role_id = rl.id
-                    WHERE usr.id = %s
-                )
-                OR (s.approver_type = 'context_approver'
-                    AND r.context_snapshot->>'approver_user_id' = %s)
-                OR (s.approver_type = 'context_approver'
-                    AND r.context_snapshot->'stakeholder_approver_ids' @> to_jsonb(%s::int))
-                OR s.approver_user_id IN (
-                    SELECT d.delegator_id FROM approval_delegations d
-                    WHERE d.delegate_id = %s AND d.is_active = TRUE
-                    AND NOW() BETWEEN d.starts_at AND d.ends_at
-                    AND (d.entity_type IS NULL OR d.entity_type = r.entity_type)
-                    AND (d.flow_id IS NULL OR d.flow_id = r.flow_id)
-                )
-            )
-            AND NOT EXISTS (
-                SELECT 1 FROM approval_decisions ad
-                WHERE ad.request_id = r.id AND ad.step_id = r.current_step_id
-                AND ad.decided_by = %s
-            )
-        ''', (user_id, user_id, user_id, str(user_id), user_id, user_id, user_id))
+        """Fast count for badge — index-only lookup on approval_inbox."""
+        row = self.query_one(
+            'SELECT COUNT(*) as cnt FROM approval_inbox WHERE user_id = %s', (user_id,))
         return row['cnt'] if row else 0
 
     def get_timed_out_requests(self):
@@ -232,6 +232,18 @@ def api_my_queue_count():
     return jsonify({'count': count})
 
 
+@approvals_bp.route('/api/my-queue/rebuild', methods=['POST'])
+@login_required
+@handle_api_errors
+def api_rebuild_queue():
+    """Rebuild the materialised approval inbox for all users (admin)."""
+    if not current_user.can_access_settings:
+        return jsonify({'success': False, 'error': 'Admin access required'}), 403
+
+    count = _engine.rebuild_inbox()
+    return jsonify({'success': True, 'rows': count})
+
+
 @approvals_bp.route('/api/my-requests', methods=['GET'])
 @login_required
 @approvals_access_required
@@ -377,6 +389,7 @@ def api_update_step(flow_id, step_id):
     data = request.get_json()
     updated = _flow_repo.update_step(step_id, **data)
     if updated:
+        _engine.refresh_inbox_for_step(step_id)
         return jsonify({'success': True})
     return jsonify({'success': False, 'error': 'Step not found'}), 404
 
@@ -442,6 +455,7 @@ def api_create_delegation():
         entity_type=data.get('entity_type'),
         flow_id=data.get('flow_id'),
     )
+    _engine.refresh_inbox_for_delegation(delegation_id)
     return jsonify({'success': True, 'id': delegation_id})
 
 
@@ -451,6 +465,7 @@ def api_create_delegation():
 def api_delete_delegation(delegation_id):
     """Revoke a delegation."""
     if _delegation_repo.deactivate(delegation_id):
+        _engine.refresh_inbox_for_delegation(delegation_id)
         return jsonify({'success': True})
     return jsonify({'success': False, 'error': 'Delegation not found'}), 404
 
@@ -0,0 +1,107 @@
+"""Presence — coalesced last_seen writes and a cached online-users view.
+
+/api/heartbeat only records the user id in memory. A flusher thread writes
+everything recorded since its last pass as one batched
+``UPDATE users … FROM (VALUES …)`` every FLUSH_SECONDS, so a user's many
+heartbeats (several tabs, web + mobile) cost one row update per interval
+instead of a thread and a connection each.
+
+last_seen in the database stays the state shared by all workers. The
+online-users list is read from it at most once per ONLINE_CACHE_SECONDS per
+window, right after this process has flushed its own heartbeats.
+
+The flusher starts lazily on the first heartbeat, so processes that never
+serve one (job worker, events app) never run it.
+"""
+
+import atexit
+import logging
+import threading
+import time
+
+logger = logging.getLogger('jarvis.core.auth.presence')
+
+FLUSH_SECONDS = 5
+ONLINE_CACHE_SECONDS = 5
+
+
+class PresenceTracker:
+
+    def __init__(self, user_repo=None, flush_seconds=FLUSH_SECONDS,
+                 online_cache_seconds=ONLINE_CACHE_SECONDS):
+        self._user_repo = user_repo
+        self._flush_seconds = flush_seconds
+        self._online_cache_seconds = online_cache_seconds
+        self._pending = {}          # user_id -> monotonic time of latest heartbeat
+        self._online = {}           # minutes -> (monotonic fetched_at, result)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def user_repo(self):
+        if self._user_repo is None:
+            from core.auth.repositories import UserRepository
+            self._user_repo = UserRepository()
+        return self._user_repo
+
+    # ── Public API ──
+
+    def record_heartbeat(self, user_id):
+        """Note that user_id is active now. Written on the next flush."""
+        with self._lock:
+            self._pending[user_id] = time.monotonic()
+        self._ensure_flusher()
+
+    def flush(self):
+        """Write pending heartbeats in one statement. Returns users updated."""
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+            if not pending:
+                return 0
+            now = time.monotonic()
+            seen = {user_id: now - at for user_id, at in pending.items()}
+            try:
+                return self.user_repo.update_last_seen_many(seen)
+            except Exception as e:
+                logger.error(f'Presence flush failed for {len(seen)} users: {e}')
+                with self._lock:  # keep them for the next pass unless newer
+                    for user_id, at in pending.items():
+                        self._pending.setdefault(user_id, at)
+                return 0
+
+    def get_online_count(self, minutes=5):
+        """{'count', 'users'} for users active in the last `minutes` minutes."""
+        now = time.monotonic()
+        cached = self._online.get(minutes)
+        if cached and now - cached[0] < self._online_cache_seconds:
+            return cached[1]
+        self.flush()
+        result = self.user_repo.get_online_count(minutes)
+        self._online[minutes] = (now, result)
+        return result
+
+    def stop(self):
+        self._stop.set()
+
+    # ── Flusher ──
+
+    def _ensure_flusher(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='jarvis-presence-flusher', daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self._flush_seconds):
+            self.flush()
+
+
+presence = PresenceTracker()
+atexit.register(presence.flush)
@@ -76,6 +76,27 @@ class UserRepository(BaseRepository):
             WHERE id = %s
         ''', (user_id,)) > 0
 
+    def update_last_seen_many(self, seen: Dict[int, float]) -> int:
+        """Update last_seen for many users in one statement.
+
+        Args:
+            seen: user_id -> seconds elapsed since that user's heartbeat
+        """
+        from psycopg2.extras import execute_values
+        rows = [(user_id, round(age, 3)) for user_id, age in seen.items()]
+        if not rows:
+            return 0
+
+        def _work(cursor):
+            execute_values(cursor, '''
+                UPDATE users u
+                SET last_seen = CURRENT_TIMESTAMP - make_interval(secs => v.age)
+                FROM (VALUES %s) AS v(id, age)
+                WHERE u.id = v.id
+            ''', rows, template='(%s::int, %s::float8)', page_size=len(rows))
+            return cursor.rowcount
+        return self.execute_many(_work)
+
     def get_online_users(self, minutes: int = 5) -> List[Dict[str, Any]]:
         """Get users who have been active in the last N minutes."""
         rows = self.query_all('''
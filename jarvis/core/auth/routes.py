@@ -3,12 +3,12 @@
 All authentication, user management, employee management, password management,
 and event log routes.
 """
-import threading
 from flask import jsonify, request, render_template, redirect, url_for, flash
 from flask_login import login_required, login_user, logout_user, current_user
 
 from . import auth_bp
 from .models import User
+from .presence import presence
 from .repositories import UserRepository, EventRepository
 from core.utils.api_helpers import admin_required, error_response, safe_error_response, RateLimiter
 
@@ -263,12 +263,8 @@ def api_change_password():
 @auth_bp.route('/api/heartbeat', methods=['POST'])
 @login_required
 def api_heartbeat():
-    """Keep-alive — returns instantly, updates last_seen in background."""
-    user_id = current_user.id
-    threading.Thread(
-        target=lambda: _user_repo.update_last_seen(user_id),
-        daemon=True
-    ).start()
+    """Keep-alive — returns instantly; last_seen is written by the presence flusher."""
+    presence.record_heartbeat(current_user.id)
     return jsonify({'success': True})
 
 
@@ -276,7 +272,7 @@ def api_heartbeat():
 @login_required
 def api_online_users():
     """Get count and list of currently online users (active in last 3 minutes)."""
-    result = _user_repo.get_online_count(minutes=3)
+    result = presence.get_online_count(minutes=3)
     return jsonify(result)
 
 
@@ -30,12 +30,16 @@ import os
 import time as _time
 
 from database import get_db, get_cursor, release_db, dict_from_row
+from core.metrics import Histogram
 
 _logger = logging.getLogger('jarvis.db')
 _SLOW_MS = int(os.environ.get('SLOW_QUERY_MS', '200'))
 
+QUERY_SECONDS = Histogram('jarvis_db_query_duration_seconds', 'BaseRepository statement execution time')
+
 
 def _warn_slow(elapsed_ms: float, sql: str):
+    QUERY_SECONDS.observe(elapsed_ms / 1000)
     if elapsed_ms > _SLOW_MS:
         _logger.warning(f'Slow query {elapsed_ms:.0f}ms: {sql[:120]}')
 
@@ -16,6 +16,8 @@ import time
 import logging
 import threading
 
+from core.metrics import cache_result
+
 logger = logging.getLogger('jarvis.core.cache')
 
 # Thread-safe lock for cache operations
@@ -26,11 +28,15 @@ _cache_lock = threading.RLock()
 MAX_SUMMARY_CACHE_ENTRIES = 50
 
 
-def _is_cache_valid(cache_entry: dict) -> bool:
-    """Check if a cache entry is still valid."""
-    if cache_entry.get('data') is None:
-        return False
-    return (time.time() - cache_entry.get('timestamp', 0)) < cache_entry.get('ttl', 300)
+def _is_cache_valid(cache_entry: dict, name: str = None) -> bool:
+    """Check if a cache entry is still valid.
+
+    With a name, the lookup is counted as a hit or miss of that cache
+    (jarvis_cache_requests_total).
+    """
+    valid = (cache_entry.get('data') is not None
+             and (time.time() - cache_entry.get('timestamp', 0)) < cache_entry.get('ttl', 300))
+    return cache_result(name, valid) if name else valid
 
 
 def _get_cache_data(cache_dict: dict, key: str = 'data'):
@@ -71,7 +77,8 @@ def _get_summary_cache(summary_cache: dict, cache_type: str, cache_key: str):
     with _cache_lock:
         cache = summary_cache.get(cache_type, {})
         entry = cache.get(cache_key)
-        if entry and (time.time() - entry.get('timestamp', 0)) < summary_cache.get('ttl', 60):
+        if cache_result(f'summary_{cache_type}',
+                        bool(entry) and (time.time() - entry.get('timestamp', 0)) < summary_cache.get('ttl', 60)):
             return entry.get('data')
         return None
 
@@ -1,8 +1,30 @@
-"""GPS check-in data access layer."""
+"""GPS check-in data access layer.
+
+The caller's BioStar mapping is needed by every punch and status call, so
+user -> biostar_user_id lookups are cached per process for MAPPING_TTL
+(MAPPING_MISS_TTL for unmapped users). BioStarRepository clears the cache
+when it changes a mapping.
+"""
 
 import json
+import time
+from collections import OrderedDict
 
 from core.base_repository import BaseRepository
+from core.cache import _cache_lock
+from core.connectors.biostar.repositories.attendance_repository import punch_rollup_sql
+
+MAPPING_TTL = 300
+MAPPING_MISS_TTL = 30
+MAPPING_CACHE_SIZE = 5000
+
+_mapping_cache = OrderedDict()   # jarvis_user_id -> (timestamp, mapping row or None)
+
+
+def clear_biostar_mapping_cache():
+    """Drop cached user -> BioStar mappings (after mapping changes)."""
+    with _cache_lock:
+        _mapping_cache.clear()
 
 
 class CheckinRepository(BaseRepository):
@@ -55,13 +77,28 @@ class CheckinRepository(BaseRepository):
     # ── User mapping ──
 
     def get_biostar_user_id(self, jarvis_user_id):
-        """Reverse-lookup: jarvis user_id -> biostar_user_id via biostar_employees."""
-        return self.query_one(
+        """Reverse-lookup: jarvis user_id -> biostar_user_id via biostar_employees (cached)."""
+        now = time.time()
+        with _cache_lock:
+            entry = _mapping_cache.get(jarvis_user_id)
+            if entry:
+                ttl = MAPPING_TTL if entry[1] else MAPPING_MISS_TTL
+                if now - entry[0] < ttl:
+                    _mapping_cache.move_to_end(jarvis_user_id)
+                    return entry[1]
+
+        mapping = self.query_one(
             """SELECT biostar_user_id FROM biostar_employees
                WHERE mapped_jarvis_user_id = %s AND status = 'active'
                LIMIT 1""",
             (jarvis_user_id,),
         )
+        with _cache_lock:
+            _mapping_cache[jarvis_user_id] = (now, mapping)
+            _mapping_cache.move_to_end(jarvis_user_id)
+            while len(_mapping_cache) > MAPPING_CACHE_SIZE:
+                _mapping_cache.popitem(last=False)
+        return mapping
 
     # ── Punch queries ──
 
@@ -71,21 +108,37 @@ class CheckinRepository(BaseRepository):
             """SELECT id, biostar_event_id, event_datetime, direction,
                       device_name, raw_data
                FROM biostar_punch_logs
-               WHERE biostar_user_id = %s AND event_datetime::date = %s::date
+               WHERE biostar_user_id = %s
+                 AND event_datetime >= %s::date AND event_datetime < %s::date + 1
                ORDER BY event_datetime ASC""",
-            (biostar_user_id, date_str),
+            (biostar_user_id, date_str, date_str),
+        )
+
+    def get_last_punch(self, biostar_user_id, date_str):
+        """Latest punch for a user on a given date, or None."""
+        return self.query_one(
+            """SELECT event_datetime, direction
+               FROM biostar_punch_logs
+               WHERE biostar_user_id = %s
+                 AND event_datetime >= %s::date AND event_datetime < %s::date + 1
+               ORDER BY event_datetime DESC
+               LIMIT 1""",
+            (biostar_user_id, date_str, date_str),
         )
 
     def insert_gps_punch(self, biostar_event_id, biostar_user_id, event_datetime,
                          direction, raw_data_json):
-        """Insert a GPS-based punch into biostar_punch_logs."""
+        """Insert a GPS-based punch into biostar_punch_logs (and the daily attendance rollup)."""
         return self.execute(
-            """INSERT INTO biostar_punch_logs
-                   (biostar_event_id, biostar_user_id, event_datetime,
-                    event_type, direction, device_name, raw_data)
-               VALUES (%s, %s, %s, 'GPS_CHECKIN', %s, 'GPS Mobile', %s)
-               ON CONFLICT (biostar_event_id, (event_datetime::date)) DO NOTHING
-               RETURNING id, biostar_event_id""",
+            f"""WITH ins AS (
+                   INSERT INTO biostar_punch_logs
+                       (biostar_event_id, biostar_user_id, event_datetime,
+                        event_type, direction, device_name, raw_data)
+                   VALUES (%s, %s, %s, 'GPS_CHECKIN', %s, 'GPS Mobile', %s)
+                   ON CONFLICT (biostar_event_id, (event_datetime::date)) DO NOTHING
+                   RETURNING id, biostar_event_id, biostar_user_id, event_datetime
+               ), rollup AS ({punch_rollup_sql('ins')})
+               SELECT id, biostar_event_id FROM ins""",
             (biostar_event_id, biostar_user_id, event_datetime,
              direction, raw_data_json),
             returning=True,
@@ -1,7 +1,14 @@
-"""GPS check-in business logic."""
+"""GPS check-in business logic.
+
+Active locations are matched through a Geofences index cached per process:
+a lat/lng grid for the GPS match, plus allowed-IP and id lookups for the
+Wi-Fi and QR/NFC fallbacks. Location CRUD through this service rebuilds it;
+other workers pick changes up within GEOFENCE_TTL.
+"""
 
 import json
 import math
+from collections import defaultdict
 from datetime import datetime
 
 try:
@@ -10,9 +17,24 @@ except ImportError:
     from backports.zoneinfo import ZoneInfo
 
 from .repository import CheckinRepository
+from core.cache import _cache_lock, _is_cache_valid, _set_cache_data, create_cache
+from core.events.publisher import publish
 
 _RO_TZ = ZoneInfo('Europe/Bucharest')
 
+GEOFENCE_TTL = 60
+
+# Grid cell size in degrees (~1.1 km of latitude)
+GRID_CELL_DEG = 0.01
+_METERS_PER_DEG_LAT = 111_320
+
+_geofence_cache = create_cache(ttl=GEOFENCE_TTL)
+
+
+def clear_geofence_cache():
+    """Drop the cached geofences so the next punch reloads locations."""
+    _set_cache_data(_geofence_cache, None)
+
 
 def haversine(lat1, lon1, lat2, lon2):
     """Distance in meters between two (lat, lng) points."""
@@ -24,6 +46,60 @@ def haversine(lat1, lon1, lat2, lon2):
     return R * 2 * math.atan2(math.sqrt(a), math.sqrt(1 - a))
 
 
+def _cell(degrees):
+    return math.floor(degrees / GRID_CELL_DEG)
+
+
+class Geofences:
+    """Active check-in locations indexed for punch matching."""
+
+    def __init__(self, locations):
+        self.locations = locations
+        self.by_id = {loc['id']: loc for loc in locations}
+        self.by_ip = {}
+        self.max_radius = 0
+        self._points = {}
+        self._cells = defaultdict(list)
+        for loc in locations:
+            allowed = loc.get('allowed_ips') or []
+            if isinstance(allowed, str):
+                allowed = json.loads(allowed)
+            for ip in allowed:
+                self.by_ip.setdefault(ip, loc)
+            lat, lng = float(loc['latitude']), float(loc['longitude'])
+            self._points[loc['id']] = (lat, lng)
+            self._cells[_cell(lat), _cell(lng)].append(loc)
+            self.max_radius = max(self.max_radius, loc['allowed_radius_meters'])
+
+    def nearest(self, lat, lng):
+        """(location, distance in meters) of the nearest location.
+
+        Only locations in grid cells within max_radius of the point are
+        measured first. If none of them is within max_radius no location can
+        match, and all of them are measured just to report the nearest.
+        """
+        span_lat = self.max_radius / _METERS_PER_DEG_LAT
+        span_lng = span_lat / max(math.cos(math.radians(min(abs(lat) + span_lat, 89.0))), 0.01)
+        candidates = [
+            loc
+            for row in range(_cell(lat - span_lat), _cell(lat + span_lat) + 1)
+            for col in range(_cell(lng - span_lng), _cell(lng + span_lng) + 1)
+            for loc in self._cells.get((row, col), ())
+        ]
+        loc, dist = self._closest(lat, lng, candidates)
+        if loc is not None and dist <= self.max_radius:
+            return loc, dist
+        return self._closest(lat, lng, self.locations)
+
+    def _closest(self, lat, lng, locations):
+        nearest, nearest_dist = None, float('inf')
+        for loc in locations:
+            d = haversine(lat, lng, *self._points[loc['id']])
+            if d < nearest_dist:
+                nearest_dist, nearest = d, loc
+        return nearest, nearest_dist
+
+
 class CheckinService:
 
     def __init__(self):
@@ -32,22 +108,37 @@ class CheckinService:
     # ── Location CRUD ──
 
     def get_locations(self, active_only=True):
-        return self.repo.get_active_locations() if active_only else self.repo.get_all_locations()
+        return self.get_geofences().locations if active_only else self.repo.get_all_locations()
+
+    def get_geofences(self):
+        """Active locations as a Geofences index (cached)."""
+        with _cache_lock:
+            if _is_cache_valid(_geofence_cache, 'geofences'):
+                return _geofence_cache['data']
+        geofences = Geofences(self.repo.get_active_locations())
+        _set_cache_data(_geofence_cache, geofences)
+        return geofences
 
     def create_location(self, name, latitude, longitude, radius, created_by, allowed_ips=None, auto_checkout_radius=200):
-        return self.repo.create_location(
+        loc = self.repo.create_location(
             name, float(latitude), float(longitude), int(radius), allowed_ips or [],
             created_by, int(auto_checkout_radius),
         )
+        clear_geofence_cache()
+        return loc
 
     def update_location(self, location_id, name, latitude, longitude, radius, is_active, allowed_ips=None, auto_checkout_radius=200):
-        return self.repo.update_location(
+        loc = self.repo.update_location(
             location_id, name, float(latitude), float(longitude), int(radius),
             allowed_ips or [], is_active, int(auto_checkout_radius),
         )
+        clear_geofence_cache()
+        return loc
 
     def delete_location(self, location_id):
-        return self.repo.delete_location(location_id)
+        deleted = self.repo.delete_location(location_id)
+        clear_geofence_cache()
+        return deleted
 
     # ── Status ──
 
@@ -67,6 +158,14 @@ class CheckinService:
             'next_direction': _next_direction(punches),
         }
 
+    def get_last_punch(self, jarvis_user_id):
+        """Today's latest punch ({event_datetime, direction}) or None; for widgets."""
+        mapping = self.repo.get_biostar_user_id(jarvis_user_id)
+        if not mapping:
+            return None
+        today = datetime.now(_RO_TZ).strftime('%Y-%m-%d')
+        return self.repo.get_last_punch(mapping['biostar_user_id'], today)
+
     # ── Punch ──
 
     def punch(self, jarvis_user_id, lat=None, lng=None, direction=None, client_ip=None, qr_token=None):
@@ -79,8 +178,8 @@ class CheckinService:
         biostar_uid = mapping['biostar_user_id']
 
         # 2. Find matching location (GPS or IP fallback)
-        locations = self.repo.get_active_locations()
-        if not locations:
+        geofences = self.get_geofences()
+        if not geofences.locations:
             return {'success': False, 'error': 'No check-in locations configured. Contact admin.'}
 
         matched_loc = None
@@ -89,12 +188,7 @@ class CheckinService:
 
         # Try GPS first
         if lat is not None and lng is not None:
-            nearest, nearest_dist = None, float('inf')
-            for loc in locations:
-                d = haversine(float(lat), float(lng), float(loc['latitude']), float(loc['longitude']))
-                if d < nearest_dist:
-                    nearest_dist, nearest = d, loc
-
+            nearest, nearest_dist = geofences.nearest(float(lat), float(lng))
             if nearest_dist <= nearest['allowed_radius_meters']:
                 matched_loc = nearest
                 match_source = 'gps_mobile'
@@ -102,14 +196,14 @@ class CheckinService:
 
         # IP fallback if GPS didn't match or wasn't provided
         if not matched_loc and client_ip:
-            matched_loc = _match_ip(locations, client_ip)
+            matched_loc = geofences.by_ip.get(client_ip)
             if matched_loc:
                 match_source = 'ip_wifi'
                 match_dist = 0
 
         # QR code fallback — token format: "checkin:<location_id>"
         if not matched_loc and qr_token:
-            matched_loc = _match_qr(locations, qr_token)
+            matched_loc = _match_qr(geofences, qr_token)
             if matched_loc:
                 match_source = 'qr_code'
                 match_dist = 0
@@ -163,6 +257,9 @@ class CheckinService:
         if not result:
             return {'success': False, 'error': 'Duplicate punch. Try again in a minute.'}
 
+        publish('checkin', [jarvis_user_id])
+        publish('biostar', data={'biostar_user_id': biostar_uid})
+
         return {
             'success': True,
             'direction': actual_dir,
@@ -173,7 +270,7 @@ class CheckinService:
         }
 
 
-def _match_qr(locations, qr_token):
+def _match_qr(geofences, qr_token):
     """Validate QR token format 'checkin:<location_id>' against active locations."""
     if not qr_token or ':' not in qr_token:
         return None
@@ -184,23 +281,7 @@ def _match_qr(locations, qr_token):
         loc_id = int(loc_id_str)
     except ValueError:
         return None
-    for loc in locations:
-        if loc['id'] == loc_id:
-            return loc
-    return None
-
-
-def _match_ip(locations, client_ip):
-    """Check if client_ip matches any location's allowed_ips list."""
-    if not client_ip:
-        return None
-    for loc in locations:
-        allowed = loc.get('allowed_ips') or []
-        if isinstance(allowed, str):
-            allowed = json.loads(allowed)
-        if client_ip in allowed:
-            return loc
-    return None
+    return geofences.by_id.get(loc_id)
 
 
 def _next_direction(punches):
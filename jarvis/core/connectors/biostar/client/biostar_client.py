@@ -8,6 +8,7 @@ import time
 import requests
 import urllib3
 
+from core.metrics import external_call
 from ..config import REQUEST_TIMEOUT, USERS_PAGE_SIZE, EVENTS_PAGE_SIZE, MAX_RETRIES, RETRY_BASE_DELAY
 from .exceptions import (
     AuthenticationError, SessionExpiredError,
@@ -36,11 +37,14 @@ class BioStarClient:
     def login(self):
         """Authenticate and store bs-session-id. Returns user info dict."""
         try:
-            resp = self._session.post(
-                f"{self.base_url}/api/login",
-                json={"User": {"login_id": self.login_id, "password": self.password}},
-                timeout=REQUEST_TIMEOUT,
-            )
+            with external_call('biostar', '/api/login') as call:
+                resp = self._session.post(
+                    f"{self.base_url}/api/login",
+                    json={"User": {"login_id": self.login_id, "password": self.password}},
+                    timeout=REQUEST_TIMEOUT,
+                )
+                if resp.status_code != 200:
+                    call.error = f'HTTP {resp.status_code}'
         except requests.exceptions.Timeout:
             raise TimeoutError(f"Timeout connecting to {self.base_url}")
         except requests.exceptions.ConnectionError as e:
@@ -77,10 +81,13 @@ class BioStarClient:
         url = f"{self.base_url}{endpoint}"
         for attempt in range(MAX_RETRIES):
             try:
-                resp = self._session.request(
-                    method, url, json=json_data, params=params,
-                    timeout=REQUEST_TIMEOUT,
-                )
+                with external_call('biostar', endpoint) as call:
+                    resp = self._session.request(
+                        method, url, json=json_data, params=params,
+                        timeout=REQUEST_TIMEOUT,
+                    )
+                    if resp.status_code >= 400:
+                        call.error = f'HTTP {resp.status_code}'
             except requests.exceptions.Timeout:
                 if attempt < MAX_RETRIES - 1:
                     time.sleep(RETRY_BASE_DELAY * (attempt + 1))
@@ -0,0 +1,56 @@
+-- BioStar 2 Connector: Daily Attendance Rollup
+-- Migration: 003_create_daily_attendance.sql
+-- Created: 2026-10-18
+-- Description: Per-employee, per-day punch rollup read by the Pontaje
+--   range/daily summaries, employee history and off-schedule detection
+--   instead of grouping biostar_punch_logs on every request.
+--   Maintained incrementally by punch inserts and adjustment writes
+--   (repositories/attendance_repository.py); rebuild a range with
+--   scripts/rebuild_biostar_attendance.py.
+
+CREATE TABLE IF NOT EXISTS biostar_daily_attendance (
+    biostar_user_id VARCHAR(50) NOT NULL,
+    day DATE NOT NULL,
+
+    -- Raw punches for the day
+    first_punch TIMESTAMP NOT NULL,
+    last_punch TIMESTAMP NOT NULL,
+    total_punches INTEGER NOT NULL,
+
+    -- Copy of the day's biostar_daily_adjustments row, if any
+    adjustment_id INTEGER,
+    adjusted_first_punch TIMESTAMP,
+    adjusted_last_punch TIMESTAMP,
+    adjusted_duration_seconds NUMERIC,
+    adjustment_type VARCHAR(20),
+
+    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+
+    PRIMARY KEY (biostar_user_id, day)
+);
+
+CREATE INDEX IF NOT EXISTS idx_biostar_attendance_day ON biostar_daily_attendance(day);
+
+-- Initial fill from existing punches
+INSERT INTO biostar_daily_attendance
+    (biostar_user_id, day, first_punch, last_punch, total_punches,
+     adjustment_id, adjusted_first_punch, adjusted_last_punch,
+     adjusted_duration_seconds, adjustment_type)
+SELECT p.biostar_user_id, p.day, p.first_punch, p.last_punch, p.punches,
+       adj.id, adj.adjusted_first_punch, adj.adjusted_last_punch,
+       adj.adjusted_duration_seconds, adj.adjustment_type
+FROM (
+    SELECT biostar_user_id, event_datetime::date AS day,
+           MIN(event_datetime) AS first_punch, MAX(event_datetime) AS last_punch,
+           COUNT(*) AS punches
+    FROM biostar_punch_logs
+    GROUP BY biostar_user_id, event_datetime::date
+) p
+LEFT JOIN biostar_daily_adjustments adj
+    ON adj.biostar_user_id = p.biostar_user_id AND adj.date = p.day
+ON CONFLICT (biostar_user_id, day) DO NOTHING;
+
+-- ============================================================
+-- ROLLBACK
+-- ============================================================
+-- DROP TABLE IF EXISTS biostar_daily_attendance;
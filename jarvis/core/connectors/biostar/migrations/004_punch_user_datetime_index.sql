@@ -0,0 +1,19 @@
+-- BioStar 2 Connector: Per-user punch time index
+-- Migration: 004_punch_user_datetime_index.sql
+-- Created: 2026-10-18
+-- Description: The GPS/NFC check-in path reads a user's punches for today
+--   on every punch and status call. It now filters with a half-open
+--   range (event_datetime >= day AND event_datetime < day + 1) instead of
+--   event_datetime::date = day, which this index serves directly.
+--   Leading biostar_user_id makes idx_biostar_punch_user redundant.
+
+CREATE INDEX IF NOT EXISTS idx_biostar_punch_user_datetime
+    ON biostar_punch_logs(biostar_user_id, event_datetime);
+
+DROP INDEX IF EXISTS idx_biostar_punch_user;
+
+-- ============================================================
+-- ROLLBACK
+-- ============================================================
+-- CREATE INDEX IF NOT EXISTS idx_biostar_punch_user ON biostar_punch_logs(biostar_user_id);
+-- DROP INDEX IF EXISTS idx_biostar_punch_user_datetime;
@@ -1,4 +1,5 @@
 from .biostar_repository import BioStarRepository
 from .sync_repo import BioStarSyncRepository
+from .attendance_repository import AttendanceRepository
 
-__all__ = ['BioStarRepository', 'BioStarSyncRepository']
+__all__ = ['BioStarRepository', 'BioStarSyncRepository', 'AttendanceRepository']
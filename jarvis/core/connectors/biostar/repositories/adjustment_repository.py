@@ -1,6 +1,7 @@
 """Repository for biostar_daily_adjustments."""
 
 from core.base_repository import BaseRepository
+from .attendance_repository import adjustment_rollup_sql
 
 
 class AdjustmentRepository(BaseRepository):
@@ -21,7 +22,7 @@ class AdjustmentRepository(BaseRepository):
         return self.query_all('''
             WITH daily AS (
                 SELECT
-                    pl.biostar_user_id,
+                    a.biostar_user_id,
                     be.name,
                     be.email,
                     be.user_group_name,
@@ -31,18 +32,16 @@ class AdjustmentRepository(BaseRepository):
                     be.working_hours,
                     be.mapped_jarvis_user_id,
                     u.name AS mapped_jarvis_user_name,
-                    MIN(pl.event_datetime) AS first_punch,
-                    MAX(pl.event_datetime) AS last_punch,
-                    COUNT(*) AS total_punches,
-                    EXTRACT(EPOCH FROM (MAX(pl.event_datetime) - MIN(pl.event_datetime))) AS duration_seconds
-                FROM biostar_punch_logs pl
-                LEFT JOIN biostar_employees be ON be.biostar_user_id = pl.biostar_user_id
+                    a.first_punch,
+                    a.last_punch,
+                    a.total_punches,
+                    EXTRACT(EPOCH FROM (a.last_punch - a.first_punch)) AS duration_seconds
+                FROM biostar_daily_attendance a
+                JOIN biostar_employees be ON be.biostar_user_id = a.biostar_user_id
                 LEFT JOIN users u ON u.id = be.mapped_jarvis_user_id
-                WHERE pl.event_datetime::date = %s::date
+                WHERE a.day = %s::date
+                  AND a.adjustment_id IS NULL
                   AND be.status = 'active'
-                GROUP BY pl.biostar_user_id, be.name, be.email, be.user_group_name,
-                         be.schedule_start, be.schedule_end, be.lunch_break_minutes,
-                         be.working_hours, be.mapped_jarvis_user_id, u.name
             ),
             flagged AS (
                 SELECT d.*,
@@ -118,25 +117,29 @@ class AdjustmentRepository(BaseRepository):
         ''', (date_str,))
 
     def upsert_adjustment(self, data):
-        """Insert or update a daily adjustment."""
-        return self.execute('''
-            INSERT INTO biostar_daily_adjustments
-                (biostar_user_id, date, original_first_punch, original_last_punch,
-                 original_duration_seconds, adjusted_first_punch, adjusted_last_punch,
-                 adjusted_duration_seconds, schedule_start, schedule_end,
-                 lunch_break_minutes, working_hours,
-                 deviation_minutes_in, deviation_minutes_out,
-                 adjustment_type, adjusted_by, notes)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON CONFLICT (biostar_user_id, date) DO UPDATE SET
-                adjusted_first_punch = EXCLUDED.adjusted_first_punch,
-                adjusted_last_punch = EXCLUDED.adjusted_last_punch,
-                adjusted_duration_seconds = EXCLUDED.adjusted_duration_seconds,
-                adjustment_type = EXCLUDED.adjustment_type,
-                adjusted_by = EXCLUDED.adjusted_by,
-                notes = EXCLUDED.notes,
-                updated_at = NOW()
-            RETURNING id
+        """Insert or update a daily adjustment (mirrored onto biostar_daily_attendance)."""
+        return self.execute(f'''
+            WITH adj AS (
+                INSERT INTO biostar_daily_adjustments
+                    (biostar_user_id, date, original_first_punch, original_last_punch,
+                     original_duration_seconds, adjusted_first_punch, adjusted_last_punch,
+                     adjusted_duration_seconds, schedule_start, schedule_end,
+                     lunch_break_minutes, working_hours,
+                     deviation_minutes_in, deviation_minutes_out,
+                     adjustment_type, adjusted_by, notes)
+                VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                ON CONFLICT (biostar_user_id, date) DO UPDATE SET
+                    adjusted_first_punch = EXCLUDED.adjusted_first_punch,
+                    adjusted_last_punch = EXCLUDED.adjusted_last_punch,
+                    adjusted_duration_seconds = EXCLUDED.adjusted_duration_seconds,
+                    adjustment_type = EXCLUDED.adjustment_type,
+                    adjusted_by = EXCLUDED.adjusted_by,
+                    notes = EXCLUDED.notes,
+                    updated_at = NOW()
+                RETURNING id, biostar_user_id, date, adjusted_first_punch, adjusted_last_punch,
+                          adjusted_duration_seconds, adjustment_type
+            ), rollup AS ({adjustment_rollup_sql('adj')})
+            SELECT id FROM adj
         ''', (
             data['biostar_user_id'], data['date'],
             data['original_first_punch'], data['original_last_punch'],
@@ -153,9 +156,17 @@ class AdjustmentRepository(BaseRepository):
 
     def delete_adjustment(self, biostar_user_id, date_str):
         """Remove an adjustment (revert to original)."""
-        return self.execute('''
-            DELETE FROM biostar_daily_adjustments
-            WHERE biostar_user_id = %s AND date = %s::date
+        return self.execute(f'''
+            WITH removed AS (
+                DELETE FROM biostar_daily_adjustments
+                WHERE biostar_user_id = %s AND date = %s::date
+                RETURNING biostar_user_id, date, NULL::integer AS id,
+                          NULL::timestamp AS adjusted_first_punch,
+                          NULL::timestamp AS adjusted_last_punch,
+                          NULL::numeric AS adjusted_duration_seconds,
+                          NULL::varchar AS adjustment_type
+            ), rollup AS ({adjustment_rollup_sql('removed')})
+            SELECT 1 FROM removed
         ''', (biostar_user_id, date_str))
 
     def get_employee_history(self, biostar_user_id, start_date=None, end_date=None):
@@ -184,10 +195,11 @@ class AdjustmentRepository(BaseRepository):
     def get_unadjusted_dates(self):
         """Get all distinct past dates with punch logs that have unadjusted employees."""
         return self.query_all('''
-            SELECT DISTINCT pl.event_datetime::date AS punch_date
-            FROM biostar_punch_logs pl
-            LEFT JOIN biostar_employees be ON be.biostar_user_id = pl.biostar_user_id
-            WHERE pl.event_datetime::date < CURRENT_DATE
+            SELECT DISTINCT a.day AS punch_date
+            FROM biostar_daily_attendance a
+            JOIN biostar_employees be ON be.biostar_user_id = a.biostar_user_id
+            WHERE a.day < CURRENT_DATE
+              AND a.adjustment_id IS NULL
               AND be.status = 'active'
             ORDER BY punch_date DESC
         ''')
@@ -0,0 +1,102 @@
+"""Repository for biostar_daily_attendance — per-employee, per-day punch rollup.
+
+One row per (biostar_user_id, day) with first/last punch and punch count,
+plus the day's adjustment (if any) copied from biostar_daily_adjustments.
+Range summaries, employee history and off-schedule detection read it
+instead of grouping biostar_punch_logs on every call.
+
+Kept current in the same transaction as the writes it mirrors:
+- punch inserts (BioStar event sync, GPS check-in) fold the new punches in
+  with punch_rollup_sql()
+- adjustment upserts/deletes copy the adjustment onto the day's row
+
+rebuild() recomputes a date range from the raw tables
+(scripts/rebuild_biostar_attendance.py).
+"""
+
+from core.base_repository import BaseRepository
+
+# Adjustment columns mirrored onto the rollup row
+_ADJUSTMENT_COLUMNS = '''
+    adjustment_id, adjusted_first_punch, adjusted_last_punch,
+    adjusted_duration_seconds, adjustment_type'''
+
+
+def punch_rollup_sql(source):
+    """INSERT … ON CONFLICT folding new punches from `source` into the rollup.
+
+    `source` is a relation with biostar_user_id and event_datetime holding only
+    the newly inserted punches — e.g. a data-modifying CTE's RETURNING set, or
+    ``biostar_punch_logs WHERE id = ANY(%s)`` after the insert.
+    """
+    return f'''
+        INSERT INTO biostar_daily_attendance
+            (biostar_user_id, day, first_punch, last_punch, total_punches,
+             {_ADJUSTMENT_COLUMNS})
+        SELECT p.biostar_user_id, p.day, p.first_punch, p.last_punch, p.punches,
+               adj.id, adj.adjusted_first_punch, adj.adjusted_last_punch,
+               adj.adjusted_duration_seconds, adj.adjustment_type
+        FROM (
+            SELECT biostar_user_id, event_datetime::date AS day,
+                   MIN(event_datetime) AS first_punch, MAX(event_datetime) AS last_punch,
+                   COUNT(*) AS punches
+            FROM {source}
+            GROUP BY biostar_user_id, event_datetime::date
+        ) p
+        LEFT JOIN biostar_daily_adjustments adj
+            ON adj.biostar_user_id = p.biostar_user_id AND adj.date = p.day
+        ON CONFLICT (biostar_user_id, day) DO UPDATE SET
+            first_punch = LEAST(biostar_daily_attendance.first_punch, EXCLUDED.first_punch),
+            last_punch = GREATEST(biostar_daily_attendance.last_punch, EXCLUDED.last_punch),
+            total_punches = biostar_daily_attendance.total_punches + EXCLUDED.total_punches,
+            updated_at = NOW()
+    '''
+
+
+def adjustment_rollup_sql(source):
+    """UPDATE copying adjustments from `source` onto their rollup rows.
+
+    `source` yields biostar_user_id and date plus the adjusted columns
+    (id, adjusted_first_punch, adjusted_last_punch, adjusted_duration_seconds,
+    adjustment_type) — NULLs clear a reverted adjustment.
+    """
+    return f'''
+        UPDATE biostar_daily_attendance a SET
+            adjustment_id = s.id,
+            adjusted_first_punch = s.adjusted_first_punch,
+            adjusted_last_punch = s.adjusted_last_punch,
+            adjusted_duration_seconds = s.adjusted_duration_seconds,
+            adjustment_type = s.adjustment_type,
+            updated_at = NOW()
+        FROM {source} s
+        WHERE a.biostar_user_id = s.biostar_user_id AND a.day = s.date
+    '''
+
+
+class AttendanceRepository(BaseRepository):
+    """Maintenance of biostar_daily_attendance."""
+
+    def rebuild(self, start_date=None, end_date=None):
+        """Recompute the rollup from biostar_punch_logs (optionally for a date range).
+
+        Returns the number of employee-days written.
+        """
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append('day >= %s::date')
+            params.append(start_date)
+        if end_date:
+            conditions.append('day <= %s::date')
+            params.append(end_date)
+        day_where = f"WHERE {' AND '.join(conditions)}" if conditions else ''
+        punch_where = day_where.replace('day ', 'event_datetime::date ')
+
+        def _work(cursor):
+            # Blocks concurrent punch/adjustment writers from folding into
+            # rows while they are being replaced
+            cursor.execute('LOCK TABLE biostar_daily_attendance IN EXCLUSIVE MODE')
+            cursor.execute(f'DELETE FROM biostar_daily_attendance {day_where}', params)
+            cursor.execute(punch_rollup_sql(f'biostar_punch_logs {punch_where}'), params)
+            return cursor.rowcount
+        return self.execute_many(_work)
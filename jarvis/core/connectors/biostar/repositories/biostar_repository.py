@@ -2,6 +2,13 @@
 
 import json
 from core.base_repository import BaseRepository
+from .attendance_repository import punch_rollup_sql
+
+
+def _clear_checkin_mappings():
+    """Mapping changes must reach the check-in path's cached lookups."""
+    from core.checkin.repository import clear_biostar_mapping_cache
+    clear_biostar_mapping_cache()
 
 
 class BioStarRepository(BaseRepository):
@@ -74,12 +81,14 @@ class BioStarRepository(BaseRepository):
 
     def update_mapping(self, biostar_user_id, jarvis_user_id, method='manual', confidence=100.0):
         """Map a BioStar employee to a JARVIS user."""
-        return self.execute('''
+        updated = self.execute('''
             UPDATE biostar_employees
             SET mapped_jarvis_user_id = %s, mapping_method = %s,
                 mapping_confidence = %s, updated_at = NOW()
             WHERE biostar_user_id = %s
         ''', (jarvis_user_id, method, confidence, biostar_user_id))
+        _clear_checkin_mappings()
+        return updated
 
     def update_schedule(self, biostar_user_id, lunch_break_minutes, working_hours,
                         schedule_start=None, schedule_end=None):
@@ -158,16 +167,19 @@ class BioStarRepository(BaseRepository):
             f"UPDATE biostar_employees SET status = 'inactive', updated_at = NOW() WHERE biostar_user_id IN ({placeholders})",
             biostar_user_ids
         )
+        _clear_checkin_mappings()
         return len(biostar_user_ids)
 
     def remove_mapping(self, biostar_user_id):
         """Remove JARVIS user mapping."""
-        return self.execute('''
+        updated = self.execute('''
             UPDATE biostar_employees
             SET mapped_jarvis_user_id = NULL, mapping_method = NULL,
                 mapping_confidence = NULL, updated_at = NOW()
             WHERE biostar_user_id = %s
         ''', (biostar_user_id,))
+        _clear_checkin_mappings()
+        return updated
 
     def get_unmapped_employees(self):
         """Get employees without JARVIS user mapping."""
@@ -191,9 +203,13 @@ class BioStarRepository(BaseRepository):
     # ── Punch Logs ──
 
     def insert_punch_logs(self, logs):
-        """Bulk insert punch logs with ON CONFLICT DO NOTHING for dedup."""
+        """Bulk insert punch logs with ON CONFLICT DO NOTHING for dedup.
+
+        Newly inserted punches are folded into biostar_daily_attendance in
+        the same transaction.
+        """
         def _work(cursor):
-            inserted = 0
+            inserted_ids = []
             skipped = 0
             for log in logs:
                 cursor.execute('''
@@ -203,6 +219,7 @@ class BioStarRepository(BaseRepository):
                          door_id, door_name, auth_type, raw_data)
                     VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                     ON CONFLICT (biostar_event_id, (event_datetime::date)) DO NOTHING
+                    RETURNING id
                 ''', (
                     log['biostar_event_id'], log['biostar_user_id'],
                     log['event_datetime'], log['event_type'],
@@ -211,11 +228,15 @@ class BioStarRepository(BaseRepository):
                     log.get('door_name'), log.get('auth_type'),
                     json.dumps(log.get('raw_data', {}))
                 ))
-                if cursor.rowcount > 0:
-                    inserted += 1
+                row = cursor.fetchone()
+                if row:
+                    inserted_ids.append(row['id'])
                 else:
                     skipped += 1
-            return {'inserted': inserted, 'skipped': skipped}
+            if inserted_ids:
+                cursor.execute(punch_rollup_sql('biostar_punch_logs WHERE id = ANY(%s)'),
+                               (inserted_ids,))
+            return {'inserted': len(inserted_ids), 'skipped': skipped}
         return self.execute_many(_work)
 
     def get_punch_logs(self, biostar_user_id=None, start_date=None,
@@ -280,45 +301,33 @@ class BioStarRepository(BaseRepository):
         if jarvis_user_ids:
             extra_where = ' AND be.mapped_jarvis_user_id = ANY(%s)'
             params.append(jarvis_user_ids)
-        # date_str used a second time for the adjustment JOIN
-        params.append(date_str)
         return self.query_all(f'''
-            WITH punches AS (
-                SELECT
-                    pl.biostar_user_id,
-                    be.name,
-                    be.email,
-                    be.user_group_name,
-                    be.mapped_jarvis_user_id,
-                    u.name AS mapped_jarvis_user_name,
-                    u.company AS jarvis_company,
-                    u.department AS jarvis_department,
-                    be.lunch_break_minutes,
-                    be.working_hours,
-                    be.schedule_start,
-                    be.schedule_end,
-                    MIN(pl.event_datetime) AS first_punch,
-                    MAX(pl.event_datetime) AS last_punch,
-                    COUNT(*) AS total_punches,
-                    EXTRACT(EPOCH FROM (MAX(pl.event_datetime) - MIN(pl.event_datetime))) AS duration_seconds
-                FROM biostar_punch_logs pl
-                LEFT JOIN biostar_employees be ON be.biostar_user_id = pl.biostar_user_id
-                LEFT JOIN users u ON u.id = be.mapped_jarvis_user_id
-                WHERE pl.event_datetime::date = %s::date
-                  AND (be.is_blacklisted IS NULL OR be.is_blacklisted = FALSE){extra_where}
-                GROUP BY pl.biostar_user_id, be.name, be.email, be.user_group_name,
-                         be.mapped_jarvis_user_id, u.name, u.company, u.department,
-                         be.lunch_break_minutes, be.working_hours,
-                         be.schedule_start, be.schedule_end
-            )
-            SELECT p.*,
-                   adj.adjusted_first_punch,
-                   adj.adjusted_last_punch,
-                   adj.adjustment_type
-            FROM punches p
-            LEFT JOIN biostar_daily_adjustments adj
-                ON adj.biostar_user_id = p.biostar_user_id AND adj.date = %s::date
-            ORDER BY p.jarvis_company NULLS LAST, p.name
+            SELECT
+                a.biostar_user_id,
+                be.name,
+                be.email,
+                be.user_group_name,
+                be.mapped_jarvis_user_id,
+                u.name AS mapped_jarvis_user_name,
+                u.company AS jarvis_company,
+                u.department AS jarvis_department,
+                be.lunch_break_minutes,
+                be.working_hours,
+                be.schedule_start,
+                be.schedule_end,
+                a.first_punch,
+                a.last_punch,
+                a.total_punches,
+                EXTRACT(EPOCH FROM (a.last_punch - a.first_punch)) AS duration_seconds,
+                a.adjusted_first_punch,
+                a.adjusted_last_punch,
+                a.adjustment_type
+            FROM biostar_daily_attendance a
+            LEFT JOIN biostar_employees be ON be.biostar_user_id = a.biostar_user_id
+            LEFT JOIN users u ON u.id = be.mapped_jarvis_user_id
+            WHERE a.day = %s::date
+              AND (be.is_blacklisted IS NULL OR be.is_blacklisted = FALSE){extra_where}
+            ORDER BY u.company NULLS LAST, be.name
         ''', params)
 
     def get_range_summary(self, start_date, end_date, jarvis_user_ids=None):
@@ -330,18 +339,10 @@ class BioStarRepository(BaseRepository):
             params.append(jarvis_user_ids)
         return self.query_all(f'''
             WITH daily AS (
-                SELECT
-                    pl.biostar_user_id,
-                    pl.event_datetime::date AS day,
-                    MIN(pl.event_datetime) AS first_punch,
-                    MAX(pl.event_datetime) AS last_punch,
-                    COUNT(*) AS punches,
-                    EXTRACT(EPOCH FROM (MAX(pl.event_datetime) - MIN(pl.event_datetime))) AS duration_seconds
-                FROM biostar_punch_logs pl
-                LEFT JOIN biostar_employees be2 ON be2.biostar_user_id = pl.biostar_user_id
-                WHERE pl.event_datetime::date BETWEEN %s::date AND %s::date
-                  AND (be2.is_blacklisted IS NULL OR be2.is_blacklisted = FALSE)
-                GROUP BY pl.biostar_user_id, pl.event_datetime::date
+                SELECT a.*,
+                       EXTRACT(EPOCH FROM (a.last_punch - a.first_punch)) AS duration_seconds
+                FROM biostar_daily_attendance a
+                WHERE a.day BETWEEN %s::date AND %s::date
             )
             SELECT
                 d.biostar_user_id,
@@ -359,19 +360,17 @@ class BioStarRepository(BaseRepository):
                 COUNT(d.day) AS days_present,
                 SUM(d.duration_seconds) AS total_duration_seconds,
                 AVG(d.duration_seconds) AS avg_duration_seconds,
-                SUM(d.punches) AS total_punches,
+                SUM(d.total_punches) AS total_punches,
                 MIN(d.first_punch) AS earliest_punch,
                 MAX(d.last_punch) AS latest_punch,
                 AVG(EXTRACT(EPOCH FROM d.first_punch::time)) AS avg_check_in_epoch,
-                AVG(CASE WHEN d.punches > 1 THEN EXTRACT(EPOCH FROM d.last_punch::time) END) AS avg_check_out_epoch,
-                SUM(COALESCE(adj.adjusted_duration_seconds, d.duration_seconds)) AS adjusted_total_duration_seconds,
-                COUNT(adj.id) AS adjustment_count
+                AVG(CASE WHEN d.total_punches > 1 THEN EXTRACT(EPOCH FROM d.last_punch::time) END) AS avg_check_out_epoch,
+                SUM(COALESCE(d.adjusted_duration_seconds, d.duration_seconds)) AS adjusted_total_duration_seconds,
+                COUNT(d.adjustment_id) AS adjustment_count
             FROM daily d
             LEFT JOIN biostar_employees be ON be.biostar_user_id = d.biostar_user_id
             LEFT JOIN users u ON u.id = be.mapped_jarvis_user_id
-            LEFT JOIN biostar_daily_adjustments adj
-                ON adj.biostar_user_id = d.biostar_user_id AND adj.date = d.day
-            WHERE 1=1{extra_where}
+            WHERE (be.is_blacklisted IS NULL OR be.is_blacklisted = FALSE){extra_where}
             GROUP BY d.biostar_user_id, be.name, be.email, be.user_group_name,
                      be.mapped_jarvis_user_id, u.name, u.company, u.department,
                      be.lunch_break_minutes, be.working_hours,
@@ -395,33 +394,25 @@ class BioStarRepository(BaseRepository):
         Also returns adjusted punch times from biostar_daily_adjustments if they exist.
         """
         return self.query_all('''
-            WITH daily AS (
-                SELECT
-                    pl.event_datetime::date AS date,
-                    MIN(pl.event_datetime) AS first_punch,
-                    MAX(pl.event_datetime) AS last_punch,
-                    COUNT(*) AS total_punches,
-                    EXTRACT(EPOCH FROM (MAX(pl.event_datetime) - MIN(pl.event_datetime))) AS duration_seconds,
-                    be.lunch_break_minutes,
-                    be.working_hours,
-                    be.schedule_start,
-                    be.schedule_end
-                FROM biostar_punch_logs pl
-                LEFT JOIN biostar_employees be ON be.biostar_user_id = pl.biostar_user_id
-                WHERE pl.biostar_user_id = %s
-                  AND pl.event_datetime::date BETWEEN %s::date AND %s::date
-                GROUP BY pl.event_datetime::date, be.lunch_break_minutes, be.working_hours,
-                         be.schedule_start, be.schedule_end
-            )
-            SELECT d.*,
-                   adj.adjusted_first_punch,
-                   adj.adjusted_last_punch,
-                   adj.adjustment_type
-            FROM daily d
-            LEFT JOIN biostar_daily_adjustments adj
-                ON adj.biostar_user_id = %s AND adj.date = d.date
-            ORDER BY d.date DESC
-        ''', (biostar_user_id, start_date, end_date, biostar_user_id))
+            SELECT
+                a.day AS date,
+                a.first_punch,
+                a.last_punch,
+                a.total_punches,
+                EXTRACT(EPOCH FROM (a.last_punch - a.first_punch)) AS duration_seconds,
+                be.lunch_break_minutes,
+                be.working_hours,
+                be.schedule_start,
+                be.schedule_end,
+                a.adjusted_first_punch,
+                a.adjusted_last_punch,
+                a.adjustment_type
+            FROM biostar_daily_attendance a
+            LEFT JOIN biostar_employees be ON be.biostar_user_id = a.biostar_user_id
+            WHERE a.biostar_user_id = %s
+              AND a.day BETWEEN %s::date AND %s::date
+            ORDER BY a.day DESC
+        ''', (biostar_user_id, start_date, end_date))
 
     def get_employee_with_mapping(self, biostar_user_id):
         """Get employee details with JARVIS mapping info."""
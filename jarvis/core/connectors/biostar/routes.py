@@ -658,14 +658,15 @@ def update_cron_jobs():
     try:
         from tasks.cleanup import scheduler
         if scheduler.running:
-            from tasks.cleanup import sync_biostar_events, sync_biostar_users, auto_adjust_biostar_schedules
-            job_funcs = {
-                'biostar_sync_events': sync_biostar_events,
-                'biostar_sync_users': sync_biostar_users,
-                'biostar_auto_adjust': auto_adjust_biostar_schedules,
+            from tasks.cleanup import _enqueue_scheduled
+            # Scheduler triggers only enqueue; the job worker runs the task
+            job_tasks = {
+                'biostar_sync_events': 'sync_biostar_events',
+                'biostar_sync_users': 'sync_biostar_users',
+                'biostar_auto_adjust': 'auto_adjust_biostar_schedules',
             }
             for job_id, settings in cron_settings.items():
-                if job_id not in job_funcs:
+                if job_id not in job_tasks:
                     continue
                 try:
                     scheduler.remove_job(job_id)
@@ -674,8 +675,9 @@ def update_cron_jobs():
                 if settings.get('enabled', True):
                     if settings.get('schedule_type') == 'interval':
                         scheduler.add_job(
-                            job_funcs[job_id],
+                            _enqueue_scheduled,
                             'interval',
+                            args=[job_tasks[job_id]],
                             minutes=settings.get('interval_minutes', 60),
                             id=job_id,
                             replace_existing=True,
@@ -684,8 +686,9 @@ def update_cron_jobs():
                         )
                     else:
                         scheduler.add_job(
-                            job_funcs[job_id],
+                            _enqueue_scheduled,
                             'cron',
+                            args=[job_tasks[job_id]],
                             hour=settings['hour'],
                             minute=settings['minute'],
                             id=job_id,
@@ -363,6 +363,9 @@ class BioStarSyncService:
             )
 
             client.close()
+            if insert_result['inserted']:
+                from core.events.publisher import publish
+                publish('biostar', data={'inserted': insert_result['inserted']})
             return {
                 'success': True,
                 'data': {
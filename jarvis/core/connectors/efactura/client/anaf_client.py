@@ -17,6 +17,7 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from core.utils.logging_config import get_logger
+from core.metrics import external_call
 from .exceptions import (
     ANAFError,
     AuthenticationError,
@@ -185,7 +186,12 @@ class ANAFClient:
                 retry_after=3600,  # 1 hour
             )
 
-    def _make_request(
+    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any] | bytes:
+        """_send_request, timed as an external call (jarvis_external_call_*)."""
+        with external_call('anaf', endpoint):
+            return self._send_request(method, endpoint, **kwargs)
+
+    def _send_request(
         self,
         method: str,
         endpoint: str,
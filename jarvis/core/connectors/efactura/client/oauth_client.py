@@ -17,6 +17,7 @@ from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
 from core.utils.logging_config import get_logger
+from core.metrics import external_call
 from .exceptions import (
     ANAFError,
     AuthenticationError,
@@ -286,7 +287,12 @@ class ANAFOAuthClient:
                 retry_after=60,  # 1 minute
             )
 
-    def _make_request(
+    def _make_request(self, method: str, endpoint: str, **kwargs) -> Dict[str, Any] | bytes:
+        """_send_request, timed as an external call (jarvis_external_call_*)."""
+        with external_call('anaf', endpoint):
+            return self._send_request(method, endpoint, **kwargs)
+
+    def _send_request(
         self,
         method: str,
         endpoint: str,
@@ -621,15 +627,18 @@ class ANAFOAuthClient:
         session = self._get_session()
         url = f"{self.base_url}{endpoint}"
 
-        response = session.post(
-            url,
-            data=xml_content.encode('utf-8'),
-            headers={
-                **session.headers,
-                'Content-Type': 'text/plain',
-            },
-            timeout=self.config.DOWNLOAD_TIMEOUT,
-        )
+        with external_call('anaf', endpoint) as call:
+            response = session.post(
+                url,
+                data=xml_content.encode('utf-8'),
+                headers={
+                    **session.headers,
+                    'Content-Type': 'text/plain',
+                },
+                timeout=self.config.DOWNLOAD_TIMEOUT,
+            )
+            if response.status_code >= 400:
+                call.error = f'HTTP {response.status_code}'
 
         if response.status_code >= 400:
             raise APIError(
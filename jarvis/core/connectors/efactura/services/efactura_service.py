@@ -14,12 +14,14 @@ from typing import Optional, List, Dict, Any, Tuple
 from datetime import date
 
 from core.utils.logging_config import get_logger
+from core.metrics import external_call
 from core.database import get_db, get_cursor, release_db
 from core.organization.repositories import CompanyRepository as _CompanyRepo
 _company_repo = _CompanyRepo()
 match_company_by_vat = _company_repo.match_by_vat
 get_companies_with_vat = _company_repo.get_all_with_vat_and_brands
 from core.services.notification_service import notify_invoice_allocations, is_smtp_configured
+from core.services.currency_converter import convert_many
 
 from ..config import InvoiceDirection, ArtifactType
 from ..repositories import (
@@ -168,15 +170,18 @@ class EFacturaService:
         clean_cif = cif.replace('RO', '').replace(' ', '').strip()
 
         try:
-            response = requests.post(
-                'https://webservicesp.anaf.ro/api/PlatitorTvaRest/v9/tva',
-                json=[{
-                    'cui': int(clean_cif),
-                    'data': date.today().strftime('%Y-%m-%d')
-                }],
-                headers={'Content-Type': 'application/json'},
-                timeout=10,
-            )
+            with external_call('anaf', '/PlatitorTvaRest/v9/tva') as call:
+                response = requests.post(
+                    'https://webservicesp.anaf.ro/api/PlatitorTvaRest/v9/tva',
+                    json=[{
+                        'cui': int(clean_cif),
+                        'data': date.today().strftime('%Y-%m-%d')
+                    }],
+                    headers={'Content-Type': 'application/json'},
+                    timeout=10,
+                )
+                if response.status_code != 200:
+                    call.error = f'HTTP {response.status_code}'
 
             if response.status_code != 200:
                 return ServiceResult(
@@ -249,12 +254,15 @@ class EFacturaService:
             return ServiceResult(success=True, data={})
 
         try:
-            response = requests.post(
-                'https://webservicesp.anaf.ro/api/PlatitorTvaRest/v9/tva',
-                json=payload,
-                headers={'Content-Type': 'application/json'},
-                timeout=15,
-            )
+            with external_call('anaf', '/PlatitorTvaRest/v9/tva') as call:
+                response = requests.post(
+                    'https://webservicesp.anaf.ro/api/PlatitorTvaRest/v9/tva',
+                    json=payload,
+                    headers={'Content-Type': 'application/json'},
+                    timeout=15,
+                )
+                if response.status_code != 200:
+                    call.error = f'HTTP {response.status_code}'
 
             if response.status_code != 200:
                 return ServiceResult(
@@ -1901,10 +1909,21 @@ Only mark as duplicate if you're confident (>0.7) it's the same invoice."""
             params = []
             efactura_ids = []
 
-            for inv in invoices_to_create:
+            # RON value and EUR/RON rate for every invoice in one pass over
+            # the stored BNR rates
+            conversions = convert_many(
+                [(float(inv['total_amount']), inv['currency'] or 'RON', 'RON', inv['issue_date'])
+                 for inv in invoices_to_create]
+                + [(1, 'EUR', 'RON', inv['issue_date']) for inv in invoices_to_create]
+            )
+            n = len(invoices_to_create)
+
+            for idx, inv in enumerate(invoices_to_create):
                 invoice_value = inv['total_amount']  # Gross value (with VAT)
                 net_value = inv.get('total_without_vat')  # Net value (without VAT)
-                value_ron = invoice_value if inv['currency'] == 'RON' else None
+                value_ron = conversions[idx][0]
+                eur_rate = conversions[n + idx][1]
+                value_eur = round(value_ron / eur_rate, 2) if value_ron is not None and eur_rate else None
                 comment = f"e-Factura import | CIF: {inv['partner_cif']}"
 
                 # PDF link to e-Factura export endpoint
@@ -1918,7 +1937,7 @@ Only mark as duplicate if you're confident (>0.7) it's the same invoice."""
                     # VAT rate = (gross - net) / net * 100
                     vat_rate = round((invoice_value - net_value) / net_value * 100, 2)
 
-                values.append(f"(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())")
+                values.append(f"(%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, NOW())")
                 params.extend([
                     inv['partner_name'],      # supplier
                     inv['partner_name'],      # invoice_template
@@ -1928,6 +1947,8 @@ Only mark as duplicate if you're confident (>0.7) it's the same invoice."""
                     net_value,                # net_value
                     inv['currency'],          # currency
                     value_ron,                # value_ron
+                    value_eur,                # value_eur
+                    eur_rate,                 # exchange_rate (EUR/RON)
                     drive_link,               # drive_link (PDF export)
                     comment,                  # comment
                     'Nebugetata',             # status
@@ -1940,8 +1961,9 @@ Only mark as duplicate if you're confident (>0.7) it's the same invoice."""
             cursor.execute(f'''
                 INSERT INTO invoices (
                     supplier, invoice_template, invoice_number, invoice_date,
-                    invoice_value, net_value, currency, value_ron, drive_link,
-                    comment, status, subtract_vat, vat_rate, created_at
+                    invoice_value, net_value, currency, value_ron, value_eur,
+                    exchange_rate, drive_link, comment, status, subtract_vat,
+                    vat_rate, created_at
                 ) VALUES {', '.join(values)}
                 RETURNING id
             ''', params)
@@ -16,6 +16,7 @@ from dataclasses import dataclass
 import requests
 
 from core.utils.logging_config import get_logger
+from core.metrics import external_call
 from ..config import DEFAULT_CONFIG
 
 logger = get_logger('jarvis.core.connectors.efactura.oauth')
@@ -236,19 +237,22 @@ class ANAFOAuthService:
 
         # Exchange code for tokens
         try:
-            response = requests.post(
-                OAUTH_TOKEN_URL,
-                data={
-                    'grant_type': 'authorization_code',
-                    'code': code,
-                    'redirect_uri': self.redirect_uri,
-                    'client_id': self.client_id,
-                    'client_secret': self.client_secret,
-                    'code_verifier': code_verifier,
-                    'token_content_type': 'jwt',
-                },
-                timeout=30,
-            )
+            with external_call('anaf_oauth', 'token') as call:
+                response = requests.post(
+                    OAUTH_TOKEN_URL,
+                    data={
+                        'grant_type': 'authorization_code',
+                        'code': code,
+                        'redirect_uri': self.redirect_uri,
+                        'client_id': self.client_id,
+                        'client_secret': self.client_secret,
+                        'code_verifier': code_verifier,
+                        'token_content_type': 'jwt',
+                    },
+                    timeout=30,
+                )
+                if response.status_code != 200:
+                    call.error = f'HTTP {response.status_code}'
 
             if response.status_code != 200:
                 logger.error(
@@ -317,17 +321,20 @@ class ANAFOAuthService:
         )
 
         try:
-            response = requests.post(
-                OAUTH_TOKEN_URL,
-                data={
-                    'grant_type': 'refresh_token',
-                    'refresh_token': refresh_token,
-                    'client_id': self.client_id,
-                    'client_secret': self.client_secret,
-                    'token_content_type': 'jwt',
-                },
-                timeout=30,
-            )
+            with external_call('anaf_oauth', 'token_refresh') as call:
+                response = requests.post(
+                    OAUTH_TOKEN_URL,
+                    data={
+                        'grant_type': 'refresh_token',
+                        'refresh_token': refresh_token,
+                        'client_id': self.client_id,
+                        'client_secret': self.client_secret,
+                        'token_content_type': 'jwt',
+                    },
+                    timeout=30,
+                )
+                if response.status_code != 200:
+                    call.error = f'HTTP {response.status_code}'
 
             if response.status_code != 200:
                 logger.error(
@@ -393,14 +400,17 @@ class ANAFOAuthService:
         logger.info("Revoking OAuth token")
 
         try:
-            response = requests.post(
-                OAUTH_REVOKE_URL,
-                data={
-                    'token': token,
-                    'token_type_hint': token_type,
-                },
-                timeout=30,
-            )
+            with external_call('anaf_oauth', 'revoke') as call:
+                response = requests.post(
+                    OAUTH_REVOKE_URL,
+                    data={
+                        'token': token,
+                        'token_type_hint': token_type,
+                    },
+                    timeout=30,
+                )
+                if response.status_code != 200:
+                    call.error = f'HTTP {response.status_code}'
 
             # Revocation should return 200 even if token is already invalid
             success = response.status_code == 200
@@ -24,7 +24,7 @@ except ImportError:
     get_folder_link_from_file = None
     upload_attachment_to_folder = None
 
-# Image compression (TinyPNG)
+# Image compression (local, Pillow)
 try:
     from core.services.image_compressor import compress_if_image
     IMAGE_COMPRESSION_ENABLED = True
@@ -0,0 +1,17 @@
+"""Server-push event channel (SSE over PostgreSQL LISTEN/NOTIFY).
+
+Modules publish small change events ("notifications", "approvals",
+"checkin", "digest", "biostar"); connected browser tabs receive them on a
+single multiplexed text/event-stream and refetch only what changed.
+
+    from core.events import publish
+    publish('notifications', user_ids=[42])
+"""
+from flask import Blueprint
+
+events_bp = Blueprint('events', __name__)
+
+from .publisher import publish  # noqa: E402
+from . import routes  # noqa: E402, F401
+
+__all__ = ['events_bp', 'publish']
@@ -0,0 +1,33 @@
+"""Bridges in-process domain hooks to the server-push event channel.
+
+Registered at app startup via register_event_hooks().
+"""
+
+import logging
+
+from .publisher import publish
+
+logger = logging.getLogger('jarvis.core.events.handlers')
+
+# Any of these can add or remove items from some user's approval queue.
+_APPROVAL_EVENTS = (
+    'approval.submitted', 'approval.decided', 'approval.step_advanced',
+    'approval.approved', 'approval.rejected', 'approval.returned',
+    'approval.cancelled', 'approval.escalated', 'approval.expired',
+)
+
+
+def _on_approval_event(payload):
+    # Queue membership depends on roles, context approvers and delegations,
+    # so broadcast; only tabs with an approvals query mounted refetch.
+    publish('approvals', data={'request_id': payload.get('request_id')})
+
+
+def register_event_hooks():
+    """Register hook → event bridges. Call once at app startup."""
+    from core.approvals.hooks import on
+
+    for event_type in _APPROVAL_EVENTS:
+        on(event_type, _on_approval_event)
+
+    logger.info('Server-push event hooks registered')
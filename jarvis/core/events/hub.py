@@ -0,0 +1,179 @@
+"""Per-process event hub — one LISTEN connection fanned out to SSE subscribers.
+
+Each process that serves /api/events/stream keeps a single dedicated
+PostgreSQL connection (outside the request pool) listening on the
+``jarvis_events`` channel. Notifications are routed to in-memory
+subscriber queues keyed by user id. The listener starts lazily on the
+first subscription, so processes that never serve streams never open it.
+
+Under gevent (events_app.py) the listener thread, queues and select() are
+all cooperative, so thousands of idle streams cost a greenlet each rather
+than an OS thread.
+"""
+
+import json
+import logging
+import queue
+import select
+import threading
+
+from .publisher import CHANNEL
+
+logger = logging.getLogger('jarvis.core.events.hub')
+
+# Per-subscriber backlog; events are invalidation hints, so dropping on
+# overflow is safe — the client resyncs on its next 'ready'.
+SUBSCRIBER_QUEUE_SIZE = 100
+_POLL_SECONDS = 5
+_MAX_BACKOFF_SECONDS = 30
+
+
+class Subscription:
+    """One connected stream. Coalesces duplicate pending events."""
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self._queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def push(self, event, data):
+        key = (event, json.dumps(data, sort_keys=True))
+        with self._lock:
+            if key in self._pending:
+                return
+            try:
+                self._queue.put_nowait((event, data))
+            except queue.Full:
+                return
+            self._pending.add(key)
+
+    def get(self, timeout):
+        """Next (event, data) tuple, or None after `timeout` seconds."""
+        try:
+            event, data = self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        with self._lock:
+            self._pending.discard((event, json.dumps(data, sort_keys=True)))
+        return event, data
+
+
+class EventHub:
+
+    def __init__(self, dsn=None):
+        self._dsn = dsn
+        self._subs = {}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    # ── Subscribers ──
+
+    def subscribe(self, user_id):
+        sub = Subscription(user_id)
+        with self._lock:
+            self._subs.setdefault(user_id, set()).add(sub)
+        self._ensure_listener()
+        return sub
+
+    def unsubscribe(self, sub):
+        with self._lock:
+            subs = self._subs.get(sub.user_id)
+            if subs:
+                subs.discard(sub)
+                if not subs:
+                    del self._subs[sub.user_id]
+
+    def subscriber_count(self):
+        with self._lock:
+            return sum(len(s) for s in self._subs.values())
+
+    def dispatch(self, raw_payload):
+        """Route one NOTIFY payload to the matching subscribers."""
+        try:
+            msg = json.loads(raw_payload)
+        except (TypeError, ValueError):
+            logger.debug(f'Ignoring malformed event payload: {raw_payload!r}')
+            return 0
+        event = msg.get('event')
+        if not event:
+            return 0
+        data = msg.get('data') or {}
+        users = msg.get('users')
+        with self._lock:
+            if users is None:
+                targets = [s for subs in self._subs.values() for s in subs]
+            else:
+                targets = [s for uid in users for s in self._subs.get(uid, ())]
+        for sub in targets:
+            sub.push(event, data)
+        return len(targets)
+
+    # ── Listener ──
+
+    def _ensure_listener(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread and self._thread.is_alive():
+                return
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name='jarvis-events-listener', daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _connect(self):
+        import psycopg2
+        from database import DATABASE_URL
+        conn = psycopg2.connect(
+            self._dsn or DATABASE_URL,
+            keepalives=1, keepalives_idle=30, keepalives_interval=10,
+            keepalives_count=5, connect_timeout=5,
+        )
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(f'LISTEN {CHANNEL}')
+        return conn
+
+    def _run(self):
+        backoff = 1
+        while not self._stop.is_set():
+            conn = None
+            try:
+                conn = self._connect()
+                logger.info(f'Event listener connected (channel={CHANNEL})')
+                backoff = 1
+                while not self._stop.is_set():
+                    ready, _, _ = select.select([conn], [], [], _POLL_SECONDS)
+                    if not ready:
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        self.dispatch(conn.notifies.pop(0).payload)
+            except Exception as e:
+                logger.warning(f'Event listener error, reconnecting in {backoff}s: {e}')
+                self._stop.wait(backoff)
+                backoff = min(backoff * 2, _MAX_BACKOFF_SECONDS)
+            finally:
+                if conn is not None:
+                    try:
+                        conn.close()
+                    except Exception:
+                        pass
+
+
+_hub = None
+_hub_lock = threading.Lock()
+
+
+def get_hub():
+    """Process-wide EventHub singleton."""
+    global _hub
+    if _hub is None:
+        with _hub_lock:
+            if _hub is None:
+                _hub = EventHub()
+    return _hub
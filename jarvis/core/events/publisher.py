@@ -0,0 +1,62 @@
+"""Event publisher — fans change events out to every worker via pg_notify.
+
+Events are tiny (type + target users + optional ids); clients refetch the
+affected queries rather than receiving full payloads. Publishing never
+raises: a lost event only means a tab refreshes on its fallback poll.
+"""
+
+import json
+import logging
+
+from database import get_db, get_cursor, release_db
+
+logger = logging.getLogger('jarvis.core.events.publisher')
+
+CHANNEL = 'jarvis_events'
+
+# pg_notify payloads are capped at 8000 bytes — split large user lists
+_MAX_USERS_PER_NOTIFY = 500
+
+
+def _payloads(event, user_ids, data):
+    if user_ids is None:
+        yield json.dumps({'event': event, 'users': None, 'data': data or {}})
+        return
+    ids = sorted({int(uid) for uid in user_ids if uid})
+    for i in range(0, len(ids), _MAX_USERS_PER_NOTIFY):
+        chunk = ids[i:i + _MAX_USERS_PER_NOTIFY]
+        yield json.dumps({'event': event, 'users': chunk, 'data': data or {}})
+
+
+def publish(event, user_ids=None, data=None, cursor=None):
+    """Publish a change event.
+
+    Args:
+        event: Event type, e.g. 'notifications', 'approvals', 'checkin'
+        user_ids: Recipients; None broadcasts to every connected user
+        data: Optional small dict (ids only — never full records)
+        cursor: Publish inside the caller's transaction; NOTIFY is then
+                delivered only if that transaction commits
+
+    Returns:
+        True if the event was handed to PostgreSQL, False otherwise.
+    """
+    if user_ids is not None and not user_ids:
+        return False
+    try:
+        if cursor is not None:
+            for payload in _payloads(event, user_ids, data):
+                cursor.execute('SELECT pg_notify(%s, %s)', (CHANNEL, payload))
+            return True
+        conn = get_db()
+        try:
+            cur = get_cursor(conn)
+            for payload in _payloads(event, user_ids, data):
+                cur.execute('SELECT pg_notify(%s, %s)', (CHANNEL, payload))
+            conn.commit()
+            return True
+        finally:
+            release_db(conn)
+    except Exception as e:
+        logger.warning(f'Failed to publish event {event}: {e}')
+        return False
@@ -0,0 +1,89 @@
+"""Event stream route — multiplexed text/event-stream per browser tab."""
+
+import json
+import os
+import time
+
+from flask import Response, jsonify
+from flask_login import login_required, current_user
+
+from . import events_bp
+from .hub import get_hub
+
+_HEARTBEAT_SECONDS = int(os.environ.get('EVENTS_HEARTBEAT_SECONDS', '20'))
+# Streams are recycled periodically so proxies and load balancers never see
+# a connection that outlives their idle limits; EventSource reconnects.
+_MAX_STREAM_SECONDS = int(os.environ.get('EVENTS_MAX_STREAM_SECONDS', '3600'))
+_ALLOW_THREADED = os.environ.get('EVENTS_ALLOW_THREADED', '').lower() in ('1', 'true', 'yes')
+
+
+def _is_cooperative():
+    """True when running under gevent, where an idle stream costs a greenlet."""
+    try:
+        from gevent import monkey
+        return monkey.is_module_patched('socket')
+    except ImportError:
+        return False
+
+
+def _sse(event, data):
+    return f'event: {event}\ndata: {json.dumps(data)}\n\n'
+
+
+@events_bp.route('/api/events/stream', methods=['GET'])
+@login_required
+def api_event_stream():
+    """API: Server-Sent Events channel for change notifications.
+
+    Emits:
+    - event: ready         — sent on (re)connect; client resyncs everything
+    - event: notifications — in-app notification created / read
+    - event: approvals     — approval queue changed
+    - event: checkin       — user's punch status changed
+    - event: digest        — channel posts changed
+    - event: digest_read   — user's read markers changed (other tabs)
+    - event: biostar       — attendance data changed
+
+    Threaded (gthread) workers answer 204 so a stream never pins one of
+    their few request threads; the client then keeps its fallback poll.
+    Production routes this path to the gevent events process (events_app.py).
+    """
+    if not (_is_cooperative() or _ALLOW_THREADED):
+        return Response(status=204)
+
+    hub = get_hub()
+    sub = hub.subscribe(current_user.id)
+
+    def _generate():
+        try:
+            yield 'retry: 5000\n\n'
+            yield _sse('ready', {})
+            deadline = time.monotonic() + _MAX_STREAM_SECONDS
+            while time.monotonic() < deadline:
+                item = sub.get(timeout=_HEARTBEAT_SECONDS)
+                if item is None:
+                    yield ': ping\n\n'
+                    continue
+                yield _sse(*item)
+        finally:
+            hub.unsubscribe(sub)
+
+    return Response(
+        _generate(),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no',
+            'Connection': 'keep-alive',
+        },
+    )
+
+
+@events_bp.route('/api/events/health', methods=['GET'])
+def api_events_health():
+    """Liveness for the events process (subscriber count only)."""
+    return jsonify({
+        'status': 'ok',
+        'subscribers': get_hub().subscriber_count(),
+        'cooperative': _is_cooperative(),
+    })
@@ -0,0 +1,29 @@
+"""Durable background jobs — PostgreSQL-backed queue run by `worker.py`.
+
+Tasks are plain functions registered with @task; producers (the APScheduler
+in tasks/cleanup.py, routes) only enqueue. Worker processes claim jobs with
+FOR UPDATE SKIP LOCKED and apply priorities, retries with backoff and
+per-job timeouts.
+
+    from core.jobs import task, enqueue, set_progress
+
+    @task(timeout=1800)
+    def rebuild_things(batch_size=500):
+        ...
+        set_progress(done, total)
+
+    job_id, created = enqueue('rebuild_things', {'batch_size': 200})
+"""
+from flask import Blueprint
+
+jobs_bp = Blueprint('jobs', __name__)
+
+from .registry import task, get_task, registered_tasks, autodiscover  # noqa: E402
+from .repository import JobRepository  # noqa: E402
+from .queue import enqueue, scheduled_dedupe_key, set_progress, current_job_id  # noqa: E402
+from . import routes  # noqa: E402, F401
+
+__all__ = [
+    'jobs_bp', 'task', 'get_task', 'registered_tasks', 'autodiscover',
+    'JobRepository', 'enqueue', 'scheduled_dedupe_key', 'set_progress', 'current_job_id',
+]
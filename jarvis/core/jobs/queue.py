@@ -0,0 +1,67 @@
+"""Producer-side helpers: enqueue jobs, report progress from inside a task."""
+
+import contextvars
+import logging
+
+from .registry import get_task, autodiscover
+from .repository import JobRepository
+
+logger = logging.getLogger('jarvis.core.jobs.queue')
+
+_repo = JobRepository()
+
+# Id of the job the current worker thread is executing (None outside jobs)
+_current_job = contextvars.ContextVar('current_job_id', default=None)
+
+
+def enqueue(task_name, payload=None, priority=None, max_attempts=None, timeout=None,
+            delay_seconds=0, dedupe_key=None, created_by=None):
+    """Queue a registered task. Defaults come from its @task declaration.
+
+    Returns:
+        Tuple (job_id, created) — created is False when dedupe_key matched a
+        job that is already queued or running.
+
+    Raises:
+        ValueError: unknown task name
+    """
+    spec = get_task(task_name)
+    if spec is None:
+        autodiscover()
+        spec = get_task(task_name)
+    if spec is None:
+        raise ValueError(f'Unknown job task: {task_name}')
+    return _repo.enqueue(
+        spec.name, payload,
+        priority=spec.priority if priority is None else priority,
+        max_attempts=spec.max_attempts if max_attempts is None else max_attempts,
+        timeout_seconds=spec.timeout if timeout is None else timeout,
+        delay_seconds=delay_seconds,
+        dedupe_key=dedupe_key,
+        created_by=created_by,
+    )
+
+
+def scheduled_dedupe_key(task_name, payload=None):
+    """Dedupe key shared by scheduled triggers and manual runs of a task, so a
+    run is never queued while another with the same arguments is pending."""
+    if not payload:
+        return f'scheduled:{task_name}'
+    args = ','.join(f'{k}={v}' for k, v in sorted(payload.items()))
+    return f'scheduled:{task_name}:{args}'
+
+
+def current_job_id():
+    return _current_job.get()
+
+
+def set_progress(done, total=None, message=None):
+    """Report progress for the running job (no-op outside a worker). Never raises."""
+    job_id = _current_job.get()
+    if job_id is None:
+        return
+    progress = {'done': done, 'total': total, 'message': message}
+    try:
+        _repo.set_progress(job_id, progress)
+    except Exception as e:
+        logger.warning(f'Job {job_id}: progress update failed: {e}')
@@ -0,0 +1,75 @@
+"""Task registry — maps job `task` names to callables and their defaults.
+
+Usage:
+    from core.jobs import task
+
+    @task(priority=5, timeout=1800, max_attempts=2)
+    def reindex_rag_documents():
+        ...
+
+The decorator returns the function unchanged, so it can still be called
+directly. Workers only claim jobs whose task is registered in their process;
+TASK_MODULES lists the modules imported by autodiscover() to register them.
+"""
+
+import importlib
+import logging
+from dataclasses import dataclass
+from typing import Callable
+
+logger = logging.getLogger('jarvis.core.jobs.registry')
+
+# Modules that define @task functions (imported by workers and the status API)
+TASK_MODULES = (
+    'tasks.cleanup',
+    'accounting.bugetare.bulk_jobs',
+)
+
+DEFAULT_PRIORITY = 0          # higher runs first
+DEFAULT_MAX_ATTEMPTS = 3
+DEFAULT_TIMEOUT = 600         # seconds
+
+
+@dataclass(frozen=True)
+class TaskSpec:
+    name: str
+    func: Callable
+    priority: int = DEFAULT_PRIORITY
+    max_attempts: int = DEFAULT_MAX_ATTEMPTS
+    timeout: int = DEFAULT_TIMEOUT
+
+
+_registry: dict[str, TaskSpec] = {}
+_discovered = False
+
+
+def task(name: str = None, priority: int = DEFAULT_PRIORITY,
+         max_attempts: int = DEFAULT_MAX_ATTEMPTS, timeout: int = DEFAULT_TIMEOUT):
+    """Register a function as a job task (keyword arguments = job payload)."""
+    def decorator(func):
+        spec = TaskSpec(name or func.__name__, func, priority, max_attempts, timeout)
+        _registry[spec.name] = spec
+        return func
+    return decorator
+
+
+def get_task(name: str):
+    """Return the TaskSpec for a name, or None."""
+    return _registry.get(name)
+
+
+def registered_tasks() -> dict:
+    return dict(_registry)
+
+
+def autodiscover():
+    """Import TASK_MODULES so their @task decorators run (idempotent)."""
+    global _discovered
+    if _discovered:
+        return
+    for module in TASK_MODULES:
+        try:
+            importlib.import_module(module)
+        except Exception as e:
+            logger.error(f'Failed to import task module {module}: {e}')
+    _discovered = True
@@ -0,0 +1,187 @@
+"""Repository for the `jobs` table — durable background job queue.
+
+Workers claim jobs with SELECT … FOR UPDATE SKIP LOCKED, so any number of
+worker processes can poll concurrently without double-running a job or
+blocking each other. Failed jobs are re-queued with a backoff until
+max_attempts is reached; jobs whose worker died are recovered by
+reap_stale().
+"""
+
+import json
+import logging
+
+from core.base_repository import BaseRepository
+
+logger = logging.getLogger('jarvis.core.jobs.repository')
+
+# Columns returned to the status API (payload/result included, lock details not)
+_PUBLIC_COLUMNS = '''
+    id, task, payload, status, priority, attempts, max_attempts, timeout_seconds,
+    run_at, dedupe_key, progress, result, last_error, created_by,
+    created_at, started_at, finished_at, heartbeat_at
+'''
+
+
+class JobRepository(BaseRepository):
+
+    def enqueue(self, task, payload=None, priority=0, max_attempts=3, timeout_seconds=600,
+                delay_seconds=0, dedupe_key=None, created_by=None):
+        """Insert a queued job. Returns (job_id, created).
+
+        With a dedupe_key, a job that is already queued or running under the
+        same key is returned instead of adding a duplicate.
+        """
+        def _work(cursor):
+            cursor.execute('''
+                INSERT INTO jobs (task, payload, priority, max_attempts, timeout_seconds,
+                                  run_at, dedupe_key, created_by)
+                VALUES (%s, %s::jsonb, %s, %s, %s,
+                        NOW() + make_interval(secs => %s), %s, %s)
+                ON CONFLICT (dedupe_key) WHERE status IN ('queued', 'running') DO NOTHING
+                RETURNING id
+            ''', (task, json.dumps(payload or {}, default=str), priority, max_attempts,
+                  timeout_seconds, delay_seconds, dedupe_key, created_by))
+            row = cursor.fetchone()
+            if row:
+                return row['id'], True
+            cursor.execute('''
+                SELECT id FROM jobs
+                WHERE dedupe_key = %s AND status IN ('queued', 'running')
+            ''', (dedupe_key,))
+            row = cursor.fetchone()
+            return (row['id'] if row else None), False
+        return self.execute_many(_work)
+
+    def claim(self, worker_id, tasks):
+        """Atomically take the most urgent runnable job among `tasks`, or None."""
+        if not tasks:
+            return None
+        return self.execute('''
+            UPDATE jobs SET
+                status = 'running', attempts = attempts + 1,
+                locked_by = %s, locked_at = NOW(), heartbeat_at = NOW(),
+                started_at = COALESCE(started_at, NOW())
+            WHERE id = (
+                SELECT id FROM jobs
+                WHERE status = 'queued' AND run_at <= NOW() AND task = ANY(%s)
+                ORDER BY priority DESC, run_at, id
+                FOR UPDATE SKIP LOCKED
+                LIMIT 1
+            )
+            RETURNING id, task, payload, attempts, max_attempts, timeout_seconds
+        ''', (worker_id, list(tasks)), returning=True)
+
+    def complete(self, job_id, result=None):
+        return self.execute('''
+            UPDATE jobs SET status = 'succeeded', result = %s::jsonb, last_error = NULL,
+                   finished_at = NOW(), locked_by = NULL
+            WHERE id = %s AND status = 'running'
+        ''', (json.dumps(result, default=str) if result is not None else None, job_id))
+
+    def fail(self, job_id, error, retry_in_seconds):
+        """Record a failed attempt: re-queue after retry_in_seconds, or mark
+        failed once attempts are exhausted. Returns the new status."""
+        row = self.execute('''
+            UPDATE jobs SET
+                status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                run_at = CASE WHEN attempts < max_attempts
+                              THEN NOW() + make_interval(secs => %s) ELSE run_at END,
+                finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+                last_error = %s, locked_by = NULL
+            WHERE id = %s AND status = 'running'
+            RETURNING status
+        ''', (retry_in_seconds, (error or '')[:4000], job_id), returning=True)
+        return row['status'] if row else None
+
+    def set_progress(self, job_id, progress):
+        """Store progress (and refresh the heartbeat) for a running job."""
+        return self.execute('''
+            UPDATE jobs SET progress = %s::jsonb, heartbeat_at = NOW()
+            WHERE id = %s AND status = 'running'
+        ''', (json.dumps(progress, default=str), job_id))
+
+    def heartbeat(self, job_id):
+        """Refresh heartbeat_at for a running job (the worker calls this while it runs)."""
+        return self.execute('''
+            UPDATE jobs SET heartbeat_at = NOW()
+            WHERE id = %s AND status = 'running'
+        ''', (job_id,))
+
+    def reap_stale(self, grace_seconds=60):
+        """Recover running jobs whose worker died (no heartbeat past timeout + grace).
+
+        Returns the number of jobs re-queued or failed.
+        """
+        return self.execute('''
+            UPDATE jobs SET
+                status = CASE WHEN attempts < max_attempts THEN 'queued' ELSE 'failed' END,
+                run_at = NOW(),
+                finished_at = CASE WHEN attempts < max_attempts THEN NULL ELSE NOW() END,
+                last_error = 'Worker lost: no heartbeat within timeout', locked_by = NULL
+            WHERE status = 'running'
+            AND heartbeat_at < NOW() - make_interval(secs => timeout_seconds + %s)
+        ''', (grace_seconds,))
+
+    def cancel(self, job_id):
+        """Cancel a job that has not started yet. Returns True if cancelled."""
+        return self.execute('''
+            UPDATE jobs SET status = 'cancelled', finished_at = NOW()
+            WHERE id = %s AND status = 'queued'
+        ''', (job_id,)) > 0
+
+    def retry(self, job_id):
+        """Re-queue a failed or cancelled job with a fresh attempt budget.
+
+        Returns False (nothing changed) when the job is not failed/cancelled or
+        another job with its dedupe_key is already queued or running.
+        """
+        return self.execute('''
+            UPDATE jobs SET status = 'queued', attempts = 0, run_at = NOW(),
+                   finished_at = NULL, last_error = NULL
+            WHERE id = %s AND status IN ('failed', 'cancelled')
+            AND NOT EXISTS (
+                SELECT 1 FROM jobs j2
+                WHERE j2.dedupe_key = jobs.dedupe_key AND j2.status IN ('queued', 'running')
+            )
+        ''', (job_id,)) > 0
+
+    def purge_finished(self, succeeded_days=7, failed_days=30):
+        """Delete old finished jobs. Returns rows deleted."""
+        return self.execute('''
+            DELETE FROM jobs
+            WHERE (status IN ('succeeded', 'cancelled')
+                   AND finished_at < NOW() - make_interval(days => %s))
+               OR (status = 'failed' AND finished_at < NOW() - make_interval(days => %s))
+        ''', (succeeded_days, failed_days))
+
+    def get(self, job_id):
+        return self.query_one(f'SELECT {_PUBLIC_COLUMNS} FROM jobs WHERE id = %s', (job_id,))
+
+    def list(self, status=None, task=None, limit=50):
+        where, params = [], []
+        if status:
+            where.append('status = %s')
+            params.append(status)
+        if task:
+            where.append('task = %s')
+            params.append(task)
+        sql = f'SELECT {_PUBLIC_COLUMNS} FROM jobs'
+        if where:
+            sql += ' WHERE ' + ' AND '.join(where)
+        sql += ' ORDER BY id DESC LIMIT %s'
+        params.append(limit)
+        return self.query_all(sql, params)
+
+    def stats(self):
+        """Per-task counts by status plus queue lag."""
+        return self.query_all('''
+            SELECT task,
+                   COUNT(*) FILTER (WHERE status = 'queued') AS queued,
+                   COUNT(*) FILTER (WHERE status = 'running') AS running,
+                   COUNT(*) FILTER (WHERE status = 'succeeded') AS succeeded,
+                   COUNT(*) FILTER (WHERE status = 'failed') AS failed,
+                   EXTRACT(EPOCH FROM NOW() - MIN(run_at) FILTER (
+                       WHERE status = 'queued' AND run_at <= NOW()))::int AS oldest_ready_seconds,
+                   MAX(finished_at) AS last_finished_at
+            FROM jobs GROUP BY task ORDER BY task
+        ''')
@@ -0,0 +1,125 @@
+"""Job status / progress API."""
+
+import logging
+from functools import wraps
+
+import psycopg2
+from flask import jsonify, request
+from flask_login import login_required, current_user
+
+from . import jobs_bp
+from .queue import enqueue, scheduled_dedupe_key
+from .registry import autodiscover, registered_tasks
+from .repository import JobRepository
+from core.utils.api_helpers import handle_api_errors
+
+logger = logging.getLogger('jarvis.core.jobs.routes')
+
+_repo = JobRepository()
+
+_STATUSES = ('queued', 'running', 'succeeded', 'failed', 'cancelled')
+
+
+def admin_required(f):
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        if not current_user.can_access_settings:
+            return jsonify({'success': False, 'error': 'Admin access required'}), 403
+        return f(*args, **kwargs)
+    return decorated
+
+
+@jobs_bp.route('/api/jobs', methods=['GET'])
+@login_required
+@admin_required
+@handle_api_errors
+def api_list_jobs():
+    """List recent jobs, filterable by ?status= and ?task=."""
+    status = request.args.get('status')
+    if status and status not in _STATUSES:
+        return jsonify({'success': False, 'error': f'Invalid status: {status}'}), 400
+    limit = min(request.args.get('limit', 50, type=int), 200)
+    jobs = _repo.list(status=status, task=request.args.get('task'), limit=limit)
+    return jsonify({'success': True, 'jobs': jobs})
+
+
+@jobs_bp.route('/api/jobs/stats', methods=['GET'])
+@login_required
+@admin_required
+@handle_api_errors
+def api_job_stats():
+    """Per-task queue depth, outcomes and lag."""
+    return jsonify({'success': True, 'tasks': _repo.stats()})
+
+
+@jobs_bp.route('/api/jobs/<int:job_id>', methods=['GET'])
+@login_required
+@handle_api_errors
+def api_get_job(job_id):
+    """Job status and progress. Visible to admins and to the user who queued it."""
+    job = _repo.get(job_id)
+    if not job or (job.get('created_by') != current_user.id and not current_user.can_access_settings):
+        return jsonify({'success': False, 'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job})
+
+
+@jobs_bp.route('/api/jobs/<int:job_id>/cancel', methods=['POST'])
+@login_required
+@admin_required
+@handle_api_errors
+def api_cancel_job(job_id):
+    """Cancel a queued job (running jobs cannot be interrupted)."""
+    if not _repo.cancel(job_id):
+        return jsonify({'success': False, 'error': 'Only queued jobs can be cancelled'}), 409
+    return jsonify({'success': True})
+
+
+@jobs_bp.route('/api/jobs/<int:job_id>/retry', methods=['POST'])
+@login_required
+@admin_required
+@handle_api_errors
+def api_retry_job(job_id):
+    """Re-queue a failed or cancelled job."""
+    try:
+        retried = _repo.retry(job_id)
+    except psycopg2.IntegrityError:
+        # Lost a race with an enqueue under the same dedupe_key
+        retried = False
+    if not retried:
+        return jsonify({'success': False, 'error': 'Only failed or cancelled jobs can be retried, '
+                                                   'and not while the same job is queued or running'}), 409
+    return jsonify({'success': True})
+
+
+@jobs_bp.route('/api/jobs/tasks', methods=['GET'])
+@login_required
+@admin_required
+def api_list_tasks():
+    """Registered task names with their defaults."""
+    autodiscover()
+    tasks = [
+        {'name': s.name, 'priority': s.priority, 'max_attempts': s.max_attempts, 'timeout': s.timeout}
+        for s in sorted(registered_tasks().values(), key=lambda s: s.name)
+    ]
+    return jsonify({'success': True, 'tasks': tasks})
+
+
+@jobs_bp.route('/api/jobs/run', methods=['POST'])
+@login_required
+@admin_required
+@handle_api_errors
+def api_run_task():
+    """Queue a registered task now (e.g. re-run a scheduled job on demand)."""
+    data = request.get_json(silent=True) or {}
+    name = data.get('task')
+    if not name:
+        return jsonify({'success': False, 'error': 'task is required'}), 400
+    payload = data.get('payload') or {}
+    if not isinstance(payload, dict):
+        return jsonify({'success': False, 'error': 'payload must be an object'}), 400
+    try:
+        job_id, created = enqueue(name, payload, dedupe_key=scheduled_dedupe_key(name, payload),
+                                  created_by=current_user.id)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    return jsonify({'success': True, 'job_id': job_id, 'created': created}), 202 if created else 200
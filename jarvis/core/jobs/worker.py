@@ -0,0 +1,241 @@
+"""Job worker — claims jobs from the `jobs` table and runs them.
+
+run_workers() is the process supervisor behind `python worker.py`: it forks N
+worker processes, restarts any that exit (crash, or recycling after
+JOBS_MAX_PER_PROCESS jobs, mirroring gunicorn's --max-requests) and forwards
+SIGTERM for a graceful shutdown.
+
+Per-job timeouts are enforced with SIGALRM in worker processes. While a job
+runs, a side thread refreshes its heartbeat every HEARTBEAT_SECONDS, so only
+a job whose worker died goes stale; JobRepository.reap_stale(), which every
+worker runs periodically, re-queues those.
+"""
+
+import logging
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+import traceback
+
+from core.metrics import Histogram, JOB_BUCKETS
+from .queue import _current_job, _repo
+from .registry import autodiscover, get_task, registered_tasks
+
+logger = logging.getLogger('jarvis.core.jobs.worker')
+
+POLL_SECONDS = float(os.environ.get('JOBS_POLL_SECONDS', '2'))
+REAP_INTERVAL_SECONDS = 60
+HEARTBEAT_SECONDS = 30
+BACKOFF_BASE_SECONDS = 30
+BACKOFF_MAX_SECONDS = 3600
+MAX_JOBS_PER_PROCESS = int(os.environ.get('JOBS_MAX_PER_PROCESS', '500'))
+GRACEFUL_SECONDS = int(os.environ.get('JOBS_GRACEFUL_SECONDS', '30'))
+
+JOB_SECONDS = Histogram('jarvis_job_duration_seconds', 'Job run time by task and outcome',
+                        ['task', 'outcome'], buckets=JOB_BUCKETS)
+
+
+class JobTimeout(Exception):
+    """Raised inside a task when it exceeds its timeout_seconds."""
+
+
+def retry_delay(attempts):
+    """Exponential backoff after the given (1-based) failed attempt."""
+    return min(BACKOFF_BASE_SECONDS * 2 ** max(attempts - 1, 0), BACKOFF_MAX_SECONDS)
+
+
+class _time_limit:
+    """Raise JobTimeout after `seconds` (main thread only; no-op elsewhere)."""
+
+    def __init__(self, seconds):
+        self.seconds = seconds
+        self.armed = False
+
+    def _expire(self, signum, frame):
+        raise JobTimeout(f'Job exceeded {self.seconds}s timeout')
+
+    def __enter__(self):
+        if self.seconds and threading.current_thread() is threading.main_thread():
+            self._previous = signal.signal(signal.SIGALRM, self._expire)
+            signal.setitimer(signal.ITIMER_REAL, self.seconds)
+            self.armed = True
+        return self
+
+    def __exit__(self, *exc):
+        if self.armed:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, self._previous)
+        return False
+
+
+class _heartbeat:
+    """Refresh a running job's heartbeat_at from a side thread until exit.
+
+    Keeps long jobs that never report progress from being reaped while
+    their worker is alive (the embedded worker has no timeout at all).
+    """
+
+    def __init__(self, job_id, interval=HEARTBEAT_SECONDS):
+        self.job_id = job_id
+        self.interval = interval
+        self._done = threading.Event()
+
+    def _beat(self):
+        while not self._done.wait(self.interval):
+            try:
+                _repo.heartbeat(self.job_id)
+            except Exception as e:
+                logger.warning(f'Heartbeat for job {self.job_id} failed: {e}')
+
+    def __enter__(self):
+        threading.Thread(target=self._beat, name=f'jarvis-job-{self.job_id}-heartbeat',
+                         daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._done.set()
+        return False
+
+
+class Worker:
+    """Single-threaded job loop. One per worker process (or embedded thread)."""
+
+    def __init__(self, worker_id=None, poll_interval=POLL_SECONDS, max_jobs=None):
+        self.worker_id = worker_id or f'{socket.gethostname()}:{os.getpid()}'
+        self.poll_interval = poll_interval
+        self.max_jobs = max_jobs
+        self.jobs_run = 0
+        self._stop = threading.Event()
+        self._last_reap = 0.0
+
+    def stop(self):
+        self._stop.set()
+
+    def run_once(self):
+        """Claim and run one job. Returns the claimed job dict, or None if idle."""
+        job = _repo.claim(self.worker_id, list(registered_tasks()))
+        if not job:
+            return None
+
+        job_id = job['id']
+        spec = get_task(job['task'])
+        started = time.monotonic()
+        token = _current_job.set(job_id)
+        try:
+            with _heartbeat(job_id), _time_limit(job['timeout_seconds']):
+                result = spec.func(**(job.get('payload') or {}))
+        except Exception as e:
+            error = f'{type(e).__name__}: {e}'
+            status = _repo.fail(job_id, f'{error}\n{traceback.format_exc(limit=10)}',
+                                retry_delay(job['attempts']))
+            log = logger.error if status == 'failed' else logger.warning
+            log(f"Job {job_id} ({job['task']}) attempt {job['attempts']}/{job['max_attempts']} "
+                f"failed → {status}: {error}")
+            JOB_SECONDS.observe(time.monotonic() - started, task=job['task'],
+                                outcome='failed' if status == 'failed' else 'retry')
+        else:
+            _repo.complete(job_id, result if isinstance(result, (dict, list)) else None)
+            elapsed = time.monotonic() - started
+            JOB_SECONDS.observe(elapsed, task=job['task'], outcome='ok')
+            logger.info(f"Job {job_id} ({job['task']}) done in {elapsed:.1f}s")
+        finally:
+            _current_job.reset(token)
+            self.jobs_run += 1
+        return job
+
+    def run(self):
+        """Poll until stop() or max_jobs is reached."""
+        logger.info(f'Job worker {self.worker_id} started ({len(registered_tasks())} tasks)')
+        while not self._stop.is_set():
+            if self.max_jobs and self.jobs_run >= self.max_jobs:
+                logger.info(f'Job worker {self.worker_id} recycling after {self.jobs_run} jobs')
+                break
+            try:
+                self._maybe_reap()
+                job = self.run_once()
+            except Exception as e:
+                logger.error(f'Job worker {self.worker_id} loop error: {e}')
+                job = None
+            if job is None:
+                self._stop.wait(self.poll_interval)
+        logger.info(f'Job worker {self.worker_id} stopped')
+
+    def _maybe_reap(self):
+        now = time.monotonic()
+        if now - self._last_reap < REAP_INTERVAL_SECONDS:
+            return
+        self._last_reap = now
+        count = _repo.reap_stale()
+        if count:
+            logger.warning(f'Recovered {count} job(s) from lost workers')
+
+
+def start_embedded_worker():
+    """Run a Worker on a daemon thread inside this process.
+
+    Fallback for deployments without a `worker` process; timeouts are not
+    enforced here (no SIGALRM off the main thread), but the heartbeat keeps
+    a long job from being reaped and run a second time.
+    """
+    autodiscover()
+    worker = Worker(worker_id=f'{socket.gethostname()}:{os.getpid()}:embedded')
+    thread = threading.Thread(target=worker.run, name='jarvis-jobs-embedded', daemon=True)
+    thread.start()
+    return worker
+
+
+def _child_main(max_jobs):
+    worker = Worker(max_jobs=max_jobs)
+    signal.signal(signal.SIGTERM, lambda *_: worker.stop())
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # supervisor handles Ctrl-C
+    autodiscover()
+    worker.run()
+
+
+def run_workers(processes=1, max_jobs=MAX_JOBS_PER_PROCESS):
+    """Supervise `processes` worker processes until SIGTERM/SIGINT."""
+    ctx = multiprocessing.get_context('fork')
+    children = {}
+    stopping = threading.Event()
+
+    def _spawn(slot):
+        proc = ctx.Process(target=_child_main, args=(max_jobs,), name=f'jarvis-worker-{slot}')
+        proc.start()
+        children[slot] = (proc, time.monotonic())
+
+    def _shutdown(signum, frame):
+        stopping.set()
+
+    signal.signal(signal.SIGTERM, _shutdown)
+    signal.signal(signal.SIGINT, _shutdown)
+
+    for slot in range(processes):
+        _spawn(slot)
+    logger.info(f'Job supervisor started {processes} worker process(es) (pid={os.getpid()})')
+
+    while not stopping.is_set():
+        for slot, (proc, started) in list(children.items()):
+            if proc.is_alive():
+                continue
+            if time.monotonic() - started < 5:
+                # Crash loop guard — don't respawn faster than every 5s
+                continue
+            if proc.exitcode:
+                logger.warning(f'Worker {proc.name} exited with {proc.exitcode}, restarting')
+            _spawn(slot)
+        stopping.wait(1)
+
+    logger.info('Job supervisor stopping workers')
+    for proc, _ in children.values():
+        if proc.is_alive():
+            proc.terminate()
+    deadline = time.monotonic() + GRACEFUL_SECONDS
+    for proc, _ in children.values():
+        proc.join(max(0.0, deadline - time.monotonic()))
+        if proc.is_alive():
+            logger.warning(f'Worker {proc.name} did not stop in {GRACEFUL_SECONDS}s, killing')
+            proc.kill()
+            proc.join()
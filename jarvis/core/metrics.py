@@ -0,0 +1,476 @@
+"""In-process metrics with cross-process aggregation and Prometheus export.
+
+Counters, gauges and histograms live in a per-process registry; updating one
+is a dict operation under a lock. Every METRICS_FLUSH_SECONDS a daemon thread
+writes the process's snapshot to METRICS_DIR/<pid>.json (atomic rename), and
+GET /metrics merges the snapshots of every process sharing that directory —
+all Gunicorn workers, and the job worker when it runs on the same host — into
+one Prometheus text exposition:
+
+- counters and histograms are summed. Snapshots of processes that have
+  exited (Gunicorn recycles workers after --max-requests) are folded into
+  _archive.json so totals never go backwards;
+- gauges are summed or max-ed across live processes (per gauge) and dropped
+  when their process exits.
+
+Usage:
+    from core.metrics import Counter, Histogram, external_call
+
+    EXPORTS = Counter('jarvis_exports_total', 'Exports generated', ['format'])
+    EXPORTS.inc(format='xlsx')
+
+    with external_call('anaf', '/descarcare'):
+        response = session.get(...)
+
+METRICS_ENABLED=0 turns recording into no-ops (the endpoint then serves the
+metric families with no samples).
+"""
+
+import atexit
+import fcntl
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger('jarvis.core.metrics')
+
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+METRICS_DIR = os.environ.get('METRICS_DIR') or os.path.join(tempfile.gettempdir(), 'jarvis-metrics')
+METRICS_FLUSH_SECONDS = float(os.environ.get('METRICS_FLUSH_SECONDS', '15'))
+
+# Seconds; tuned for web requests, queries and outbound HTTP calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+JOB_BUCKETS = (0.1, 0.5, 1, 5, 15, 30, 60, 120, 300, 600, 1800, 3600)
+
+_ARCHIVE = '_archive.json'
+_LOCK = '.lock'
+
+_registry = {}
+_registry_lock = threading.Lock()
+_flusher_pid = None
+_snapshot_pid = None
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+        with _registry_lock:
+            _registry[name] = self
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f'{self.name} expects labels {self.labelnames}, got {tuple(labels)}')
+        return tuple(str(labels[n]) for n in self.labelnames)
+
+    def _reset(self):
+        with self._lock:
+            self._values = {}
+
+    def _samples(self):
+        with self._lock:
+            return [[list(k), v] for k, v in self._values.items()]
+
+    def _describe(self):
+        return {'kind': self.kind, 'help': self.documentation, 'labels': list(self.labelnames)}
+
+
+class Counter(_Metric):
+    """Monotonic total. inc(amount=1, **labels)."""
+    kind = 'counter'
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        _ensure_flusher()
+
+
+class Gauge(_Metric):
+    """Current value. Across processes the values are summed, or max-ed with
+    aggregate='max'. A `function` returning a number (or, for labelled
+    gauges, a dict of label-value tuples to numbers) is sampled at flush
+    time instead of being set."""
+    kind = 'gauge'
+
+    def __init__(self, name, documentation, labelnames=(), aggregate='sum', function=None):
+        if aggregate not in ('sum', 'max'):
+            raise ValueError(f'Unsupported gauge aggregate: {aggregate}')
+        self.aggregate = aggregate
+        self.function = function
+        super().__init__(name, documentation, labelnames)
+
+    def set(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+        _ensure_flusher()
+
+    def inc(self, amount=1, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+        _ensure_flusher()
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    def _samples(self):
+        if self.function is None or not METRICS_ENABLED:
+            return super()._samples()
+        try:
+            value = self.function()
+        except Exception as e:
+            logger.debug(f'Gauge {self.name} callback failed: {e}')
+            return []
+        if isinstance(value, dict):
+            return [[[str(v) for v in k], n] for k, n in value.items()]
+        return [[[], value]]
+
+    def _describe(self):
+        return {**super()._describe(), 'aggregate': self.aggregate}
+
+
+class Histogram(_Metric):
+    """Distribution of observations (e.g. durations in seconds)."""
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def observe(self, value, **labels):
+        if not METRICS_ENABLED:
+            return
+        key = self._key(labels)
+        index = len(self.buckets)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                index = i
+                break
+        with self._lock:
+            entry = self._values.get(key)
+            if entry is None:
+                # per-bucket counts (+Inf last), sum, count
+                entry = self._values[key] = [0] * (len(self.buckets) + 1) + [0.0, 0]
+            entry[index] += 1
+            entry[-2] += value
+            entry[-1] += 1
+        _ensure_flusher()
+
+    @contextmanager
+    def time(self, **labels):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self):
+        with self._lock:
+            return [[list(k), list(v)] for k, v in self._values.items()]
+
+    def _describe(self):
+        return {**super()._describe(), 'buckets': list(self.buckets)}
+
+
+# ── Snapshots ──
+
+def _snapshot():
+    with _registry_lock:
+        metrics = list(_registry.values())
+    return {'pid': os.getpid(), 'written': time.time(),
+            'metrics': {m.name: {**m._describe(), 'samples': m._samples()} for m in metrics}}
+
+
+@contextmanager
+def _dir_lock():
+    os.makedirs(METRICS_DIR, exist_ok=True)
+    with open(os.path.join(METRICS_DIR, _LOCK), 'a') as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def _read(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _write(path, document):
+    tmp = f'{path}.{os.getpid()}.tmp'
+    with open(tmp, 'w') as f:
+        json.dump(document, f, separators=(',', ':'))
+    os.replace(tmp, path)
+
+
+def flush():
+    """Write this process's snapshot to METRICS_DIR."""
+    global _snapshot_pid
+    if not METRICS_ENABLED:
+        return
+    pid = os.getpid()
+    path = os.path.join(METRICS_DIR, f'{pid}.json')
+    try:
+        if _snapshot_pid != pid:
+            # A file under our pid belongs to an earlier process that had it
+            with _dir_lock():
+                _archive_files([path])
+            _snapshot_pid = pid
+        else:
+            os.makedirs(METRICS_DIR, exist_ok=True)
+        _write(path, _snapshot())
+    except OSError as e:
+        logger.warning(f'Metrics flush to {METRICS_DIR} failed: {e}')
+
+
+def _flush_loop():
+    pid = os.getpid()
+    while _flusher_pid == pid:
+        time.sleep(METRICS_FLUSH_SECONDS)
+        if _flusher_pid == pid:
+            flush()
+
+
+def _ensure_flusher():
+    global _flusher_pid
+    if _flusher_pid == os.getpid():
+        return
+    with _registry_lock:
+        if _flusher_pid == os.getpid():
+            return
+        _flusher_pid = os.getpid()
+    threading.Thread(target=_flush_loop, name='jarvis-metrics-flush', daemon=True).start()
+
+
+def _after_fork():
+    # The parent keeps reporting what it recorded; the child starts from zero
+    global _flusher_pid, _snapshot_pid, _registry_lock
+    _flusher_pid = None
+    _snapshot_pid = None
+    _registry_lock = threading.Lock()
+    for metric in list(_registry.values()):
+        metric._lock = threading.Lock()
+        metric._reset()
+
+
+os.register_at_fork(after_in_child=_after_fork)
+atexit.register(lambda: _flusher_pid == os.getpid() and flush())
+
+
+# ── Aggregation ──
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _merge(into, snapshot, include_gauges=True):
+    for name, metric in snapshot.get('metrics', {}).items():
+        if metric['kind'] == 'gauge' and not include_gauges:
+            continue
+        target = into.setdefault(name, {k: v for k, v in metric.items() if k != 'samples'})
+        target.setdefault('values', {})
+        values = target['values']
+        for labels, value in metric['samples']:
+            key = tuple(labels)
+            if key not in values:
+                values[key] = list(value) if isinstance(value, list) else value
+            elif metric['kind'] == 'histogram':
+                if len(values[key]) == len(value):
+                    values[key] = [a + b for a, b in zip(values[key], value)]
+            elif metric['kind'] == 'gauge' and metric.get('aggregate') == 'max':
+                values[key] = max(values[key], value)
+            else:
+                values[key] += value
+
+
+def _archive_files(paths):
+    """Fold counters/histograms of dead processes into the archive (caller
+    holds the directory lock)."""
+    paths = [p for p in paths if os.path.exists(p)]
+    if not paths:
+        return
+    archive_path = os.path.join(METRICS_DIR, _ARCHIVE)
+    merged = {}
+    archive = _read(archive_path)
+    if archive:
+        _merge(merged, archive)
+    for path in paths:
+        snapshot = _read(path)
+        if snapshot:
+            _merge(merged, snapshot, include_gauges=False)
+    _write(archive_path, {'metrics': {
+        name: {**{k: v for k, v in m.items() if k != 'values'},
+               'samples': [[list(k), v] for k, v in m['values'].items()]}
+        for name, m in merged.items()
+    }})
+    for path in paths:
+        os.remove(path)
+
+
+def collect():
+    """Merged metric families of every process sharing METRICS_DIR."""
+    merged = {}
+    if METRICS_ENABLED:
+        flush()
+        try:
+            with _dir_lock():
+                dead = []
+                for entry in sorted(os.listdir(METRICS_DIR)):
+                    if not entry.endswith('.json') or entry == _ARCHIVE:
+                        continue
+                    try:
+                        pid = int(entry[:-5])
+                    except ValueError:
+                        continue
+                    path = os.path.join(METRICS_DIR, entry)
+                    if pid != os.getpid() and not _pid_alive(pid):
+                        dead.append(path)
+                        continue
+                    snapshot = _read(path)
+                    if snapshot:
+                        _merge(merged, snapshot)
+                _archive_files(dead)
+                archive = _read(os.path.join(METRICS_DIR, _ARCHIVE))
+                if archive:
+                    _merge(merged, archive)
+        except OSError as e:
+            logger.warning(f'Reading metrics from {METRICS_DIR} failed: {e}')
+            merged = {}
+            _merge(merged, _snapshot())
+    # Families registered but not yet recorded still get HELP/TYPE lines
+    with _registry_lock:
+        for metric in _registry.values():
+            merged.setdefault(metric.name, {**metric._describe(), 'values': {}})
+    return merged
+
+
+# ── Prometheus text format ──
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _labels(names, values, extra=None):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+def _number(value):
+    if value == float('inf'):
+        return '+Inf'
+    if isinstance(value, float) and value.is_integer() and abs(value) < 1e15:
+        return str(int(value))
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render(families=None):
+    """Prometheus text exposition (version 0.0.4) of collect()."""
+    families = collect() if families is None else families
+    lines = []
+    for name in sorted(families):
+        family = families[name]
+        labelnames = family.get('labels', [])
+        lines.append(f'# HELP {name} {family["help"]}')
+        lines.append(f'# TYPE {name} {family["kind"]}')
+        for key in sorted(family.get('values', {})):
+            value = family['values'][key]
+            if family['kind'] != 'histogram':
+                lines.append(f'{name}{_labels(labelnames, key)} {_number(value)}')
+                continue
+            cumulative = 0
+            for bound, count in zip(list(family['buckets']) + [float('inf')], value[:-2]):
+                cumulative += count
+                lines.append(f'{name}_bucket{_labels(labelnames, key, ("le", _number(float(bound))))} {cumulative}')
+            lines.append(f'{name}_sum{_labels(labelnames, key)} {_number(value[-2])}')
+            lines.append(f'{name}_count{_labels(labelnames, key)} {value[-1]}')
+    return '\n'.join(lines) + '\n'
+
+
+# ── Shared instruments ──
+
+CACHE_REQUESTS = Counter('jarvis_cache_requests_total', 'In-process cache lookups', ['cache', 'result'])
+EXTERNAL_CALL_SECONDS = Histogram('jarvis_external_call_duration_seconds',
+                                  'Outbound API call latency', ['service', 'operation'])
+EXTERNAL_CALL_ERRORS = Counter('jarvis_external_call_errors_total',
+                               'Failed outbound API calls', ['service', 'operation', 'error'])
+
+_cache_sizes = {}
+CACHE_ENTRIES = Gauge('jarvis_cache_entries', 'Entries held by in-process caches', ['cache'],
+                      function=lambda: {(name, ): size() for name, size in list(_cache_sizes.items())})
+
+_ID_SEGMENT = re.compile(r'/\d+(?=/|$)')
+
+
+def cache_result(cache, hit):
+    """Count a lookup in `cache`; returns `hit` so it can wrap a condition."""
+    CACHE_REQUESTS.inc(cache=cache, result='hit' if hit else 'miss')
+    return hit
+
+
+def track_cache_size(cache, size):
+    """Report `size()` as the entry count of `cache` (jarvis_cache_entries)."""
+    _cache_sizes[cache] = size
+
+
+class _Call:
+    __slots__ = ('error',)
+
+    def __init__(self):
+        self.error = None
+
+
+@contextmanager
+def external_call(service, operation):
+    """Time an outbound call. Exceptions are counted as errors by type and
+    re-raised; failures that do not raise (an HTTP error status the caller
+    handles) are counted by setting `error` on the yielded object:
+
+        with external_call('anaf', '/tva') as call:
+            response = requests.post(...)
+            if response.status_code != 200:
+                call.error = f'HTTP {response.status_code}'
+
+    Numeric path segments in `operation` are collapsed to {id}.
+    """
+    operation = _ID_SEGMENT.sub('/{id}', operation or '')
+    call = _Call()
+    start = time.perf_counter()
+    try:
+        yield call
+    except Exception as e:
+        call.error = type(e).__name__
+        raise
+    finally:
+        EXTERNAL_CALL_SECONDS.observe(time.perf_counter() - start, service=service, operation=operation)
+        if call.error:
+            EXTERNAL_CALL_ERRORS.inc(service=service, operation=operation, error=call.error)
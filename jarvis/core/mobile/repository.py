@@ -0,0 +1,104 @@
+"""Mobile dashboard snapshot — data access.
+
+The home-screen stats, recent invoices/clients and upcoming events are the
+same for every user. refresh_global() computes them in one statement into
+dashboard_snapshots (refresh_mobile_dashboard job, every
+DASHBOARD_REFRESH_MINUTES). version only moves when the payload changes.
+
+get_dashboard() reads the snapshot plus the caller's own counters in one
+round trip. The counters come from the materialised approval_inbox and
+idx_doc_sig_signer (signed_by, status), both index-only lookups.
+"""
+
+import json
+
+from core.base_repository import BaseRepository
+
+DASHBOARD_REFRESH_MINUTES = 2
+# Snapshots older than this are refreshed on read (job worker behind or down)
+DASHBOARD_MAX_AGE_MINUTES = 10
+GLOBAL_KEY = 'mobile_global'
+
+
+def _global_payload_sql(with_events):
+    events = '''
+        COALESCE((
+            SELECT json_agg(e ORDER BY e.date)
+            FROM (
+                SELECT he.id, he.title, he.event_date::text AS date, he.end_date::text AS end_date,
+                       he.location, he.event_type AS type, he.status,
+                       COALESCE(p.cnt, 0) AS participants_count
+                FROM (SELECT * FROM hr_events WHERE event_date >= CURRENT_DATE
+                      ORDER BY event_date ASC LIMIT 3) he
+                LEFT JOIN LATERAL (SELECT COUNT(*) AS cnt FROM hr_event_participants
+                                   WHERE event_id = he.id) p ON TRUE
+            ) e
+        ), '[]'::json)''' if with_events else "'[]'::json"
+    return f'''
+        SELECT json_build_object(
+            'stats', (
+                SELECT json_build_object(
+                    'invoices', COUNT(*),
+                    'revenue', COALESCE(SUM(invoice_value), 0)::float8,
+                    'pending_invoices', COUNT(*) FILTER (WHERE status = 'pending'),
+                    'clients', (SELECT COUNT(*) FROM crm_clients WHERE is_blacklisted = false))
+                FROM invoices WHERE deleted_at IS NULL
+            ),
+            'recent_invoices', COALESCE((
+                SELECT json_agg(r)
+                FROM (SELECT id, invoice_number, supplier, invoice_value::float8 AS amount,
+                             currency, invoice_date::text AS date, status
+                      FROM invoices WHERE deleted_at IS NULL
+                      ORDER BY created_at DESC LIMIT 5) r
+            ), '[]'::json),
+            'recent_clients', COALESCE((
+                SELECT json_agg(r)
+                FROM (SELECT id, display_name AS name, company_name AS cui,
+                             '' AS contact_person, phone, email, city, client_type AS status
+                      FROM crm_clients WHERE is_blacklisted = false
+                      ORDER BY created_at DESC LIMIT 5) r
+            ), '[]'::json),
+            'upcoming_events', {events}
+        )::jsonb AS payload
+    '''
+
+
+class DashboardSnapshotRepository(BaseRepository):
+
+    def refresh_global(self):
+        """Recompute the shared dashboard payload. Returns the snapshot version."""
+        def _work(cursor):
+            cursor.execute("SELECT to_regclass('public.hr_events') IS NOT NULL AS has_events")
+            payload_sql = _global_payload_sql(cursor.fetchone()['has_events'])
+            cursor.execute(f'''
+                INSERT INTO dashboard_snapshots (key, payload, version, refreshed_at)
+                SELECT %s, g.payload, 1, NOW() FROM ({payload_sql}) g
+                ON CONFLICT (key) DO UPDATE SET
+                    payload = EXCLUDED.payload,
+                    version = dashboard_snapshots.version
+                              + (dashboard_snapshots.payload IS DISTINCT FROM EXCLUDED.payload)::int,
+                    refreshed_at = NOW()
+                RETURNING version
+            ''', (GLOBAL_KEY,))
+            return cursor.fetchone()['version']
+        return self.execute_many(_work)
+
+    def get_dashboard(self, user_id):
+        """Shared snapshot + the user's counters.
+
+        Returns:
+            dict with payload, version, stale, pending_approvals and
+            pending_signatures; payload is None before the first refresh.
+        """
+        row = self.query_one('''
+            SELECT s.payload, s.version,
+                   s.refreshed_at < NOW() - make_interval(mins => %(max_age)s) AS stale,
+                   (SELECT COUNT(*) FROM approval_inbox WHERE user_id = %(user_id)s) AS pending_approvals,
+                   (SELECT COUNT(*) FROM document_signatures
+                    WHERE signed_by = %(user_id)s AND status = 'pending') AS pending_signatures
+            FROM (SELECT 1) one
+            LEFT JOIN dashboard_snapshots s ON s.key = %(key)s
+        ''', {'user_id': user_id, 'key': GLOBAL_KEY, 'max_age': DASHBOARD_MAX_AGE_MINUTES})
+        if row and isinstance(row.get('payload'), str):
+            row['payload'] = json.loads(row['payload'])
+        return row
@@ -13,8 +13,10 @@ from flask import jsonify, request
 from . import mobile_bp
 from core.auth.repositories import UserRepository
 from core.auth.models import User
+from .repository import DashboardSnapshotRepository
 
 _user_repo = UserRepository()
+_dashboard_repo = DashboardSnapshotRepository()
 
 
 @mobile_bp.after_request
@@ -327,108 +329,50 @@ def api_unregister_device():
 @mobile_bp.route('/api/mobile/dashboard')
 @jwt_required
 def api_mobile_dashboard():
-    """Aggregated dashboard data for mobile home screen — single request."""
+    """Aggregated dashboard data for mobile home screen — single request.
+
+    Shared stats/lists come from the dashboard snapshot (core/mobile/repository.py);
+    only the caller's pending counters are read live, in the same query.
+    """
     import logging
+    from flask import current_app
     logger = logging.getLogger(__name__)
-    from database import get_db_connection
     user = _current_mobile_user()
-    result = {'stats': {'invoices': 0, 'revenue': 0, 'pending_invoices': 0,
-                        'pending_approvals': 0, 'pending_signatures': 0, 'clients': 0},
-              'recent_invoices': [], 'recent_clients': [], 'upcoming_events': []}
-
-    def _safe_query(conn, sql, params=None):
-        """Run a query with savepoint so failures don't poison the transaction."""
-        try:
-            with conn.cursor() as cur:
-                cur.execute(sql, params)
-                return cur.fetchall(), [d[0] for d in cur.description] if cur.description else []
-        except Exception as e:
-            conn.rollback()
-            logger.warning('Dashboard query failed: %s — %s', sql[:80], e)
-            return [], []
 
-    with get_db_connection() as conn:
-        try:
-            # Stat cards — invoices
-            rows, _ = _safe_query(conn, """
-                SELECT COUNT(*), COALESCE(SUM(invoice_value), 0),
-                       COUNT(*) FILTER (WHERE status = 'pending')
-                FROM invoices WHERE deleted_at IS NULL
-            """)
-            if rows:
-                result['stats']['invoices'] = rows[0][0]
-                result['stats']['revenue'] = float(rows[0][1])
-                result['stats']['pending_invoices'] = rows[0][2]
-
-            # Pending approvals
-            rows, _ = _safe_query(conn, """
-                SELECT COUNT(*) FROM approval_decisions ad
-                JOIN approval_requests ar ON ar.id = ad.request_id
-                WHERE ad.decided_by = %s AND ad.decision = 'pending' AND ar.status = 'pending'
-            """, (user.id,))
-            if rows:
-                result['stats']['pending_approvals'] = rows[0][0]
-
-            # Pending signatures
-            rows, _ = _safe_query(conn, """
-                SELECT COUNT(*) FROM document_signatures
-                WHERE signed_by = %s AND status = 'pending'
-            """, (user.id,))
-            if rows:
-                result['stats']['pending_signatures'] = rows[0][0]
-
-            # Client count
-            rows, _ = _safe_query(conn, "SELECT COUNT(*) FROM crm_clients WHERE is_blacklisted = false")
-            if rows:
-                result['stats']['clients'] = rows[0][0]
-
-            # Recent invoices (last 5)
-            rows, cols = _safe_query(conn, """
-                SELECT id, invoice_number, supplier, invoice_value as amount,
-                       currency, invoice_date as date, status
-                FROM invoices WHERE deleted_at IS NULL
-                ORDER BY created_at DESC LIMIT 5
-            """)
-            result['recent_invoices'] = [dict(zip(cols, r)) for r in rows]
-            for inv in result['recent_invoices']:
-                if inv.get('date'):
-                    inv['date'] = str(inv['date'])
-                if inv.get('amount'):
-                    inv['amount'] = float(inv['amount'])
-
-            # Recent clients (last 5)
-            rows, cols = _safe_query(conn, """
-                SELECT id, display_name as name, company_name as cui,
-                       '' as contact_person, phone, email, city, client_type as status
-                FROM crm_clients WHERE is_blacklisted = false
-                ORDER BY created_at DESC LIMIT 5
-            """)
-            result['recent_clients'] = [dict(zip(cols, r)) for r in rows]
+    try:
+        row = _dashboard_repo.get_dashboard(user.id)
+        if row['payload'] is None:
+            _dashboard_repo.refresh_global()
+            row = _dashboard_repo.get_dashboard(user.id)
+        elif row['stale']:
+            _queue_dashboard_refresh()
+    except Exception as e:
+        logger.error('Dashboard endpoint error: %s', e)
+        return jsonify({'error': 'An internal error occurred', 'success': False}), 500
+
+    etag = f'dash-{row["version"]}-{row["pending_approvals"]}-{row["pending_signatures"]}'
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        result = dict(row['payload'])
+        result['stats'] = {
+            **result['stats'],
+            'pending_approvals': row['pending_approvals'],
+            'pending_signatures': row['pending_signatures'],
+        }
+        response = jsonify(result)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response
 
-            # Upcoming events — check table exists first
-            rows, _ = _safe_query(conn, """
-                SELECT EXISTS (SELECT 1 FROM information_schema.tables
-                               WHERE table_schema = 'public' AND table_name = 'hr_events')
-            """)
-            if rows and rows[0][0]:
-                rows, cols = _safe_query(conn, """
-                    SELECT he.id, he.title, he.event_date as date, he.end_date,
-                           he.location, he.event_type as type, he.status,
-                           (SELECT COUNT(*) FROM hr_event_participants WHERE event_id = he.id) as participants_count
-                    FROM hr_events he WHERE he.event_date >= CURRENT_DATE
-                    ORDER BY he.event_date ASC LIMIT 3
-                """)
-                result['upcoming_events'] = [dict(zip(cols, r)) for r in rows]
-                for ev in result['upcoming_events']:
-                    if ev.get('date'):
-                        ev['date'] = str(ev['date'])
-                    if ev.get('end_date'):
-                        ev['end_date'] = str(ev['end_date'])
 
-            return jsonify(result)
-        except Exception as e:
-            logger.error('Dashboard endpoint error: %s', e)
-            return jsonify({'error': 'An internal error occurred', 'success': False}), 500
+def _queue_dashboard_refresh():
+    try:
+        from core.jobs import enqueue, scheduled_dedupe_key
+        enqueue('refresh_mobile_dashboard', dedupe_key=scheduled_dedupe_key('refresh_mobile_dashboard'))
+    except Exception as e:
+        import logging
+        logging.getLogger(__name__).warning('Could not queue dashboard refresh: %s', e)
 
 
 # ============== WIDGET DATA (lightweight) ==============
@@ -441,16 +385,10 @@ def api_widget_data():
     from core.checkin.service import CheckinService
     user = _current_mobile_user()
 
-    # Check-in status via existing service
-    checkin_svc = CheckinService()
-    status = checkin_svc.get_status(user.id)
-    punches = status.get('punches', [])
-    checked_in = False
-    last_punch_time = None
-    if punches:
-        last = punches[-1]
-        checked_in = last.get('direction') == 'IN'
-        last_punch_time = last.get('event_datetime')
+    # Check-in state from today's latest punch only
+    last = CheckinService().get_last_punch(user.id)
+    checked_in = bool(last) and last.get('direction') == 'IN'
+    last_punch_time = last['event_datetime'].isoformat() if last else None
 
     pending_count = 0
     next_event = None
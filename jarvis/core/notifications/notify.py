@@ -16,6 +16,7 @@ For in-app + push:
 
 import logging
 from .repositories.in_app_repo import InAppNotificationRepository
+from core.events.publisher import publish
 
 logger = logging.getLogger('jarvis.core.notifications.notify')
 
@@ -35,6 +36,8 @@ def notify_user(user_id, title, message=None, link=None,
     except Exception as e:
         logger.error(f'Failed to create notification for user {user_id}: {e}')
         result = None
+    if result:
+        publish('notifications', [user_id])
 
     # Also send push notification
     try:
@@ -61,6 +64,8 @@ def notify_users(user_ids, title, message=None, link=None,
     except Exception as e:
         logger.error(f'Failed to create notifications for {len(user_ids)} users: {e}')
         results = []
+    if results:
+        publish('notifications', user_ids)
 
     # Also send push notification
     try:
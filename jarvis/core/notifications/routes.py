@@ -10,6 +10,7 @@ from flask_login import login_required, current_user
 from . import notifications_bp
 from .repositories import NotificationRepository, InAppNotificationRepository, PushCategoryRepository, PushRateLimitRepository
 from core.utils.api_helpers import safe_error_response
+from core.events.publisher import publish
 
 _notif_repo = NotificationRepository()
 _in_app_repo = InAppNotificationRepository()
@@ -161,6 +162,8 @@ def api_get_unread_count():
 def api_mark_read(notification_id):
     """Mark a single notification as read."""
     updated = _in_app_repo.mark_read(notification_id, current_user.id)
+    if updated:
+        publish('notifications', [current_user.id])
     return jsonify({'success': updated})
 
 
@@ -169,6 +172,8 @@ def api_mark_read(notification_id):
 def api_mark_all_read():
     """Mark all notifications as read for current user."""
     count = _in_app_repo.mark_all_read(current_user.id)
+    if count:
+        publish('notifications', [current_user.id])
     return jsonify({'success': True, 'count': count})
 
 
@@ -57,7 +57,7 @@ class CompanyRepository(BaseRepository):
         """Get all companies (with caching)."""
         global _companies_vat_cache
 
-        if _is_cache_valid(_companies_vat_cache):
+        if _is_cache_valid(_companies_vat_cache, 'companies_vat'):
             return _companies_vat_cache['data']
 
         results = self.query_all('SELECT * FROM companies ORDER BY company')
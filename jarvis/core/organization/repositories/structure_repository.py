@@ -16,7 +16,7 @@ class StructureRepository(BaseRepository):
     def get_all(self) -> list[dict]:
         """Get all department structures with responsable info."""
         with get_cache_lock():
-            if _is_cache_valid(_all_cache):
+            if _is_cache_valid(_all_cache, 'department_structure'):
                 return _all_cache['data']
         result = self.query_all('''
             SELECT ds.*, u.name as responsable_name, u.email as responsable_email
@@ -94,6 +94,19 @@ class ProfileRepository(BaseRepository):
 
         return '(' + ' OR '.join(conditions) + ')', params
 
+    def _invoice_scope(self, cursor, user_id: int) -> tuple[str, list]:
+        """Allocation filter for the user's invoices: org scope, or (with no
+        organigram assignments) allocations they are responsible for.
+
+        responsible_user_id is resolved from the free-text name when the
+        allocation is written (and by the resolve_allocation_responsibles job),
+        so the fallback is an equality on idx_allocations_responsible_user_id.
+        """
+        org_sql, org_params = self._build_org_filter(cursor, user_id)
+        if org_sql:
+            return org_sql, org_params
+        return 'a.responsible_user_id = %s', [user_id]
+
     # ------------------------------------------------------------------
     # Invoice visibility check (same org-scope as list)
     # ------------------------------------------------------------------
@@ -101,15 +114,7 @@ class ProfileRepository(BaseRepository):
     def is_invoice_visible_to_user(self, user_id: int, invoice_id: int) -> bool:
         """Check if a given invoice is visible to the user via org-scope or direct responsibility."""
         def _work(cursor):
-            org_sql, org_params = self._build_org_filter(cursor, user_id)
-
-            if org_sql:
-                scope = org_sql
-                scope_params = org_params
-            else:
-                scope = '(a.responsible_user_id = %s OR (a.responsible_user_id IS NULL AND LOWER(a.responsible) = (SELECT LOWER(name) FROM users WHERE id = %s)))'
-                scope_params = [user_id, user_id]
-
+            scope, scope_params = self._invoice_scope(cursor, user_id)
             cursor.execute(f'''
                 SELECT 1 FROM invoices i
                 INNER JOIN allocations a ON i.id = a.invoice_id
@@ -123,9 +128,9 @@ class ProfileRepository(BaseRepository):
     # User invoices (org-scope based: L0>L1>L2>L3>L4, fallback to own)
     # ------------------------------------------------------------------
 
-    def get_user_invoices_by_responsible_name(
+    def get_user_invoices(
         self,
-        user_email: str,
+        user_id: int,
         status: Optional[str] = None,
         start_date: Optional[str] = None,
         end_date: Optional[str] = None,
@@ -133,27 +138,15 @@ class ProfileRepository(BaseRepository):
         department: Optional[str] = None,
         limit: int = 100,
         offset: int = 0,
-    ) -> list[dict]:
-        """Get invoices visible to the user based on L0-L5 org scope.
+    ) -> dict:
+        """Get a page of invoices visible to the user based on L0-L5 org scope.
         Fallback: if no org assignments, show only directly-responsible invoices.
+
+        Returns {'invoices': [...], 'total': n}; the total comes from the same
+        query (window count over the filtered set, before LIMIT).
         """
         def _work(cursor):
-            cursor.execute('SELECT id FROM users WHERE LOWER(email) = LOWER(%s)', [user_email])
-            user_row = cursor.fetchone()
-            if not user_row:
-                return []
-
-            user_id = user_row['id']
-            org_sql, org_params = self._build_org_filter(cursor, user_id)
-
-            if org_sql:
-                # Org scope: L0 sees all company, L1 sees dept+descendants, etc.
-                scope = org_sql
-                scope_params = org_params
-            else:
-                # No org assignments: show only own invoices
-                scope = '(a.responsible_user_id = %s OR (a.responsible_user_id IS NULL AND LOWER(a.responsible) = (SELECT LOWER(name) FROM users WHERE id = %s)))'
-                scope_params = [user_id, user_id]
+            scope, scope_params = self._invoice_scope(cursor, user_id)
 
             # Build optional filter clauses
             extra_where = ''
@@ -176,20 +169,25 @@ class ProfileRepository(BaseRepository):
                 extra_where += ' AND LOWER(a.department) = LOWER(%s)'
                 params.append(department)
 
-            # Use CTE to paginate distinct invoices, then aggregate allocations
-            query = f'''
+            scoped = f'''
+                SELECT DISTINCT i.id
+                FROM invoices i
+                INNER JOIN allocations a ON i.id = a.invoice_id
+                WHERE {scope} AND i.deleted_at IS NULL {extra_where}
+            '''
+
+            # Paginate distinct invoices (counting them on the way), then aggregate allocations
+            cursor.execute(f'''
                 WITH filtered_invoices AS (
-                    SELECT DISTINCT i.id
-                    FROM invoices i
-                    INNER JOIN allocations a ON i.id = a.invoice_id
-                    WHERE {scope} AND i.deleted_at IS NULL {extra_where}
-                    ORDER BY i.id DESC
+                    SELECT id, COUNT(*) OVER () AS total
+                    FROM ({scoped}) s
+                    ORDER BY id DESC
                     LIMIT %s OFFSET %s
                 )
                 SELECT
                     i.id, i.invoice_number, i.invoice_date, i.invoice_value,
                     i.currency, i.supplier, i.status, i.drive_link, i.comment,
-                    i.created_at, i.updated_at, i.payment_status,
+                    i.created_at, i.updated_at, i.payment_status, fi.total,
                     COALESCE(
                         json_agg(
                             json_build_object(
@@ -208,15 +206,15 @@ class ProfileRepository(BaseRepository):
                 FROM filtered_invoices fi
                 JOIN invoices i ON i.id = fi.id
                 LEFT JOIN allocations a ON a.invoice_id = i.id
-                GROUP BY i.id
+                GROUP BY i.id, fi.total
                 ORDER BY i.invoice_date DESC
-            '''
-            params.extend([limit, offset])
+            ''', params + [limit, offset])
 
-            cursor.execute(query, params)
             rows = []
+            total = 0
             for row in cursor.fetchall():
                 d = dict_from_row(dict(row))
+                total = d.pop('total')
                 # For backwards compat: set top-level fields from first allocation
                 allocs = d.get('allocations') or []
                 if allocs:
@@ -228,110 +226,46 @@ class ProfileRepository(BaseRepository):
                     d['allocation_percent'] = first.get('allocation_percent')
                     d['allocation_value'] = first.get('allocation_value')
                 rows.append(d)
-            return rows
-        return self.execute_many(_work)
-
-    def get_user_invoices_count(
-        self,
-        user_email: str,
-        status: Optional[str] = None,
-        start_date: Optional[str] = None,
-        end_date: Optional[str] = None,
-        search: Optional[str] = None,
-        department: Optional[str] = None,
-    ) -> int:
-        """Count invoices visible via L0-L5 org scope (fallback: own)."""
-        def _work(cursor):
-            cursor.execute('SELECT id FROM users WHERE LOWER(email) = LOWER(%s)', [user_email])
-            user_row = cursor.fetchone()
-            if not user_row:
-                return 0
-
-            user_id = user_row['id']
-            org_sql, org_params = self._build_org_filter(cursor, user_id)
-
-            if org_sql:
-                scope = org_sql
-                scope_params = org_params
-            else:
-                scope = '(a.responsible_user_id = %s OR (a.responsible_user_id IS NULL AND LOWER(a.responsible) = (SELECT LOWER(name) FROM users WHERE id = %s)))'
-                scope_params = [user_id, user_id]
-
-            query = f'''
-                SELECT COUNT(DISTINCT i.id) as count
-                FROM invoices i
-                INNER JOIN allocations a ON i.id = a.invoice_id
-                WHERE {scope}
-                AND i.deleted_at IS NULL
-            '''
-            params = list(scope_params)
 
-            if status:
-                query += ' AND i.status = %s'
-                params.append(status)
-            if start_date:
-                query += ' AND i.invoice_date >= %s'
-                params.append(start_date)
-            if end_date:
-                query += ' AND i.invoice_date <= %s'
-                params.append(end_date)
-            if search:
-                query += ' AND (i.invoice_number ILIKE %s OR i.supplier ILIKE %s)'
-                search_pattern = f'%{search}%'
-                params.extend([search_pattern, search_pattern])
-            if department:
-                query += ' AND LOWER(a.department) = LOWER(%s)'
-                params.append(department)
+            # Page past the end: no row carries the total
+            if not rows and offset > 0:
+                cursor.execute(f'SELECT COUNT(*) AS count FROM ({scoped}) s', params)
+                total = cursor.fetchone()['count']
 
-            cursor.execute(query, params)
-            row = cursor.fetchone()
-            return row['count'] if row else 0
+            return {'invoices': rows, 'total': total}
         return self.execute_many(_work)
 
-    def get_user_invoices_summary(self, user_email: str) -> dict:
-        """Get invoice summary stats via L0-L5 org scope (fallback: own)."""
-        def _work(cursor):
-            cursor.execute('SELECT id FROM users WHERE LOWER(email) = LOWER(%s)', [user_email])
-            user_row = cursor.fetchone()
-            if not user_row:
-                return {'total': 0, 'total_value': 0, 'by_status': {}}
-
-            user_id = user_row['id']
-            org_sql, org_params = self._build_org_filter(cursor, user_id)
-
-            if org_sql:
-                base_where = org_sql
-                base_params = org_params
-            else:
-                base_where = '(a.responsible_user_id = %s OR (a.responsible_user_id IS NULL AND LOWER(a.responsible) = (SELECT LOWER(name) FROM users WHERE id = %s)))'
-                base_params = [user_id, user_id]
+    def get_user_invoices_summary(self, user_id: int) -> dict:
+        """Get invoice summary stats via L0-L5 org scope (fallback: own).
 
+        One pass over the distinct visible invoices: per-status rows plus the
+        ROLLUP grand total.
+        """
+        def _work(cursor):
+            scope, scope_params = self._invoice_scope(cursor, user_id)
             cursor.execute(f'''
-                SELECT i.status, COUNT(DISTINCT i.id) as count
-                FROM invoices i
-                INNER JOIN allocations a ON i.id = a.invoice_id
-                WHERE {base_where} AND i.deleted_at IS NULL
-                GROUP BY i.status
-            ''', base_params)
+                WITH scoped AS (
+                    SELECT DISTINCT i.id, i.status, i.invoice_value
+                    FROM invoices i
+                    INNER JOIN allocations a ON i.id = a.invoice_id
+                    WHERE {scope} AND i.deleted_at IS NULL
+                )
+                SELECT status, GROUPING(status) = 1 AS is_total,
+                       COUNT(*) AS count, COALESCE(SUM(invoice_value), 0) AS total_value
+                FROM scoped
+                GROUP BY ROLLUP (status)
+            ''', scope_params)
 
-            by_status = {}
+            summary = {'total': 0, 'total_value': 0, 'by_status': {}}
             for row in cursor.fetchall():
-                by_status[row['status'] or 'unknown'] = row['count']
-
-            cursor.execute(f'''
-                SELECT COUNT(DISTINCT i.id) as total, COALESCE(SUM(DISTINCT i.invoice_value), 0) as total_value
-                FROM invoices i
-                INNER JOIN allocations a ON i.id = a.invoice_id
-                WHERE {base_where} AND i.deleted_at IS NULL
-            ''', base_params)
-
-            totals = cursor.fetchone()
-
-            return {
-                'total': totals['total'] if totals else 0,
-                'total_value': float(totals['total_value']) if totals else 0,
-                'by_status': by_status,
-            }
+                if row['is_total']:
+                    summary['total'] = row['count']
+                    summary['total_value'] = float(row['total_value'])
+                else:
+                    by_status = summary['by_status']
+                    key = row['status'] or 'unknown'
+                    by_status[key] = by_status.get(key, 0) + row['count']
+            return summary
         return self.execute_many(_work)
 
     # ------------------------------------------------------------------
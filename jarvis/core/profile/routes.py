@@ -51,8 +51,7 @@ def api_profile_summary():
             'contract_work_date': str(fresh['contract_work_date']) if fresh.get('contract_work_date') else None,
         }
 
-        # Get invoice summary using user's email
-        invoices_summary = _profile_repo.get_user_invoices_summary(current_user.email)
+        invoices_summary = _profile_repo.get_user_invoices_summary(current_user.id)
         activity_count = _profile_repo.get_user_activity_count(current_user.id)
 
         # Add mobile-friendly pending/allocated fields
@@ -128,9 +127,8 @@ def api_profile_invoices():
 
         offset = (page - 1) * per_page
 
-        # Get invoices using user's email (finds user, matches their name to allocation.responsible)
-        invoices = _profile_repo.get_user_invoices_by_responsible_name(
-            user_email=current_user.email,
+        result = _profile_repo.get_user_invoices(
+            current_user.id,
             status=status if status else None,
             start_date=start_date if start_date else None,
             end_date=end_date if end_date else None,
@@ -140,18 +138,9 @@ def api_profile_invoices():
             offset=offset,
         )
 
-        total = _profile_repo.get_user_invoices_count(
-            user_email=current_user.email,
-            status=status if status else None,
-            start_date=start_date if start_date else None,
-            end_date=end_date if end_date else None,
-            search=search if search else None,
-            department=department if department else None,
-        )
-
         return jsonify({
-            'invoices': invoices,
-            'total': total,
+            'invoices': result['invoices'],
+            'total': result['total'],
             'page': page,
             'per_page': per_page,
         })
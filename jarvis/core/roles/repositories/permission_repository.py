@@ -8,16 +8,18 @@ import time
 from typing import Optional
 
 from core.base_repository import BaseRepository
+from core.metrics import cache_result, track_cache_size
 
 logger = logging.getLogger('jarvis.core.roles.permission_repository')
 
 _perm_cache = {}
 _PERM_CACHE_TTL = 300  # 5 minutes
+track_cache_size('permissions', lambda: len(_perm_cache))
 
 
 def _cache_get(key):
     cached = _perm_cache.get(key)
-    if cached and (time.time() - cached[1]) < _PERM_CACHE_TTL:
+    if cache_result('permissions', bool(cached) and (time.time() - cached[1]) < _PERM_CACHE_TTL):
         return cached[0]
     return None
 
@@ -1,41 +1,118 @@
 """
 BNR Currency Converter Module
 
-Fetches exchange rates from the National Bank of Romania (BNR) API
-and provides currency conversion functionality.
+Exchange rates from the National Bank of Romania (BNR) and currency
+conversion.
 
-BNR XML API endpoints:
+Rates live in the bnr_exchange_rates table, filled by the sync_bnr_rates job
+(tasks/cleanup.py) from the BNR XML API:
 - Current rates: https://www.bnr.ro/nbrfxrates.xml
 - Historical rates by year: https://www.bnr.ro/files/xml/years/nbrfxrates{YEAR}.xml
 
+Lookups never touch the network. The first lookup for a year reads that year
+from the table and expands it into a per-currency, per-day map with the
+weekend/holiday fallback already applied, so every later lookup is a dict
+access. The current year is re-read every RATE_CACHE_TTL seconds to pick up
+newly synced days; a year with no stored rates queues a backfill.
+
 All rates are RON-based (how many RON per 1 unit of foreign currency).
 """
 
-import os
+import threading
+import time
 import xml.etree.ElementTree as ET
-from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from datetime import date, datetime, timedelta
+from typing import Iterable, List, Optional, Tuple
 import requests
 
+from core.base_repository import BaseRepository
+from core.utils.logging_config import get_logger
+
+logger = get_logger('jarvis.currency_converter')
+
 # BNR XML API URLs
 BNR_CURRENT_URL = "https://www.bnr.ro/nbrfxrates.xml"
 BNR_YEARLY_URL = "https://www.bnr.ro/files/xml/years/nbrfxrates{year}.xml"
+BNR_FIRST_YEAR = 2005  # first yearly archive published
 
 # XML namespace used by BNR
 BNR_NS = {"bnr": "http://www.bnr.ro/xsd"}
 
-# Simple in-memory cache for exchange rates
-# Structure: {year: {date_str: {currency: rate}}}
-_rate_cache = {}
-
+# BNR does not publish on weekends/holidays: a day without a fixing uses the
+# most recent rate from up to RATE_LOOKBACK_DAYS - 1 days earlier
+RATE_LOOKBACK_DAYS = 10
+RATE_CACHE_TTL = 900          # seconds, for years that can still change
+STALE_AFTER_DAYS = 4          # sync refetches the year archive past this gap
 
-def get_exchange_rate(currency: str, date: str) -> Optional[float]:
+# Expanded rates per year: {year: {currency: {date_str: rate}}}
+_rate_cache = {}
+_loaded_at = {}               # {year: monotonic load time} for expiring years
+_backfill_requested = set()
+_cache_lock = threading.Lock()
+
+
+class BnrRateRepository(BaseRepository):
+    """Stored BNR rates (bnr_exchange_rates)."""
+
+    def rates_between(self, start: date, end: date) -> dict:
+        """Return {date_str: {currency: rate}} for start..end inclusive."""
+        rows = self.query_all('''
+            SELECT currency, rate_date, rate FROM bnr_exchange_rates
+            WHERE rate_date BETWEEN %s AND %s
+        ''', (start, end))
+        rates_by_date = {}
+        for row in rows:
+            rates_by_date.setdefault(str(row['rate_date']), {})[row['currency']] = float(row['rate'])
+        return rates_by_date
+
+    def upsert(self, rates_by_date: dict) -> int:
+        """Store {date_str: {currency: rate}}. Returns the number of rates written."""
+        from psycopg2.extras import execute_values
+        rows = [(currency, date_str, rate)
+                for date_str, rates in rates_by_date.items()
+                for currency, rate in rates.items()]
+        if not rows:
+            return 0
+
+        def _work(cursor):
+            execute_values(cursor, '''
+                INSERT INTO bnr_exchange_rates (currency, rate_date, rate) VALUES %s
+                ON CONFLICT (currency, rate_date) DO UPDATE
+                SET rate = EXCLUDED.rate, fetched_at = NOW()
+                WHERE bnr_exchange_rates.rate IS DISTINCT FROM EXCLUDED.rate
+            ''', rows, page_size=1000)
+        self.execute_many(_work)
+        return len(rows)
+
+    def stored_years(self) -> set:
+        rows = self.query_all('''
+            SELECT DISTINCT EXTRACT(YEAR FROM rate_date)::int AS year FROM bnr_exchange_rates
+        ''')
+        return {row['year'] for row in rows}
+
+    def latest_date(self) -> Optional[date]:
+        row = self.query_one('SELECT MAX(rate_date) AS latest FROM bnr_exchange_rates')
+        return row['latest'] if row else None
+
+    def invoice_years(self) -> set:
+        """Years that have invoices — the years conversions are asked for."""
+        rows = self.query_all('''
+            SELECT DISTINCT EXTRACT(YEAR FROM invoice_date)::int AS year
+            FROM invoices WHERE deleted_at IS NULL
+        ''')
+        return {row['year'] for row in rows}
+
+
+_repo = BnrRateRepository()
+
+
+def get_exchange_rate(currency: str, date) -> Optional[float]:
     """
     Get the BNR exchange rate for a currency on a specific date.
 
     Args:
         currency: Currency code (e.g., 'EUR', 'USD')
-        date: Date string in YYYY-MM-DD format
+        date: Date string in YYYY-MM-DD format (or a date/datetime)
 
     Returns:
         Exchange rate (RON per 1 unit of currency) or None if not found
@@ -49,44 +126,134 @@ def get_exchange_rate(currency: str, date: str) -> Optional[float]:
     if currency == 'RON':
         return 1.0
 
-    # Parse the date
+    day = _to_date(date)
+    if day is None:
+        return None
+
+    return _year_rates(day.year).get(currency, {}).get(day.isoformat())
+
+
+def _to_date(value) -> Optional[date]:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
     try:
-        target_date = datetime.strptime(date, '%Y-%m-%d')
-    except ValueError:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except (TypeError, ValueError):
         return None
 
-    year = target_date.year
 
-    # Try to get rate for the exact date, fallback to previous days
-    # BNR doesn't publish on weekends/holidays
-    for days_back in range(10):  # Try up to 10 days back
-        check_date = target_date - timedelta(days=days_back)
-        check_date_str = check_date.strftime('%Y-%m-%d')
-        check_year = check_date.year
+def _year_rates(year: int) -> dict:
+    """Expanded rates for a year, read from the store on first use."""
+    rates = _rate_cache.get(year)
+    if rates is not None and not _expired(year):
+        return rates
 
-        rate = _get_rate_from_cache_or_fetch(currency, check_date_str, check_year)
-        if rate is not None:
-            return rate
+    with _cache_lock:
+        rates = _rate_cache.get(year)
+        if rates is None or _expired(year):
+            rates = _load_year(year)
+            _rate_cache[year] = rates
+            if not rates or year >= date.today().year:
+                _loaded_at[year] = time.monotonic()
+            else:
+                _loaded_at.pop(year, None)  # complete past year: keep for good
 
-    return None
+    if not rates:
+        _request_backfill(year)
+    return rates
 
 
-def _get_rate_from_cache_or_fetch(currency: str, date: str, year: int) -> Optional[float]:
-    """Get rate from cache or fetch from BNR API."""
-    global _rate_cache
+def _expired(year: int) -> bool:
+    loaded_at = _loaded_at.get(year)
+    return loaded_at is not None and time.monotonic() - loaded_at > RATE_CACHE_TTL
 
-    # Check cache first
-    if year in _rate_cache and date in _rate_cache[year]:
-        rates = _rate_cache[year][date]
-        return rates.get(currency)
 
-    # Fetch rates for the year
-    rates_by_date = _fetch_rates_for_year(year)
+def _load_year(year: int) -> dict:
+    start = date(year, 1, 1) - timedelta(days=RATE_LOOKBACK_DAYS - 1)
+    try:
+        rates_by_date = _repo.rates_between(start, date(year, 12, 31))
+    except Exception as e:
+        logger.error(f"Error loading BNR rates for {year}: {e}")
+        return {}
+    return _expand_year(year, rates_by_date)
 
-    if date in rates_by_date:
-        return rates_by_date[date].get(currency)
 
-    return None
+def _expand_year(year: int, rates_by_date: dict) -> dict:
+    """
+    Expand {date_str: {currency: rate}} into {currency: {date_str: rate}}
+    with an entry for every day of the year that has a rate within the
+    lookback window (the weekend/holiday fallback, precomputed).
+    """
+    expanded = {}
+    latest = {}  # currency -> (date published, rate)
+    day = date(year, 1, 1) - timedelta(days=RATE_LOOKBACK_DAYS - 1)
+    end = date(year, 12, 31)
+    while day <= end:
+        date_str = day.isoformat()
+        for currency, rate in rates_by_date.get(date_str, {}).items():
+            latest[currency] = (day, rate)
+        if day.year == year:
+            for currency, (published, rate) in latest.items():
+                if (day - published).days < RATE_LOOKBACK_DAYS:
+                    expanded.setdefault(currency, {})[date_str] = rate
+        day += timedelta(days=1)
+    return expanded
+
+
+def _request_backfill(year: int) -> None:
+    """Queue a sync for a year with no stored rates (once per process)."""
+    if year in _backfill_requested or not BNR_FIRST_YEAR <= year <= date.today().year:
+        return
+    _backfill_requested.add(year)
+    try:
+        from core.jobs import enqueue
+        enqueue('sync_bnr_rates', {'years': [year]}, dedupe_key=f'sync_bnr_rates:{year}')
+    except Exception as e:
+        logger.error(f"Failed to queue BNR rate backfill for {year}: {e}")
+
+
+def sync_rates(years: Optional[Iterable[int]] = None) -> dict:
+    """
+    Fetch rates from BNR into bnr_exchange_rates (job worker only — network I/O).
+
+    Args:
+        years: Years whose archives to fetch. Default: today's feed, plus the
+               archive of every year used by invoices that has no stored
+               rates, plus the current year's archive if the store has fallen
+               more than STALE_AFTER_DAYS behind.
+
+    Returns:
+        dict with 'years' (archives fetched) and 'rates' (rates written)
+    """
+    today = date.today()
+    rates_by_date = {}
+
+    if years is None:
+        stored = _repo.stored_years()
+        years = {y for y in _repo.invoice_years() | {today.year}
+                 if y not in stored and BNR_FIRST_YEAR <= y <= today.year}
+        latest = _repo.latest_date()
+        if latest is None or (today - latest).days > STALE_AFTER_DAYS:
+            years.add(today.year)
+        if today.year not in years:
+            rates_by_date.update(_fetch_xml(BNR_CURRENT_URL))
+
+    years = sorted(set(years))
+    for year in years:
+        rates_by_date.update(_fetch_rates_for_year(year))
+
+    count = _repo.upsert(rates_by_date)
+
+    # Drop this process's copy of the years written
+    with _cache_lock:
+        for year in {int(d[:4]) for d in rates_by_date}:
+            _rate_cache.pop(year, None)
+            _loaded_at.pop(year, None)
+            _backfill_requested.discard(year)
+
+    return {'years': years, 'rates': count}
 
 
 def _fetch_rates_for_year(year: int) -> dict:
@@ -95,12 +262,6 @@ def _fetch_rates_for_year(year: int) -> dict:
 
     Returns dict: {date_str: {currency: rate}}
     """
-    global _rate_cache
-
-    # Already fetched this year
-    if year in _rate_cache:
-        return _rate_cache[year]
-
     current_year = datetime.now().year
 
     # Always try yearly archive first (has full history), fall back to current
@@ -110,18 +271,21 @@ def _fetch_rates_for_year(year: int) -> dict:
 
     rates_by_date = {}
     for url in urls:
-        try:
-            response = requests.get(url, timeout=10)
-            response.raise_for_status()
-            parsed = _parse_bnr_xml(response.content)
-            rates_by_date.update(parsed)
-        except Exception as e:
-            print(f"Error fetching BNR rates from {url}: {e}")
-
-    _rate_cache[year] = rates_by_date
+        rates_by_date.update(_fetch_xml(url))
     return rates_by_date
 
 
+def _fetch_xml(url: str) -> dict:
+    """Download and parse one BNR XML feed. Returns {} on failure."""
+    try:
+        response = requests.get(url, timeout=10)
+        response.raise_for_status()
+        return _parse_bnr_xml(response.content)
+    except Exception as e:
+        logger.error(f"Error fetching BNR rates from {url}: {e}")
+        return {}
+
+
 def _parse_bnr_xml(xml_content: bytes) -> dict:
     """
     Parse BNR XML response and extract rates.
@@ -163,7 +327,7 @@ def _parse_bnr_xml(xml_content: bytes) -> dict:
                 rates_by_date[date_str] = rates
 
     except ET.ParseError as e:
-        print(f"Error parsing BNR XML: {e}")
+        logger.error(f"Error parsing BNR XML: {e}")
 
     return rates_by_date
 
@@ -211,6 +375,26 @@ def convert_currency(
     return round(converted, 2), round(rate, 6)
 
 
+def convert_many(
+    items: Iterable[Tuple[float, str, str, object]]
+) -> List[Tuple[Optional[float], Optional[float]]]:
+    """
+    Convert many amounts at once.
+
+    Args:
+        items: (amount, from_currency, to_currency, date) tuples
+
+    Returns:
+        [(converted_amount, exchange_rate)] in item order, as convert_currency
+        returns them. Every year involved is loaded once up front; the
+        conversions themselves are in-memory lookups.
+    """
+    items = list(items)
+    for year in {day.year for day in (_to_date(item[3]) for item in items) if day}:
+        _year_rates(year)
+    return [convert_currency(*item) for item in items]
+
+
 def get_eur_ron_conversion(
     amount: float,
     currency: str,
@@ -269,9 +453,11 @@ def get_eur_ron_conversion(
 
 
 def clear_cache():
-    """Clear the rate cache (useful for testing or refreshing data)."""
-    global _rate_cache
-    _rate_cache = {}
+    """Clear the in-memory rates (useful for testing or refreshing data)."""
+    with _cache_lock:
+        _rate_cache.clear()
+        _loaded_at.clear()
+        _backfill_requested.clear()
 
 
 # Test function
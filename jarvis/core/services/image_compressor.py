@@ -1,30 +1,188 @@
 """
-Image compression module using TinyPNG API.
+Image compression module (local, Pillow).
 
 Compresses PNG, JPEG images to reduce file size before uploading to Drive.
+
+Encoding runs in a small process pool (IMAGE_COMPRESSION_WORKERS, forked on
+first use) so it never holds the GIL of a request thread, and each call is
+bounded by IMAGE_COMPRESSION_TIMEOUT. The container format is kept (the
+upload keeps the client's filename and MIME type); the encoding is picked
+per image:
+- JPEG: EXIF orientation applied, downscaled to IMAGE_MAX_DIMENSION, metadata
+  other than the ICC profile dropped, re-encoded at IMAGE_JPEG_QUALITY
+  (optimized, progressive).
+- PNG: same orientation/resize, then quantised to an IMAGE_PNG_COLORS
+  palette (undithered when the image already has that few colours, as
+  screenshots and diagrams do). The optimized full-colour encoding is kept
+  when it is smaller.
+The original is returned whenever the result is not smaller.
+
+Results are cached by content hash (IMAGE_CACHE_MAX_BYTES, LRU, counting a
+fixed overhead per entry), so re-uploads of the same file cost nothing.
 """
+import hashlib
+import io
+import multiprocessing
 import os
-import requests
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor, TimeoutError as FutureTimeout
+from concurrent.futures.process import BrokenProcessPool
+
+from PIL import Image, ImageOps, UnidentifiedImageError
 
-# TinyPNG API key - can be overridden via environment variable
-TINYPNG_API_KEY = os.environ.get('TINYPNG_API_KEY', '')
+from core.utils.logging_config import get_logger
+
+logger = get_logger('jarvis.image_compressor')
 
 # Supported image types for compression
 COMPRESSIBLE_TYPES = {'image/png', 'image/jpeg', 'image/jpg'}
 
-# Minimum file size for TinyPNG compression (500KB)
-# Files under this size are not compressed to save API calls
-MIN_SIZE_FOR_COMPRESSION = 500 * 1024  # 500KB in bytes
+# Files under this size are uploaded as-is
+MIN_SIZE_FOR_COMPRESSION = int(os.environ.get('IMAGE_MIN_COMPRESS_BYTES', str(100 * 1024)))
+
+# Quality targets
+IMAGE_JPEG_QUALITY = int(os.environ.get('IMAGE_JPEG_QUALITY', '82'))
+IMAGE_PNG_COLORS = int(os.environ.get('IMAGE_PNG_COLORS', '256'))
+IMAGE_MAX_DIMENSION = int(os.environ.get('IMAGE_MAX_DIMENSION', '2560'))
+
+IMAGE_COMPRESSION_WORKERS = int(os.environ.get('IMAGE_COMPRESSION_WORKERS', '2'))
+IMAGE_COMPRESSION_TIMEOUT = int(os.environ.get('IMAGE_COMPRESSION_TIMEOUT', '20'))
+IMAGE_CACHE_MAX_BYTES = int(os.environ.get('IMAGE_CACHE_MAX_BYTES', str(32 * 1024 * 1024)))
+
+# Charged per cache entry on top of the result bytes (key, dict slot), so
+# "already smallest" entries, which store no bytes, still count
+_CACHE_ENTRY_OVERHEAD = 256
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# sha256 -> compressed bytes, or None when the original was already smallest
+_results = OrderedDict()
+_results_bytes = 0
+_results_lock = threading.Lock()
 
 
 def is_compressible_image(mime_type: str) -> bool:
-    """Check if the file type can be compressed by TinyPNG."""
+    """Check if the file type can be compressed."""
     return mime_type.lower() in COMPRESSIBLE_TYPES
 
 
+def _settings() -> tuple:
+    return (IMAGE_JPEG_QUALITY, IMAGE_PNG_COLORS, IMAGE_MAX_DIMENSION)
+
+
+def _encode(file_bytes: bytes, settings: tuple) -> bytes:
+    """Re-encode one image. Runs in a pool process; returns the smallest
+    encoding found (possibly larger than the input — the caller compares)."""
+    jpeg_quality, png_colors, max_dimension = settings
+    with Image.open(io.BytesIO(file_bytes)) as src:
+        fmt = src.format
+        if fmt not in ('JPEG', 'PNG'):
+            raise ValueError(f'Unsupported image format: {fmt}')
+        icc_profile = src.info.get('icc_profile')
+        img = ImageOps.exif_transpose(src)
+        img.thumbnail((max_dimension, max_dimension), Image.LANCZOS)
+
+    out = io.BytesIO()
+    if fmt == 'JPEG':
+        if img.mode not in ('RGB', 'L', 'CMYK'):
+            img = img.convert('RGB')
+        img.save(out, 'JPEG', quality=jpeg_quality, optimize=True, progressive=True,
+                 icc_profile=icc_profile)
+        return out.getvalue()
+
+    if img.mode not in ('RGB', 'RGBA', 'L', 'LA', 'P'):
+        img = img.convert('RGBA')
+    candidates = [img]
+    if img.mode in ('RGB', 'RGBA'):
+        # Few colours (screenshots, diagrams): exact palette, no dithering
+        few_colors = img.getcolors(png_colors) is not None
+        candidates.append(img.quantize(
+            colors=png_colors,
+            method=Image.Quantize.FASTOCTREE if img.mode == 'RGBA' else Image.Quantize.MEDIANCUT,
+            dither=Image.Dither.NONE if few_colors else Image.Dither.FLOYDSTEINBERG,
+        ))
+
+    best = None
+    for candidate in candidates:
+        buf = io.BytesIO()
+        candidate.save(buf, 'PNG', optimize=True, icc_profile=icc_profile)
+        if best is None or buf.tell() < len(best):
+            best = buf.getvalue()
+    return best
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, IMAGE_COMPRESSION_WORKERS),
+                mp_context=multiprocessing.get_context('fork'),
+            )
+        return _pool
+
+
+def _reset_pool(pool):
+    global _pool
+    with _pool_lock:
+        if _pool is pool:
+            _pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _cache_get(key):
+    with _results_lock:
+        if key not in _results:
+            return False, None
+        _results.move_to_end(key)
+        return True, _results[key]
+
+
+def _entry_size(compressed):
+    return _CACHE_ENTRY_OVERHEAD + (len(compressed) if compressed else 0)
+
+
+def _cache_put(key, compressed):
+    global _results_bytes
+    size = _entry_size(compressed)
+    if size > IMAGE_CACHE_MAX_BYTES:
+        return
+    with _results_lock:
+        if key in _results:
+            return
+        _results[key] = compressed
+        _results_bytes += size
+        while _results_bytes > IMAGE_CACHE_MAX_BYTES:
+            _, evicted = _results.popitem(last=False)
+            _results_bytes -= _entry_size(evicted)
+
+
+def clear_compression_cache():
+    """Drop all cached compression results."""
+    global _results_bytes
+    with _results_lock:
+        _results.clear()
+        _results_bytes = 0
+
+
+def _stats(original_size: int, compressed_size: int, error: str = None) -> dict:
+    stats = {
+        'original_size': original_size,
+        'compressed_size': compressed_size,
+        'ratio': compressed_size / original_size if original_size > 0 else 1,
+        'saved_percent': round((1 - compressed_size / original_size) * 100, 1) if original_size > 0 else 0,
+        'saved_bytes': original_size - compressed_size,
+    }
+    if error:
+        stats['error'] = error
+    return stats
+
+
 def compress_image(file_bytes: bytes, filename: str = None) -> tuple[bytes, dict]:
     """
-    Compress an image using TinyPNG API.
+    Compress a PNG/JPEG image locally.
 
     Args:
         file_bytes: The original image bytes
@@ -32,74 +190,53 @@ def compress_image(file_bytes: bytes, filename: str = None) -> tuple[bytes, dict
 
     Returns:
         Tuple of (compressed_bytes, stats_dict)
-        stats_dict contains: original_size, compressed_size, ratio, saved_percent
-
-    Raises:
-        Exception if compression fails
+        stats_dict contains: original_size, compressed_size, ratio, saved_percent,
+        saved_bytes (and error when the original is returned because
+        compression failed)
     """
-    if not TINYPNG_API_KEY:
-        raise ValueError("TinyPNG API key not configured")
-
     original_size = len(file_bytes)
+    settings = _settings()
+    key = hashlib.sha256(file_bytes).hexdigest() + ':' + ':'.join(map(str, settings))
+
+    hit, compressed = _cache_get(key)
+    if not hit:
+        pool = _get_pool()
+        try:
+            compressed = pool.submit(_encode, file_bytes, settings).result(timeout=IMAGE_COMPRESSION_TIMEOUT)
+        except FutureTimeout:
+            logger.warning(f"Compression timed out for {filename or 'image'} after {IMAGE_COMPRESSION_TIMEOUT}s")
+            return file_bytes, _stats(original_size, original_size, 'Compression timed out')
+        except BrokenProcessPool as e:
+            _reset_pool(pool)
+            logger.error(f"Compression pool died on {filename or 'image'}: {e}")
+            return file_bytes, _stats(original_size, original_size, 'Compression worker crashed')
+        except UnidentifiedImageError:
+            logger.warning(f"Could not compress {filename or 'image'}: not a recognised image")
+            return file_bytes, _stats(original_size, original_size, 'Not a recognised image')
+        except (ValueError, OSError, Image.DecompressionBombError) as e:
+            logger.warning(f"Could not compress {filename or 'image'}: {e}")
+            return file_bytes, _stats(original_size, original_size, str(e) or type(e).__name__)
+        except Exception as e:
+            # Pillow also raises e.g. SyntaxError ("broken PNG file") on corrupt chunks
+            logger.error(f"Compression failed for {filename or 'image'}: {type(e).__name__}: {e}")
+            return file_bytes, _stats(original_size, original_size, str(e) or type(e).__name__)
+
+        if len(compressed) >= original_size:
+            compressed = None
+        _cache_put(key, compressed)
+
+    if compressed is None:
+        return file_bytes, _stats(original_size, original_size)
 
-    try:
-        # Send image to TinyPNG API
-        response = requests.post(
-            'https://api.tinify.com/shrink',
-            auth=('api', TINYPNG_API_KEY),
-            data=file_bytes,
-            timeout=60
-        )
-
-        if response.status_code == 201:
-            # Get the URL to download the compressed image
-            output_url = response.json().get('output', {}).get('url')
-            if output_url:
-                # Download the compressed image
-                compressed_response = requests.get(output_url, timeout=60)
-                if compressed_response.status_code == 200:
-                    compressed_bytes = compressed_response.content
-                    compressed_size = len(compressed_bytes)
-
-                    stats = {
-                        'original_size': original_size,
-                        'compressed_size': compressed_size,
-                        'ratio': compressed_size / original_size if original_size > 0 else 1,
-                        'saved_percent': round((1 - compressed_size / original_size) * 100, 1) if original_size > 0 else 0,
-                        'saved_bytes': original_size - compressed_size
-                    }
-
-                    print(f"TinyPNG: {filename or 'image'} compressed from {original_size} to {compressed_size} bytes ({stats['saved_percent']}% saved)")
-
-                    return compressed_bytes, stats
-
-        # If compression failed, return original
-        error_msg = response.json().get('message', 'Unknown error') if response.content else 'No response'
-        print(f"TinyPNG compression failed for {filename or 'image'}: {error_msg}")
-        return file_bytes, {
-            'original_size': original_size,
-            'compressed_size': original_size,
-            'ratio': 1,
-            'saved_percent': 0,
-            'saved_bytes': 0,
-            'error': error_msg
-        }
-
-    except requests.RequestException as e:
-        print(f"TinyPNG request error for {filename or 'image'}: {e}")
-        return file_bytes, {
-            'original_size': original_size,
-            'compressed_size': original_size,
-            'ratio': 1,
-            'saved_percent': 0,
-            'saved_bytes': 0,
-            'error': str(e)
-        }
+    stats = _stats(original_size, len(compressed))
+    logger.info(f"{filename or 'image'} compressed from {original_size} to {len(compressed)} bytes "
+                f"({stats['saved_percent']}% saved{', cached' if hit else ''})")
+    return compressed, stats
 
 
 def compress_if_image(file_bytes: bytes, filename: str, mime_type: str) -> tuple[bytes, dict | None]:
     """
-    Compress the file if it's a compressible image and over 500KB, otherwise return as-is.
+    Compress the file if it's a compressible image over MIN_SIZE_FOR_COMPRESSION, otherwise return as-is.
 
     Args:
         file_bytes: File content
@@ -108,12 +245,12 @@ def compress_if_image(file_bytes: bytes, filename: str, mime_type: str) -> tuple
 
     Returns:
         Tuple of (file_bytes, stats_or_none)
-        stats is None if file was not compressed (not an image or under 500KB)
+        stats is None if file was not compressed (not an image or under the threshold)
     """
     if is_compressible_image(mime_type):
         file_size = len(file_bytes)
         if file_size < MIN_SIZE_FOR_COMPRESSION:
-            print(f"Skipping TinyPNG for {filename or 'image'}: {file_size} bytes is under 500KB threshold")
+            logger.debug(f"Skipping compression for {filename or 'image'}: {file_size} bytes is under threshold")
             return file_bytes, None
         return compress_image(file_bytes, filename)
     return file_bytes, None
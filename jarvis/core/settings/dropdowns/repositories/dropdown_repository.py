@@ -86,11 +86,11 @@ class DropdownRepository(BaseRepository):
             if dropdown_type:
                 with lock:
                     entry = _options_cache.get(dropdown_type)
-                    if entry and _is_cache_valid(entry):
+                    if _is_cache_valid(entry or {}, 'dropdown_options'):
                         return entry['data']
             else:
                 with lock:
-                    if _is_cache_valid(_options_all_cache):
+                    if _is_cache_valid(_options_all_cache, 'dropdown_options'):
                         return _options_all_cache['data']
 
         query = 'SELECT * FROM dropdown_options WHERE 1=1'
@@ -37,13 +37,15 @@ class SignatureRepository(BaseRepository):
             (document_type, document_id),
         )
 
-    def get_pending_for_user(self, user_id):
-        """Get all pending signature requests for a user."""
+    def get_pending_for_user(self, user_id, sig_ids=None):
+        """Get all pending signature requests for a user (optionally only sig_ids)."""
+        id_filter = 'AND id = ANY(%s)' if sig_ids is not None else ''
+        params = (user_id, list(sig_ids)) if sig_ids is not None else (user_id,)
         return self.query_all(
-            '''SELECT * FROM document_signatures
-               WHERE signed_by = %s AND status = 'pending'
+            f'''SELECT * FROM document_signatures
+               WHERE signed_by = %s AND status = 'pending' {id_filter}
                ORDER BY created_at DESC''',
-            (user_id,),
+            params,
         )
 
     def update_status(self, sig_id, status):
@@ -68,3 +70,32 @@ class SignatureRepository(BaseRepository):
             (signature_image, signed_pdf_path, document_hash,
              ip_address, sig_id),
         )
+
+    def save_signed_many(self, signed, signature_image, ip_address):
+        """Save a batch of completed signatures in one statement.
+
+        Args:
+            signed: list of (sig_id, signed_pdf_path, document_hash)
+            signature_image: the signature image shared by the batch
+            ip_address: IP address of the signer
+
+        Returns:
+            IDs that were still pending and are now signed.
+        """
+        if not signed:
+            return []
+        ids, paths, hashes = (list(col) for col in zip(*signed))
+
+        def _work(cursor):
+            cursor.execute(
+                '''UPDATE document_signatures ds
+                   SET signature_image = %s, signed_pdf_path = v.path,
+                       document_hash = v.hash, ip_address = %s,
+                       status = 'signed', signed_at = CURRENT_TIMESTAMP,
+                       updated_at = CURRENT_TIMESTAMP
+                   FROM unnest(%s::int[], %s::text[], %s::text[]) AS v(id, path, hash)
+                   WHERE ds.id = v.id AND ds.status = 'pending'
+                   RETURNING ds.id''',
+                (signature_image, ip_address, ids, paths, hashes))
+            return [r['id'] for r in cursor.fetchall()]
+        return self.execute_many(_work)
@@ -106,6 +106,34 @@ def api_sign(sig_id):
         return jsonify({'success': False, 'error': 'Failed to process signature'}), 500
 
 
+@signatures_bp.route('/api/sign-batch', methods=['POST'])
+@login_required
+def api_sign_batch():
+    """Sign several of the current user's pending requests with one signature."""
+    data = request.get_json()
+    if not data or not data.get('signature_image'):
+        return jsonify({'success': False, 'error': 'signature_image required'}), 400
+
+    signature_ids = data.get('signature_ids')
+    if signature_ids is not None:
+        try:
+            signature_ids = [int(i) for i in signature_ids]
+        except (TypeError, ValueError):
+            return jsonify({'success': False, 'error': 'signature_ids must be a list of IDs'}), 400
+
+    try:
+        ip_address = request.headers.get('X-Forwarded-For', request.remote_addr)
+        result = _service.process_signatures_batch(
+            current_user.id, data['signature_image'], ip_address, signature_ids,
+        )
+        return jsonify({'success': True, **result})
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        logger.error(f'Failed to process batch signature: {e}')
+        return jsonify({'success': False, 'error': 'Failed to process signatures'}), 500
+
+
 @signatures_bp.route('/api/<int:sig_id>/reject', methods=['POST'])
 @login_required
 def api_reject(sig_id):
@@ -1,145 +1,151 @@
-"""PDF utilities for digital signatures — embed signature image + hash."""
+"""PDF utilities for digital signatures — stamp a signature image + hash.
+
+The signature is appended to the original PDF as an incremental update
+(PDF 32000-1 §7.5.6). The original bytes are copied through unchanged and
+followed by:
+- the signature image as a Flate-compressed RGB XObject, with its alpha
+  channel as a Flate-compressed /SMask
+- two small content streams that wrap the page's own content in q … Q and
+  draw the image bottom-right
+- a new revision of the last page object pointing at them
+- a cross-reference section (table or stream, matching the original) with
+  /Prev chained to the original one
+
+Stamping no longer re-serializes every page, so its cost is independent of
+the page count. The SHA-256 of the signed file is computed over the bytes as
+they are written, so callers don't read the output back to hash it.
+"""
 import base64
 import hashlib
 import io
 import logging
 import os
+import re
+import zlib
+from dataclasses import dataclass
+from typing import Optional
 
 from PIL import Image
 from PyPDF2 import PdfReader, PdfWriter
-from PyPDF2.generic import NameObject, ArrayObject, FloatObject
+from PyPDF2.generic import (
+    ArrayObject, DictionaryObject, IndirectObject, NameObject,
+    NumberObject, StreamObject,
+)
 
 logger = logging.getLogger('jarvis.core.signatures.pdf_utils')
 
+# Signature box (points) and its distance from the page's bottom-right corner
+SIG_MAX_WIDTH = 200
+SIG_MAX_HEIGHT = 80
+SIG_MARGIN = 40
 
-def embed_signature_image(original_pdf_path, base64_image, output_path):
-    """Embed a signature image on the last page of a PDF (bottom-right).
+_COPY_CHUNK = 64 * 1024
+_STARTXREF = re.compile(rb'startxref\s+(\d+)\s+%%EOF\s*$')
+_OBJ_HEADER = re.compile(rb'\s*\d+\s+\d+\s+obj\b')
 
-    Args:
-        original_pdf_path: Path to the original PDF file.
-        base64_image: Base64-encoded PNG signature image.
-        output_path: Path to write the signed PDF.
 
-    Returns:
-        output_path on success.
+@dataclass(frozen=True)
+class SignatureImage:
+    """A decoded, scaled signature ready to embed.
 
-    Raises:
-        FileNotFoundError: If original PDF doesn't exist.
-        ValueError: If base64_image is invalid.
+    rgb and alpha are Flate-compressed 8-bit samples; alpha is None when
+    the image is fully opaque.
     """
-    if not os.path.exists(original_pdf_path):
-        raise FileNotFoundError(f'PDF not found: {original_pdf_path}')
+    width: int
+    height: int
+    rgb: bytes
+    alpha: Optional[bytes]
+
+
+def prepare_signature_image(base64_image):
+    """Decode, scale and compress a base64 signature image.
 
-    # Decode signature image
+    Prepare once and pass the result to embed_signature_image() when the
+    same signature is stamped on several documents.
+
+    Raises:
+        ValueError: If base64_image is not a valid image.
+    """
     try:
         img_data = base64.b64decode(base64_image.split(',')[-1])
     except Exception as e:
         raise ValueError(f'Invalid base64 image: {e}')
+    try:
+        sig_img = Image.open(io.BytesIO(img_data))
+        sig_img.load()
+    except Exception as e:
+        raise ValueError(f'Invalid signature image: {e}')
 
-    sig_img = Image.open(io.BytesIO(img_data))
     if sig_img.mode != 'RGBA':
         sig_img = sig_img.convert('RGBA')
 
-    # Scale signature to reasonable size (max 200x80 points)
-    max_w, max_h = 200, 80
     w, h = sig_img.size
-    scale = min(max_w / w, max_h / h, 1.0)
-    sig_w = int(w * scale)
-    sig_h = int(h * scale)
+    scale = min(SIG_MAX_WIDTH / w, SIG_MAX_HEIGHT / h, 1.0)
+    sig_w = max(int(w * scale), 1)
+    sig_h = max(int(h * scale), 1)
     if scale < 1.0:
         sig_img = sig_img.resize((sig_w, sig_h), Image.LANCZOS)
 
-    reader = PdfReader(original_pdf_path)
-    writer = PdfWriter()
+    alpha = sig_img.getchannel('A')
+    opaque = alpha.getextrema() == (255, 255)
+    return SignatureImage(
+        width=sig_w,
+        height=sig_h,
+        rgb=zlib.compress(sig_img.convert('RGB').tobytes()),
+        alpha=None if opaque else zlib.compress(alpha.tobytes()),
+    )
 
-    # Copy all pages
-    for page in reader.pages:
-        writer.add_page(page)
 
-    # Get last page dimensions
-    last_page = writer.pages[-1]
-    page_w = float(last_page.mediabox.width)
-    page_h = float(last_page.mediabox.height)
+def embed_signature_image(original_pdf_path, signature, output_path):
+    """Stamp a signature image on the last page of a PDF (bottom-right).
 
-    # Create a small PDF with just the signature image using ReportLab-free approach
-    # We'll create an XObject image and add it to the last page
-    sig_pdf_buffer = _create_sig_overlay(sig_img, sig_w, sig_h, page_w, page_h)
+    Args:
+        original_pdf_path: Path to the original PDF file.
+        signature: Base64-encoded signature image, or a SignatureImage from
+            prepare_signature_image().
+        output_path: Path to write the signed PDF.
 
-    sig_reader = PdfReader(sig_pdf_buffer)
-    last_page.merge_page(sig_reader.pages[0])
+    Returns:
+        Hex SHA-256 of the signed PDF.
 
-    os.makedirs(os.path.dirname(output_path), exist_ok=True)
-    with open(output_path, 'wb') as f:
-        writer.write(f)
+    Raises:
+        FileNotFoundError: If original PDF doesn't exist.
+        ValueError: If the image is invalid or the PDF is encrypted.
+    """
+    if not os.path.exists(original_pdf_path):
+        raise FileNotFoundError(f'PDF not found: {original_pdf_path}')
+    if not isinstance(signature, SignatureImage):
+        signature = prepare_signature_image(signature)
 
-    logger.info(f'Signature embedded in PDF: {output_path}')
-    return output_path
-
-
-def _create_sig_overlay(sig_img, sig_w, sig_h, page_w, page_h):
-    """Create a single-page PDF containing just the signature image positioned bottom-right."""
-    # Save signature as PNG bytes
-    img_buffer = io.BytesIO()
-    sig_img.save(img_buffer, format='PNG')
-    img_buffer.seek(0)
-
-    # Position: bottom-right with 40pt margin
-    margin = 40
-    x = page_w - sig_w - margin
-    y = margin
-
-    # Build a minimal PDF with the image
-    # Using raw PDF construction since we don't have reportlab
-    from PyPDF2 import PdfWriter as PW
-    from PyPDF2.generic import (
-        DictionaryObject, NumberObject, StreamObject,
-        NameObject, ArrayObject,
-    )
+    reader = PdfReader(original_pdf_path)
+    if reader.is_encrypted:
+        raise ValueError(f'Cannot sign encrypted PDF: {original_pdf_path}')
+    xref = _last_xref(reader)
+    if xref is None or reader.pages[-1].indirect_reference is None:
+        # Broken cross-reference data: /Prev can't point at it, so rewrite
+        # the document once and append to the repaired copy
+        logger.warning(f'Rewriting PDF with unusable xref before signing: {original_pdf_path}')
+        buf = io.BytesIO()
+        writer = PdfWriter()
+        for page in reader.pages:
+            writer.add_page(page)
+        writer.write(buf)
+        reader = PdfReader(buf)
+        xref = _last_xref(reader)
 
-    overlay_writer = PW()
-    overlay_writer.add_blank_page(width=page_w, height=page_h)
-    page = overlay_writer.pages[0]
-
-    # Encode image as flate-compressed stream for inline embedding
-    img_bytes = img_buffer.getvalue()
-
-    # Create an image XObject
-    img_obj = StreamObject()
-    img_obj[NameObject('/Type')] = NameObject('/XObject')
-    img_obj[NameObject('/Subtype')] = NameObject('/Image')
-    img_obj[NameObject('/Width')] = NumberObject(sig_w)
-    img_obj[NameObject('/Height')] = NumberObject(sig_h)
-    img_obj[NameObject('/ColorSpace')] = NameObject('/DeviceRGB')
-    img_obj[NameObject('/BitsPerComponent')] = NumberObject(8)
-
-    # Convert RGBA to RGB bytes for PDF
-    rgb_img = sig_img.convert('RGB')
-    raw_data = rgb_img.tobytes()
-    img_obj._data = raw_data
-
-    # Add image as indirect object
-    img_ref = overlay_writer._add_object(img_obj)
-
-    # Create content stream that draws the image
-    content_stream = f'q {sig_w} 0 0 {sig_h} {x:.2f} {y:.2f} cm /SigImg Do Q'
-
-    # Get existing resources or create new
-    resources = page.get('/Resources', DictionaryObject())
-    if '/XObject' not in resources:
-        resources[NameObject('/XObject')] = DictionaryObject()
-    resources[NameObject('/XObject')][NameObject('/SigImg')] = img_ref
-    page[NameObject('/Resources')] = resources
-
-    # Set content stream
-    cs = StreamObject()
-    cs._data = content_stream.encode('latin-1')
-    cs_ref = overlay_writer._add_object(cs)
-    page[NameObject('/Contents')] = cs_ref
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    tmp_path = f'{output_path}.tmp'
+    try:
+        with open(tmp_path, 'wb') as f:
+            out = _HashingWriter(f)
+            _append_stamp(reader, xref, signature, out)
+        os.replace(tmp_path, output_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
 
-    buf = io.BytesIO()
-    overlay_writer.write(buf)
-    buf.seek(0)
-    return buf
+    logger.info(f'Signature embedded in PDF: {output_path}')
+    return out.hexdigest()
 
 
 def hash_pdf(pdf_path):
@@ -159,6 +165,213 @@ def hash_pdf(pdf_path):
 
     sha256 = hashlib.sha256()
     with open(pdf_path, 'rb') as f:
-        for chunk in iter(lambda: f.read(8192), b''):
+        for chunk in iter(lambda: f.read(_COPY_CHUNK), b''):
             sha256.update(chunk)
     return sha256.hexdigest()
+
+
+# ── Incremental update ──
+
+class _HashingWriter:
+    """File wrapper that hashes and counts everything written through it."""
+
+    def __init__(self, raw):
+        self._raw = raw
+        self._sha256 = hashlib.sha256()
+        self._pos = 0
+
+    def write(self, data):
+        self._raw.write(data)
+        self._sha256.update(data)
+        self._pos += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._pos
+
+    def hexdigest(self):
+        return self._sha256.hexdigest()
+
+
+def _last_xref(reader):
+    """(offset, 'table' | 'stream') of the file's last xref section, or None
+    if startxref does not point at one."""
+    data = reader.stream.getvalue()
+    match = _STARTXREF.search(data[-1024:])
+    if not match:
+        return None
+    offset = int(match.group(1))
+    section = data[offset:offset + 64]
+    if section.startswith(b'xref'):
+        return offset, 'table'
+    if _OBJ_HEADER.match(section):
+        return offset, 'stream'
+    return None
+
+
+def _next_object_number(reader):
+    """First object number not used by any revision of the file."""
+    used = [num for table in reader.xref.values() for num in table]
+    used += list(reader.xref_objStm)
+    size = dict.get(reader.trailer, '/Size')  # not kept for xref streams
+    return max(int(size or 0), max(used, default=0) + 1)
+
+
+def _image_stream(width, height, color_space, data):
+    img = StreamObject()
+    img[NameObject('/Type')] = NameObject('/XObject')
+    img[NameObject('/Subtype')] = NameObject('/Image')
+    img[NameObject('/Width')] = NumberObject(width)
+    img[NameObject('/Height')] = NumberObject(height)
+    img[NameObject('/ColorSpace')] = NameObject(color_space)
+    img[NameObject('/BitsPerComponent')] = NumberObject(8)
+    img[NameObject('/Filter')] = NameObject('/FlateDecode')
+    img._data = data
+    return img
+
+
+def _content_stream(content):
+    cs = StreamObject()
+    cs._data = content.encode('latin-1')
+    return cs
+
+
+def _page_resources(page):
+    """The page's /Resources, following inheritance from the page tree."""
+    node = page
+    while '/Resources' not in node and '/Parent' in node:
+        node = node['/Parent']
+    return node['/Resources'] if '/Resources' in node else DictionaryObject()
+
+
+def _append_stamp(reader, xref, signature, out):
+    prev_offset, xref_kind = xref
+    page = reader.pages[-1]
+    page_ref = page.indirect_reference
+    next_num = _next_object_number(reader)
+
+    def ref(num):
+        return IndirectObject(num, 0, reader)
+
+    # New objects: image (+ alpha mask), open/stamp content streams
+    objects = {}
+    img_num = next_num
+    img = _image_stream(signature.width, signature.height, '/DeviceRGB', signature.rgb)
+    if signature.alpha is not None:
+        mask_num = img_num + 1
+        objects[mask_num] = _image_stream(
+            signature.width, signature.height, '/DeviceGray', signature.alpha)
+        img[NameObject('/SMask')] = ref(mask_num)
+    objects[img_num] = img
+    open_num = max(objects) + 1
+    stamp_num = open_num + 1
+
+    resources = DictionaryObject(dict.items(_page_resources(page)))
+    xobjects = DictionaryObject(
+        dict.items(resources['/XObject']) if '/XObject' in resources else ())
+    name = '/JarvisSig'
+    while name in xobjects:
+        name += '_'
+    xobjects[NameObject(name)] = ref(img_num)
+    resources[NameObject('/XObject')] = xobjects
+
+    box = page.mediabox
+    x = float(box.left) + float(box.width) - signature.width - SIG_MARGIN
+    y = float(box.bottom) + SIG_MARGIN
+    objects[open_num] = _content_stream('q\n')
+    objects[stamp_num] = _content_stream(
+        f'\nQ q {signature.width} 0 0 {signature.height} {x:.2f} {y:.2f} cm {name} Do Q\n')
+
+    contents = []
+    if '/Contents' in page:
+        existing = page['/Contents']
+        if isinstance(existing, ArrayObject):
+            contents = list(existing)
+        else:
+            contents = [dict.get(page, '/Contents')]
+    new_page = DictionaryObject(dict.items(page))
+    new_page[NameObject('/Resources')] = resources
+    new_page[NameObject('/Contents')] = ArrayObject([ref(open_num), *contents, ref(stamp_num)])
+
+    # Original revision, byte for byte
+    source = reader.stream.getbuffer()
+    for start in range(0, len(source), _COPY_CHUNK):
+        out.write(bytes(source[start:start + _COPY_CHUNK]))
+    if not source or source[-1:] not in (b'\n', b'\r'):
+        out.write(b'\n')
+
+    offsets = {}
+    for num in sorted(objects):
+        offsets[num] = (out.tell(), 0)
+        _write_object(out, num, 0, objects[num])
+    offsets[page_ref.idnum] = (out.tell(), page_ref.generation)
+    _write_object(out, page_ref.idnum, page_ref.generation, new_page)
+
+    trailer = DictionaryObject()
+    for key in ('/Root', '/Info', '/ID'):
+        if key in reader.trailer:
+            trailer[NameObject(key)] = dict.get(reader.trailer, key)
+    trailer[NameObject('/Prev')] = NumberObject(prev_offset)
+
+    if xref_kind == 'stream':
+        _write_xref_stream(out, offsets, trailer, stamp_num + 1)
+    else:
+        _write_xref_table(out, offsets, trailer, stamp_num + 1)
+
+
+def _write_object(out, num, generation, obj):
+    out.write(f'{num} {generation} obj\n'.encode())
+    obj.write_to_stream(out, None)
+    out.write(b'\nendobj\n')
+
+
+def _subsections(nums):
+    """Split sorted object numbers into runs of consecutive numbers."""
+    runs = []
+    for num in nums:
+        if runs and num == runs[-1][-1] + 1:
+            runs[-1].append(num)
+        else:
+            runs.append([num])
+    return runs
+
+
+def _write_xref_table(out, offsets, trailer, size):
+    xref_offset = out.tell()
+    # Object 0 heads the free list; some readers expect every section to start with it
+    lines = ['xref\n', '0 1\n', '0000000000 65535 f\r\n']
+    for run in _subsections(sorted(offsets)):
+        lines.append(f'{run[0]} {len(run)}\n')
+        for num in run:
+            offset, generation = offsets[num]
+            lines.append(f'{offset:010d} {generation:05d} n\r\n')
+    out.write(''.join(lines).encode())
+    trailer[NameObject('/Size')] = NumberObject(size)
+    out.write(b'trailer\n')
+    trailer.write_to_stream(out, None)
+    out.write(f'\nstartxref\n{xref_offset}\n%%EOF\n'.encode())
+
+
+def _write_xref_stream(out, offsets, trailer, xref_num):
+    """Cross-reference stream (§7.5.8) for files whose original xref is one."""
+    xref_offset = out.tell()
+    offsets = dict(offsets)
+    offsets[xref_num] = (xref_offset, 0)
+    width = max((xref_offset.bit_length() + 7) // 8, 1)
+    index = []
+    rows = []
+    for run in _subsections(sorted(offsets)):
+        index += [NumberObject(run[0]), NumberObject(len(run))]
+        for num in run:
+            offset, generation = offsets[num]
+            rows.append(b'\x01' + offset.to_bytes(width, 'big') + generation.to_bytes(2, 'big'))
+
+    stream = StreamObject()
+    stream.update(trailer)
+    stream[NameObject('/Type')] = NameObject('/XRef')
+    stream[NameObject('/Size')] = NumberObject(xref_num + 1)
+    stream[NameObject('/Index')] = ArrayObject(index)
+    stream[NameObject('/W')] = ArrayObject([NumberObject(1), NumberObject(width), NumberObject(2)])
+    stream._data = b''.join(rows)
+    _write_object(out, xref_num, 0, stream)
+    out.write(f'startxref\n{xref_offset}\n%%EOF\n'.encode())
@@ -3,7 +3,9 @@ import logging
 import os
 
 from core.signatures.repositories import SignatureRepository
-from core.signatures.services.pdf_utils import embed_signature_image, hash_pdf
+from core.signatures.services.pdf_utils import (
+    embed_signature_image, hash_pdf, prepare_signature_image,
+)
 
 logger = logging.getLogger('jarvis.core.signatures.signature_service')
 
@@ -65,20 +67,7 @@ class SignatureService:
                 f'Signature {signature_id} is {sig["status"]}, expected pending'
             )
 
-        signed_pdf_path = None
-        document_hash = None
-
-        # If there's an original PDF, embed the signature into it
-        if sig.get('original_pdf_path') and os.path.exists(sig['original_pdf_path']):
-            os.makedirs(SIGNED_PDF_DIR, exist_ok=True)
-            signed_pdf_path = os.path.join(
-                SIGNED_PDF_DIR,
-                f'signed_{sig["document_type"]}_{sig["document_id"]}_{signature_id}.pdf',
-            )
-            embed_signature_image(
-                sig['original_pdf_path'], base64_image, signed_pdf_path,
-            )
-            document_hash = hash_pdf(signed_pdf_path)
+        signed_pdf_path, document_hash = self._stamp(sig, base64_image)
 
         self._repo.save_signed(
             signature_id, base64_image, signed_pdf_path,
@@ -92,6 +81,67 @@ class SignatureService:
         )
         return updated
 
+    def process_signatures_batch(self, signer_id, base64_image, ip_address,
+                                 signature_ids=None):
+        """Sign many pending requests of one signer with the same signature.
+
+        The image is decoded and compressed once for the whole batch, and all
+        completed requests are saved in one statement.
+
+        Args:
+            signer_id: User ID of the signer; only their pending requests are signed.
+            base64_image: Base64-encoded PNG of the drawn signature.
+            ip_address: IP address of the signer.
+            signature_ids: Optional IDs to sign; defaults to all pending requests.
+
+        Returns:
+            dict with 'signed' (IDs) and 'failed' ([{id, error}]).
+
+        Raises:
+            ValueError: If the signature image is invalid.
+        """
+        signature = prepare_signature_image(base64_image)
+        pending = self._repo.get_pending_for_user(signer_id, signature_ids)
+
+        stamped = []
+        failed = []
+        for sig in pending:
+            try:
+                stamped.append((sig['id'], *self._stamp(sig, signature)))
+            except Exception as e:
+                logger.error(f'Failed to stamp signature {sig["id"]}: {e}')
+                failed.append({'id': sig['id'], 'error': str(e)})
+
+        signed = self._repo.save_signed_many(stamped, base64_image, ip_address)
+        done = set(signed) | {f['id'] for f in failed}
+        for sig_id in signature_ids or ():
+            if sig_id not in done:
+                failed.append({'id': sig_id, 'error': 'Not pending for this signer'})
+
+        logger.info(
+            f'Batch signature by user {signer_id} from {ip_address}: '
+            f'{len(signed)} signed, {len(failed)} failed'
+        )
+        return {'signed': signed, 'failed': failed}
+
+    def _stamp(self, sig, signature):
+        """Embed the signature into the request's PDF, if it has one.
+
+        Returns:
+            (signed_pdf_path, document_hash), both None without a PDF.
+        """
+        if not sig.get('original_pdf_path') or not os.path.exists(sig['original_pdf_path']):
+            return None, None
+        os.makedirs(SIGNED_PDF_DIR, exist_ok=True)
+        signed_pdf_path = os.path.join(
+            SIGNED_PDF_DIR,
+            f'signed_{sig["document_type"]}_{sig["document_id"]}_{sig["id"]}.pdf',
+        )
+        document_hash = embed_signature_image(
+            sig['original_pdf_path'], signature, signed_pdf_path,
+        )
+        return signed_pdf_path, document_hash
+
     def get_status(self, signature_id):
         """Get the current status of a signature request."""
         sig = self._repo.get_by_id(signature_id)
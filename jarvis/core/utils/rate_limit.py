@@ -0,0 +1,88 @@
+"""Shared sliding-window rate limiter, backed by PostgreSQL.
+
+RateLimiter in api_helpers keeps a timestamp list per key in each process:
+every Gunicorn worker counts separately and keys are never evicted.
+SharedRateLimiter counts in rate_limit_counters instead, so all workers see
+the same totals, and keeps two fixed buckets per key rather than every
+timestamp. The sliding window is approximated as
+
+    previous_bucket * (1 - elapsed_fraction) + current_bucket
+
+Every attempt is counted, including rejected ones, so a client that keeps
+retrying stays limited. Buckets expire after two windows and are deleted by
+the purge_rate_limit_counters job.
+
+A check that cannot reach the database fails open — the request it guards
+needs the database too.
+"""
+
+import logging
+import math
+import time
+
+from core.base_repository import BaseRepository
+
+logger = logging.getLogger('jarvis.core.utils.rate_limit')
+
+
+class RateLimitRepository(BaseRepository):
+    """Bucket counters in rate_limit_counters."""
+
+    def hit(self, scope, key, bucket, window_seconds):
+        """Count one attempt in `bucket`. Returns (current_hits, previous_hits)."""
+        row = self.execute('''
+            WITH cur AS (
+                INSERT INTO rate_limit_counters (scope, key, bucket, hits, expires_at)
+                VALUES (%(scope)s, %(key)s, %(bucket)s, 1,
+                        NOW() + make_interval(secs => %(ttl)s))
+                ON CONFLICT (scope, key, bucket)
+                DO UPDATE SET hits = rate_limit_counters.hits + 1
+                RETURNING hits
+            )
+            SELECT cur.hits AS current,
+                   COALESCE((SELECT hits FROM rate_limit_counters
+                             WHERE scope = %(scope)s AND key = %(key)s
+                               AND bucket = %(bucket)s - 1), 0) AS previous
+            FROM cur
+        ''', {'scope': scope, 'key': key, 'bucket': bucket, 'ttl': 2 * window_seconds},
+            returning=True)
+        return row['current'], row['previous']
+
+    def purge_expired(self):
+        """Delete buckets that can no longer affect a window."""
+        return self.execute('DELETE FROM rate_limit_counters WHERE expires_at < NOW()')
+
+
+class SharedRateLimiter:
+    """Per-key limit of `max_requests` per `window_seconds`, across workers.
+
+    Same interface as api_helpers.RateLimiter:
+
+        limiter = SharedRateLimiter('forms_public_submit', 5, 60)
+        allowed, retry_after = limiter.is_allowed(ip)
+    """
+
+    def __init__(self, scope, max_requests, window_seconds, repo=None):
+        self.scope = scope
+        self.max_requests = max_requests
+        self.window_seconds = window_seconds
+        self._repo = repo or RateLimitRepository()
+
+    def is_allowed(self, key):
+        """Record an attempt for `key`.
+
+        Returns:
+            (is_allowed: bool, retry_after: int) tuple
+        """
+        now = time.time()
+        bucket, offset = divmod(now, self.window_seconds)
+        try:
+            current, previous = self._repo.hit(self.scope, str(key), int(bucket), self.window_seconds)
+        except Exception as e:
+            logger.warning(f'Rate limit check failed for {self.scope}, allowing: {e}')
+            return True, 0
+
+        elapsed = offset / self.window_seconds
+        if previous * (1 - elapsed) + current <= self.max_requests:
+            return True, 0
+        return False, max(1, math.ceil(self.window_seconds - offset))
@@ -1,12 +1,15 @@
 import os
 import logging
 import threading
+import time
 from contextlib import contextmanager
 
 import psycopg2
 from psycopg2 import pool
 from psycopg2.extras import RealDictCursor
 
+from core.metrics import Counter, Gauge, Histogram
+
 
 # Configure module logger
 logger = logging.getLogger('jarvis.database')
@@ -29,6 +32,20 @@ POOL_MAX_CONN = int(os.environ.get('DB_POOL_MAX_CONN', '15'))
 POOL_GETCONN_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', '10'))
 
 
+def _pool_connections():
+    if _connection_pool is None:
+        return {}
+    return {('in_use',): len(_connection_pool._used), ('idle',): len(_connection_pool._pool)}
+
+
+POOL_CONNECTIONS = Gauge('jarvis_db_pool_connections', 'Pooled connections by state (all processes)',
+                         ['state'], function=_pool_connections)
+POOL_MAX_CONNECTIONS = Gauge('jarvis_db_pool_max_connections', 'Pool capacity (all processes)',
+                             function=lambda: POOL_MAX_CONN)
+POOL_WAIT_SECONDS = Histogram('jarvis_db_pool_wait_seconds', 'Time spent waiting for a pooled connection')
+POOL_TIMEOUTS = Counter('jarvis_db_pool_timeouts_total', 'Connection requests that hit DB_POOL_TIMEOUT')
+
+
 def _get_pool():
     """Get or create the connection pool (lazy initialization, thread-safe)."""
     global _connection_pool
@@ -67,11 +84,14 @@ def _getconn_with_timeout(timeout=None):
         except Exception as e:
             error[0] = e
 
+    started = time.perf_counter()
     t = threading.Thread(target=_get, daemon=True)
     t.start()
     t.join(timeout=timeout)
+    POOL_WAIT_SECONDS.observe(time.perf_counter() - started)
 
     if t.is_alive():
+        POOL_TIMEOUTS.inc()
         raise psycopg2.OperationalError(
             f"Connection pool exhausted — timed out after {timeout}s waiting for available connection"
         )
@@ -193,7 +213,6 @@ def ping_db():
 
     Returns True if successful, False otherwise.
     """
-    import time
     now = time.time()
     if _ping_cache['ok'] and (now - _ping_cache['ts']) < 5:
         return True
@@ -750,6 +769,22 @@ def init_db():
                     END IF;
                 END $$;
             ''')
+            # AI: per-message content_tokens (context window selection in SQL)
+            cursor.execute('''
+                DO $$
+                BEGIN
+                    IF EXISTS (SELECT 1 FROM information_schema.schemata WHERE schema_name = 'ai_agent')
+                       AND NOT EXISTS (SELECT 1 FROM information_schema.columns
+                                       WHERE table_schema = 'ai_agent'
+                                       AND table_name = 'messages'
+                                       AND column_name = 'content_tokens') THEN
+                        ALTER TABLE ai_agent.messages ADD COLUMN content_tokens INTEGER;
+                        UPDATE ai_agent.messages SET content_tokens = GREATEST(1, length(content) / 3);
+                        CREATE INDEX IF NOT EXISTS idx_messages_conversation_recent
+                            ON ai_agent.messages(conversation_id, created_at DESC, id DESC);
+                    END IF;
+                END $$;
+            ''')
             # ── Bilant (Balance Sheet) Generator tables ──
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS bilant_templates (
@@ -1793,9 +1828,79 @@ def init_db():
             ''')
             cursor.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_biostar_punch_dedup
                 ON biostar_punch_logs(biostar_event_id, (event_datetime::date))''')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_biostar_punch_user ON biostar_punch_logs(biostar_user_id)')
+            # (user, time) serves per-user day/range lookups; supersedes idx_biostar_punch_user
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_biostar_punch_user_datetime
+                ON biostar_punch_logs(biostar_user_id, event_datetime)''')
+            cursor.execute('DROP INDEX IF EXISTS idx_biostar_punch_user')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_biostar_punch_datetime ON biostar_punch_logs(event_datetime)')
 
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS biostar_daily_adjustments (
+                    id SERIAL PRIMARY KEY,
+                    biostar_user_id VARCHAR(50) NOT NULL,
+                    date DATE NOT NULL,
+                    original_first_punch TIMESTAMP,
+                    original_last_punch TIMESTAMP,
+                    original_duration_seconds NUMERIC,
+                    adjusted_first_punch TIMESTAMP,
+                    adjusted_last_punch TIMESTAMP,
+                    adjusted_duration_seconds NUMERIC,
+                    schedule_start TIME,
+                    schedule_end TIME,
+                    lunch_break_minutes INTEGER,
+                    working_hours NUMERIC(4,1),
+                    deviation_minutes_in INTEGER,
+                    deviation_minutes_out INTEGER,
+                    adjustment_type VARCHAR(20) NOT NULL DEFAULT 'manual',
+                    adjusted_by INTEGER REFERENCES users(id),
+                    notes TEXT,
+                    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    UNIQUE(biostar_user_id, date)
+                )
+            ''')
+
+            # Per-employee daily rollup (core/connectors/biostar/repositories/attendance_repository.py)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS biostar_daily_attendance (
+                    biostar_user_id VARCHAR(50) NOT NULL,
+                    day DATE NOT NULL,
+                    first_punch TIMESTAMP NOT NULL,
+                    last_punch TIMESTAMP NOT NULL,
+                    total_punches INTEGER NOT NULL,
+                    adjustment_id INTEGER,
+                    adjusted_first_punch TIMESTAMP,
+                    adjusted_last_punch TIMESTAMP,
+                    adjusted_duration_seconds NUMERIC,
+                    adjustment_type VARCHAR(20),
+                    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (biostar_user_id, day)
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_biostar_attendance_day ON biostar_daily_attendance(day)')
+            # First deploy: fill from existing punches (later rebuilds:
+            # scripts/rebuild_biostar_attendance.py)
+            cursor.execute('''
+                INSERT INTO biostar_daily_attendance
+                    (biostar_user_id, day, first_punch, last_punch, total_punches,
+                     adjustment_id, adjusted_first_punch, adjusted_last_punch,
+                     adjusted_duration_seconds, adjustment_type)
+                SELECT p.biostar_user_id, p.day, p.first_punch, p.last_punch, p.punches,
+                       adj.id, adj.adjusted_first_punch, adj.adjusted_last_punch,
+                       adj.adjusted_duration_seconds, adj.adjustment_type
+                FROM (
+                    SELECT biostar_user_id, event_datetime::date AS day,
+                           MIN(event_datetime) AS first_punch, MAX(event_datetime) AS last_punch,
+                           COUNT(*) AS punches
+                    FROM biostar_punch_logs
+                    GROUP BY biostar_user_id, event_datetime::date
+                ) p
+                LEFT JOIN biostar_daily_adjustments adj
+                    ON adj.biostar_user_id = p.biostar_user_id AND adj.date = p.day
+                WHERE NOT EXISTS (SELECT 1 FROM biostar_daily_attendance)
+                ON CONFLICT (biostar_user_id, day) DO NOTHING
+            ''')
+
             # ── Checkin locations ──
             cursor.execute('''
                 CREATE TABLE IF NOT EXISTS checkin_locations (
@@ -1814,6 +1919,245 @@ def init_db():
             ''')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_checkin_locations_active ON checkin_locations(is_active)')
 
+            # ── Approval inbox (materialised per-user queue) ──
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS approval_inbox (
+                    user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                    request_id INTEGER NOT NULL REFERENCES approval_requests(id) ON DELETE CASCADE,
+                    step_id INTEGER NOT NULL REFERENCES approval_steps(id) ON DELETE CASCADE,
+                    reason TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (user_id, request_id)
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_approval_inbox_request ON approval_inbox(request_id)')
+
+            # ── Digest unread counters (per user, channel) ──
+            cursor.execute('''
+                DO $$
+                BEGIN
+                    IF to_regclass('public.digest_channels') IS NOT NULL THEN
+                        CREATE TABLE IF NOT EXISTS digest_unread_counters (
+                            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+                            channel_id INTEGER NOT NULL REFERENCES digest_channels(id) ON DELETE CASCADE,
+                            unread_count INTEGER NOT NULL DEFAULT 0,
+                            counted_through_post_id INTEGER NOT NULL DEFAULT 0,
+                            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            PRIMARY KEY (user_id, channel_id)
+                        );
+                        CREATE INDEX IF NOT EXISTS idx_digest_unread_counters_channel
+                            ON digest_unread_counters(channel_id, user_id);
+                        CREATE INDEX IF NOT EXISTS idx_digest_posts_channel_id
+                            ON digest_posts(channel_id, id);
+                    END IF;
+                END $$;
+            ''')
+
+            # ── Forms: maintained submission_count, submission search document ──
+            cursor.execute('''
+                DO $$
+                BEGIN
+                    IF to_regclass('public.form_submissions') IS NOT NULL THEN
+                        IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                                       WHERE table_name = 'forms' AND column_name = 'submission_count') THEN
+                            ALTER TABLE forms ADD COLUMN submission_count INTEGER NOT NULL DEFAULT 0;
+                            UPDATE forms f SET submission_count = s.n
+                            FROM (SELECT form_id, COUNT(*) AS n FROM form_submissions GROUP BY form_id) s
+                            WHERE s.form_id = f.id;
+                        END IF;
+                        ALTER TABLE form_submissions ADD COLUMN IF NOT EXISTS search_text TEXT
+                            GENERATED ALWAYS AS (
+                                coalesce(respondent_name, '') || ' ' ||
+                                coalesce(respondent_email, '') || ' ' ||
+                                coalesce(respondent_phone, '') || ' ' ||
+                                coalesce(jsonb_path_query_array(answers,
+                                    'strict $.** ? ((@.type() == "string" && !(@ starts with "data:")) || @.type() == "number")'
+                                )::text, '')
+                            ) STORED;
+                        CREATE INDEX IF NOT EXISTS idx_form_submissions_form_id
+                            ON form_submissions(form_id, id);
+                        DROP INDEX IF EXISTS idx_form_submissions_form;
+                        CREATE INDEX IF NOT EXISTS idx_form_submissions_search_fts
+                            ON form_submissions USING GIN (to_tsvector('simple', search_text));
+                        BEGIN
+                            CREATE EXTENSION IF NOT EXISTS pg_trgm;
+                            CREATE INDEX IF NOT EXISTS idx_form_submissions_search_trgm
+                                ON form_submissions USING gin (search_text gin_trgm_ops);
+                        EXCEPTION WHEN OTHERS THEN NULL;
+                        END;
+                    END IF;
+                END $$;
+            ''')
+
+            # ── Form analytics aggregates ──
+            cursor.execute("""
+                DO $$
+                BEGIN
+                    IF to_regclass('public.forms') IS NOT NULL THEN
+                        CREATE TABLE IF NOT EXISTS form_option_counts (
+                            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+                            field_id TEXT NOT NULL,
+                            option TEXT NOT NULL,
+                            count INTEGER NOT NULL DEFAULT 0,
+                            PRIMARY KEY (form_id, field_id, option)
+                        );
+                        CREATE TABLE IF NOT EXISTS form_numeric_stats (
+                            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+                            field_id TEXT NOT NULL,
+                            count INTEGER NOT NULL DEFAULT 0,
+                            total DOUBLE PRECISION NOT NULL DEFAULT 0,
+                            min_value DOUBLE PRECISION,
+                            max_value DOUBLE PRECISION,
+                            PRIMARY KEY (form_id, field_id)
+                        );
+                        CREATE TABLE IF NOT EXISTS form_numeric_buckets (
+                            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+                            field_id TEXT NOT NULL,
+                            bucket DOUBLE PRECISION NOT NULL,
+                            count INTEGER NOT NULL DEFAULT 0,
+                            PRIMARY KEY (form_id, field_id, bucket)
+                        );
+                        CREATE TABLE IF NOT EXISTS form_daily_stats (
+                            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+                            day DATE NOT NULL,
+                            source TEXT NOT NULL,
+                            utm_source TEXT NOT NULL DEFAULT '',
+                            utm_medium TEXT NOT NULL DEFAULT '',
+                            utm_campaign TEXT NOT NULL DEFAULT '',
+                            submissions INTEGER NOT NULL DEFAULT 0,
+                            PRIMARY KEY (form_id, day, source, utm_source, utm_medium, utm_campaign)
+                        );
+                        CREATE TABLE IF NOT EXISTS form_status_counts (
+                            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+                            status TEXT NOT NULL,
+                            count INTEGER NOT NULL DEFAULT 0,
+                            PRIMARY KEY (form_id, status)
+                        );
+                    END IF;
+                END $$;
+            """)
+
+            # ── Shared rate limiter buckets ──
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS rate_limit_counters (
+                    scope TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    bucket BIGINT NOT NULL,
+                    hits INTEGER NOT NULL DEFAULT 0,
+                    expires_at TIMESTAMP NOT NULL,
+                    PRIMARY KEY (scope, key, bucket)
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_expires ON rate_limit_counters(expires_at)')
+
+            # ── Shared dashboard snapshots (core/mobile/repository.py) ──
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS dashboard_snapshots (
+                    key TEXT PRIMARY KEY,
+                    payload JSONB NOT NULL,
+                    version BIGINT NOT NULL DEFAULT 1,
+                    refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+
+            # ── Allocation responsible resolution (allocation_repository.RESPONSIBLE_USER_SQL) ──
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_lower_name ON users(LOWER(name))')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_allocations_unresolved_responsible
+                ON allocations(LOWER(responsible))
+                WHERE responsible_user_id IS NULL AND responsible IS NOT NULL
+            ''')
+
+            # ── Invoice parse cache ──
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS invoice_parse_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    content_sha256 TEXT NOT NULL,
+                    parser_version TEXT NOT NULL,
+                    result JSONB NOT NULL,
+                    size_bytes INTEGER NOT NULL,
+                    cost_usd NUMERIC(10,6) NOT NULL DEFAULT 0,
+                    hit_count INTEGER NOT NULL DEFAULT 0,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    last_hit_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_invoice_parse_cache_last_hit ON invoice_parse_cache(last_hit_at)')
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS invoice_parse_cache_stats (
+                    kind TEXT PRIMARY KEY,
+                    hits BIGINT NOT NULL DEFAULT 0,
+                    misses BIGINT NOT NULL DEFAULT 0,
+                    saved_usd NUMERIC(12,4) NOT NULL DEFAULT 0
+                )
+            ''')
+
+            # ── Bulk upload files (bulk parse jobs) ──
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS bulk_upload_files (
+                    id SERIAL PRIMARY KEY,
+                    batch_id TEXT NOT NULL,
+                    position INTEGER NOT NULL,
+                    filename TEXT NOT NULL,
+                    content BYTEA,
+                    size_bytes INTEGER NOT NULL DEFAULT 0,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    result JSONB,
+                    error TEXT,
+                    duplicate BOOLEAN NOT NULL DEFAULT FALSE,
+                    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    finished_at TIMESTAMP
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_bulk_upload_files_batch ON bulk_upload_files(batch_id, position)')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_bulk_upload_files_created ON bulk_upload_files(created_at)')
+
+            # ── BNR exchange rates (currency_converter) ──
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS bnr_exchange_rates (
+                    currency TEXT NOT NULL,
+                    rate_date DATE NOT NULL,
+                    rate NUMERIC(14,6) NOT NULL,
+                    fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (currency, rate_date)
+                )
+            ''')
+
+            # ── Background job queue (core/jobs) ──
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id BIGSERIAL PRIMARY KEY,
+                    task TEXT NOT NULL,
+                    payload JSONB NOT NULL DEFAULT '{}'::JSONB,
+                    status TEXT NOT NULL DEFAULT 'queued',
+                    priority INTEGER NOT NULL DEFAULT 0,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    max_attempts INTEGER NOT NULL DEFAULT 3,
+                    timeout_seconds INTEGER NOT NULL DEFAULT 600,
+                    run_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    dedupe_key TEXT,
+                    progress JSONB,
+                    result JSONB,
+                    last_error TEXT,
+                    locked_by TEXT,
+                    locked_at TIMESTAMP,
+                    heartbeat_at TIMESTAMP,
+                    created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+                    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    started_at TIMESTAMP,
+                    finished_at TIMESTAMP,
+                    CONSTRAINT jobs_status_check CHECK (status IN (
+                        'queued', 'running', 'succeeded', 'failed', 'cancelled'
+                    ))
+                )
+            ''')
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(priority DESC, run_at, id) WHERE status = 'queued'")
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key) WHERE status IN ('queued', 'running')")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_running ON jobs(heartbeat_at) WHERE status = 'running'")
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_task_created ON jobs(task, created_at DESC)')
+
             conn.commit()
             logger.info('Database schema already initialized — skipping init_db()')
             return
@@ -1974,9 +2318,77 @@ def init_db():
             ''')
             cursor.execute('''CREATE UNIQUE INDEX IF NOT EXISTS idx_biostar_punch_dedup
                 ON biostar_punch_logs(biostar_event_id, (event_datetime::date))''')
-            cursor.execute('CREATE INDEX IF NOT EXISTS idx_biostar_punch_user ON biostar_punch_logs(biostar_user_id)')
+            cursor.execute('''CREATE INDEX IF NOT EXISTS idx_biostar_punch_user_datetime
+                ON biostar_punch_logs(biostar_user_id, event_datetime)''')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_biostar_punch_datetime ON biostar_punch_logs(event_datetime)')
 
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS biostar_daily_adjustments (
+                    id SERIAL PRIMARY KEY,
+                    biostar_user_id VARCHAR(50) NOT NULL,
+                    date DATE NOT NULL,
+                    original_first_punch TIMESTAMP,
+                    original_last_punch TIMESTAMP,
+                    original_duration_seconds NUMERIC,
+                    adjusted_first_punch TIMESTAMP,
+                    adjusted_last_punch TIMESTAMP,
+                    adjusted_duration_seconds NUMERIC,
+                    schedule_start TIME,
+                    schedule_end TIME,
+                    lunch_break_minutes INTEGER,
+                    working_hours NUMERIC(4,1),
+                    deviation_minutes_in INTEGER,
+                    deviation_minutes_out INTEGER,
+                    adjustment_type VARCHAR(20) NOT NULL DEFAULT 'manual',
+                    adjusted_by INTEGER REFERENCES users(id),
+                    notes TEXT,
+                    created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    UNIQUE(biostar_user_id, date)
+                )
+            ''')
+
+            # Per-employee daily rollup (core/connectors/biostar/repositories/attendance_repository.py)
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS biostar_daily_attendance (
+                    biostar_user_id VARCHAR(50) NOT NULL,
+                    day DATE NOT NULL,
+                    first_punch TIMESTAMP NOT NULL,
+                    last_punch TIMESTAMP NOT NULL,
+                    total_punches INTEGER NOT NULL,
+                    adjustment_id INTEGER,
+                    adjusted_first_punch TIMESTAMP,
+                    adjusted_last_punch TIMESTAMP,
+                    adjusted_duration_seconds NUMERIC,
+                    adjustment_type VARCHAR(20),
+                    updated_at TIMESTAMP NOT NULL DEFAULT NOW(),
+                    PRIMARY KEY (biostar_user_id, day)
+                )
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_biostar_attendance_day ON biostar_daily_attendance(day)')
+            # First deploy: fill from existing punches (later rebuilds:
+            # scripts/rebuild_biostar_attendance.py)
+            cursor.execute('''
+                INSERT INTO biostar_daily_attendance
+                    (biostar_user_id, day, first_punch, last_punch, total_punches,
+                     adjustment_id, adjusted_first_punch, adjusted_last_punch,
+                     adjusted_duration_seconds, adjustment_type)
+                SELECT p.biostar_user_id, p.day, p.first_punch, p.last_punch, p.punches,
+                       adj.id, adj.adjusted_first_punch, adj.adjusted_last_punch,
+                       adj.adjusted_duration_seconds, adj.adjustment_type
+                FROM (
+                    SELECT biostar_user_id, event_datetime::date AS day,
+                           MIN(event_datetime) AS first_punch, MAX(event_datetime) AS last_punch,
+                           COUNT(*) AS punches
+                    FROM biostar_punch_logs
+                    GROUP BY biostar_user_id, event_datetime::date
+                ) p
+                LEFT JOIN biostar_daily_adjustments adj
+                    ON adj.biostar_user_id = p.biostar_user_id AND adj.date = p.day
+                WHERE NOT EXISTS (SELECT 1 FROM biostar_daily_attendance)
+                ON CONFLICT (biostar_user_id, day) DO NOTHING
+            ''')
+
             conn.commit()
             logger.info('Incremental migration complete')
             return
@@ -1,6 +1,9 @@
 """Repository for digest module — channels, posts, reactions, polls."""
 
 from core.base_repository import BaseRepository
+from digest.repositories.unread_repository import (
+    post_created_sql, post_deleted_sql, upsert_recount_sql,
+)
 
 
 class DigestRepository(BaseRepository):
@@ -8,22 +11,19 @@ class DigestRepository(BaseRepository):
     # ── Channels ─────────────────────────────────────────────
 
     def get_channels(self, user_id):
-        """Get all channels the user is a member of (or all public channels)."""
+        """Get all channels the user is a member of (or all public channels).
+
+        unread_count comes from digest_unread_counters (UnreadRepository.ensure
+        creates missing rows first).
+        """
         return self.query_all('''
             SELECT c.*, u.name AS created_by_name,
                    (SELECT COUNT(*) FROM digest_channel_members WHERE channel_id = c.id) AS member_count,
                    (SELECT COUNT(*) FROM digest_posts WHERE channel_id = c.id AND deleted_at IS NULL) AS post_count,
-                   COALESCE(
-                       (SELECT COUNT(*) FROM digest_posts p
-                        WHERE p.channel_id = c.id AND p.deleted_at IS NULL
-                          AND p.id > COALESCE(
-                              (SELECT last_read_post_id FROM digest_read_status
-                               WHERE channel_id = c.id AND user_id = %s), 0
-                          )
-                       ), 0
-                   ) AS unread_count
+                   COALESCE(uc.unread_count, 0) AS unread_count
             FROM digest_channels c
             LEFT JOIN users u ON u.id = c.created_by
+            LEFT JOIN digest_unread_counters uc ON uc.channel_id = c.id AND uc.user_id = %s
             WHERE c.deleted_at IS NULL
               AND (c.is_private = FALSE
                    OR EXISTS (SELECT 1 FROM digest_channel_members m
@@ -204,11 +204,19 @@ class DigestRepository(BaseRepository):
         ''', tuple(params), returning=True)
 
     def clear_channel_history(self, channel_id):
-        """Soft-delete all posts in a channel."""
-        return self.execute('''
-            UPDATE digest_posts SET deleted_at = CURRENT_TIMESTAMP
-            WHERE channel_id = %s AND deleted_at IS NULL
-        ''', (channel_id,))
+        """Soft-delete all posts in a channel (and zero its unread counters)."""
+        def _work(cursor):
+            cursor.execute('''
+                UPDATE digest_posts SET deleted_at = CURRENT_TIMESTAMP
+                WHERE channel_id = %s AND deleted_at IS NULL
+            ''', (channel_id,))
+            cleared = cursor.rowcount
+            cursor.execute('''
+                UPDATE digest_unread_counters SET unread_count = 0, updated_at = NOW()
+                WHERE channel_id = %s AND unread_count <> 0
+            ''', (channel_id,))
+            return cleared
+        return self.execute_many(_work)
 
     # ── Posts ────────────────────────────────────────────────
 
@@ -251,9 +259,14 @@ class DigestRepository(BaseRepository):
         ''', (post_id,))
 
     def create_post(self, channel_id, user_id, content, post_type='post', parent_id=None, reply_to_id=None):
-        return self.execute('''
-            INSERT INTO digest_posts (channel_id, user_id, content, type, parent_id, reply_to_id)
-            VALUES (%s, %s, %s, %s, %s, %s) RETURNING *
+        """Insert a post; private channels' unread counters are bumped in the
+        same statement (public channels: UnreadRepository.fan_out)."""
+        return self.execute(f'''
+            WITH new_post AS (
+                INSERT INTO digest_posts (channel_id, user_id, content, type, parent_id, reply_to_id)
+                VALUES (%s, %s, %s, %s, %s, %s) RETURNING *
+            ), unread AS ({post_created_sql('new_post')})
+            SELECT * FROM new_post
         ''', (channel_id, user_id, content, post_type, parent_id, reply_to_id), returning=True)
 
     def update_post(self, post_id, content):
@@ -263,8 +276,13 @@ class DigestRepository(BaseRepository):
         ''', (content, post_id), returning=True)
 
     def delete_post(self, post_id):
-        return self.execute('''
-            UPDATE digest_posts SET deleted_at = CURRENT_TIMESTAMP WHERE id = %s
+        return self.execute(f'''
+            WITH deleted AS (
+                UPDATE digest_posts SET deleted_at = CURRENT_TIMESTAMP
+                WHERE id = %s AND deleted_at IS NULL
+                RETURNING id, channel_id
+            ), unread AS ({post_deleted_sql('deleted')})
+            SELECT id FROM deleted
         ''', (post_id,))
 
     def toggle_pin(self, post_id):
@@ -361,26 +379,17 @@ class DigestRepository(BaseRepository):
     # ── Read Status ──────────────────────────────────────────
 
     def mark_read(self, channel_id, user_id, post_id):
-        return self.execute('''
-            INSERT INTO digest_read_status (channel_id, user_id, last_read_post_id, last_read_at)
-            VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
-            ON CONFLICT (channel_id, user_id)
-            DO UPDATE SET last_read_post_id = GREATEST(digest_read_status.last_read_post_id, EXCLUDED.last_read_post_id),
-                          last_read_at = CURRENT_TIMESTAMP
-        ''', (channel_id, user_id, post_id))
-
-    def get_unread_counts(self, user_id):
-        return self.query_all('''
-            SELECT c.id AS channel_id, c.name,
-                   COUNT(p.id) AS unread_count
-            FROM digest_channels c
-            LEFT JOIN digest_read_status rs ON rs.channel_id = c.id AND rs.user_id = %s
-            LEFT JOIN digest_posts p ON p.channel_id = c.id
-                AND p.deleted_at IS NULL
-                AND p.id > COALESCE(rs.last_read_post_id, 0)
-            WHERE c.deleted_at IS NULL
-              AND (c.is_private = FALSE
-                   OR EXISTS (SELECT 1 FROM digest_channel_members m WHERE m.channel_id = c.id AND m.user_id = %s))
-            GROUP BY c.id, c.name
-            HAVING COUNT(p.id) > 0
-        ''', (user_id, user_id))
+        """Advance the read position and recount the user's unread counter."""
+        def _work(cursor):
+            cursor.execute('''
+                INSERT INTO digest_read_status (channel_id, user_id, last_read_post_id, last_read_at)
+                VALUES (%s, %s, %s, CURRENT_TIMESTAMP)
+                ON CONFLICT (channel_id, user_id)
+                DO UPDATE SET last_read_post_id = GREATEST(digest_read_status.last_read_post_id, EXCLUDED.last_read_post_id),
+                              last_read_at = CURRENT_TIMESTAMP
+            ''', (channel_id, user_id, post_id))
+            updated = cursor.rowcount
+            cursor.execute(upsert_recount_sql('SELECT %s::int AS user_id, %s::int AS channel_id'),
+                           (user_id, channel_id))
+            return updated
+        return self.execute_many(_work)
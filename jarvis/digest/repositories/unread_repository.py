@@ -0,0 +1,200 @@
+"""Repository for digest_unread_counters — per-(user, channel) unread badge counts.
+
+One row per (user, channel) the user has looked at, holding the number of
+live posts newer than their digest_read_status.last_read_post_id. Badge and
+channel-list reads join it instead of counting digest_posts per channel.
+
+Rows are created on the user's first read (full count) and then kept current:
+- post created: +1 on every row of the channel — in the same statement for
+  private channels, in user_id batches by the digest_unread_fanout job for
+  public ones (their rows span every user who opened the digest)
+- post deleted: -1 where the reader had not read past it
+- history cleared: 0 for the channel
+- mark_read: recount from the new read position
+
+counted_through_post_id is the newest post a recount already included, so a
+fan-out that lands after a recount does not add the same post twice.
+reconcile() (reconcile_digest_unread job) repairs whatever drift is left.
+"""
+
+import logging
+from core.base_repository import BaseRepository
+
+logger = logging.getLogger('jarvis.digest.unread_repository')
+
+FANOUT_BATCH_SIZE = 1000
+
+# Channels visible to user %(user_id)s
+_VISIBLE_CHANNEL = '''
+    c.deleted_at IS NULL
+    AND (c.is_private = FALSE
+         OR EXISTS (SELECT 1 FROM digest_channel_members m
+                    WHERE m.channel_id = c.id AND m.user_id = %(user_id)s))
+'''
+
+
+def recount_sql(targets):
+    """SELECT of fresh counter rows for the (user_id, channel_id) pairs in `targets`."""
+    return f'''
+        SELECT t.user_id, t.channel_id,
+               (SELECT COUNT(*) FROM digest_posts p
+                WHERE p.channel_id = t.channel_id AND p.deleted_at IS NULL
+                  AND p.id > COALESCE(rs.last_read_post_id, 0)) AS unread_count,
+               COALESCE((SELECT MAX(p.id) FROM digest_posts p
+                         WHERE p.channel_id = t.channel_id), 0) AS counted_through_post_id
+        FROM ({targets}) t
+        LEFT JOIN digest_read_status rs ON rs.channel_id = t.channel_id AND rs.user_id = t.user_id
+    '''
+
+
+def upsert_recount_sql(targets):
+    """INSERT … ON CONFLICT replacing the counters of `targets` with a recount."""
+    return f'''
+        INSERT INTO digest_unread_counters (user_id, channel_id, unread_count, counted_through_post_id)
+        {recount_sql(targets)}
+        ON CONFLICT (user_id, channel_id) DO UPDATE SET
+            unread_count = EXCLUDED.unread_count,
+            counted_through_post_id = EXCLUDED.counted_through_post_id,
+            updated_at = NOW()
+    '''
+
+
+def post_created_sql(post):
+    """UPDATE adding one unread post to a private channel's counters.
+
+    `post` is a relation with the new post's id and channel_id (e.g. an
+    INSERT … RETURNING CTE). Public channels are left to fan_out().
+    """
+    return f'''
+        UPDATE digest_unread_counters uc
+        SET unread_count = uc.unread_count + 1, updated_at = NOW()
+        FROM {post} np
+        JOIN digest_channels c ON c.id = np.channel_id AND c.is_private = TRUE
+        WHERE uc.channel_id = np.channel_id AND uc.counted_through_post_id < np.id
+    '''
+
+
+def post_deleted_sql(post):
+    """UPDATE removing a deleted post from the counters of readers behind it."""
+    return f'''
+        UPDATE digest_unread_counters uc
+        SET unread_count = GREATEST(uc.unread_count - 1, 0), updated_at = NOW()
+        FROM {post} dp
+        WHERE uc.channel_id = dp.channel_id
+          AND NOT EXISTS (
+              SELECT 1 FROM digest_read_status rs
+              WHERE rs.channel_id = uc.channel_id AND rs.user_id = uc.user_id
+                AND rs.last_read_post_id >= dp.id
+          )
+    '''
+
+
+class UnreadRepository(BaseRepository):
+
+    def ensure(self, user_id):
+        """Create missing counter rows for the channels the user can see."""
+        return self.execute(self._ENSURE_SQL, {'user_id': user_id})
+
+    def get_counts(self, user_id):
+        """Channels with unread posts for the user: [{channel_id, name, unread_count}]."""
+        def _work(cursor):
+            cursor.execute(self._ENSURE_SQL, {'user_id': user_id})
+            cursor.execute(f'''
+                SELECT c.id AS channel_id, c.name, uc.unread_count
+                FROM digest_unread_counters uc
+                JOIN digest_channels c ON c.id = uc.channel_id
+                WHERE uc.user_id = %(user_id)s AND uc.unread_count > 0
+                  AND {_VISIBLE_CHANNEL}
+            ''', {'user_id': user_id})
+            return [dict(r) for r in cursor.fetchall()]
+        return self.execute_many(_work)
+
+    def fan_out(self, channel_id, post_id, batch_size=FANOUT_BATCH_SIZE):
+        """Add a new public-channel post to every counter row, batch by batch.
+
+        Each batch is its own short transaction. Stops early if the post was
+        deleted meanwhile. Returns the number of rows updated.
+        """
+        updated = 0
+        after_user_id = 0
+        while True:
+            rows = self.execute_many(lambda cursor: self._fan_out_batch(
+                cursor, channel_id, post_id, after_user_id, batch_size))
+            updated += len(rows)
+            if len(rows) < batch_size:
+                return updated
+            after_user_id = max(rows)
+
+    @staticmethod
+    def _fan_out_batch(cursor, channel_id, post_id, after_user_id, batch_size):
+        cursor.execute('''
+            WITH batch AS (
+                SELECT user_id FROM digest_unread_counters
+                WHERE channel_id = %(channel_id)s AND user_id > %(after)s
+                  AND counted_through_post_id < %(post_id)s
+                ORDER BY user_id
+                LIMIT %(limit)s
+            )
+            UPDATE digest_unread_counters uc
+            SET unread_count = uc.unread_count + 1, updated_at = NOW()
+            FROM batch
+            WHERE uc.channel_id = %(channel_id)s AND uc.user_id = batch.user_id
+              AND EXISTS (SELECT 1 FROM digest_posts
+                          WHERE id = %(post_id)s AND deleted_at IS NULL)
+            RETURNING uc.user_id
+        ''', {'channel_id': channel_id, 'post_id': post_id,
+              'after': after_user_id, 'limit': batch_size})
+        return [r['user_id'] for r in cursor.fetchall()]
+
+    def reconcile(self, since_minutes=None):
+        """Recount counters and fix the ones that drifted.
+
+        Args:
+            since_minutes: only channels with posts created or deleted in the
+                last N minutes; None checks every counter.
+
+        Returns:
+            dict with 'corrected' and 'removed' row counts
+        """
+        scope = ''
+        params = ()
+        if since_minutes:
+            scope = '''
+                WHERE channel_id IN (
+                    SELECT DISTINCT channel_id FROM digest_posts
+                    WHERE created_at > NOW() - make_interval(mins => %s)
+                       OR deleted_at > NOW() - make_interval(mins => %s)
+                )
+            '''
+            params = (since_minutes, since_minutes)
+
+        def _work(cursor):
+            cursor.execute('''
+                DELETE FROM digest_unread_counters uc
+                USING digest_channels c
+                WHERE c.id = uc.channel_id AND c.deleted_at IS NOT NULL
+            ''')
+            removed = cursor.rowcount
+            cursor.execute(f'''
+                UPDATE digest_unread_counters uc
+                SET unread_count = e.unread_count,
+                    counted_through_post_id = e.counted_through_post_id,
+                    updated_at = NOW()
+                FROM ({recount_sql(f'SELECT user_id, channel_id FROM digest_unread_counters {scope}')}) e
+                WHERE uc.user_id = e.user_id AND uc.channel_id = e.channel_id
+                  AND uc.unread_count <> e.unread_count
+            ''', params)
+            return {'corrected': cursor.rowcount, 'removed': removed}
+        return self.execute_many(_work)
+
+    _ENSURE_SQL = f'''
+        INSERT INTO digest_unread_counters (user_id, channel_id, unread_count, counted_through_post_id)
+        {recount_sql(f"""
+            SELECT %(user_id)s::int AS user_id, c.id AS channel_id
+            FROM digest_channels c
+            WHERE {_VISIBLE_CHANNEL}
+              AND NOT EXISTS (SELECT 1 FROM digest_unread_counters uc
+                              WHERE uc.user_id = %(user_id)s AND uc.channel_id = c.id)
+        """)}
+        ON CONFLICT (user_id, channel_id) DO NOTHING
+    '''
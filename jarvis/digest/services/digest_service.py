@@ -3,9 +3,11 @@
 import re
 import logging
 from digest.repositories.digest_repository import DigestRepository
+from digest.repositories.unread_repository import UnreadRepository
 
 logger = logging.getLogger(__name__)
 _repo = DigestRepository()
+_unread = UnreadRepository()
 
 # Matches @[Display Name](user_id)
 _MENTION_RE = re.compile(r'@\[([^\]]+)\]\((\d+)\)')
@@ -16,6 +18,7 @@ class DigestService:
     # ── Channels ─────────────────────────────────────────────
 
     def get_channels(self, user_id):
+        _unread.ensure(user_id)
         return _repo.get_channels(user_id)
 
     def get_channel(self, channel_id):
@@ -118,6 +121,10 @@ class DigestService:
             )
         logger.info(f'Post created: {post["id"]} in channel {channel_id} by user {user_id}')
 
+        if post:
+            self._count_unread(channel_id, post['id'])
+            self._publish_channel_event(channel_id)
+
         # Send notifications (non-blocking)
         if post:
             try:
@@ -128,6 +135,34 @@ class DigestService:
 
         return post
 
+    def _count_unread(self, channel_id, post_id):
+        """Queue the unread fan-out for a public channel's new post.
+
+        Private channels were already counted by create_post itself.
+        """
+        channel = _repo.get_channel(channel_id)
+        if not channel or channel.get('is_private'):
+            return
+        try:
+            from core.jobs import enqueue
+            enqueue('digest_unread_fanout', {'channel_id': channel_id, 'post_id': post_id},
+                    dedupe_key=f'digest_unread_fanout:{post_id}')
+        except Exception as e:
+            logger.error(f'Failed to queue unread fan-out for post {post_id}, running inline: {e}')
+            _unread.fan_out(channel_id, post_id)
+
+    def _publish_channel_event(self, channel_id):
+        """Push a 'digest' change event to everyone who can see the channel."""
+        from core.events.publisher import publish
+        channel = _repo.get_channel(channel_id)
+        if not channel:
+            return
+        if channel.get('is_private'):
+            member_ids = [m['user_id'] for m in _repo.get_channel_members(channel_id)]
+            publish('digest', member_ids, {'channel_id': channel_id})
+        else:
+            publish('digest', data={'channel_id': channel_id})
+
     def _notify_post(self, post, channel_id, user_id, content, post_type,
                      author_name, poll_data):
         """Send push + in-app notifications for a new post."""
@@ -241,6 +276,7 @@ class DigestService:
         if not post or post['user_id'] != user_id:
             return False
         _repo.delete_post(post_id)
+        self._publish_channel_event(post['channel_id'])
         return True
 
     def toggle_pin(self, post_id):
@@ -269,7 +305,10 @@ class DigestService:
     # ── Read Status ──────────────────────────────────────────
 
     def mark_read(self, channel_id, user_id, post_id):
-        return _repo.mark_read(channel_id, user_id, post_id)
+        result = _repo.mark_read(channel_id, user_id, post_id)
+        from core.events.publisher import publish
+        publish('digest_read', [user_id], {'channel_id': channel_id})
+        return result
 
     def get_unread_counts(self, user_id):
-        return _repo.get_unread_counts(user_id)
+        return _unread.get_counts(user_id)
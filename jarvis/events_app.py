@@ -0,0 +1,91 @@
+# Server-push events process — serves /api/events/* only.
+#
+# Runs under gevent so each idle SSE connection is a greenlet, not one of the
+# web app's gthread slots:
+#   gunicorn events_app:app --worker-class gevent --workers 1 --worker-connections 2000
+# Route /api/events to this process; everything else stays on app:app.
+from gevent import monkey
+monkey.patch_all()
+# psycopg2 is a C extension that monkey-patching cannot reach; without this
+# every query blocks the whole event loop (and every open stream)
+from psycogreen.gevent import patch_psycopg
+patch_psycopg()
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import time
+
+from flask import Flask
+from flask_login import LoginManager
+
+from core.utils.logging_config import setup_logging, get_logger
+from core.config import AppConfig
+from core.auth.models import User
+from core.auth.repositories import UserRepository
+from core.metrics import cache_result
+
+logger = setup_logging(level=os.environ.get('LOG_LEVEL', 'INFO'))
+events_logger = get_logger('jarvis.events_app')
+
+_user_repo = UserRepository()
+
+
+def create_events_app(config: AppConfig = None) -> Flask:
+    """Minimal Flask app sharing the web app's session cookie and user loader."""
+    if config is None:
+        config = AppConfig.from_env()
+
+    flask_app = Flask(__name__)
+    flask_app.secret_key = config.secret_key or 'dev-only-insecure-key-not-for-production'
+
+    is_production = config.flask_env.lower() == 'production' or (
+        'localhost' not in config.database_url
+        and '127.0.0.1' not in config.database_url
+    )
+    flask_app.config['SESSION_COOKIE_SECURE'] = is_production
+    flask_app.config['SESSION_COOKIE_HTTPONLY'] = True
+    flask_app.config['SESSION_COOKIE_SAMESITE'] = 'Lax'
+    flask_app.config['REMEMBER_COOKIE_SECURE'] = is_production
+
+    login_manager = LoginManager()
+    login_manager.init_app(flask_app)
+
+    _user_cache = {}
+    _USER_CACHE_TTL = 60
+
+    @login_manager.user_loader
+    def load_user(user_id):
+        """Load user by ID (cached per-process, 60s TTL)."""
+        uid = int(user_id)
+        now = time.time()
+        cached = _user_cache.get(uid)
+        if cache_result('users', bool(cached) and (now - cached[1]) < _USER_CACHE_TTL):
+            return cached[0]
+        user_data = _user_repo.get_by_id(uid)
+        if user_data:
+            user = User(user_data)
+            _user_cache[uid] = (user, now)
+            return user
+        _user_cache.pop(uid, None)
+        return None
+
+    @login_manager.unauthorized_handler
+    def unauthorized():
+        return {'success': False, 'error': 'Authentication required'}, 401
+
+    from core.events import events_bp
+    flask_app.register_blueprint(events_bp)
+
+    events_logger.info('JARVIS events app ready')
+    return flask_app
+
+
+app = create_events_app()
+
+
+if __name__ == '__main__':
+    from gevent.pywsgi import WSGIServer
+    port = int(os.environ.get('EVENTS_PORT', 5002))
+    WSGIServer(('0.0.0.0', port), app).serve_forever()
@@ -1,5 +1,6 @@
 """Forms repositories."""
 from .form_repo import FormRepository
 from .submission_repo import SubmissionRepository
+from .analytics_repo import FormAnalyticsRepository
 
-__all__ = ['FormRepository', 'SubmissionRepository']
+__all__ = ['FormRepository', 'SubmissionRepository', 'FormAnalyticsRepository']
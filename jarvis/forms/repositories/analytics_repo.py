@@ -0,0 +1,270 @@
+"""Repository for form analytics — aggregates maintained as submissions change.
+
+Tables (one set of rows per form):
+- form_option_counts: answers per option of dropdown/radio/checkbox fields
+- form_numeric_stats: count/total/min/max of number and rating fields
+- form_numeric_buckets: histogram of the same fields (see histogram_bucket)
+- form_daily_stats: submissions per day, source and UTM source/medium/campaign
+- form_status_counts: submissions per status
+
+SubmissionRepository applies an AnswerTally in the same transaction as each
+create, status change and delete, so the analytics endpoint reads a few
+small rows instead of exporting every submission. min/max only ever widen
+(a delete cannot narrow them); rebuild() recomputes everything from
+form_submissions (scripts/rebuild_form_analytics.py). Forms whose counters
+disagree with submission_count are rebuilt by the backfill_form_analytics
+job, queued on every scheduler start.
+"""
+
+import math
+from collections import Counter
+
+from core.base_repository import BaseRepository
+from database import dict_from_row
+
+CHOICE_TYPES = {'dropdown', 'radio', 'checkbox'}
+NUMERIC_TYPES = {'number', 'rating'}
+
+_UTM_KEYS = ('utm_source', 'utm_medium', 'utm_campaign')
+_REBUILD_BATCH_SIZE = 500
+
+_TABLES = ('form_option_counts', 'form_numeric_stats', 'form_numeric_buckets',
+           'form_daily_stats', 'form_status_counts')
+
+
+def histogram_bucket(value):
+    """Lower bound of the histogram bucket holding `value`.
+
+    Values under 10 in magnitude get one bucket per integer (ratings, small
+    counts); larger ones use a 1-2-5 series per decade (10, 20, 50, 100, …),
+    so any range is covered by a bounded number of buckets. Negative values
+    mirror the series and still floor: -75 falls in [-100, -50).
+    """
+    if abs(value) < 10:
+        return float(math.floor(value))
+    magnitude = abs(value)
+    decade = 10 ** math.floor(math.log10(magnitude))
+    if value > 0:
+        return float(max(s for s in (1, 2, 5) if s * decade <= magnitude) * decade)
+    return -float(min(s for s in (1, 2, 5, 10) if s * decade >= magnitude) * decade)
+
+
+def _ordered(counts):
+    """Items sorted by key, so concurrent upserts lock aggregate rows in the
+    same order (a status change touches two rows; unsorted, opposite
+    transitions on one form deadlock)."""
+    return sorted(counts.items(), key=lambda item: str(item[0]))
+
+
+def _number(value):
+    try:
+        number = float(value)
+    except (TypeError, ValueError):
+        return None
+    return number if math.isfinite(number) else None
+
+
+class AnswerTally:
+    """Contribution of one or more submissions of a form to its aggregates."""
+
+    def __init__(self, form_id):
+        self.form_id = form_id
+        self.options = Counter()      # (field_id, option) -> submissions
+        self.numbers = {}             # field_id -> [count, total, min, max]
+        self.buckets = Counter()      # (field_id, bucket) -> submissions
+        self.daily = Counter()        # (day, source, utm_source, utm_medium, utm_campaign) -> submissions
+        self.statuses = Counter()     # status -> submissions
+
+    def add(self, answers, schema, source='web_public', utm_data=None, status='new', day=None):
+        """Count one submission. day=None means today (CURRENT_DATE)."""
+        answers = answers or {}
+        for field in schema or []:
+            field_id, field_type = field.get('id'), field.get('type')
+            value = answers.get(field_id)
+            if not field_id or value is None or value == '':
+                continue
+            if field_type in CHOICE_TYPES:
+                for option in (value if isinstance(value, list) else [value]):
+                    if option not in (None, ''):
+                        self.options[(field_id, str(option))] += 1
+            elif field_type in NUMERIC_TYPES:
+                number = _number(value)
+                if number is None:
+                    continue
+                stats = self.numbers.setdefault(field_id, [0, 0.0, number, number])
+                stats[0] += 1
+                stats[1] += number
+                stats[2] = min(stats[2], number)
+                stats[3] = max(stats[3], number)
+                self.buckets[(field_id, histogram_bucket(number))] += 1
+
+        utm_data = utm_data or {}
+        utm = tuple(str(utm_data.get(k) or '') for k in _UTM_KEYS)
+        self.daily[(day, source) + utm] += 1
+        self.statuses[status] += 1
+        return self
+
+    def apply(self, cursor, sign=1):
+        """Add (sign=1) or remove (sign=-1) the tally in the caller's transaction."""
+        from psycopg2.extras import execute_values
+        form_id = self.form_id
+
+        if self.options:
+            execute_values(cursor, '''
+                INSERT INTO form_option_counts (form_id, field_id, option, count)
+                VALUES %s
+                ON CONFLICT (form_id, field_id, option)
+                DO UPDATE SET count = form_option_counts.count + EXCLUDED.count
+            ''', [(form_id, f, o, sign * n) for (f, o), n in _ordered(self.options)])
+
+        if self.numbers:
+            rows = [(form_id, f, sign * c, sign * t, lo, hi) for f, (c, t, lo, hi) in _ordered(self.numbers)]
+            if sign > 0:
+                execute_values(cursor, '''
+                    INSERT INTO form_numeric_stats (form_id, field_id, count, total, min_value, max_value)
+                    VALUES %s
+                    ON CONFLICT (form_id, field_id) DO UPDATE SET
+                        count = form_numeric_stats.count + EXCLUDED.count,
+                        total = form_numeric_stats.total + EXCLUDED.total,
+                        min_value = LEAST(form_numeric_stats.min_value, EXCLUDED.min_value),
+                        max_value = GREATEST(form_numeric_stats.max_value, EXCLUDED.max_value)
+                ''', rows, template='(%s, %s, %s, %s::float8, %s::float8, %s::float8)')
+            else:
+                execute_values(cursor, '''
+                    UPDATE form_numeric_stats s
+                    SET count = s.count + v.count, total = s.total + v.total
+                    FROM (VALUES %s) AS v(form_id, field_id, count, total, min_value, max_value)
+                    WHERE s.form_id = v.form_id AND s.field_id = v.field_id
+                ''', rows, template='(%s, %s, %s, %s::float8, %s::float8, %s::float8)')
+
+        if self.buckets:
+            execute_values(cursor, '''
+                INSERT INTO form_numeric_buckets (form_id, field_id, bucket, count)
+                VALUES %s
+                ON CONFLICT (form_id, field_id, bucket)
+                DO UPDATE SET count = form_numeric_buckets.count + EXCLUDED.count
+            ''', [(form_id, f, b, sign * n) for (f, b), n in _ordered(self.buckets)],
+                template='(%s, %s, %s::float8, %s)')
+
+        if self.daily:
+            execute_values(cursor, '''
+                INSERT INTO form_daily_stats
+                    (form_id, day, source, utm_source, utm_medium, utm_campaign, submissions)
+                VALUES %s
+                ON CONFLICT (form_id, day, source, utm_source, utm_medium, utm_campaign)
+                DO UPDATE SET submissions = form_daily_stats.submissions + EXCLUDED.submissions
+            ''', [(form_id, day, *rest, sign * n) for (day, *rest), n in _ordered(self.daily)],
+                template='(%s, COALESCE(%s::date, CURRENT_DATE), %s, %s, %s, %s, %s)')
+
+        if self.statuses:
+            execute_values(cursor, '''
+                INSERT INTO form_status_counts (form_id, status, count)
+                VALUES %s
+                ON CONFLICT (form_id, status)
+                DO UPDATE SET count = form_status_counts.count + EXCLUDED.count
+            ''', [(form_id, s, sign * n) for s, n in _ordered(self.statuses)])
+
+
+def apply_status_change(cursor, form_id, old_status, new_status):
+    """Move one submission between status counters."""
+    if old_status == new_status:
+        return
+    tally = AnswerTally(form_id)
+    tally.statuses[new_status] += 1
+    tally.statuses[old_status] -= 1
+    tally.apply(cursor)
+
+
+class FormAnalyticsRepository(BaseRepository):
+
+    def get_summary(self, form_id, date_from=None, date_to=None):
+        """All aggregates of a form. date_from/date_to bound the daily rows."""
+        def _work(cursor):
+            cursor.execute('''
+                SELECT field_id, option, count FROM form_option_counts
+                WHERE form_id = %s AND count > 0
+                ORDER BY field_id, count DESC, option
+            ''', (form_id,))
+            options = cursor.fetchall()
+
+            cursor.execute('''
+                SELECT field_id, count, total, min_value, max_value FROM form_numeric_stats
+                WHERE form_id = %s AND count > 0
+            ''', (form_id,))
+            numbers = cursor.fetchall()
+
+            cursor.execute('''
+                SELECT field_id, bucket, count FROM form_numeric_buckets
+                WHERE form_id = %s AND count > 0
+                ORDER BY field_id, bucket
+            ''', (form_id,))
+            buckets = cursor.fetchall()
+
+            cursor.execute('''
+                SELECT day, source, utm_source, utm_medium, utm_campaign, submissions
+                FROM form_daily_stats
+                WHERE form_id = %s AND submissions > 0
+                  AND (%s::date IS NULL OR day >= %s::date)
+                  AND (%s::date IS NULL OR day <= %s::date)
+                ORDER BY day, source, utm_source, utm_medium, utm_campaign
+            ''', (form_id, date_from, date_from, date_to, date_to))
+            daily = cursor.fetchall()
+
+            cursor.execute('''
+                SELECT status, count FROM form_status_counts
+                WHERE form_id = %s AND count > 0
+            ''', (form_id,))
+            statuses = cursor.fetchall()
+
+            return {
+                'options': [dict(r) for r in options],
+                'numbers': [dict(r) for r in numbers],
+                'buckets': [dict(r) for r in buckets],
+                'daily': [dict_from_row(r) for r in daily],
+                'statuses': {r['status']: r['count'] for r in statuses},
+            }
+        return self.execute_many(_work)
+
+    def rebuild(self, form_id):
+        """Recompute a form's aggregates from its submissions. Returns submissions counted."""
+        def _work(cursor):
+            # Serialises with submission writes, which update the forms row first
+            cursor.execute('SELECT id FROM forms WHERE id = %s FOR UPDATE', (form_id,))
+            for table in _TABLES:
+                cursor.execute(f'DELETE FROM {table} WHERE form_id = %s', (form_id,))
+
+            tally = AnswerTally(form_id)
+            counted, after_id = 0, 0
+            while True:
+                cursor.execute('''
+                    SELECT id, answers, form_schema_snapshot, source, utm_data, status,
+                           created_at::date AS day
+                    FROM form_submissions
+                    WHERE form_id = %s AND id > %s
+                    ORDER BY id
+                    LIMIT %s
+                ''', (form_id, after_id, _REBUILD_BATCH_SIZE))
+                rows = cursor.fetchall()
+                for r in rows:
+                    tally.add(r['answers'], r['form_schema_snapshot'], r['source'],
+                              r['utm_data'], r['status'], r['day'])
+                counted += len(rows)
+                if len(rows) < _REBUILD_BATCH_SIZE:
+                    break
+                after_id = rows[-1]['id']
+            tally.apply(cursor)
+            return counted
+        return self.execute_many(_work)
+
+    def form_ids(self):
+        return [r['id'] for r in self.query_all('SELECT id FROM forms ORDER BY id')]
+
+    def unbackfilled_form_ids(self):
+        """Forms whose status counters don't add up to submission_count — never
+        rebuilt since the aggregates were added, or edited outside the repositories."""
+        return [r['id'] for r in self.query_all('''
+            SELECT f.id FROM forms f
+            WHERE f.submission_count <> COALESCE(
+                (SELECT SUM(c.count) FROM form_status_counts c WHERE c.form_id = f.id), 0)
+            ORDER BY f.id
+        ''')]
@@ -3,23 +3,53 @@
 import json
 import logging
 import re
+import time
+import zlib
+from collections import OrderedDict
 from core.base_repository import BaseRepository
+from core.cache import _cache_lock
 from database import dict_from_row
 
 logger = logging.getLogger('jarvis.forms.form_repo')
 
+# Published forms for anonymous /public/<slug> views: slug -> entry with the
+# form (or None for unknown slugs), its ETag and fetch time. Writes through
+# this repository clear the form's entry; other workers pick the change up
+# within PUBLIC_FORM_TTL.
+_public_forms = OrderedDict()
+PUBLIC_FORM_TTL = 30
+PUBLIC_FORM_CACHE_SIZE = 500
+
+
+def clear_public_form_cache(form_id=None):
+    """Drop cached public payloads (one form's, or all).
+
+    Cached misses go too: the form may have just been published under one.
+    """
+    with _cache_lock:
+        if form_id is None:
+            _public_forms.clear()
+            return
+        for slug in [s for s, e in _public_forms.items()
+                     if not e['form'] or e['form']['id'] == form_id]:
+            del _public_forms[slug]
+
+
+def _public_etag(form):
+    """Versioned ETag: changes on publish (version) and any settings edit (updated_at)."""
+    stamp = zlib.crc32(str(form.get('updated_at')).encode())
+    return f"{form['id']}-{form['version']}-{stamp:08x}"
+
 
 class FormRepository(BaseRepository):
 
     def get_by_id(self, form_id):
-        """Get form by ID with company name, owner name, and submission count."""
+        """Get form by ID with company name and owner name (f.* includes submission_count)."""
         return self.query_one('''
             SELECT f.*,
                    c.company as company_name,
                    u.name as owner_name,
-                   u2.name as created_by_name,
-                   (SELECT COUNT(*) FROM form_submissions fs
-                    WHERE fs.form_id = f.id) as submission_count
+                   u2.name as created_by_name
             FROM forms f
             JOIN companies c ON c.id = f.company_id
             JOIN users u ON u.id = f.owner_id
@@ -33,6 +63,7 @@ class FormRepository(BaseRepository):
             SELECT f.id, f.name, f.slug, f.description,
                    f.published_schema, f.settings, f.utm_config, f.branding,
                    f.version, f.company_id, f.requires_approval,
+                   f.submission_count, f.updated_at,
                    c.company as company_name
             FROM forms f
             JOIN companies c ON c.id = f.company_id
@@ -42,6 +73,28 @@ class FormRepository(BaseRepository):
               AND f.published_schema IS NOT NULL
         ''', (slug,))
 
+    def get_public(self, slug):
+        """Published form by slug for public views, cached.
+
+        Returns:
+            (form, etag) tuple, or None if no published form has this slug
+        """
+        now = time.time()
+        with _cache_lock:
+            entry = _public_forms.get(slug)
+            if entry and now - entry['timestamp'] < PUBLIC_FORM_TTL:
+                _public_forms.move_to_end(slug)
+                return (entry['form'], entry['etag']) if entry['form'] else None
+
+        form = self.get_by_slug(slug)
+        etag = _public_etag(form) if form else None
+        with _cache_lock:
+            _public_forms[slug] = {'form': form, 'etag': etag, 'timestamp': now}
+            _public_forms.move_to_end(slug)
+            while len(_public_forms) > PUBLIC_FORM_CACHE_SIZE:
+                _public_forms.popitem(last=False)
+        return (form, etag) if form else None
+
     def list_forms(self, filters=None):
         """List forms with pagination and filtering."""
         filters = filters or {}
@@ -70,9 +123,7 @@ class FormRepository(BaseRepository):
             cursor.execute(f'''
                 SELECT f.*,
                        c.company as company_name,
-                       u.name as owner_name,
-                       (SELECT COUNT(*) FROM form_submissions fs
-                        WHERE fs.form_id = f.id) as submission_count
+                       u.name as owner_name
                 FROM forms f
                 JOIN companies c ON c.id = f.company_id
                 JOIN users u ON u.id = f.owner_id
@@ -136,14 +187,16 @@ class FormRepository(BaseRepository):
         updates.append('updated_at = CURRENT_TIMESTAMP')
         params.append(form_id)
         set_clause = ', '.join(updates)
-        return self.execute(
+        updated = self.execute(
             f'UPDATE forms SET {set_clause} WHERE id = %s AND deleted_at IS NULL',
             params
         ) > 0
+        clear_public_form_cache(form_id)
+        return updated
 
     def publish(self, form_id):
         """Publish: copy schema → published_schema, bump version, set status."""
-        return self.execute('''
+        published = self.execute('''
             UPDATE forms
             SET published_schema = schema,
                 status = 'published',
@@ -152,14 +205,18 @@ class FormRepository(BaseRepository):
                 updated_at = CURRENT_TIMESTAMP
             WHERE id = %s AND deleted_at IS NULL
         ''', (form_id,)) > 0
+        clear_public_form_cache(form_id)
+        return published
 
     def disable(self, form_id):
         """Disable a published form."""
-        return self.execute('''
+        disabled = self.execute('''
             UPDATE forms
             SET status = 'disabled', updated_at = CURRENT_TIMESTAMP
             WHERE id = %s AND deleted_at IS NULL
         ''', (form_id,)) > 0
+        clear_public_form_cache(form_id)
+        return disabled
 
     def duplicate(self, form_id, created_by):
         """Clone a form. Returns new form ID."""
@@ -196,15 +253,17 @@ class FormRepository(BaseRepository):
 
     def soft_delete(self, form_id):
         """Soft-delete a form."""
-        return self.execute(
+        deleted = self.execute(
             'UPDATE forms SET deleted_at = CURRENT_TIMESTAMP, updated_at = CURRENT_TIMESTAMP WHERE id = %s AND deleted_at IS NULL',
             (form_id,)
         ) > 0
+        clear_public_form_cache(form_id)
+        return deleted
 
     def count_submissions(self, form_id):
-        """Get total submission count for a form."""
+        """Get total submission count for a form (maintained forms.submission_count)."""
         row = self.query_one(
-            'SELECT COUNT(*) as total FROM form_submissions WHERE form_id = %s',
+            'SELECT submission_count AS total FROM forms WHERE id = %s',
             (form_id,)
         )
         return row['total'] if row else 0
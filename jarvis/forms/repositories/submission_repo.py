@@ -4,9 +4,13 @@ import json
 import logging
 from core.base_repository import BaseRepository
 from database import dict_from_row
+from forms.repositories.analytics_repo import AnswerTally, apply_status_change
 
 logger = logging.getLogger('jarvis.forms.submission_repo')
 
+# Shorter search terms have no trigrams; they fall back to whole-word matching
+_TRIGRAM_MIN_LENGTH = 3
+
 
 class SubmissionRepository(BaseRepository):
 
@@ -24,7 +28,13 @@ class SubmissionRepository(BaseRepository):
         ''', (submission_id,))
 
     def list_by_form(self, form_id, filters=None):
-        """List submissions for a form with pagination."""
+        """List submissions for a form, newest first, with keyset pagination.
+
+        Pass the previous page's next_cursor as filters['cursor'] to get the
+        following page. total is the form's maintained submission_count when
+        unfiltered; with filters it is counted on the first page only (None
+        on later pages).
+        """
         filters = filters or {}
         where = ['fs.form_id = %s']
         params = [form_id]
@@ -42,72 +52,155 @@ class SubmissionRepository(BaseRepository):
             where.append('fs.created_at <= %s')
             params.append(filters['date_to'])
         if filters.get('search'):
-            where.append('''(
-                fs.respondent_name ILIKE %s
-                OR fs.respondent_email ILIKE %s
-                OR fs.answers::text ILIKE %s
-            )''')
-            term = f"%{filters['search']}%"
-            params.extend([term, term, term])
+            term = filters['search'].strip()
+            if len(term) >= _TRIGRAM_MIN_LENGTH:
+                # Substring match, served by the trigram index
+                where.append('fs.search_text ILIKE %s')
+                params.append(f'%{term}%')
+            elif term:
+                # Too short for trigrams: whole-word match on the tsvector index
+                where.append("to_tsvector('simple', fs.search_text) @@ plainto_tsquery('simple', %s)")
+                params.append(term)
 
+        filtered = len(where) > 1
         where_clause = ' AND '.join(where)
         limit = min(int(filters.get('limit', 50)), 500)
-        offset = int(filters.get('offset', 0))
+        cursor_id = int(filters['cursor']) if filters.get('cursor') else None
 
         def _work(cursor):
+            page_where = where_clause + (' AND fs.id < %s' if cursor_id else '')
+            page_params = params + ([cursor_id] if cursor_id else [])
             cursor.execute(f'''
                 SELECT fs.*,
                        u.name as respondent_user_name
                 FROM form_submissions fs
                 LEFT JOIN users u ON u.id = fs.respondent_user_id
-                WHERE {where_clause}
-                ORDER BY fs.created_at DESC
-                LIMIT %s OFFSET %s
-            ''', params + [limit, offset])
+                WHERE {page_where}
+                ORDER BY fs.id DESC
+                LIMIT %s
+            ''', page_params + [limit + 1])
             rows = cursor.fetchall()
+            has_more = len(rows) > limit
+            rows = rows[:limit]
 
-            cursor.execute(f'''
-                SELECT COUNT(*) as total
-                FROM form_submissions fs
-                WHERE {where_clause}
-            ''', params)
-            total = cursor.fetchone()['total']
+            if not filtered:
+                cursor.execute('SELECT submission_count AS total FROM forms WHERE id = %s', (form_id,))
+                row = cursor.fetchone()
+                total = row['total'] if row else 0
+            elif cursor_id is None:
+                cursor.execute(f'''
+                    SELECT COUNT(*) as total
+                    FROM form_submissions fs
+                    WHERE {where_clause}
+                ''', params)
+                total = cursor.fetchone()['total']
+            else:
+                total = None
 
-            return {'submissions': [dict_from_row(r) for r in rows], 'total': total}
+            submissions = [dict_from_row(r) for r in rows]
+            for sub in submissions:
+                sub.pop('search_text', None)  # derived from answers; not part of the payload
+            return {
+                'submissions': submissions,
+                'total': total,
+                'next_cursor': rows[-1]['id'] if has_more else None,
+            }
         return self.execute_many(_work)
 
     def create(self, form_id, form_version, answers, form_schema_snapshot,
-               source='web_public', company_id=None, **kwargs):
-        """Create a new submission. Returns the new submission ID."""
-        return self.execute('''
-            INSERT INTO form_submissions
-                (form_id, form_version, answers, form_schema_snapshot,
-                 respondent_name, respondent_email, respondent_phone,
-                 respondent_ip, respondent_user_id,
-                 utm_data, source, company_id)
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s::inet, %s, %s, %s, %s)
-            RETURNING id
-        ''', (
-            form_id, form_version,
-            json.dumps(answers),
-            json.dumps(form_schema_snapshot),
-            kwargs.get('respondent_name'),
-            kwargs.get('respondent_email'),
-            kwargs.get('respondent_phone'),
-            kwargs.get('respondent_ip'),
-            kwargs.get('respondent_user_id'),
-            json.dumps(kwargs.get('utm_data', {})),
-            source,
-            company_id,
-        ), returning=True)['id']
+               source='web_public', company_id=None, submission_limit=None, **kwargs):
+        """Create a new submission. Returns the new submission ID.
+
+        forms.submission_count is incremented in the same statement. With
+        submission_limit the increment is conditional on the form being under
+        the limit, so concurrent submits cannot overshoot it; returns None
+        when the form is full. The form's analytics aggregates are updated in
+        the same transaction.
+        """
+        params = {
+            'form_id': form_id,
+            'limit': int(submission_limit) if submission_limit else None,
+            'form_version': form_version,
+            'answers': json.dumps(answers),
+            'snapshot': json.dumps(form_schema_snapshot),
+            'name': kwargs.get('respondent_name'),
+            'email': kwargs.get('respondent_email'),
+            'phone': kwargs.get('respondent_phone'),
+            'ip': kwargs.get('respondent_ip'),
+            'user_id': kwargs.get('respondent_user_id'),
+            'utm': json.dumps(kwargs.get('utm_data', {})),
+            'source': source,
+            'company_id': company_id,
+        }
+
+        def _work(cursor):
+            cursor.execute('''
+                WITH slot AS (
+                    UPDATE forms SET submission_count = submission_count + 1
+                    WHERE id = %(form_id)s
+                      AND (%(limit)s::int IS NULL OR submission_count < %(limit)s::int)
+                    RETURNING id
+                )
+                INSERT INTO form_submissions
+                    (form_id, form_version, answers, form_schema_snapshot,
+                     respondent_name, respondent_email, respondent_phone,
+                     respondent_ip, respondent_user_id,
+                     utm_data, source, company_id)
+                SELECT slot.id, %(form_version)s, %(answers)s, %(snapshot)s,
+                       %(name)s, %(email)s, %(phone)s, %(ip)s::inet, %(user_id)s,
+                       %(utm)s, %(source)s, %(company_id)s
+                FROM slot
+                RETURNING id
+            ''', params)
+            row = cursor.fetchone()
+            if not row:
+                return None
+            AnswerTally(form_id).add(answers, form_schema_snapshot, source,
+                                     kwargs.get('utm_data')).apply(cursor)
+            return row['id']
+        return self.execute_many(_work)
+
+    def delete(self, submission_id):
+        """Delete a submission; decrement its form's submission_count and analytics."""
+        def _work(cursor):
+            cursor.execute('''
+                DELETE FROM form_submissions WHERE id = %s
+                RETURNING form_id, answers, form_schema_snapshot, source, utm_data,
+                          status, created_at::date AS day
+            ''', (submission_id,))
+            gone = cursor.fetchone()
+            if not gone:
+                return False
+            cursor.execute('''
+                UPDATE forms SET submission_count = GREATEST(submission_count - 1, 0)
+                WHERE id = %s
+            ''', (gone['form_id'],))
+            AnswerTally(gone['form_id']).add(
+                gone['answers'], gone['form_schema_snapshot'], gone['source'],
+                gone['utm_data'], gone['status'], gone['day'],
+            ).apply(cursor, sign=-1)
+            return True
+        return self.execute_many(_work)
 
     def update_status(self, submission_id, status):
-        """Update submission status."""
-        return self.execute('''
-            UPDATE form_submissions
-            SET status = %s, updated_at = CURRENT_TIMESTAMP
-            WHERE id = %s
-        ''', (status, submission_id)) > 0
+        """Update submission status (and the form's status counters)."""
+        def _work(cursor):
+            cursor.execute('''
+                WITH old AS (
+                    SELECT id, status FROM form_submissions WHERE id = %s FOR UPDATE
+                )
+                UPDATE form_submissions fs
+                SET status = %s, updated_at = CURRENT_TIMESTAMP
+                FROM old
+                WHERE fs.id = old.id
+                RETURNING fs.form_id, old.status AS old_status
+            ''', (submission_id, status))
+            row = cursor.fetchone()
+            if not row:
+                return False
+            apply_status_change(cursor, row['form_id'], row['old_status'], status)
+            return True
+        return self.execute_many(_work)
 
     def set_approval_request(self, submission_id, approval_request_id):
         """Link submission to an approval request."""
@@ -1,36 +1,21 @@
 """Public form routes — NO authentication required."""
 
 import logging
-import time
-from collections import defaultdict
 
-from flask import jsonify, request
+from flask import current_app, jsonify, request
 
 from forms import forms_bp
 from forms.repositories import FormRepository
 from forms.services.form_service import FormService
+from core.utils.rate_limit import SharedRateLimiter
 
 logger = logging.getLogger('jarvis.forms.routes.public')
 
 _form_repo = FormRepository()
 _service = FormService()
 
-# In-memory rate limiter: {ip: [timestamp, ...]}
-_submit_timestamps: dict = defaultdict(list)
-_RATE_LIMIT_WINDOW = 60       # seconds
-_RATE_LIMIT_MAX_REQUESTS = 5  # per IP per window
-
-
-def _is_rate_limited(ip: str) -> bool:
-    """Check if an IP has exceeded the submission rate limit."""
-    now = time.time()
-    cutoff = now - _RATE_LIMIT_WINDOW
-    # Prune old entries
-    _submit_timestamps[ip] = [t for t in _submit_timestamps[ip] if t > cutoff]
-    if len(_submit_timestamps[ip]) >= _RATE_LIMIT_MAX_REQUESTS:
-        return True
-    _submit_timestamps[ip].append(now)
-    return False
+# Per IP, shared by all workers
+_submit_limiter = SharedRateLimiter('forms_public_submit', max_requests=5, window_seconds=60)
 
 
 def _get_client_ip() -> str:
@@ -43,22 +28,33 @@ def _get_client_ip() -> str:
 
 @forms_bp.route('/public/<slug>', methods=['GET'])
 def api_get_public_form(slug):
-    """Get a published form by slug (no auth). Returns form schema + settings."""
-    form = _form_repo.get_by_slug(slug)
-    if not form:
-        return jsonify({'success': False, 'error': 'Form not found'}), 404
+    """Get a published form by slug (no auth). Returns form schema + settings.
 
-    return jsonify({
-        'id': form['id'],
-        'name': form['name'],
-        'slug': form['slug'],
-        'description': form.get('description'),
-        'schema': form.get('published_schema', []),
-        'settings': form.get('settings', {}),
-        'branding': form.get('branding', {}),
-        'utm_config': form.get('utm_config', {}),
-        'company_name': form.get('company_name', ''),
-    })
+    Served from FormRepository's public cache with a versioned ETag; browsers
+    revalidate every view and get a 304 while the form is unchanged.
+    """
+    cached = _form_repo.get_public(slug)
+    if not cached:
+        return jsonify({'success': False, 'error': 'Form not found'}), 404
+    form, etag = cached
+
+    if request.if_none_match.contains(etag):
+        response = current_app.response_class(status=304)
+    else:
+        response = jsonify({
+            'id': form['id'],
+            'name': form['name'],
+            'slug': form['slug'],
+            'description': form.get('description'),
+            'schema': form.get('published_schema', []),
+            'settings': form.get('settings', {}),
+            'branding': form.get('branding', {}),
+            'utm_config': form.get('utm_config', {}),
+            'company_name': form.get('company_name', ''),
+        })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'public, no-cache'
+    return response
 
 
 @forms_bp.route('/public/<slug>/submit', methods=['POST'])
@@ -67,8 +63,11 @@ def api_submit_public_form(slug):
     ip = _get_client_ip()
 
     # Rate limit check
-    if _is_rate_limited(ip):
-        return jsonify({'success': False, 'error': 'Too many submissions. Please try again later.'}), 429
+    allowed, retry_after = _submit_limiter.is_allowed(ip)
+    if not allowed:
+        response = jsonify({'success': False, 'error': 'Too many submissions. Please try again later.'})
+        response.headers['Retry-After'] = str(retry_after)
+        return response, 429
 
     data = request.get_json()
     if not data:
@@ -69,7 +69,7 @@ def api_list_submissions(form_id):
         'date_from': request.args.get('date_from'),
         'date_to': request.args.get('date_to'),
         'limit': request.args.get('limit', 50),
-        'offset': request.args.get('offset', 0),
+        'cursor': request.args.get('cursor'),
     }
     filters = {k: v for k, v in filters.items() if v is not None}
 
@@ -77,6 +77,25 @@ def api_list_submissions(form_id):
     return jsonify(result)
 
 
+# ---- Answer analytics ----
+
+@forms_bp.route('/api/forms/<int:form_id>/analytics', methods=['GET'])
+@login_required
+@form_permission_required('submission', 'view')
+def api_form_analytics(form_id):
+    """Aggregated answers for a form (option counts, numeric stats, daily volume)."""
+    form = _form_repo.get_by_id(form_id)
+    if not form or not _check_scope_access(form):
+        return jsonify({'success': False, 'error': 'Form not found'}), 404
+
+    result = _service.get_analytics(
+        form,
+        date_from=request.args.get('date_from'),
+        date_to=request.args.get('date_to'),
+    )
+    return jsonify(result.data)
+
+
 # ---- Get single submission ----
 
 @forms_bp.route('/api/submissions/<int:submission_id>', methods=['GET'])
@@ -7,7 +7,7 @@ import re
 from dataclasses import dataclass
 from typing import Optional, Dict, Any, List
 
-from forms.repositories import FormRepository, SubmissionRepository
+from forms.repositories import FormRepository, SubmissionRepository, FormAnalyticsRepository
 
 logger = logging.getLogger('jarvis.forms.service')
 
@@ -75,6 +75,7 @@ class FormService:
     def __init__(self):
         self.form_repo = FormRepository()
         self.submission_repo = SubmissionRepository()
+        self.analytics_repo = FormAnalyticsRepository()
 
     # ============== Form Lifecycle ==============
 
@@ -136,14 +137,12 @@ class FormService:
 
         schema = form.get('published_schema', [])
 
-        # Check submission limit
+        # Check submission limit (early exit; create() enforces it atomically)
         settings = form.get('settings', {})
         submission_limit = settings.get('submission_limit')
-        if submission_limit:
-            current_count = self.form_repo.count_submissions(form['id'])
-            if current_count >= int(submission_limit):
-                msg = settings.get('limit_message', 'This form is no longer accepting submissions.')
-                return ServiceResult(success=False, error=msg, status_code=403)
+        limit_message = settings.get('limit_message', 'This form is no longer accepting submissions.')
+        if submission_limit and form.get('submission_count', 0) >= int(submission_limit):
+            return ServiceResult(success=False, error=limit_message, status_code=403)
 
         # Strip unknown answer keys — only accept keys matching schema field IDs
         known_field_ids = {f.get('id') for f in schema if f.get('id')}
@@ -187,7 +186,10 @@ class FormService:
             respondent_phone=sanitized_respondent['phone'] or None,
             respondent_ip=ip,
             utm_data=filtered_utm,
+            submission_limit=submission_limit,
         )
+        if submission_id is None:
+            return ServiceResult(success=False, error=limit_message, status_code=403)
 
         # Trigger approval if required
         if form.get('requires_approval'):
@@ -240,6 +242,51 @@ class FormService:
 
         return ServiceResult(success=True, data={'submission_id': submission_id}, status_code=201)
 
+    # ============== Analytics ==============
+
+    def get_analytics(self, form: Dict, date_from: Optional[str] = None,
+                      date_to: Optional[str] = None) -> ServiceResult:
+        """Per-field answer breakdowns plus daily/status counts for a form."""
+        summary = self.analytics_repo.get_summary(form['id'], date_from, date_to)
+
+        options, numbers, histograms = {}, {}, {}
+        for row in summary['options']:
+            options.setdefault(row['field_id'], []).append(
+                {'option': row['option'], 'count': row['count']})
+        for row in summary['buckets']:
+            histograms.setdefault(row['field_id'], []).append(
+                {'bucket': row['bucket'], 'count': row['count']})
+        for row in summary['numbers']:
+            numbers[row['field_id']] = {
+                'count': row['count'],
+                'avg': row['total'] / row['count'],
+                'min': row['min_value'],
+                'max': row['max_value'],
+                'histogram': histograms.get(row['field_id'], []),
+            }
+
+        # Fields in current schema order; answers to removed fields come last
+        schema = form.get('published_schema') or form.get('schema') or []
+        labels = {f.get('id'): f for f in schema if f.get('id')}
+        field_ids = [fid for fid in labels if fid in options or fid in numbers]
+        field_ids += sorted((set(options) | set(numbers)) - set(field_ids))
+        fields = []
+        for fid in field_ids:
+            field = labels.get(fid, {})
+            entry = {'field_id': fid, 'label': field.get('label', fid), 'type': field.get('type')}
+            if fid in options:
+                entry['options'] = options[fid]
+            if fid in numbers:
+                entry['numeric'] = numbers[fid]
+            fields.append(entry)
+
+        return ServiceResult(success=True, data={
+            'total': form.get('submission_count', 0),
+            'by_status': summary['statuses'],
+            'fields': fields,
+            'daily': summary['daily'],
+        })
+
     # ============== Approval ==============
 
     def trigger_approval(self, submission_id: int, user_id: int) -> ServiceResult:
@@ -3,6 +3,7 @@ import type {
   Form,
   FormFilters,
   FormSubmission,
+  FormAnalytics,
   SubmissionFilters,
   PublicForm,
 } from '@/types/forms'
@@ -48,7 +49,7 @@ export const formsApi = {
   // ---- Submissions ----
 
   listSubmissions: (formId: number, filters?: SubmissionFilters) =>
-    api.get<{ submissions: FormSubmission[]; total: number }>(
+    api.get<{ submissions: FormSubmission[]; total: number | null; next_cursor: number | null }>(
       `${BASE}/forms/${formId}/submissions${toQs({ ...filters })}`
     ),
 
@@ -69,6 +70,11 @@ export const formsApi = {
       { answers, source }
     ),
 
+  // ---- Analytics ----
+
+  getAnalytics: (formId: number, params?: { date_from?: string; date_to?: string }) =>
+    api.get<FormAnalytics>(`${BASE}/forms/${formId}/analytics${toQs({ ...params })}`),
+
   // ---- Export ----
 
   getExportUrl: (formId: number) => `${BASE}/forms/${formId}/export`,
@@ -28,16 +28,29 @@ export const invoicesApi = {
     api.put<{ success: boolean }>(`/api/invoices/${invoiceId}/drive-link`, { drive_link: driveLink }),
 
   // Bulk upload & save
-  bulkParse: async (files: File[]): Promise<{
-    success: boolean
-    results: Array<{ filename: string; success: boolean; data?: Record<string, unknown>; error?: string; duplicate?: boolean }>
-  }> => {
+  bulkParse: async (files: File[]): Promise<{ success: boolean; job_id?: number; total?: number; error?: string }> => {
     const formData = new FormData()
     files.forEach((f) => formData.append('files[]', f))
     const response = await fetch('/api/invoices/bulk-parse', { method: 'POST', body: formData, credentials: 'same-origin' })
     if (!response.ok) throw new Error(`Bulk parse failed: ${response.status}`)
     return response.json()
   },
+  bulkParseStatus: (jobId: number) =>
+    api.get<{
+      success: boolean
+      status: 'queued' | 'running' | 'succeeded' | 'failed' | 'cancelled'
+      progress: { done: number; total: number; message?: string } | null
+      done: boolean
+      error?: string | null
+      results: Array<{
+        filename: string
+        status: 'pending' | 'done' | 'failed'
+        success?: boolean
+        data?: Record<string, unknown>
+        error?: string
+        duplicate?: boolean
+      }>
+    }>(`/api/invoices/bulk-parse/${jobId}`),
   bulkSubmit: (invoices: Array<SubmitInvoiceInput & Record<string, unknown>>) =>
     api.post<{
       success: boolean
@@ -17,6 +17,12 @@ interface SignResponse {
   callback_url?: string | null
 }
 
+interface SignBatchResponse {
+  success: boolean
+  signed: number[]
+  failed: { id: number; error: string }[]
+}
+
 interface RejectResponse {
   success: boolean
   callback_url?: string | null
@@ -43,6 +49,12 @@ export const signaturesApi = {
   sign: (id: number, signatureImage: string) =>
     api.post<SignResponse>(`/signatures/api/${id}/sign`, { signature_image: signatureImage }),
 
+  signBatch: (signatureImage: string, signatureIds?: number[]) =>
+    api.post<SignBatchResponse>('/signatures/api/sign-batch', {
+      signature_image: signatureImage,
+      signature_ids: signatureIds,
+    }),
+
   reject: (id: number) =>
     api.post<RejectResponse>(`/signatures/api/${id}/reject`),
 }
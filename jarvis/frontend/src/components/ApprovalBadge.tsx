@@ -1,11 +1,13 @@
 import { useQuery } from '@tanstack/react-query'
 import { approvalsApi } from '@/api/approvals'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 export function ApprovalBadge() {
+  const refetchInterval = useFallbackInterval(30000)
   const { data } = useQuery({
     queryKey: ['approval-queue-count'],
     queryFn: () => approvalsApi.getMyQueueCount(),
-    refetchInterval: 30000,
+    refetchInterval,
   })
 
   const count = data?.count ?? 0
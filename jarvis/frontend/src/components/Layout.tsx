@@ -2,6 +2,7 @@ import { Outlet } from 'react-router-dom'
 import { Menu } from 'lucide-react'
 import { useEffect, useState } from 'react'
 import { useAuth } from '@/hooks/useAuth'
+import { useServerEvents } from '@/hooks/useServerEvents'
 import { fetchColumnDefaults } from '@/lib/columnDefaults'
 import { Sidebar } from './Sidebar'
 import { AiAgentWidget, AiAgentPanel } from './AiAgentWidget'
@@ -19,6 +20,9 @@ export default function Layout() {
     try { const v = localStorage.getItem('sidebar-collapsed'); return v === null ? true : v === 'true' } catch { return true }
   })
 
+  // Server-push change events (badges/counts refetch on demand instead of polling)
+  useServerEvents(!!user)
+
   // Heartbeat: keep server warm while user is active
   useEffect(() => {
     if (!user) return
@@ -8,6 +8,7 @@ import { Button } from '@/components/ui/button'
 import { Separator } from '@/components/ui/separator'
 import { cn } from '@/lib/utils'
 import { notificationsApi } from '@/api/notifications'
+import { useFallbackInterval } from '@/stores/eventsStore'
 import type { InAppNotification } from '@/types/notifications'
 
 const typeIcons: Record<string, React.ElementType> = {
@@ -50,11 +51,12 @@ export function NotificationBell() {
   const navigate = useNavigate()
   const [open, setOpen] = useState(false)
 
-  // Poll unread count every 30s
+  // Unread count: pushed via SSE, 30s poll only while the stream is down
+  const unreadInterval = useFallbackInterval(30000)
   const { data: countData } = useQuery({
     queryKey: ['notification-unread-count'],
     queryFn: () => notificationsApi.getUnreadCount(),
-    refetchInterval: 30000,
+    refetchInterval: unreadInterval,
   })
 
   // Fetch notifications when popover opens
@@ -12,6 +12,7 @@ import { ApprovalBadge } from './ApprovalBadge'
 import { NotificationBell } from './NotificationBell'
 import { settingsApi } from '@/api/settings'
 import { checkinApi } from '@/api/checkin'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 interface NavItem {
   path: string
@@ -113,6 +114,7 @@ export function Sidebar({ collapsed = false, onToggle }: SidebarProps) {
   })
 
   // Check-in direction for sidebar footer label
+  const fallbackInterval = useFallbackInterval(60_000)
   const { data: checkinStatus } = useQuery({
     queryKey: ['checkin', 'status'],
     queryFn: async () => {
@@ -120,7 +122,7 @@ export function Sidebar({ collapsed = false, onToggle }: SidebarProps) {
       return (res as any).data ?? res
     },
     staleTime: 60_000,
-    refetchInterval: 60_000,
+    refetchInterval: fallbackInterval,
   })
   const checkinLabel = checkinStatus?.next_direction === 'OUT' ? 'Check Out' : 'Check In'
 
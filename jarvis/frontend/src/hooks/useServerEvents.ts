@@ -0,0 +1,71 @@
+import { useEffect } from 'react'
+import { useQueryClient, type QueryKey } from '@tanstack/react-query'
+import { useEventsStore } from '@/stores/eventsStore'
+
+// Server event type → React Query keys to refetch (prefix match)
+const EVENT_QUERIES: Record<string, QueryKey[]> = {
+  notifications: [['notification-unread-count'], ['notifications-list'], ['dashboard', 'recentNotifications']],
+  approvals: [
+    ['approval-queue-count'], ['approval-queue'], ['approval-my-requests'],
+    ['approval-all-requests'], ['dashboard', 'approvalQueue'],
+  ],
+  checkin: [['checkin', 'status'], ['checkin-status']],
+  digest: [['digest-channels'], ['digest-posts'], ['digest-thread']],
+  digest_read: [['digest-channels']],
+  biostar: [['biostar']],
+}
+
+// Retry after the server refused the stream (204 on threaded workers) or it dropped
+const RECONNECT_MS = 60_000
+
+/** Opens one SSE channel per tab and refetches affected queries on change events. */
+export function useServerEvents(enabled: boolean) {
+  const queryClient = useQueryClient()
+  const setConnected = useEventsStore((s) => s.setConnected)
+
+  useEffect(() => {
+    if (!enabled || typeof EventSource === 'undefined') return
+
+    let source: EventSource | null = null
+    let retryTimer: ReturnType<typeof setTimeout>
+    let closed = false
+
+    const invalidate = (keys: QueryKey[]) => {
+      keys.forEach((queryKey) => queryClient.invalidateQueries({ queryKey }))
+    }
+
+    const connect = () => {
+      source = new EventSource('/api/events/stream', { withCredentials: true })
+
+      // (Re)connected — events may have been missed, resync everything once
+      source.addEventListener('ready', () => {
+        setConnected(true)
+        invalidate(Object.values(EVENT_QUERIES).flat())
+      })
+
+      Object.entries(EVENT_QUERIES).forEach(([event, keys]) => {
+        source!.addEventListener(event, () => invalidate(keys))
+      })
+
+      source.onerror = () => {
+        // CONNECTING = browser is auto-retrying; CLOSED = server refused (e.g. 204)
+        if (source?.readyState === EventSource.CLOSED) {
+          setConnected(false)
+          source.close()
+          if (!closed) retryTimer = setTimeout(connect, RECONNECT_MS)
+        } else {
+          setConnected(false)
+        }
+      }
+    }
+
+    connect()
+
+    return () => {
+      closed = true
+      clearTimeout(retryTimer)
+      source?.close()
+      setConnected(false)
+    }
+  }, [enabled, queryClient, setConnected])
+}
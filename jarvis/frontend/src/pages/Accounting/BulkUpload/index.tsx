@@ -63,6 +63,8 @@ interface ParsedInvoice {
 
 type Step = 'upload' | 'review' | 'results'
 
+const PARSE_POLL_MS = 1500
+
 /* ──── Main Component ──── */
 
 export default function BulkUpload() {
@@ -72,6 +74,7 @@ export default function BulkUpload() {
   const [invoices, setInvoices] = useState<ParsedInvoice[]>([])
   const [expandedId, setExpandedId] = useState<string | null>(null)
   const [isParsing, setIsParsing] = useState(false)
+  const [parseProgress, setParseProgress] = useState<{ done: number; total: number } | null>(null)
 
   const { data: companies = [] } = useQuery({
     queryKey: ['companies'],
@@ -105,17 +108,31 @@ export default function BulkUpload() {
   const handleParse = async () => {
     if (files.length === 0) return
     setIsParsing(true)
+    setParseProgress(null)
     try {
-      const resp = await invoicesApi.bulkParse(files)
-      if (!resp.success) {
-        toast.error(resp.results?.[0]?.error || 'Parse failed')
+      const submitted = await invoicesApi.bulkParse(files)
+      if (!submitted.success || !submitted.job_id) {
+        toast.error(submitted.error || 'Parse failed')
+        setIsParsing(false)
+        return
+      }
+      // Parsing runs as a background job — poll until it finishes
+      let resp = await invoicesApi.bulkParseStatus(submitted.job_id)
+      while (!resp.done) {
+        setParseProgress({ done: resp.progress?.done ?? 0, total: resp.progress?.total ?? submitted.total ?? files.length })
+        await new Promise((resolve) => setTimeout(resolve, PARSE_POLL_MS))
+        resp = await invoicesApi.bulkParseStatus(submitted.job_id)
+      }
+      if (resp.status !== 'succeeded') {
+        toast.error(resp.error || 'Parse failed')
         setIsParsing(false)
+        setParseProgress(null)
         return
       }
       const parsed: ParsedInvoice[] = resp.results.map((r, i) => ({
         id: `inv-${i}-${Date.now()}`,
         filename: r.filename,
-        success: r.success,
+        success: r.success ?? false,
         error: r.error,
         duplicate: r.duplicate ?? false,
         selected: r.success && !r.duplicate,
@@ -147,6 +164,7 @@ export default function BulkUpload() {
       toast.error('Failed to parse files')
     }
     setIsParsing(false)
+    setParseProgress(null)
   }
 
   // ── Update invoice field ──
@@ -281,7 +299,9 @@ export default function BulkUpload() {
                 <div className="flex justify-end">
                   <Button onClick={handleParse} disabled={isParsing}>
                     {isParsing ? <Loader2 className="h-4 w-4 animate-spin mr-2" /> : null}
-                    {isParsing ? 'Parsing...' : `Parse ${files.length} File${files.length !== 1 ? 's' : ''}`}
+                    {isParsing
+                      ? parseProgress ? `Parsing ${parseProgress.done}/${parseProgress.total}...` : 'Parsing...'
+                      : `Parse ${files.length} File${files.length !== 1 ? 's' : ''}`}
                   </Button>
                 </div>
               </div>
@@ -22,6 +22,7 @@ import { toast } from 'sonner'
 import RequestDetail from './RequestDetail'
 import type { ApprovalRequest, ApprovalQueueItem, ApprovalDelegation } from '@/types/approvals'
 import type { UserDetail } from '@/types/users'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 type Tab = 'queue' | 'my-requests' | 'all' | 'delegations'
 
@@ -85,10 +86,11 @@ export default function Approvals() {
     enabled: activeTab === 'all',
   })
 
+  const fallbackInterval = useFallbackInterval(30000)
   const { data: countData } = useQuery({
     queryKey: ['approval-queue-count'],
     queryFn: () => approvalsApi.getMyQueueCount(),
-    refetchInterval: 30000,
+    refetchInterval: fallbackInterval,
   })
 
   const { data: delegationsData, isLoading: delegationsLoading } = useQuery({
@@ -7,6 +7,7 @@ import { marketingApi } from '@/api/marketing'
 import { approvalsApi } from '@/api/approvals'
 import { notificationsApi } from '@/api/notifications'
 import type { User } from '@/types'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 /**
  * Runs the same queries as dashboard widgets (React Query deduplicates them)
@@ -47,18 +48,20 @@ export function useWidgetEmptyState(user: User | null) {
     enabled: !!user?.can_access_marketing,
   })
 
+  const approvalsInterval = useFallbackInterval(60_000)
   const approvals = useQuery({
     queryKey: ['dashboard', 'approvalQueue'],
     queryFn: () => approvalsApi.getMyQueue(),
     staleTime: 30_000,
-    refetchInterval: 60_000,
+    refetchInterval: approvalsInterval,
   })
 
+  const notificationsInterval = useFallbackInterval(60_000)
   const notifications = useQuery({
     queryKey: ['dashboard', 'recentNotifications'],
     queryFn: () => notificationsApi.getNotifications({ limit: 5, unread_only: true }),
     staleTime: 30_000,
-    refetchInterval: 60_000,
+    refetchInterval: notificationsInterval,
   })
 
   return useMemo(() => {
@@ -18,6 +18,7 @@ import { efacturaApi } from '@/api/efactura'
 import { hrApi } from '@/api/hr'
 import { marketingApi } from '@/api/marketing'
 import { notificationsApi } from '@/api/notifications'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 // ── Shell ──
 
@@ -280,11 +281,12 @@ export function MarketingSummaryWidget({ enabled }: { enabled: boolean }) {
 // ── Approvals Queue ──
 
 export function ApprovalsQueueWidget({ enabled }: { enabled: boolean }) {
+  const fallbackInterval = useFallbackInterval(60_000)
   const { data } = useQuery({
     queryKey: ['dashboard', 'approvalQueue'],
     queryFn: () => approvalsApi.getMyQueue(),
     staleTime: 30_000,
-    refetchInterval: 60_000,
+    refetchInterval: fallbackInterval,
     enabled,
   })
   const items = data?.queue ?? []
@@ -370,11 +372,12 @@ export function OnlineUsersWidget({ enabled }: { enabled: boolean }) {
 // ── Notifications ──
 
 export function NotificationsWidget({ enabled }: { enabled: boolean }) {
+  const fallbackInterval = useFallbackInterval(60_000)
   const { data, isLoading } = useQuery({
     queryKey: ['dashboard', 'recentNotifications'],
     queryFn: () => notificationsApi.getNotifications({ limit: 5, unread_only: true }),
     staleTime: 30_000,
-    refetchInterval: 60_000,
+    refetchInterval: fallbackInterval,
     enabled,
   })
   const items = data?.notifications ?? []
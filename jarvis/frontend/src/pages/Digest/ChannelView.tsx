@@ -11,6 +11,7 @@ import PostItem from './PostItem'
 import PollCreator from './PollCreator'
 import ThreadView from './ThreadView'
 import ChannelSettings from './ChannelSettings'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 interface Props {
   channel: DigestChannel
@@ -73,10 +74,11 @@ export default function ChannelView({ channel, onBack }: Props) {
     }
   }
 
+  const fallbackInterval = useFallbackInterval(10_000)
   const { data: postsRes, isLoading } = useQuery({
     queryKey: ['digest-posts', channel.id],
     queryFn: () => digestApi.getPosts(channel.id, { limit: 100 }),
-    refetchInterval: 10_000,
+    refetchInterval: fallbackInterval,
   })
   const posts = postsRes?.data ?? []
 
@@ -6,6 +6,7 @@ import { Button } from '@/components/ui/button'
 import { Textarea } from '@/components/ui/textarea'
 import type { DigestChannel, DigestPost } from '@/types/digest'
 import PostItem from './PostItem'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 interface Props {
   channel: DigestChannel
@@ -19,10 +20,11 @@ export default function ThreadView({ channel, parentPost, onBack }: Props) {
   const [replyTo, setReplyTo] = useState<DigestPost | null>(null)
   const bottomRef = useRef<HTMLDivElement>(null)
 
+  const fallbackInterval = useFallbackInterval(10_000)
   const { data: repliesRes, isLoading } = useQuery({
     queryKey: ['digest-thread', channel.id, parentPost.id],
     queryFn: () => digestApi.getPosts(channel.id, { parent_id: parentPost.id, limit: 200 }),
-    refetchInterval: 10_000,
+    refetchInterval: fallbackInterval,
   })
   const replies = repliesRes?.data ?? []
 
@@ -13,6 +13,7 @@ import { Label } from '@/components/ui/label'
 import { cn } from '@/lib/utils'
 import type { DigestChannel } from '@/types/digest'
 import ChannelView from './ChannelView'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 type AudienceMode = 'everyone' | 'levels' | 'manual'
 
@@ -33,10 +34,11 @@ export default function Digest() {
   const [inviteSearch, setInviteSearch] = useState('')
   const [invitedUsers, setInvitedUsers] = useState<{ id: number; name: string; email: string }[]>([])
 
+  const fallbackInterval = useFallbackInterval(30_000)
   const { data: channelsRes, isLoading } = useQuery({
     queryKey: ['digest-channels'],
     queryFn: digestApi.getChannels,
-    refetchInterval: 30_000,
+    refetchInterval: fallbackInterval,
   })
   const channels = channelsRes?.data ?? []
 
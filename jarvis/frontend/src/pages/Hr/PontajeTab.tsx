@@ -30,6 +30,7 @@ import { DateField } from '@/components/ui/date-field'
 import { biostarApi } from '@/api/biostar'
 import { cn } from '@/lib/utils'
 import type { BioStarDailySummary, BioStarRangeSummary, BioStarPunchLog } from '@/types/biostar'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 type SortField = 'name' | 'group' | 'check_in' | 'check_out' | 'duration' | 'punches'
 type SortDir = 'asc' | 'desc'
@@ -224,11 +225,12 @@ export default function PontajeTab({ showStats = false, showFilters = false, man
   const connected = !!status?.connected
 
   // Single day query
+  const fallbackInterval = useFallbackInterval(60_000)
   const { data: dailySummary = [], isLoading: loadingDaily } = useQuery({
     queryKey: ['biostar', 'daily-summary', start, managerFilter],
     queryFn: () => biostarApi.getDailySummary(start, managerFilter),
     enabled: isSingleDay && !is3Day,
-    refetchInterval: isSingleDay && !is3Day && connected ? 60_000 : false,
+    refetchInterval: isSingleDay && !is3Day && connected ? fallbackInterval : false,
   })
 
   // Range query
@@ -1193,10 +1195,11 @@ function DaySection({
 }) {
   const navigate = useNavigate()
   const [expandedId, setExpandedId] = useState<string | null>(null)
+  const fallbackInterval = useFallbackInterval(60_000)
   const { data: summary = [], isLoading } = useQuery({
     queryKey: ['biostar', 'daily-summary', date, managerFilter],
     queryFn: () => biostarApi.getDailySummary(date, managerFilter),
-    refetchInterval: connected ? 60_000 : false,
+    refetchInterval: connected ? fallbackInterval : false,
   })
 
   const label = new Date(`${date}T12:00:00`).toLocaleDateString('ro-RO', {
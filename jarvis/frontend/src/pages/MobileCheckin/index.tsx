@@ -11,6 +11,7 @@ import { useIsMobile } from '@/hooks/useMediaQuery'
 import { useAuth } from '@/hooks/useAuth'
 import { checkinApi } from '@/api/checkin'
 import type { CheckinStatus, PunchResult, CheckinLocation } from '@/types/checkin'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 // ── Haversine (client-side, for display only — server validates) ──
 
@@ -172,10 +173,11 @@ export default function MobileCheckin() {
   const [lastResult, setLastResult] = useState<PunchResult | null>(null)
 
   // Fetch status (today's punches + next direction)
+  const fallbackInterval = useFallbackInterval(30_000)
   const { data: status, isLoading: statusLoading } = useQuery<CheckinStatus>({
     queryKey: ['checkin-status'],
     queryFn: checkinApi.getStatus,
-    refetchInterval: 30_000,
+    refetchInterval: fallbackInterval,
   })
 
   // Fetch locations (for client-side distance display)
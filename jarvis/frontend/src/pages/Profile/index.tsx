@@ -67,6 +67,7 @@ import { cn, usePersistedState } from '@/lib/utils'
 import type { Invoice } from '@/types/invoices'
 import type { ProfileInvoice, ProfileActivity, ProfileBonus, OrgTreeNode } from '@/types/profile'
 import type { BioStarDayHistory, BioStarPunchLog, BioStarDailySummary, BioStarRangeSummary } from '@/types/biostar'
+import { useFallbackInterval } from '@/stores/eventsStore'
 
 type Tab = 'invoices' | 'hr-events' | 'pontaje' | 'team-pontaje' | 'activity'
 
@@ -579,13 +580,14 @@ function netSec(durationSec: number | null, lunchMin: number) {
 function QuickCheckinCard() {
   const qc = useQueryClient()
 
+  const fallbackInterval = useFallbackInterval(60_000)
   const { data: status } = useQuery({
     queryKey: ['checkin', 'status'],
     queryFn: async () => {
       const res = await checkinApi.getStatus()
       return (res as any).data ?? res
     },
-    refetchInterval: 60_000,
+    refetchInterval: fallbackInterval,
   })
 
   const punchMut = useMutation({
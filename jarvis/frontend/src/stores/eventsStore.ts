@@ -0,0 +1,18 @@
+import { create } from 'zustand'
+
+interface EventsState {
+  /** True while the /api/events/stream SSE channel is open */
+  connected: boolean
+  setConnected: (connected: boolean) => void
+}
+
+export const useEventsStore = create<EventsState>((set) => ({
+  connected: false,
+  setConnected: (connected) => set({ connected }),
+}))
+
+/** Poll interval to use for data that is also pushed over SSE: off while connected. */
+export function useFallbackInterval(ms: number): number | false {
+  const connected = useEventsStore((s) => s.connected)
+  return connected ? false : ms
+}
@@ -122,7 +122,34 @@ export interface SubmissionFilters {
   date_from?: string
   date_to?: string
   limit?: number
-  offset?: number
+  cursor?: number
+}
+
+// Aggregated answers (/forms/:id/analytics)
+export interface FormAnalytics {
+  total: number
+  by_status: Record<string, number>
+  fields: {
+    field_id: string
+    label: string
+    type: string | null
+    options?: { option: string; count: number }[]
+    numeric?: {
+      count: number
+      avg: number
+      min: number | null
+      max: number | null
+      histogram: { bucket: number; count: number }[]
+    }
+  }[]
+  daily: {
+    day: string
+    source: string
+    utm_source: string
+    utm_medium: string
+    utm_campaign: string
+    submissions: number
+  }[]
 }
 
 // Public form data (returned by /forms/public/:slug)
@@ -21,6 +21,10 @@ export default defineConfig({
   server: {
     port: 5173,
     proxy: {
+      '/api/events': {
+        target: 'http://localhost:5002',
+        changeOrigin: true,
+      },
       '/api': {
         target: 'http://localhost:5001',
         changeOrigin: true,
@@ -313,157 +313,114 @@ class KpiRepository(BaseRepository):
         resolved from linked budget lines and KPI dependencies.
         For raw KPIs (no formula), sums all linked source values.
         """
-        from marketing.services.formula_engine import evaluate as eval_formula
+        results = self.sync_kpis([project_kpi_id])
+        return results.get(project_kpi_id, {'synced': False, 'reason': 'KPI not found'})
+
+    def sync_all_project_kpis(self, project_id):
+        """Sync all KPIs for a project that have linked sources. Returns count synced."""
+        rows = self.query_all(
+            'SELECT id FROM mkt_project_kpis WHERE project_id = %s', (project_id,)
+        )
+        results = self.sync_kpis([r['id'] for r in rows])
+        return sum(1 for r in results.values() if r.get('synced'))
+
+    def sync_kpis(self, kpi_ids):
+        """Batch-sync KPIs in one transaction, in dependency order.
+
+        Inputs for every KPI are loaded with four set-based queries, values are
+        computed by marketing.services.kpi_sync (topological order, each formula
+        compiled once), then written back with one bulk UPDATE and one bulk
+        snapshot INSERT for the values that changed.
+
+        Individual deal links are handled by +1/-1 in link/unlink_kpi_deal,
+        NOT by sync. This preserves manually recorded values.
+
+        Returns:
+            {kpi_id: {'synced': True, 'value', 'changed'} | {'synced': False, 'reason'}}
+        """
+        from psycopg2.extras import execute_values
+        from marketing.services.kpi_sync import compute_kpi_values
+
+        ids = sorted({int(k) for k in kpi_ids})
+        if not ids:
+            return {}
 
         def _work(cursor):
-            # Get KPI's formula and current value from its definition
             cursor.execute('''
                 SELECT pk.id, pk.current_value, kd.formula
                 FROM mkt_project_kpis pk
                 JOIN mkt_kpi_definitions kd ON kd.id = pk.kpi_definition_id
-                WHERE pk.id = %s
-            ''', (project_kpi_id,))
-            kpi_row = cursor.fetchone()
-            if not kpi_row:
-                return {'synced': False, 'reason': 'KPI not found'}
-            formula = kpi_row['formula']
-            old_value = float(kpi_row['current_value'] or 0)
+                WHERE pk.id = ANY(%s)
+            ''', (ids,))
+            kpis = {r['id']: r for r in cursor.fetchall()}
+            if not kpis:
+                return {}
+            kpi_list = list(kpis)
 
             # Budget lines grouped by role (variable name)
             cursor.execute('''
-                SELECT kb.role, COALESCE(SUM(bl.spent_amount), 0) as total
+                SELECT kb.project_kpi_id, kb.role, COALESCE(SUM(bl.spent_amount), 0) as total
                 FROM mkt_kpi_budget_lines kb
                 JOIN mkt_budget_lines bl ON bl.id = kb.budget_line_id
-                WHERE kb.project_kpi_id = %s
-                GROUP BY kb.role
-            ''', (project_kpi_id,))
-            bl_by_role = {r['role']: float(r['total']) for r in cursor.fetchall()}
+                WHERE kb.project_kpi_id = ANY(%s)
+                GROUP BY kb.project_kpi_id, kb.role
+            ''', (kpi_list,))
+            budget_rows = cursor.fetchall()
 
-            # KPI dependencies grouped by role (variable name)
+            # KPI dependency edges with the stored value of each input
             cursor.execute('''
-                SELECT kd.role, COALESCE(SUM(pk.current_value), 0) as total
+                SELECT kd.project_kpi_id, kd.role, kd.depends_on_kpi_id, pk.current_value
                 FROM mkt_kpi_dependencies kd
                 JOIN mkt_project_kpis pk ON pk.id = kd.depends_on_kpi_id
-                WHERE kd.project_kpi_id = %s
-                GROUP BY kd.role
-            ''', (project_kpi_id,))
-            dep_by_role = {r['role']: float(r['total']) for r in cursor.fetchall()}
+                WHERE kd.project_kpi_id = ANY(%s)
+            ''', (kpi_list,))
+            dependency_rows = cursor.fetchall()
 
-            # Deal sources grouped by role — aggregate CRM deals from linked clients
-            deal_by_role = {}
-            cursor.execute(
-                'SELECT project_id FROM mkt_project_kpis WHERE id = %s',
-                (project_kpi_id,)
-            )
-            proj_row = cursor.fetchone()
-            if proj_row:
-                cursor.execute(
-                    'SELECT * FROM mkt_kpi_deal_sources WHERE project_kpi_id = %s',
-                    (project_kpi_id,)
-                )
-                deal_sources = cursor.fetchall()
-                if deal_sources:
-                    cursor.execute(
-                        'SELECT client_id FROM mkt_project_clients WHERE project_id = %s',
-                        (proj_row['project_id'],)
-                    )
-                    client_ids = [r['client_id'] for r in cursor.fetchall()]
-                    if client_ids:
-                        agg_map = {
-                            'count': 'COUNT(*)',
-                            'sum_revenue': 'COALESCE(SUM(sale_price_net), 0)',
-                            'sum_profit': 'COALESCE(SUM(gross_profit), 0)',
-                            'avg_price': 'COALESCE(AVG(sale_price_net), 0)',
-                        }
-                        for ds in deal_sources:
-                            agg_expr = agg_map.get(ds['metric'], 'COUNT(*)')
-                            conditions = ['client_id IN %s']
-                            params = [tuple(client_ids)]
-                            if ds.get('brand_filter'):
-                                conditions.append('brand ILIKE %s')
-                                params.append(f'%{ds["brand_filter"]}%')
-                            if ds.get('source_filter'):
-                                conditions.append('source = %s')
-                                params.append(ds['source_filter'])
-                            if ds.get('status_filter'):
-                                statuses = [s.strip() for s in ds['status_filter'].split(',')]
-                                placeholders = ','.join(['%s'] * len(statuses))
-                                conditions.append(f'dossier_status IN ({placeholders})')
-                                params.extend(statuses)
-                            if ds.get('date_from'):
-                                conditions.append('contract_date >= %s')
-                                params.append(ds['date_from'])
-                            if ds.get('date_to'):
-                                conditions.append('contract_date <= %s')
-                                params.append(ds['date_to'])
-                            where = ' AND '.join(conditions)
-                            cursor.execute(
-                                f'SELECT {agg_expr} as total FROM crm_deals WHERE {where}',
-                                tuple(params)
-                            )
-                            val = float(cursor.fetchone()['total'] or 0)
-                            role = ds['role']
-                            deal_by_role[role] = deal_by_role.get(role, 0) + val
-
-            # Individual deal links are handled by +1/-1 in link/unlink_kpi_deal,
-            # NOT by sync. This preserves manually recorded values.
-
-            has_sources = bool(bl_by_role) or bool(dep_by_role) or bool(deal_by_role)
-            if not has_sources:
-                return {'synced': False, 'reason': 'No linked sources'}
-
-            # Merge variables from all sources (same variable name = summed)
-            variables = {}
-            for role in set(bl_by_role.keys()) | set(dep_by_role.keys()) | set(deal_by_role.keys()):
-                variables[role] = (bl_by_role.get(role, 0)
-                                   + dep_by_role.get(role, 0)
-                                   + deal_by_role.get(role, 0))
-
-            # Calculate
-            if formula:
-                try:
-                    new_value = round(eval_formula(formula, variables), 4)
-                except ZeroDivisionError:
-                    logger.warning(f"KPI {project_kpi_id}: division by zero in '{formula}'")
-                    new_value = 0
-                except ValueError as e:
-                    logger.warning(f"KPI {project_kpi_id}: formula error: {e}")
-                    return {'synced': False, 'reason': f'Formula error: {e}'}
-            else:
-                # No formula = raw KPI, sum all inputs
-                new_value = sum(variables.values())
+            # Deal sources — every CRM aggregate for every source in one pass
+            cursor.execute('''
+                SELECT ds.id, ds.project_kpi_id, ds.role, ds.metric,
+                       BOOL_OR(pc.client_id IS NOT NULL) as has_clients,
+                       COUNT(d.id) as deal_count,
+                       COALESCE(SUM(d.sale_price_net), 0) as sum_revenue,
+                       COALESCE(SUM(d.gross_profit), 0) as sum_profit,
+                       COALESCE(AVG(d.sale_price_net), 0) as avg_price
+                FROM mkt_kpi_deal_sources ds
+                JOIN mkt_project_kpis pk ON pk.id = ds.project_kpi_id
+                LEFT JOIN mkt_project_clients pc ON pc.project_id = pk.project_id
+                LEFT JOIN crm_deals d ON d.client_id = pc.client_id
+                    AND (COALESCE(ds.brand_filter, '') = ''
+                         OR d.brand ILIKE '%%' || ds.brand_filter || '%%')
+                    AND (COALESCE(ds.source_filter, '') = '' OR d.source = ds.source_filter)
+                    AND (COALESCE(ds.status_filter, '') = ''
+                         OR d.dossier_status IN (
+                             SELECT btrim(s) FROM unnest(string_to_array(ds.status_filter, ',')) s))
+                    AND (ds.date_from IS NULL OR d.contract_date >= ds.date_from)
+                    AND (ds.date_to IS NULL OR d.contract_date <= ds.date_to)
+                WHERE ds.project_kpi_id = ANY(%s)
+                GROUP BY ds.id, ds.project_kpi_id, ds.role, ds.metric
+            ''', (kpi_list,))
+            deal_rows = cursor.fetchall()
+
+            results = compute_kpi_values(kpis, budget_rows, dependency_rows, deal_rows)
 
             # Always update last_synced_at, but only create snapshot if value changed
-            cursor.execute('''
-                UPDATE mkt_project_kpis
-                SET current_value = %s, last_synced_at = NOW(), updated_at = NOW()
-                WHERE id = %s
-            ''', (new_value, project_kpi_id))
-            value_changed = round(old_value, 4) != round(new_value, 4)
-            if value_changed:
-                cursor.execute('''
+            synced = [(k, r['value']) for k, r in results.items() if r.get('synced')]
+            if synced:
+                execute_values(cursor, '''
+                    UPDATE mkt_project_kpis pk
+                    SET current_value = v.value, last_synced_at = NOW(), updated_at = NOW()
+                    FROM (VALUES %s) AS v(id, value)
+                    WHERE pk.id = v.id
+                ''', synced, template='(%s, %s::numeric)')
+            changed = [(k, v) for k, v in synced if results[k]['changed']]
+            if changed:
+                execute_values(cursor, '''
                     INSERT INTO mkt_kpi_snapshots (project_kpi_id, value, source)
-                    VALUES (%s, %s, 'auto')
-                ''', (project_kpi_id, new_value))
-            return {'synced': True, 'value': new_value, 'changed': value_changed}
+                    VALUES %s
+                ''', changed, template="(%s, %s, 'auto')")
+            return results
         return self.execute_many(_work)
 
-    def sync_all_project_kpis(self, project_id):
-        """Sync all KPIs for a project that have linked sources. Returns count synced."""
-        rows = self.query_all(
-            'SELECT id FROM mkt_project_kpis WHERE project_id = %s', (project_id,)
-        )
-        kpi_ids = [r['id'] for r in rows]
-        synced = 0
-        for kpi_id in kpi_ids:
-            try:
-                result = self.sync_kpi(kpi_id)
-                if result.get('synced'):
-                    synced += 1
-            except Exception as e:
-                logger.warning(f"Failed to sync KPI {kpi_id}: {e}")
-        return synced
-
     def get_all_syncable_kpi_ids(self):
         """Get all KPI IDs that have at least one linked source."""
         rows = self.query_all('''
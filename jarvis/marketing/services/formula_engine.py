@@ -3,9 +3,19 @@
 Parses formula strings like 'spent / leads' or '(likes + comments) / impressions * 100'
 and evaluates them with variable substitution. Uses Python's ast module with a strict
 whitelist to prevent code injection.
+
+Compiled formulas are cached (LRU keyed by formula text), so repeated
+evaluate() calls from KPI sync and other loops parse and validate each
+formula only once. evaluate_many() applies one formula across columns of
+values in a single pass.
 """
 
 import ast
+from functools import lru_cache
+
+# Distinct formulas kept compiled — the KPI catalogue is small, so this
+# comfortably holds every formula in use.
+FORMULA_CACHE_SIZE = 256
 
 # Only these AST node types are allowed in formulas
 _SAFE_NODES = (
@@ -84,42 +94,149 @@ def validate(formula):
     return True, None, variables
 
 
-def evaluate(formula, variables):
-    """Safely evaluate a formula with variable values.
+class CompiledFormula:
+    """A parsed, validated and compiled formula — build once, evaluate many times."""
+
+    __slots__ = ('source', 'variables', '_code', '_row_fn')
+
+    def __init__(self, source, variables, code, row_fn):
+        self.source = source
+        self.variables = variables
+        self._code = code
+        self._row_fn = row_fn
+
+    def evaluate(self, variables):
+        """Evaluate with a dict of variable values. Same contract as evaluate()."""
+        for name in self.variables:
+            if name not in variables:
+                raise ValueError(f'Undefined variable: {name}')
+
+        result = eval(self._code, {'__builtins__': {}}, variables)
+
+        if not isinstance(result, (int, float)):
+            raise ValueError(f'Formula did not produce a number: {type(result).__name__}')
+
+        return float(result)
+
+    def evaluate_many(self, columns, zero_division=None):
+        """Evaluate across columns of values. See evaluate_many()."""
+        for name in self.variables:
+            if name not in columns:
+                raise ValueError(f'Undefined variable: {name}')
+        cols = [[float(v) for v in columns[name]] for name in self.variables]
+        lengths = {len(c) for c in cols}
+        if len(lengths) > 1:
+            raise ValueError('All columns must have the same length')
+
+        if not cols:
+            # Constant formula — no column to take the row count from
+            n = len(next(iter(columns.values()), ()))
+            return [self.evaluate({})] * n
+
+        try:
+            return [float(r) for r in map(self._row_fn, *cols)]
+        except ZeroDivisionError:
+            pass
+        # Slow path only when some row divides by zero
+        results = []
+        for row in zip(*cols):
+            try:
+                results.append(float(self._row_fn(*row)))
+            except ZeroDivisionError:
+                results.append(zero_division)
+        return results
+
+
+def compile_formula(formula):
+    """Parse, validate and compile a formula string.
 
     Args:
         formula: Formula string, e.g. 'spent / leads'.
-        variables: Dict mapping variable names to float values,
-                   e.g. {'spent': 1000.0, 'leads': 50.0}.
 
     Returns:
-        Float result of the formula evaluation.
+        CompiledFormula exposing .variables and .evaluate(variables).
 
     Raises:
-        ValueError: If formula is empty, contains unsafe constructs,
-                    or references undefined variables.
-        ZeroDivisionError: If formula divides by zero.
+        ValueError: If formula is empty or contains unsafe constructs.
+        SyntaxError: If formula cannot be parsed.
     """
     if not formula or not formula.strip():
         raise ValueError('Empty formula')
+    return _compile_cached(formula.strip())
+
 
-    formula = formula.strip()
+@lru_cache(maxsize=FORMULA_CACHE_SIZE)
+def _compile_cached(formula):
+    # Errors propagate and are not cached
     tree = ast.parse(formula, mode='eval')
 
     # Validate all nodes are safe
+    names = []
     for node in ast.walk(tree):
         if not isinstance(node, _SAFE_NODES):
             raise ValueError(f'Unsafe formula construct: {type(node).__name__}')
-
-    # Validate all variables are defined
-    for node in ast.walk(tree):
-        if isinstance(node, ast.Name) and node.id not in variables:
-            raise ValueError(f'Undefined variable: {node.id}')
+        if isinstance(node, ast.Name) and node.id not in names:
+            names.append(node.id)
 
     code = compile(tree, '<formula>', 'eval')
-    result = eval(code, {'__builtins__': {}}, variables)
 
-    if not isinstance(result, (int, float)):
-        raise ValueError(f'Formula did not produce a number: {type(result).__name__}')
+    # Same expression as a positional function (lambda a, b: <expr>) for
+    # evaluate_many — avoids building a dict per row
+    row_lambda = ast.Expression(body=ast.Lambda(
+        args=ast.arguments(
+            posonlyargs=[], args=[ast.arg(arg=n) for n in names],
+            kwonlyargs=[], kw_defaults=[], defaults=[],
+        ),
+        body=tree.body,
+    ))
+    ast.fix_missing_locations(row_lambda)
+    row_fn = eval(compile(row_lambda, '<formula>', 'eval'), {'__builtins__': {}})
+
+    return CompiledFormula(formula, tuple(names), code, row_fn)
+
 
-    return float(result)
+def cache_info():
+    """Compiled-formula cache statistics (hits, misses, maxsize, currsize)."""
+    return _compile_cached.cache_info()
+
+
+def clear_cache():
+    _compile_cached.cache_clear()
+
+
+def evaluate(formula, variables):
+    """Safely evaluate a formula with variable values.
+
+    Args:
+        formula: Formula string, e.g. 'spent / leads'.
+        variables: Dict mapping variable names to float values,
+                   e.g. {'spent': 1000.0, 'leads': 50.0}.
+
+    Returns:
+        Float result of the formula evaluation.
+
+    Raises:
+        ValueError: If formula is empty, contains unsafe constructs,
+                    or references undefined variables.
+        ZeroDivisionError: If formula divides by zero.
+    """
+    return compile_formula(formula).evaluate(variables)
+
+
+def evaluate_many(formula, columns, zero_division=None):
+    """Evaluate one formula across arrays of variable values.
+
+    Args:
+        formula: Formula string, e.g. 'budget * cvr / 100'.
+        columns: Dict mapping variable names to equal-length sequences,
+                 e.g. {'budget': [1000, 2000], 'cvr': [2.5, 3.0]}.
+        zero_division: Value returned for rows that divide by zero.
+
+    Returns:
+        List of floats, one per row.
+
+    Raises:
+        ValueError: If formula is empty/unsafe, a variable has no column,
+                    or column lengths differ.
+    """
+    return compile_formula(formula).evaluate_many(columns, zero_division=zero_division)
@@ -0,0 +1,140 @@
+"""KPI sync planner — dependency-ordered evaluation of project KPIs.
+
+Pure computation over inputs loaded in bulk by KpiRepository.sync_kpis():
+builds the KPI dependency DAG, orders it topologically so a KPI is only
+evaluated after every KPI it depends on. Formulas come from the
+formula_engine compile cache, so each distinct formula is parsed once.
+"""
+
+import logging
+from collections import defaultdict, deque
+
+from .formula_engine import compile_formula
+
+logger = logging.getLogger('jarvis.marketing.services.kpi_sync')
+
+# crm_deals aggregate column per deal-source metric (unknown metrics count deals)
+DEAL_METRIC_COLUMNS = {
+    'count': 'deal_count',
+    'sum_revenue': 'sum_revenue',
+    'sum_profit': 'sum_profit',
+    'avg_price': 'avg_price',
+}
+
+
+def topological_order(kpi_ids, edges):
+    """Order KPIs so dependencies come before dependents (Kahn's algorithm).
+
+    Args:
+        kpi_ids: KPIs being synced.
+        edges: Iterable of (kpi_id, depends_on_kpi_id). Edges pointing outside
+               kpi_ids are ignored — those values are read as stored.
+
+    Returns:
+        Tuple (ordered_ids, cyclic_ids). KPIs on a cycle are appended in id
+        order and read cyclic inputs at their last known value.
+    """
+    nodes = set(kpi_ids)
+    dependents = defaultdict(set)
+    indegree = {k: 0 for k in nodes}
+    for kpi_id, dep_id in edges:
+        if kpi_id in nodes and dep_id in nodes and kpi_id != dep_id \
+                and kpi_id not in dependents[dep_id]:
+            dependents[dep_id].add(kpi_id)
+            indegree[kpi_id] += 1
+
+    ready = deque(sorted(k for k, d in indegree.items() if d == 0))
+    ordered = []
+    while ready:
+        node = ready.popleft()
+        ordered.append(node)
+        for child in sorted(dependents[node]):
+            indegree[child] -= 1
+            if indegree[child] == 0:
+                ready.append(child)
+
+    cyclic = sorted(k for k, d in indegree.items() if d > 0)
+    if cyclic:
+        logger.warning(f'KPI dependency cycle among {cyclic}; using last known values for cyclic inputs')
+    return ordered + cyclic, cyclic
+
+
+def compute_kpi_values(kpis, budget_rows, dependency_rows, deal_rows):
+    """Evaluate every KPI in dependency order.
+
+    Args:
+        kpis: {kpi_id: {'current_value', 'formula'}} for the KPIs being synced.
+        budget_rows: [{'project_kpi_id', 'role', 'total'}] — spent per role.
+        dependency_rows: [{'project_kpi_id', 'role', 'depends_on_kpi_id', 'current_value'}].
+        deal_rows: [{'project_kpi_id', 'role', 'metric', 'has_clients', <metric columns>}].
+
+    Returns:
+        {kpi_id: result} where result matches KpiRepository.sync_kpi():
+        {'synced': True, 'value', 'changed'} or {'synced': False, 'reason'}.
+    """
+    bl_by_kpi = defaultdict(lambda: defaultdict(float))
+    for r in budget_rows:
+        bl_by_kpi[r['project_kpi_id']][r['role']] += float(r['total'] or 0)
+
+    deps_by_kpi = defaultdict(list)
+    stored = {}
+    for r in dependency_rows:
+        deps_by_kpi[r['project_kpi_id']].append((r['role'], r['depends_on_kpi_id']))
+        stored[r['depends_on_kpi_id']] = float(r['current_value'] or 0)
+
+    deal_by_kpi = defaultdict(lambda: defaultdict(float))
+    for r in deal_rows:
+        # Mirrors the per-KPI sync: no linked clients → the source contributes nothing
+        if not r.get('has_clients'):
+            continue
+        column = DEAL_METRIC_COLUMNS.get(r['metric'], 'deal_count')
+        deal_by_kpi[r['project_kpi_id']][r['role']] += float(r[column] or 0)
+
+    # Fresh values — seeded with stored values, overwritten as KPIs are evaluated
+    values = {k: float(v['current_value'] or 0) for k, v in kpis.items()}
+    values.update({k: v for k, v in stored.items() if k not in values})
+
+    edges = [(k, dep) for k, deps in deps_by_kpi.items() for _, dep in deps]
+    order, _ = topological_order(kpis.keys(), edges)
+
+    results = {}
+    for kpi_id in order:
+        kpi = kpis[kpi_id]
+        bl_by_role = bl_by_kpi.get(kpi_id, {})
+        deal_by_role = deal_by_kpi.get(kpi_id, {})
+        dep_by_role = defaultdict(float)
+        for role, dep_id in deps_by_kpi.get(kpi_id, ()):
+            dep_by_role[role] += values.get(dep_id, 0.0)
+
+        if not (bl_by_role or dep_by_role or deal_by_role):
+            results[kpi_id] = {'synced': False, 'reason': 'No linked sources'}
+            continue
+
+        variables = {}
+        for role in set(bl_by_role) | set(dep_by_role) | set(deal_by_role):
+            variables[role] = (bl_by_role.get(role, 0)
+                               + dep_by_role.get(role, 0)
+                               + deal_by_role.get(role, 0))
+
+        formula = kpi['formula']
+        if formula:
+            try:
+                new_value = round(compile_formula(formula).evaluate(variables), 4)
+            except ZeroDivisionError:
+                logger.warning(f"KPI {kpi_id}: division by zero in '{formula}'")
+                new_value = 0
+            except (ValueError, SyntaxError) as e:
+                logger.warning(f"KPI {kpi_id}: formula error: {e}")
+                results[kpi_id] = {'synced': False, 'reason': f'Formula error: {e}'}
+                continue
+        else:
+            # No formula = raw KPI, sum all inputs
+            new_value = sum(variables.values())
+
+        old_value = float(kpi['current_value'] or 0)
+        values[kpi_id] = float(new_value)
+        results[kpi_id] = {
+            'synced': True, 'value': new_value,
+            'changed': round(old_value, 4) != round(new_value, 4),
+        }
+    return results
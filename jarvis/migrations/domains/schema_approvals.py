@@ -188,6 +188,19 @@ def create_schema_approvals(conn, cursor):
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_approval_delegations_delegate ON approval_delegations(delegate_id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_approval_delegations_active ON approval_delegations(is_active, starts_at, ends_at)')
 
+    # Materialised per-user approval queue (maintained by ApprovalEngine)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS approval_inbox (
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            request_id INTEGER NOT NULL REFERENCES approval_requests(id) ON DELETE CASCADE,
+            step_id INTEGER NOT NULL REFERENCES approval_steps(id) ON DELETE CASCADE,
+            reason TEXT NOT NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, request_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_approval_inbox_request ON approval_inbox(request_id)')
+
     # In-app notifications table
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS notifications (
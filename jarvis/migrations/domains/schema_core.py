@@ -1,5 +1,6 @@
-"""Core schema: invoices, allocations, invoice_templates, dept_structure,
-companies, structure_nodes, structure_node_members, connectors, connector_sync_log.
+"""Core schema: invoices, allocations, invoice_templates, invoice_parse_cache, bulk_upload_files,
+bnr_exchange_rates, dept_structure, companies, structure_nodes, structure_node_members, connectors,
+connector_sync_log.
 """
 import psycopg2
 import psycopg2.errors
@@ -95,6 +96,63 @@ def create_schema_core(conn, cursor):
         )
     ''')
 
+    # Content-addressed invoice parse results (accounting/bugetare/parse_cache.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS invoice_parse_cache (
+            cache_key TEXT PRIMARY KEY,
+            kind TEXT NOT NULL,
+            content_sha256 TEXT NOT NULL,
+            parser_version TEXT NOT NULL,
+            result JSONB NOT NULL,
+            size_bytes INTEGER NOT NULL,
+            cost_usd NUMERIC(10,6) NOT NULL DEFAULT 0,
+            hit_count INTEGER NOT NULL DEFAULT 0,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            last_hit_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_invoice_parse_cache_last_hit ON invoice_parse_cache(last_hit_at)')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS invoice_parse_cache_stats (
+            kind TEXT PRIMARY KEY,
+            hits BIGINT NOT NULL DEFAULT 0,
+            misses BIGINT NOT NULL DEFAULT 0,
+            saved_usd NUMERIC(12,4) NOT NULL DEFAULT 0
+        )
+    ''')
+
+    # Stored uploads for bulk parse jobs (accounting/bugetare/bulk_jobs.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bulk_upload_files (
+            id SERIAL PRIMARY KEY,
+            batch_id TEXT NOT NULL,
+            position INTEGER NOT NULL,
+            filename TEXT NOT NULL,
+            content BYTEA,
+            size_bytes INTEGER NOT NULL DEFAULT 0,
+            status TEXT NOT NULL DEFAULT 'pending',
+            result JSONB,
+            error TEXT,
+            duplicate BOOLEAN NOT NULL DEFAULT FALSE,
+            created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            finished_at TIMESTAMP
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_bulk_upload_files_batch ON bulk_upload_files(batch_id, position)')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_bulk_upload_files_created ON bulk_upload_files(created_at)')
+
+    # BNR reference rates, RON per 1 unit (core/services/currency_converter.py)
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS bnr_exchange_rates (
+            currency TEXT NOT NULL,
+            rate_date DATE NOT NULL,
+            rate NUMERIC(14,6) NOT NULL,
+            fetched_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (currency, rate_date)
+        )
+    ''')
+
     cursor.execute('''
         CREATE TABLE IF NOT EXISTS department_structure (
             id SERIAL PRIMARY KEY,
@@ -1,4 +1,4 @@
-"""Digest module schema: channels, posts, reactions, polls, read-tracking."""
+"""Digest module schema: channels, posts, reactions, polls, read-tracking, unread counters."""
 
 
 def create_schema_digest(conn, cursor):
@@ -156,4 +156,21 @@ def create_schema_digest(conn, cursor):
         )
     ''')
 
+    # ============== Unread Counters ==============
+    # Maintained per (user, channel); see digest/repositories/unread_repository.py
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS digest_unread_counters (
+            user_id INTEGER NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+            channel_id INTEGER NOT NULL REFERENCES digest_channels(id) ON DELETE CASCADE,
+            unread_count INTEGER NOT NULL DEFAULT 0,
+            counted_through_post_id INTEGER NOT NULL DEFAULT 0,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            PRIMARY KEY (user_id, channel_id)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_digest_unread_counters_channel ON digest_unread_counters(channel_id, user_id)')
+    # Recounts: live posts after a read position, and the channel's newest post id
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_digest_posts_channel_id ON digest_posts(channel_id, id)')
+
     conn.commit()
@@ -1,4 +1,4 @@
-"""Forms schema: forms + form_submissions tables."""
+"""Forms schema: forms + form_submissions tables, analytics aggregates."""
 
 
 def create_schema_forms(conn, cursor):
@@ -71,10 +71,99 @@ def create_schema_forms(conn, cursor):
             ))
         )
     ''')
-    cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_submissions_form ON form_submissions(form_id)')
+    # Maintained by SubmissionRepository (create / delete); backfilled once
+    cursor.execute('''
+        DO $$
+        BEGIN
+            IF NOT EXISTS (SELECT 1 FROM information_schema.columns
+                           WHERE table_name = 'forms' AND column_name = 'submission_count') THEN
+                ALTER TABLE forms ADD COLUMN submission_count INTEGER NOT NULL DEFAULT 0;
+                UPDATE forms f SET submission_count = s.n
+                FROM (SELECT form_id, COUNT(*) AS n FROM form_submissions GROUP BY form_id) s
+                WHERE s.form_id = f.id;
+            END IF;
+        END $$;
+    ''')
+
+    # Search document: respondent fields + every string/number answer
+    # (signature data URLs excluded)
+    cursor.execute('''
+        ALTER TABLE form_submissions ADD COLUMN IF NOT EXISTS search_text TEXT
+            GENERATED ALWAYS AS (
+                coalesce(respondent_name, '') || ' ' ||
+                coalesce(respondent_email, '') || ' ' ||
+                coalesce(respondent_phone, '') || ' ' ||
+                coalesce(jsonb_path_query_array(answers,
+                    'strict $.** ? ((@.type() == "string" && !(@ starts with "data:")) || @.type() == "number")'
+                )::text, '')
+            ) STORED
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_submissions_form_id ON form_submissions(form_id, id)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_submissions_status ON form_submissions(status)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_submissions_created ON form_submissions(created_at)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_submissions_utm ON form_submissions USING GIN (utm_data)')
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_submissions_answers ON form_submissions USING GIN (answers)')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_form_submissions_search_fts ON form_submissions USING GIN (to_tsvector('simple', search_text))")
+
+    # ============== Analytics Aggregates ==============
+    # Maintained by SubmissionRepository; see forms/repositories/analytics_repo.py
+
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS form_option_counts (
+            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+            field_id TEXT NOT NULL,
+            option TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (form_id, field_id, option)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS form_numeric_stats (
+            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+            field_id TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            total DOUBLE PRECISION NOT NULL DEFAULT 0,
+            min_value DOUBLE PRECISION,
+            max_value DOUBLE PRECISION,
+            PRIMARY KEY (form_id, field_id)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS form_numeric_buckets (
+            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+            field_id TEXT NOT NULL,
+            bucket DOUBLE PRECISION NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (form_id, field_id, bucket)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS form_daily_stats (
+            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+            day DATE NOT NULL,
+            source TEXT NOT NULL,
+            utm_source TEXT NOT NULL DEFAULT '',
+            utm_medium TEXT NOT NULL DEFAULT '',
+            utm_campaign TEXT NOT NULL DEFAULT '',
+            submissions INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (form_id, day, source, utm_source, utm_medium, utm_campaign)
+        )
+    ''')
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS form_status_counts (
+            form_id INTEGER NOT NULL REFERENCES forms(id) ON DELETE CASCADE,
+            status TEXT NOT NULL,
+            count INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (form_id, status)
+        )
+    ''')
 
     conn.commit()
+
+    # Trigram index for substring search (needs pg_trgm)
+    try:
+        cursor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+        cursor.execute('CREATE INDEX IF NOT EXISTS idx_form_submissions_search_trgm ON form_submissions USING gin (search_text gin_trgm_ops)')
+        conn.commit()
+    except Exception:
+        conn.rollback()
@@ -1,6 +1,7 @@
 """Misc schema: notification_settings/log, user_events, password_reset_tokens,
 user_filter_presets, tag_groups, tags, entity_tags, auto_tag_rules, vat_rates,
-dropdown_options, theme_settings, module_menu_items, reinvoice_destinations.
+dropdown_options, theme_settings, module_menu_items, reinvoice_destinations, jobs,
+rate_limit_counters, dashboard_snapshots.
 """
 import json
 import psycopg2
@@ -559,6 +560,14 @@ def create_schema_misc(conn, cursor):
 
     # Create index on responsible_user_id for fast profile queries
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_allocations_responsible_user_id ON allocations(responsible_user_id)')
+    # Name -> user resolution at write time, and the unresolved rows the
+    # resolve_allocation_responsibles job links later
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_lower_name ON users(LOWER(name))')
+    cursor.execute('''
+        CREATE INDEX IF NOT EXISTS idx_allocations_unresolved_responsible
+        ON allocations(LOWER(responsible))
+        WHERE responsible_user_id IS NULL AND responsible IS NOT NULL
+    ''')
     conn.commit()
 
     # Migrate existing responsible names to responsible_user_id
@@ -617,3 +626,62 @@ def create_schema_misc(conn, cursor):
 
     cursor.execute('CREATE INDEX IF NOT EXISTS idx_allocations_line_item ON allocations(invoice_id, line_item_index)')
     conn.commit()
+
+    # ── Background job queue (core/jobs) ──
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS jobs (
+            id BIGSERIAL PRIMARY KEY,
+            task TEXT NOT NULL,
+            payload JSONB NOT NULL DEFAULT '{}'::JSONB,
+            status TEXT NOT NULL DEFAULT 'queued',
+            priority INTEGER NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            max_attempts INTEGER NOT NULL DEFAULT 3,
+            timeout_seconds INTEGER NOT NULL DEFAULT 600,
+            run_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            dedupe_key TEXT,
+            progress JSONB,
+            result JSONB,
+            last_error TEXT,
+            locked_by TEXT,
+            locked_at TIMESTAMP,
+            heartbeat_at TIMESTAMP,
+            created_by INTEGER REFERENCES users(id) ON DELETE SET NULL,
+            created_at TIMESTAMP NOT NULL DEFAULT NOW(),
+            started_at TIMESTAMP,
+            finished_at TIMESTAMP,
+            CONSTRAINT jobs_status_check CHECK (status IN (
+                'queued', 'running', 'succeeded', 'failed', 'cancelled'
+            ))
+        )
+    ''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_ready ON jobs(priority DESC, run_at, id) WHERE status = 'queued'")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_jobs_dedupe ON jobs(dedupe_key) WHERE status IN ('queued', 'running')")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_jobs_running ON jobs(heartbeat_at) WHERE status = 'running'")
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_jobs_task_created ON jobs(task, created_at DESC)')
+    conn.commit()
+
+    # ── Shared rate limiter buckets (core/utils/rate_limit.py) ──
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS rate_limit_counters (
+            scope TEXT NOT NULL,
+            key TEXT NOT NULL,
+            bucket BIGINT NOT NULL,
+            hits INTEGER NOT NULL DEFAULT 0,
+            expires_at TIMESTAMP NOT NULL,
+            PRIMARY KEY (scope, key, bucket)
+        )
+    ''')
+    cursor.execute('CREATE INDEX IF NOT EXISTS idx_rate_limit_counters_expires ON rate_limit_counters(expires_at)')
+    conn.commit()
+
+    # ── Shared dashboard snapshots (core/mobile/repository.py) ──
+    cursor.execute('''
+        CREATE TABLE IF NOT EXISTS dashboard_snapshots (
+            key TEXT PRIMARY KEY,
+            payload JSONB NOT NULL,
+            version BIGINT NOT NULL DEFAULT 1,
+            refreshed_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP
+        )
+    ''')
+    conn.commit()
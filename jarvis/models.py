@@ -92,7 +92,7 @@ def load_structure() -> list[DepartmentUnit]:
     global _structure_cache
 
     # Return cached data if valid
-    if _is_cache_valid(_structure_cache):
+    if _is_cache_valid(_structure_cache, 'structure'):
         return _structure_cache['data']
 
     conn = get_db()
@@ -133,7 +133,7 @@ def get_companies() -> list[str]:
     global _companies_cache
 
     # Return cached data if valid
-    if _is_cache_valid(_companies_cache):
+    if _is_cache_valid(_companies_cache, 'companies'):
         return _companies_cache['data']
 
     conn = get_db()
@@ -163,10 +163,9 @@ def get_brands_for_company(company: str) -> list[str]:
 
     # Check cache
     cache_key = company
-    if cache_key in _brands_cache:
-        entry = _brands_cache[cache_key]
-        if _is_cache_valid(entry):
-            return entry['data']
+    entry = _brands_cache.get(cache_key)
+    if _is_cache_valid(entry or {}, 'brands'):
+        return entry['data']
 
     conn = get_db()
     try:
@@ -198,10 +197,9 @@ def get_departments_for_company(company: str) -> list[str]:
 
     # Check cache
     cache_key = company
-    if cache_key in _departments_cache:
-        entry = _departments_cache[cache_key]
-        if _is_cache_valid(entry):
-            return entry['data']
+    entry = _departments_cache.get(cache_key)
+    if _is_cache_valid(entry or {}, 'departments'):
+        return entry['data']
 
     conn = get_db()
     try:
@@ -230,10 +228,9 @@ def get_subdepartments(company: str, department: str) -> list[str]:
 
     # Check cache
     cache_key = (company, department)
-    if cache_key in _subdepartments_cache:
-        entry = _subdepartments_cache[cache_key]
-        if _is_cache_valid(entry):
-            return entry['data']
+    entry = _subdepartments_cache.get(cache_key)
+    if _is_cache_valid(entry or {}, 'subdepartments'):
+        return entry['data']
 
     conn = get_db()
     try:
@@ -1,24 +1,36 @@
 """
-Scheduled cleanup tasks for JARVIS.
+Scheduled background tasks for JARVIS.
 
-Uses APScheduler BackgroundScheduler to run periodic maintenance jobs.
-Only one worker starts the scheduler (file-lock guard) to avoid
-duplicate execution and wasted DB connections.
+Each task is registered with core.jobs (@task) and runs in the job worker
+(`python worker.py`), which applies retries, backoff and timeouts. The
+APScheduler BackgroundScheduler is enqueue-only: on each trigger it queues
+the task, deduplicated so a slow run never piles up behind itself. Only one
+web worker starts the scheduler (file-lock guard).
+
+Tasks re-raise after logging so the job queue can retry them.
 """
 
 import os
 import atexit
 import fcntl
+from datetime import datetime
 from apscheduler.schedulers.background import BackgroundScheduler
+from core.jobs import task, enqueue, scheduled_dedupe_key
+from core.metrics import Counter
 from core.utils.logging_config import get_logger
 
 logger = get_logger('jarvis.tasks.cleanup')
 
+SCHEDULER_TRIGGERS = Counter('jarvis_scheduler_triggers_total',
+                             'Scheduler triggers by task and result (queued, skipped, error)',
+                             ['task', 'result'])
+
 scheduler = BackgroundScheduler(daemon=True)
 _lock_file = None
 _scheduler_deferred = False  # True when another worker holds the lock
 
 
+@task()
 def cleanup_old_unallocated_invoices():
     """Permanently delete unallocated e-Factura invoices older than 15 days."""
     try:
@@ -29,8 +41,10 @@ def cleanup_old_unallocated_invoices():
             logger.info(f"Cleanup: deleted {count} old unallocated e-Factura invoices (>15 days)")
     except Exception as e:
         logger.error(f"Cleanup task failed: {e}")
+        raise
 
 
+@task(priority=-10, timeout=3600, max_attempts=2)
 def reindex_rag_documents():
     """Reindex all RAG document sources for the AI agent."""
     try:
@@ -41,8 +55,10 @@ def reindex_rag_documents():
         logger.info(f"RAG reindex complete: {total} documents indexed")
     except Exception as e:
         logger.error(f"RAG reindex task failed: {e}")
+        raise
 
 
+@task(priority=10, timeout=300)
 def process_approval_tasks():
     """Run approval engine scheduled tasks: timeouts, reminders, expirations, delegation cleanup."""
     try:
@@ -56,8 +72,46 @@ def process_approval_tasks():
         logger.debug("Approval engine scheduled tasks completed")
     except Exception as e:
         logger.error(f"Approval engine scheduled tasks failed: {e}")
+        raise
+
+
+@task(priority=5, timeout=300)
+def reconcile_approval_inbox():
+    """Repair drift in the materialised approval inbox (role changes, delegation windows)."""
+    try:
+        from core.approvals.engine import ApprovalEngine
+        ApprovalEngine().reconcile_inbox()
+    except Exception as e:
+        logger.error(f"Approval inbox reconcile failed: {e}")
+        raise
+
+
+@task(priority=5, timeout=900)
+def digest_unread_fanout(channel_id, post_id):
+    """Add a new public-channel post to its readers' digest unread counters."""
+    try:
+        from digest.repositories.unread_repository import UnreadRepository
+        UnreadRepository().fan_out(channel_id, post_id)
+    except Exception as e:
+        logger.error(f"Digest unread fan-out failed for post {post_id}: {e}")
+        raise
+
+
+@task(priority=-5, timeout=900)
+def reconcile_digest_unread(since_minutes=None):
+    """Repair drift in digest unread counters (recently active channels, or all)."""
+    try:
+        from digest.repositories.unread_repository import UnreadRepository
+        result = UnreadRepository().reconcile(since_minutes=since_minutes)
+        if result['corrected'] or result['removed']:
+            logger.info(f"Digest unread reconcile: {result['corrected']} corrected, "
+                        f"{result['removed']} removed")
+    except Exception as e:
+        logger.error(f"Digest unread reconcile failed: {e}")
+        raise
 
 
+@task(priority=-5)
 def cleanup_old_notifications():
     """Delete in-app notifications older than 30 days."""
     try:
@@ -68,8 +122,10 @@ def cleanup_old_notifications():
             logger.info(f"Cleanup: deleted {count} old notifications (>30 days)")
     except Exception as e:
         logger.error(f"Notification cleanup task failed: {e}")
+        raise
 
 
+@task(priority=-5)
 def cleanup_push_rate_limit_log():
     """Delete push rate limit log entries older than 7 days."""
     try:
@@ -80,8 +136,10 @@ def cleanup_push_rate_limit_log():
             logger.info(f"Cleanup: deleted {count} old push rate limit log entries (>7 days)")
     except Exception as e:
         logger.error(f"Push rate limit cleanup failed: {e}")
+        raise
 
 
+@task(timeout=900, max_attempts=1)
 def run_smart_notifications():
     """Run smart notification checks (KPI thresholds, budget utilization, invoice anomalies, e-Factura backlog)."""
     try:
@@ -90,28 +148,44 @@ def run_smart_notifications():
         svc.run_all_checks()
     except Exception as e:
         logger.error(f"Smart notification task failed: {e}")
+        raise
 
 
+@task(timeout=900)
 def sync_marketing_kpis():
-    """Sync all marketing KPIs that have linked budget lines or dependencies."""
+    """Sync all marketing KPIs that have linked budget lines or dependencies.
+
+    One batched, dependency-ordered pass (KpiRepository.sync_kpis) so KPIs
+    that depend on other KPIs see this run's values, not the previous run's.
+    """
     try:
         from marketing.repositories import KpiRepository
         repo = KpiRepository()
         kpi_ids = repo.get_all_syncable_kpi_ids()
-        synced = 0
-        for kpi_id in kpi_ids:
-            try:
-                result = repo.sync_kpi(kpi_id)
-                if result.get('synced'):
-                    synced += 1
-            except Exception as e:
-                logger.warning(f"Failed to sync KPI {kpi_id}: {e}")
+        results = repo.sync_kpis(kpi_ids)
+        synced = sum(1 for r in results.values() if r.get('synced'))
         if synced > 0:
             logger.info(f"Marketing KPI sync: {synced}/{len(kpi_ids)} KPIs updated")
     except Exception as e:
         logger.error(f"Marketing KPI sync task failed: {e}")
+        raise
+
+
+@task(priority=5, timeout=900)
+def sync_bnr_rates(years=None):
+    """Store BNR exchange rates: today's feed, plus yearly archives for years in use
+    that have none (or `years`, for an on-demand backfill)."""
+    try:
+        from core.services.currency_converter import sync_rates
+        result = sync_rates(years)
+        if result['years']:
+            logger.info(f"BNR rates: {result['rates']} rates stored for {result['years']}")
+    except Exception as e:
+        logger.error(f"BNR rate sync failed: {e}")
+        raise
 
 
+@task(priority=-10, timeout=1800, max_attempts=2)
 def extract_ai_knowledge():
     """Extract learned patterns from positively-rated AI responses."""
     try:
@@ -124,8 +198,10 @@ def extract_ai_knowledge():
             logger.info(f"Knowledge extraction: {extracted} new, {merged} merged")
     except Exception as e:
         logger.error(f"Knowledge extraction task failed: {e}")
+        raise
 
 
+@task(timeout=900, max_attempts=1)
 def run_daily_digest():
     """Generate and send daily AI-powered digest to admins/managers."""
     try:
@@ -137,8 +213,10 @@ def run_daily_digest():
             logger.info(f"Daily digest sent to {result['sent_to']} users")
     except Exception as e:
         logger.error(f"Daily digest task failed: {e}")
+        raise
 
 
+@task(max_attempts=1)
 def field_sales_follow_up_reminders():
     """Trigger 4: Notify KAMs about visits with follow-up date = tomorrow.
 
@@ -215,8 +293,10 @@ def field_sales_follow_up_reminders():
             logger.info(f"Field Sales follow-up reminders: {sent} sent for {tomorrow}")
     except Exception as e:
         logger.error(f"Field Sales follow-up reminders failed: {e}")
+        raise
 
 
+@task(max_attempts=1)
 def field_sales_overdue_visit_alerts():
     """Trigger 5: Alert managers about overdue visits (planned but not completed).
 
@@ -309,6 +389,7 @@ Verificați în JARVIS Field Sales."""
         logger.info(f"Field Sales overdue alerts: {total_overdue} overdue visits across {len(by_kam)} KAMs")
     except Exception as e:
         logger.error(f"Field Sales overdue visit alerts failed: {e}")
+        raise
 
 
 def _save_biostar_cron_log(job_id, success, message):
@@ -336,6 +417,7 @@ def _save_biostar_cron_log(job_id, success, message):
         logger.error(f"Failed to save cron log for {job_id}: {e}")
 
 
+@task(timeout=1800)
 def sync_biostar_events():
     """Incremental sync of BioStar punch events."""
     try:
@@ -358,8 +440,10 @@ def sync_biostar_events():
     except Exception as e:
         logger.error(f"BioStar event sync task failed: {e}")
         _save_biostar_cron_log('biostar_sync_events', False, str(e))
+        raise
 
 
+@task(timeout=1800)
 def sync_biostar_users():
     """Full sync of BioStar users with auto-mapping."""
     try:
@@ -382,8 +466,10 @@ def sync_biostar_users():
     except Exception as e:
         logger.error(f"BioStar user sync task failed: {e}")
         _save_biostar_cron_log('biostar_sync_users', False, str(e))
+        raise
 
 
+@task(timeout=1800, max_attempts=1)
 def auto_adjust_biostar_schedules():
     """Auto-adjust yesterday's off-schedule punches to comply with work schedule."""
     try:
@@ -402,6 +488,92 @@ def auto_adjust_biostar_schedules():
     except Exception as e:
         logger.error(f"BioStar auto-adjust task failed: {e}")
         _save_biostar_cron_log('biostar_auto_adjust', False, str(e))
+        raise
+
+
+@task(priority=-10)
+def purge_rate_limit_counters():
+    """Delete expired shared rate limiter buckets."""
+    try:
+        from core.utils.rate_limit import RateLimitRepository
+        count = RateLimitRepository().purge_expired()
+        if count > 0:
+            logger.info(f"Cleanup: purged {count} expired rate limit buckets")
+    except Exception as e:
+        logger.error(f"Rate limit purge task failed: {e}")
+        raise
+
+
+@task(priority=5, timeout=120)
+def refresh_mobile_dashboard():
+    """Recompute the shared mobile dashboard snapshot."""
+    try:
+        from core.mobile.repository import DashboardSnapshotRepository
+        DashboardSnapshotRepository().refresh_global()
+    except Exception as e:
+        logger.error(f"Mobile dashboard refresh failed: {e}")
+        raise
+
+
+@task(priority=-5, timeout=600)
+def resolve_allocation_responsibles():
+    """Link allocations whose responsible name now matches a user."""
+    try:
+        from accounting.invoices.repositories import AllocationRepository
+        count = AllocationRepository().resolve_responsibles()
+        if count > 0:
+            logger.info(f"Resolved responsible user for {count} allocations")
+    except Exception as e:
+        logger.error(f"Allocation responsible resolution failed: {e}")
+        raise
+
+
+@task(priority=-5, timeout=3600, max_attempts=2)
+def backfill_form_analytics():
+    """Rebuild form analytics aggregates that disagree with submission_count.
+
+    Queued once per scheduler start; counts pre-existing submissions after
+    the aggregate tables are first deployed and is a no-op once they agree.
+    """
+    try:
+        from forms.repositories import FormAnalyticsRepository
+        repo = FormAnalyticsRepository()
+        form_ids = repo.unbackfilled_form_ids()
+        for form_id in form_ids:
+            repo.rebuild(form_id)
+        if form_ids:
+            logger.info(f"Form analytics: rebuilt aggregates for {len(form_ids)} form(s)")
+    except Exception as e:
+        logger.error(f"Form analytics backfill failed: {e}")
+        raise
+
+
+@task(priority=-10)
+def purge_finished_jobs():
+    """Delete finished jobs (succeeded/cancelled after 7 days, failed after 30)."""
+    try:
+        from core.jobs import JobRepository
+        count = JobRepository().purge_finished(succeeded_days=7, failed_days=30)
+        if count > 0:
+            logger.info(f"Cleanup: purged {count} finished jobs")
+    except Exception as e:
+        logger.error(f"Job purge task failed: {e}")
+        raise
+
+
+def _enqueue_scheduled(task_name, payload=None):
+    """APScheduler trigger: queue the task unless a run is already queued/running."""
+    try:
+        if payload:
+            job_id, created = enqueue(task_name, payload, dedupe_key=scheduled_dedupe_key(task_name, payload))
+        else:
+            job_id, created = enqueue(task_name, dedupe_key=scheduled_dedupe_key(task_name))
+        if not created:
+            logger.debug(f"Scheduled {task_name} skipped — job {job_id} still pending")
+        SCHEDULER_TRIGGERS.inc(task=task_name, result='queued' if created else 'skipped')
+    except Exception as e:
+        SCHEDULER_TRIGGERS.inc(task=task_name, result='error')
+        logger.error(f"Failed to enqueue scheduled task {task_name}: {e}")
 
 
 def _acquire_scheduler_lock():
@@ -422,7 +594,7 @@ def _acquire_scheduler_lock():
 
 
 def start_scheduler():
-    """Start the background scheduler with all cleanup jobs.
+    """Start the background scheduler that enqueues all periodic jobs.
 
     Uses a file lock so only one gunicorn worker runs the scheduler.
     Other workers skip silently.
@@ -437,8 +609,9 @@ def start_scheduler():
         return
 
     scheduler.add_job(
-        cleanup_old_unallocated_invoices,
+        _enqueue_scheduled,
         'interval',
+        args=['cleanup_old_unallocated_invoices'],
         hours=6,
         id='cleanup_old_unallocated',
         replace_existing=True,
@@ -447,8 +620,9 @@ def start_scheduler():
     )
 
     scheduler.add_job(
-        reindex_rag_documents,
+        _enqueue_scheduled,
         'interval',
+        args=['reindex_rag_documents'],
         hours=4,
         id='rag_reindex_periodic',
         replace_existing=True,
@@ -457,8 +631,9 @@ def start_scheduler():
     )
 
     scheduler.add_job(
-        extract_ai_knowledge,
+        _enqueue_scheduled,
         'interval',
+        args=['extract_ai_knowledge'],
         hours=6,
         id='extract_ai_knowledge',
         replace_existing=True,
@@ -467,8 +642,9 @@ def start_scheduler():
     )
 
     scheduler.add_job(
-        process_approval_tasks,
+        _enqueue_scheduled,
         'interval',
+        args=['process_approval_tasks'],
         hours=1,
         id='approval_engine_tasks',
         replace_existing=True,
@@ -476,9 +652,47 @@ def start_scheduler():
         coalesce=True,
     )
 
+    # First run at startup backfills the inbox on fresh deploys
+    scheduler.add_job(
+        _enqueue_scheduled,
+        'interval',
+        args=['reconcile_approval_inbox'],
+        minutes=15,
+        id='approval_inbox_reconcile',
+        next_run_time=datetime.now(),
+        replace_existing=True,
+        misfire_grace_time=300,
+        coalesce=True,
+    )
+
+    # Recently active channels every 15 minutes, every counter nightly
+    scheduler.add_job(
+        _enqueue_scheduled,
+        'interval',
+        args=['reconcile_digest_unread', {'since_minutes': 60}],
+        minutes=15,
+        id='digest_unread_reconcile',
+        replace_existing=True,
+        misfire_grace_time=300,
+        coalesce=True,
+    )
+
     scheduler.add_job(
-        cleanup_old_notifications,
+        _enqueue_scheduled,
         'cron',
+        args=['reconcile_digest_unread'],
+        hour=3,
+        minute=15,
+        id='digest_unread_reconcile_full',
+        replace_existing=True,
+        misfire_grace_time=300,
+        coalesce=True,
+    )
+
+    scheduler.add_job(
+        _enqueue_scheduled,
+        'cron',
+        args=['cleanup_old_notifications'],
         hour=1,
         minute=0,
         id='cleanup_old_notifications',
@@ -488,8 +702,9 @@ def start_scheduler():
     )
 
     scheduler.add_job(
-        run_smart_notifications,
+        _enqueue_scheduled,
         'interval',
+        args=['run_smart_notifications'],
         hours=4,
         id='smart_notifications',
         replace_existing=True,
@@ -498,8 +713,9 @@ def start_scheduler():
     )
 
     scheduler.add_job(
-        cleanup_push_rate_limit_log,
+        _enqueue_scheduled,
         'cron',
+        args=['cleanup_push_rate_limit_log'],
         hour=2,
         minute=0,
         id='cleanup_push_rate_limit_log',
@@ -508,9 +724,83 @@ def start_scheduler():
         coalesce=True,
     )
 
+    # First run at startup backfills rows written before the user existed
+    scheduler.add_job(
+        _enqueue_scheduled,
+        'interval',
+        args=['resolve_allocation_responsibles'],
+        hours=1,
+        id='resolve_allocation_responsibles',
+        next_run_time=datetime.now(),
+        replace_existing=True,
+        misfire_grace_time=300,
+        coalesce=True,
+    )
+
+    scheduler.add_job(
+        _enqueue_scheduled,
+        'interval',
+        args=['purge_rate_limit_counters'],
+        hours=1,
+        id='purge_rate_limit_counters',
+        replace_existing=True,
+        misfire_grace_time=300,
+        coalesce=True,
+    )
+
+    scheduler.add_job(
+        _enqueue_scheduled,
+        'interval',
+        args=['refresh_mobile_dashboard'],
+        minutes=2,
+        id='refresh_mobile_dashboard',
+        replace_existing=True,
+        misfire_grace_time=60,
+        coalesce=True,
+    )
+
+    scheduler.add_job(
+        _enqueue_scheduled,
+        'cron',
+        args=['purge_finished_jobs'],
+        hour=2,
+        minute=30,
+        id='purge_finished_jobs',
+        replace_existing=True,
+        misfire_grace_time=300,
+        coalesce=True,
+    )
+
+    scheduler.add_job(
+        _enqueue_scheduled,
+        'cron',
+        args=['purge_bulk_uploads'],
+        hour=2,
+        minute=45,
+        id='purge_bulk_uploads',
+        replace_existing=True,
+        misfire_grace_time=300,
+        coalesce=True,
+    )
+
+    # Hourly, to pick up BNR's daily fixing (~13:00 on banking days) soon after
+    # publication; the first run at startup backfills years in use on fresh deploys
     scheduler.add_job(
-        sync_marketing_kpis,
+        _enqueue_scheduled,
+        'interval',
+        args=['sync_bnr_rates'],
+        hours=1,
+        id='sync_bnr_rates',
+        next_run_time=datetime.now(),
+        replace_existing=True,
+        misfire_grace_time=300,
+        coalesce=True,
+    )
+
+    scheduler.add_job(
+        _enqueue_scheduled,
         'cron',
+        args=['sync_marketing_kpis'],
         hour=6,
         minute=0,
         id='sync_marketing_kpis',
@@ -520,8 +810,9 @@ def start_scheduler():
     )
 
     scheduler.add_job(
-        run_daily_digest,
+        _enqueue_scheduled,
         'cron',
+        args=['run_daily_digest'],
         hour=8,
         minute=0,
         id='daily_digest',
@@ -532,8 +823,9 @@ def start_scheduler():
 
     # Field Sales — follow-up reminders (08:00 daily)
     scheduler.add_job(
-        field_sales_follow_up_reminders,
+        _enqueue_scheduled,
         'cron',
+        args=['field_sales_follow_up_reminders'],
         hour=8,
         minute=0,
         id='field_sales_follow_up_reminders',
@@ -544,8 +836,9 @@ def start_scheduler():
 
     # Field Sales — overdue visit alerts (18:00 daily)
     scheduler.add_job(
-        field_sales_overdue_visit_alerts,
+        _enqueue_scheduled,
         'cron',
+        args=['field_sales_overdue_visit_alerts'],
         hour=18,
         minute=0,
         id='field_sales_overdue_visit_alerts',
@@ -580,8 +873,9 @@ def start_scheduler():
             continue
         if settings.get('schedule_type') == 'interval':
             scheduler.add_job(
-                defaults['func'],
+                _enqueue_scheduled,
                 'interval',
+                args=[defaults['func'].__name__],
                 minutes=settings.get('interval_minutes', 60),
                 id=job_id,
                 replace_existing=True,
@@ -590,8 +884,9 @@ def start_scheduler():
             )
         else:
             scheduler.add_job(
-                defaults['func'],
+                _enqueue_scheduled,
                 'cron',
+                args=[defaults['func'].__name__],
                 hour=settings.get('hour', defaults['hour']),
                 minute=settings.get('minute', defaults['minute']),
                 id=job_id,
@@ -604,6 +899,15 @@ def start_scheduler():
     atexit.register(lambda: scheduler.shutdown(wait=False))
     logger.info(f"Background scheduler started (pid={os.getpid()})")
 
+    # One-shot: aggregates that start empty (or drifted) are rebuilt in the background
+    _enqueue_scheduled('backfill_form_analytics')
+
+    # No dedicated worker process deployed → run the queue in this process
+    if os.environ.get('JOBS_EMBEDDED_WORKER', '1').lower() not in ('0', 'false', 'no'):
+        from core.jobs.worker import start_embedded_worker
+        start_embedded_worker()
+        logger.info("Embedded job worker started (set JOBS_EMBEDDED_WORKER=0 when running worker.py)")
+
 
 def is_scheduler_ok():
     """Check if the scheduler is healthy across all workers.
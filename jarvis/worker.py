@@ -0,0 +1,35 @@
+# Background job worker — runs queued jobs from the `jobs` table.
+#
+#   python worker.py --processes 2
+#
+# The web app's scheduler only enqueues; heavy work (RAG reindex, KPI sync,
+# BioStar sync, digests, …) runs here, outside the Gunicorn workers. Set
+# JOBS_EMBEDDED_WORKER=0 on the web process once this is deployed.
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import argparse
+
+from core.utils.logging_config import setup_logging, get_logger
+
+logger = setup_logging(level=os.environ.get('LOG_LEVEL', 'INFO'))
+worker_logger = get_logger('jarvis.worker')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='JARVIS background job worker')
+    parser.add_argument('--processes', type=int,
+                        default=int(os.environ.get('JOBS_WORKER_PROCESSES', '2')),
+                        help='worker processes (default: $JOBS_WORKER_PROCESSES or 2)')
+    parser.add_argument('--max-jobs', type=int, default=None,
+                        help='recycle a process after N jobs (default: $JOBS_MAX_PER_PROCESS or 500)')
+    args = parser.parse_args()
+
+    from core.jobs.worker import run_workers, MAX_JOBS_PER_PROCESS
+    worker_logger.info(f'Starting job worker with {args.processes} process(es)')
+    run_workers(max(1, args.processes), args.max_jobs or MAX_JOBS_PER_PROCESS)
+
+
+if __name__ == '__main__':
+    main()
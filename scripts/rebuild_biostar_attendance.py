@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""Rebuild the BioStar daily attendance rollup (biostar_daily_attendance).
+
+The rollup is maintained incrementally by punch inserts and adjustment
+writes. Use this after bulk edits to biostar_punch_logs done outside the
+repositories (manual SQL, imports) or to recompute a suspicious range.
+
+Prerequisites:
+  - Migration 003_create_daily_attendance.sql (or app startup) has created
+    the table
+
+Usage:
+  cd jarvis
+  DATABASE_URL="postgresql://..." python3 ../scripts/rebuild_biostar_attendance.py [--days 30]
+  DATABASE_URL="postgresql://..." python3 ../scripts/rebuild_biostar_attendance.py --start 2026-01-01 --end 2026-03-31
+  DATABASE_URL="postgresql://..." python3 ../scripts/rebuild_biostar_attendance.py --all
+"""
+import os
+import sys
+import argparse
+from datetime import date, timedelta
+
+# Add jarvis to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'jarvis'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild BioStar daily attendance rollup')
+    parser.add_argument('--days', type=int, default=30, help='Days back to rebuild (default: 30)')
+    parser.add_argument('--start', type=str, help='Explicit start date (YYYY-MM-DD), overrides --days')
+    parser.add_argument('--end', type=str, help='Explicit end date (YYYY-MM-DD), default: today')
+    parser.add_argument('--all', action='store_true', help='Rebuild every day')
+    args = parser.parse_args()
+
+    if not os.environ.get('DATABASE_URL'):
+        print('ERROR: DATABASE_URL environment variable required')
+        sys.exit(1)
+
+    from core.connectors.biostar.repositories import AttendanceRepository
+
+    if args.all:
+        start, end = None, None
+    else:
+        start = args.start or (date.today() - timedelta(days=args.days)).isoformat()
+        end = args.end or date.today().isoformat()
+
+    print('Rebuilding BioStar daily attendance:')
+    print(f'  Range: {start or "beginning"} → {end or "today"}')
+
+    written = AttendanceRepository().rebuild(start, end)
+
+    print(f'  Done: {written} employee-days written')
+
+
+if __name__ == '__main__':
+    main()
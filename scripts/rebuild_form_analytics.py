@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Rebuild form analytics aggregates from form_submissions.
+
+The aggregates (form_option_counts, form_numeric_stats, form_numeric_buckets,
+form_daily_stats, form_status_counts) are maintained by submission creates,
+status changes and deletes. Forms whose counters disagree with
+submission_count (including every form with submissions when the tables
+are first deployed) are rebuilt automatically by the backfill_form_analytics
+job on scheduler start. Use this to force a rebuild, e.g. after edits to
+form_submissions done outside the repositories that left the counts intact.
+
+Usage:
+  cd jarvis
+  DATABASE_URL="postgresql://..." python3 ../scripts/rebuild_form_analytics.py --all
+  DATABASE_URL="postgresql://..." python3 ../scripts/rebuild_form_analytics.py --form 12 --form 15
+"""
+import os
+import sys
+import argparse
+
+# Add jarvis to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'jarvis'))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Rebuild form analytics aggregates')
+    parser.add_argument('--form', type=int, action='append', help='Form ID to rebuild (repeatable)')
+    parser.add_argument('--all', action='store_true', help='Rebuild every form')
+    args = parser.parse_args()
+
+    if not args.all and not args.form:
+        parser.error('pass --form ID or --all')
+
+    if not os.environ.get('DATABASE_URL'):
+        print('ERROR: DATABASE_URL environment variable required')
+        sys.exit(1)
+
+    from forms.repositories import FormAnalyticsRepository
+
+    repo = FormAnalyticsRepository()
+    form_ids = repo.form_ids() if args.all else args.form
+
+    print(f'Rebuilding analytics for {len(form_ids)} form(s):')
+    total = 0
+    for form_id in form_ids:
+        counted = repo.rebuild(form_id)
+        total += counted
+        print(f'  Form {form_id}: {counted} submissions')
+
+    print(f'  Done: {total} submissions counted')
+
+
+if __name__ == '__main__':
+    main()
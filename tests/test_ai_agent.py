@@ -4,6 +4,10 @@ Tests:
 - ToolRegistry: registration, schemas, execution, permissions
 - Tool permission filtering
 - Tool execution error handling
+- ToolExecutor: concurrency, timeouts, memoisation, metrics
+- Provider client pooling and Claude prompt caching
+- Cache-aware cost calculation
+- Context assembly: stored token counts, SQL window, cached prompt prefix
 """
 
 import sys
@@ -199,3 +203,276 @@ class TestGlobalToolRegistry:
             assert 'description' in schema
             assert 'input_schema' in schema
             assert isinstance(schema['input_schema'], dict)
+
+
+# ═══════════════════════════════════════════════
+# ToolExecutor Tests
+# ═══════════════════════════════════════════════
+
+class TestToolExecutor:
+
+    def _make(self, **kwargs):
+        from ai_agent.tools.registry import ToolRegistry
+        from ai_agent.tools.executor import ToolExecutor
+        registry = ToolRegistry()
+        return registry, ToolExecutor(registry, **kwargs)
+
+    @staticmethod
+    def _call(name, **params):
+        return {'id': f'{name}-id', 'name': name, 'input': params}
+
+    def test_read_only_calls_run_concurrently(self):
+        import threading
+        registry, executor = self._make(max_workers=4)
+        barrier = threading.Barrier(3, timeout=2)
+
+        def handler(params, user_id):
+            barrier.wait()  # only passes if all three run at once
+            return {'n': params['n']}
+
+        registry.register('q', 'Query', {}, handler)
+        results = executor.run([self._call('q', n=i) for i in range(3)], user_id=1)
+        assert results == [{'n': 0}, {'n': 1}, {'n': 2}]
+
+    def test_timeout_returns_error_result(self):
+        import time
+        registry, executor = self._make()
+        registry.register('slow', 'Slow', {}, lambda p, u: time.sleep(1) or {}, timeout=0.05)
+        registry.register('fast', 'Fast', {}, lambda p, u: {'ok': True})
+        results = executor.run([self._call('slow'), self._call('fast')], user_id=1)
+        assert 'timed out' in results[0]['error']
+        assert results[1] == {'ok': True}
+        assert executor.stats()['slow']['timeouts'] == 1
+
+    def test_memoised_per_conversation_and_user(self):
+        registry, executor = self._make()
+        handler = MagicMock(return_value={'total': 5})
+        registry.register('summary', 'Summary', {}, handler)
+        executor.run([self._call('summary', year=2025)], user_id=1, conversation_id=10)
+        executor.run([self._call('summary', year=2025)], user_id=1, conversation_id=10)
+        assert handler.call_count == 1
+        executor.run([self._call('summary', year=2025)], user_id=2, conversation_id=10)
+        executor.run([self._call('summary', year=2025)], user_id=1, conversation_id=11)
+        executor.run([self._call('summary', year=2024)], user_id=1, conversation_id=10)
+        assert handler.call_count == 4
+        assert executor.stats()['summary']['cache_hits'] == 1
+
+    def test_no_memo_without_conversation_or_after_ttl(self):
+        registry, executor = self._make(cache_ttl=0)
+        handler = MagicMock(return_value={})
+        registry.register('q', 'Query', {}, handler)
+        executor.run([self._call('q')], user_id=1, conversation_id=10)
+        executor.run([self._call('q')], user_id=1, conversation_id=10)
+        assert handler.call_count == 2
+
+    def test_errors_are_not_memoised(self):
+        registry, executor = self._make()
+        handler = MagicMock(side_effect=[RuntimeError('db'), {'ok': True}])
+        registry.register('q', 'Query', {}, handler)
+        assert 'error' in executor.run([self._call('q')], user_id=1, conversation_id=1)[0]
+        assert executor.run([self._call('q')], user_id=1, conversation_id=1)[0] == {'ok': True}
+        assert executor.stats()['q']['errors'] == 1
+
+    def test_mutating_tool_invalidates_memo(self):
+        registry, executor = self._make()
+        read = MagicMock(return_value={'status': 'pending'})
+        write = MagicMock(return_value={'ok': True})
+        registry.register('get_status', 'Read', {}, read)
+        registry.register('approve', 'Write', {}, write, read_only=False)
+        executor.run([self._call('get_status')], user_id=1, conversation_id=1)
+        executor.run([self._call('approve'), self._call('get_status')], user_id=1, conversation_id=1)
+        assert read.call_count == 2
+        executor.run([self._call('approve')], user_id=1, conversation_id=1)
+        assert write.call_count == 2  # mutating calls are never memoised
+
+    def test_unknown_tool(self):
+        registry, executor = self._make()
+        assert executor.run([self._call('nope')], user_id=1) == [{'error': 'Unknown tool: nope'}]
+
+    def test_builtin_tools_are_read_only(self):
+        from ai_agent.tools.registry import tool_registry
+        tool = tool_registry.get_tool('search_invoices')
+        assert tool.read_only is True
+
+# ═══════════════════════════════════════════════
+# Provider client pool & prompt caching
+# ═══════════════════════════════════════════════
+
+class TestClientPool:
+
+    def setup_method(self):
+        from ai_agent.providers.client_pool import clear_clients
+        clear_clients()
+
+    def test_reuses_client_per_provider_and_key(self):
+        from ai_agent.providers.client_pool import get_client
+        factory = MagicMock(side_effect=lambda: object())
+        a = get_client('claude', 'k1', factory)
+        assert get_client('claude', 'k1', factory) is a
+        assert get_client('claude', 'k2', factory) is not a
+        assert get_client('openai', 'k1', factory) is not a
+        assert factory.call_count == 3
+
+    def test_evicts_least_recently_used(self, monkeypatch):
+        from ai_agent.providers import client_pool
+        monkeypatch.setattr(client_pool, 'MAX_CLIENTS', 2)
+        first = client_pool.get_client('claude', 'a', object)
+        client_pool.get_client('claude', 'b', object)
+        client_pool.get_client('claude', 'c', object)
+        assert client_pool.get_client('claude', 'a', object) is not first
+
+    def test_claude_provider_does_not_rebuild_client(self):
+        from ai_agent.providers import ClaudeProvider
+        response = MagicMock(content=[], stop_reason='end_turn',
+                             usage=MagicMock(input_tokens=10, output_tokens=5,
+                                             cache_read_input_tokens=0, cache_creation_input_tokens=0))
+        with patch('ai_agent.providers.claude_provider.anthropic.Anthropic') as ctor:
+            ctor.return_value.messages.create.return_value = response
+            provider = ClaudeProvider()
+            for _ in range(3):
+                provider.generate('m', [{'role': 'user', 'content': 'hi'}], api_key='k')
+        assert ctor.call_count == 1
+
+
+class TestClaudePromptCaching:
+
+    def test_breakpoint_after_static_prefix(self):
+        from ai_agent.providers.claude_provider import ClaudeProvider, CACHE_CONTROL
+        blocks = ClaudeProvider._system_blocks('STATIC\n\nRAG', 'STATIC')
+        assert blocks[0] == {'type': 'text', 'text': 'STATIC', 'cache_control': CACHE_CONTROL}
+        assert blocks[1] == {'type': 'text', 'text': '\n\nRAG'}
+
+    def test_whole_prompt_cached_without_prefix(self):
+        from ai_agent.providers.claude_provider import ClaudeProvider
+        blocks = ClaudeProvider._system_blocks('SYS', 'OTHER')
+        assert len(blocks) == 1 and 'cache_control' in blocks[0]
+
+    def test_last_tool_gets_breakpoint_without_mutating_input(self):
+        from ai_agent.providers.claude_provider import ClaudeProvider
+        tools = [{'name': 'a'}, {'name': 'b'}]
+        cached = ClaudeProvider._cached_tools(tools)
+        assert 'cache_control' in cached[-1] and 'cache_control' not in cached[0]
+        assert 'cache_control' not in tools[-1]
+
+    def test_usage_counts_cached_tokens_as_input(self):
+        from ai_agent.providers.claude_provider import ClaudeProvider
+        usage = MagicMock(input_tokens=100, output_tokens=20,
+                          cache_read_input_tokens=3000, cache_creation_input_tokens=0)
+        assert ClaudeProvider._usage(usage) == (3100, 20, 3000, 0)
+
+
+class TestCacheAwareCost:
+
+    def _service(self):
+        from ai_agent.services.ai_agent_service import AIAgentService
+        return AIAgentService.__new__(AIAgentService)
+
+    def _config(self, provider):
+        from decimal import Decimal
+        from ai_agent.models import ModelConfig, LLMProvider
+        return ModelConfig(provider=LLMProvider(provider), model_name='m',
+                           cost_per_1k_input=Decimal('3'), cost_per_1k_output=Decimal('15'))
+
+    def test_claude_cache_reads_are_discounted(self):
+        from decimal import Decimal
+        service = self._service()
+        full = service._calculate_cost(self._config('claude'), 2000, 0)
+        cached = service._calculate_cost(self._config('claude'), 2000, 0, cache_read_tokens=1000)
+        assert full == Decimal('6')
+        assert cached == Decimal('3') + Decimal('0.3')
+
+    def test_claude_cache_writes_cost_more(self):
+        from decimal import Decimal
+        cost = self._service()._calculate_cost(self._config('claude'), 1000, 0, cache_write_tokens=1000)
+        assert cost == Decimal('3.75')
+
+    def test_usage_accumulates_and_keeps_first_ttft(self):
+        from ai_agent.models import LLMResponse, LLMUsage
+        usage = LLMUsage()
+        usage.add(LLMResponse('', 100, 10, 'm', cache_read_tokens=80, ttft_ms=400))
+        usage.add(LLMResponse('', 200, 20, 'm', cache_read_tokens=150, ttft_ms=900))
+        assert (usage.input_tokens, usage.output_tokens, usage.cache_read_tokens) == (300, 30, 230)
+        assert usage.ttft_ms == 400 and usage.calls == 2
+
+    def test_static_prompt_is_prefix_of_full_prompt(self):
+        service = self._service()
+        service._static_prompt_cache = {}
+        service._prompt_prefix_cache = {}
+        service._settings_version = 0
+        prompt = service._build_system_prompt(rag_context='R', has_tools=True, page_context='/app/sales/crm')
+        prefix = service._static_system_prompt(True)
+        assert prompt.startswith(prefix) and prompt != prefix
+        assert service._static_system_prompt(True) is prefix
+
+
+# ═══════════════════════════════════════════════
+# Context assembly
+# ═══════════════════════════════════════════════
+
+class TestContextAssembly:
+
+    def _service(self):
+        from ai_agent.services.ai_agent_service import AIAgentService
+        from ai_agent.config import AIAgentConfig
+        service = AIAgentService.__new__(AIAgentService)
+        service.config = AIAgentConfig()
+        service.message_repo = MagicMock()
+        service._static_prompt_cache = {}
+        service._prompt_prefix_cache = {}
+        service._settings_version = 0
+        return service
+
+    def test_create_stores_content_tokens(self):
+        from ai_agent.repositories.message_repository import MessageRepository
+        from ai_agent.models import Message
+        repo = MessageRepository()
+        cursor = MagicMock()
+        cursor.fetchone.return_value = {'id': 1, 'created_at': None}
+        with patch.object(repo, 'execute_many', side_effect=lambda work: work(cursor)):
+            msg = repo.create(Message(conversation_id=5, content='x' * 300))
+
+        assert msg.content_tokens == 100
+        assert cursor.execute.call_args[0][1]['content_tokens'] == 100
+
+    def test_context_window_selected_in_sql(self):
+        from ai_agent.repositories.message_repository import MessageRepository
+        repo = MessageRepository()
+        with patch.object(repo, 'query_all', return_value=[]) as qa:
+            repo.get_context_window(5, token_budget=1000, limit=20, before_id=42)
+
+        sql, params = qa.call_args[0]
+        assert 'SUM(tokens) OVER (ORDER BY created_at DESC, id DESC)' in sql
+        assert 'running_tokens <= %s' in sql
+        assert params == (5, 42, 42, 20, 1000)
+
+    def test_build_context_uses_stored_counts(self):
+        from ai_agent.models import Message, MessageRole, ModelConfig
+        service = self._service()
+        service.message_repo.get_context_window.return_value = [
+            Message(id=1, role=MessageRole.USER, content='hi', content_tokens=3),
+            Message(id=2, role=MessageRole.ASSISTANT, content='hello', content_tokens=4),
+        ]
+        config = ModelConfig(context_window=10000, max_tokens=1000)
+
+        context = service._build_context_messages(5, 'now', config, system_prompt_tokens=1000,
+                                                  current_message_id=3)
+
+        assert context == [
+            {'role': 'user', 'content': 'hi'},
+            {'role': 'assistant', 'content': 'hello'},
+            {'role': 'user', 'content': 'now'},
+        ]
+        kwargs = service.message_repo.get_context_window.call_args[1]
+        assert kwargs['before_id'] == 3
+        assert kwargs['token_budget'] == int((10000 - 1000 - 1000 - 1) * 0.9)
+
+    def test_prompt_prefix_cached_per_page_and_settings_version(self):
+        service = self._service()
+        crm = service._system_prompt_prefix(True, '/app/sales/crm')
+        assert 'CURRENT PAGE CONTEXT' in crm
+        assert service._system_prompt_prefix(True, '/app/sales/crm/123') is crm
+        assert service._system_prompt_prefix(True, None) == service._static_system_prompt(True)
+
+        service._settings_version += 1
+        assert service._system_prompt_prefix(True, '/app/sales/crm') is not crm
+        assert len(service._prompt_prefix_cache) == 1
@@ -221,6 +221,7 @@ def _make_engine():
     engine._decision_repo = MagicMock()
     engine._audit_repo = MagicMock()
     engine._delegation_repo = MagicMock()
+    engine._inbox_repo = MagicMock()
     return engine
 
 
@@ -608,6 +609,96 @@ class TestEngineEscalate:
         engine._request_repo.update_status.assert_not_called()
 
 
+# ═══════════════════════════════════════════════
+# Approval Inbox
+# ═══════════════════════════════════════════════
+
+class TestEngineInbox:
+
+    def setup_method(self):
+        hooks.clear()
+
+    def test_cancel_refreshes_inbox_before_hooks(self):
+        engine = _make_engine()
+        engine._request_repo.get_by_id.return_value = {
+            'id': 100, 'entity_type': 'invoice', 'entity_id': 1,
+            'status': 'pending', 'requested_by': 1}
+        seen = []
+        hooks.on('approval.cancelled',
+                 lambda p: seen.append(engine._inbox_repo.refresh_requests.called))
+
+        engine.cancel(100, cancelled_by=1)
+
+        engine._inbox_repo.refresh_requests.assert_called_with([100])
+        assert seen == [True]
+
+    def test_decide_removes_decider_even_when_step_incomplete(self):
+        engine = _make_engine()
+        engine._request_repo.get_by_id.return_value = {
+            'id': 100, 'entity_type': 'invoice', 'entity_id': 1, 'flow_id': 1,
+            'status': 'pending', 'current_step_id': 10, 'requested_by': 1}
+        engine._flow_repo.get_step_by_id.return_value = {
+            'id': 10, 'name': 'Board', 'step_order': 1, 'approver_user_id': 5,
+            'min_approvals': 2}
+        engine._decision_repo.has_user_decided_on_step.return_value = False
+        engine._decision_repo.count_decisions_for_step.return_value = {'approved': 1}
+
+        engine.decide(100, 'approved', decided_by=5)
+
+        engine._inbox_repo.refresh_requests.assert_called_with([100])
+
+    def test_escalate_to_user_refreshes_whole_step(self):
+        engine = _make_engine()
+        engine._request_repo.get_by_id.return_value = {
+            'id': 100, 'entity_type': 'invoice', 'entity_id': 1,
+            'status': 'pending', 'current_step_id': 10}
+        engine._flow_repo.get_step_by_id.return_value = {'id': 10, 'name': 'Step 1'}
+
+        engine.escalate(100, escalate_to_user_id=9, actor_id=2)
+
+        engine._inbox_repo.refresh_step.assert_called_once_with(10)
+
+    def test_inbox_failure_does_not_break_engine(self):
+        engine = _make_engine()
+        engine._request_repo.get_by_id.return_value = {
+            'id': 100, 'entity_type': 'invoice', 'entity_id': 1,
+            'status': 'pending', 'requested_by': 1}
+        engine._inbox_repo.refresh_requests.side_effect = Exception('deadlock')
+
+        engine.cancel(100, cancelled_by=1)
+
+        engine._request_repo.update_status.assert_called_once()
+
+
+class TestInboxRepository:
+
+    def _repo_with_cursor(self, deleted, inserted):
+        from core.approvals.repositories import InboxRepository
+        repo = InboxRepository()
+        cursor = MagicMock()
+        cursor.fetchall.side_effect = [deleted, inserted]
+        repo.execute_many = lambda fn: fn(cursor)
+        return repo, cursor
+
+    def test_refresh_returns_users_whose_inbox_changed(self):
+        repo, cursor = self._repo_with_cursor(
+            deleted=[{'user_id': 5, 'request_id': 100, 'step_id': 10},
+                     {'user_id': 7, 'request_id': 100, 'step_id': 10}],
+            inserted=[{'user_id': 7, 'request_id': 100, 'step_id': 10},
+                      {'user_id': 8, 'request_id': 100, 'step_id': 11}],
+        )
+        assert repo.refresh_requests([100]) == [5, 8]
+        insert_sql, params = cursor.execute.call_args_list[1][0]
+        assert 'INSERT INTO approval_inbox' in insert_sql
+        assert 'r.id = ANY(%s)' in insert_sql
+        assert params == ([100],)
+
+    def test_refresh_with_no_ids_is_noop(self):
+        repo, cursor = self._repo_with_cursor([], [])
+        assert repo.refresh_requests([None]) == []
+        cursor.execute.assert_not_called()
+
+
 # ═══════════════════════════════════════════════
 # Full Flow Integration Test
 # ═══════════════════════════════════════════════
@@ -1,7 +1,7 @@
 """Unit tests for Currency Converter module.
 
 Tests for:
-- currency_converter.py: BNR API integration, exchange rate fetching, currency conversion
+- currency_converter.py: BNR API integration, stored-rate lookups, currency conversion, rate sync
 """
 import sys
 import os
@@ -17,11 +17,14 @@ from datetime import datetime
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'jarvis'))
 
+from core.services import currency_converter
 from core.services.currency_converter import (
     get_exchange_rate,
     convert_currency,
+    convert_many,
     get_eur_ron_conversion,
     clear_cache,
+    sync_rates,
     _parse_bnr_xml,
     _fetch_rates_for_year,
     BNR_CURRENT_URL,
@@ -39,6 +42,21 @@ def clear_rate_cache():
     clear_cache()
 
 
+@pytest.fixture(autouse=True)
+def rate_repo(monkeypatch):
+    """Stored rates (bnr_exchange_rates) — empty unless a test fills them."""
+    repo = MagicMock()
+    repo.rates_between.return_value = {}
+    monkeypatch.setattr(currency_converter, '_repo', repo)
+    return repo
+
+
+@pytest.fixture(autouse=True)
+def mock_enqueue():
+    with patch('core.jobs.enqueue', return_value=(1, True)) as m:
+        yield m
+
+
 # ============== EXCHANGE RATE TESTS ==============
 
 class TestGetExchangeRate:
@@ -59,63 +77,103 @@ class TestGetExchangeRate:
         rate = get_exchange_rate('EUR', 'invalid-date')
         assert rate is None
 
-    @patch('core.services.currency_converter._fetch_rates_for_year')
-    def test_fetches_rate_from_api(self, mock_fetch):
-        """Should fetch rate from BNR API"""
-        mock_fetch.return_value = {
+    def test_reads_rate_from_store(self, rate_repo):
+        """Should read the year's rates from bnr_exchange_rates"""
+        rate_repo.rates_between.return_value = {
             '2025-12-15': {'EUR': 4.9700, 'USD': 4.7500}
         }
 
         rate = get_exchange_rate('EUR', '2025-12-15')
 
         assert rate == 4.9700
-        mock_fetch.assert_called_once_with(2025)
-
-    @patch('core.services.currency_converter._fetch_rates_for_year')
-    def test_uses_cache(self, mock_fetch):
-        """Should use cached rate on subsequent calls"""
-        # Clear the cache first to ensure clean state
-        from core.services import currency_converter
-        currency_converter.clear_cache()
+        start, end = rate_repo.rates_between.call_args[0]
+        assert start.isoformat() == '2024-12-23'  # lookback into the previous year
+        assert end.isoformat() == '2025-12-31'
 
-        # Mock that also updates the internal cache (like real function does)
-        def mock_fetch_and_cache(year):
-            rates = {'2025-12-15': {'EUR': 4.9700}}
-            currency_converter._rate_cache[year] = rates
-            return rates
+    def test_never_fetches_from_network(self, rate_repo):
+        """Lookups must not call BNR, even when the store is empty"""
+        with patch('core.services.currency_converter.requests.get') as mock_get:
+            assert get_exchange_rate('EUR', '2025-12-15') is None
+            mock_get.assert_not_called()
 
-        mock_fetch.side_effect = mock_fetch_and_cache
+    def test_uses_cache(self, rate_repo):
+        """Should load a year once and serve later lookups from memory"""
+        rate_repo.rates_between.return_value = {'2025-12-15': {'EUR': 4.9700, 'USD': 4.75}}
 
-        # First call
-        get_exchange_rate('EUR', '2025-12-15')
-        # Second call should use cache
         get_exchange_rate('EUR', '2025-12-15')
+        get_exchange_rate('USD', '2025-12-16')
+        get_exchange_rate('EUR', '2025-06-01')
 
-        # Should only fetch once since cache is populated
-        assert mock_fetch.call_count == 1
+        assert rate_repo.rates_between.call_count == 1
 
-    @patch('core.services.currency_converter._fetch_rates_for_year')
-    def test_fallback_to_previous_days(self, mock_fetch):
-        """Should try previous days if rate not found (weekends/holidays)"""
-        mock_fetch.return_value = {
+    def test_fallback_to_previous_days(self, rate_repo):
+        """Should use the previous banking day's rate (weekends/holidays)"""
+        rate_repo.rates_between.return_value = {
             '2025-12-12': {'EUR': 4.9700},  # Friday
             # 13, 14 are weekend - no rates
         }
 
         # Saturday - should fall back to Friday
-        rate = get_exchange_rate('EUR', '2025-12-13')
+        assert get_exchange_rate('EUR', '2025-12-13') == 4.9700
+        assert get_exchange_rate('EUR', '2025-12-21') == 4.9700  # 9 days back
+        assert get_exchange_rate('EUR', '2025-12-22') is None    # beyond the window
 
-        assert rate == 4.9700
+    def test_fallback_across_year_boundary(self, rate_repo):
+        """New Year's Day uses the last rate of the previous year"""
+        rate_repo.rates_between.return_value = {'2024-12-31': {'EUR': 4.9741}}
 
-    @patch('core.services.currency_converter._fetch_rates_for_year')
-    def test_returns_none_if_not_found(self, mock_fetch):
-        """Should return None if rate not found after fallbacks"""
-        mock_fetch.return_value = {}
+        assert get_exchange_rate('EUR', '2025-01-01') == 4.9741
+
+    def test_accepts_date_objects(self, rate_repo):
+        from datetime import date
+        rate_repo.rates_between.return_value = {'2025-12-15': {'EUR': 4.97}}
+
+        assert get_exchange_rate('EUR', date(2025, 12, 15)) == 4.97
+        assert get_exchange_rate('EUR', datetime(2025, 12, 15, 10, 30)) == 4.97
 
+    def test_returns_none_if_not_found(self, rate_repo):
+        """Should return None if rate not found after fallbacks"""
         rate = get_exchange_rate('EUR', '2025-12-15')
 
         assert rate is None
 
+    def test_empty_year_queues_backfill_once(self, rate_repo, mock_enqueue):
+        """A year with no stored rates queues one sync job per process"""
+        get_exchange_rate('EUR', '2024-03-01')
+        get_exchange_rate('USD', '2024-03-02')
+
+        mock_enqueue.assert_called_once_with(
+            'sync_bnr_rates', {'years': [2024]}, dedupe_key='sync_bnr_rates:2024')
+
+    def test_no_backfill_for_future_years(self, rate_repo, mock_enqueue):
+        get_exchange_rate('EUR', f'{datetime.now().year + 1}-01-05')
+        mock_enqueue.assert_not_called()
+
+    def test_current_year_reloads_after_ttl(self, rate_repo, monkeypatch):
+        """The current year is re-read from the store after RATE_CACHE_TTL"""
+        today = datetime.now().strftime('%Y-%m-%d')
+        rate_repo.rates_between.return_value = {today: {'EUR': 4.97}}
+        get_exchange_rate('EUR', today)
+
+        monkeypatch.setattr(currency_converter, 'RATE_CACHE_TTL', -1)
+        get_exchange_rate('EUR', today)
+
+        assert rate_repo.rates_between.call_count == 2
+
+    def test_past_year_is_kept(self, rate_repo, monkeypatch):
+        rate_repo.rates_between.return_value = {'2023-05-02': {'EUR': 4.93}}
+        get_exchange_rate('EUR', '2023-05-02')
+
+        monkeypatch.setattr(currency_converter, 'RATE_CACHE_TTL', -1)
+        get_exchange_rate('EUR', '2023-05-03')
+
+        assert rate_repo.rates_between.call_count == 1
+
+    def test_store_error_returns_none(self, rate_repo):
+        rate_repo.rates_between.side_effect = Exception('connection refused')
+
+        assert get_exchange_rate('EUR', '2025-12-15') is None
+
 
 # ============== XML PARSING TESTS ==============
 
@@ -341,24 +399,109 @@ class TestFetchRatesForYear:
         assert result == {}
 
 
-# ============== CACHE TESTS ==============
+# ============== BULK CONVERSION TESTS ==============
+
+class TestConvertMany:
+    """Tests for convert_many() function."""
+
+    def test_converts_in_order(self, rate_repo):
+        rate_repo.rates_between.side_effect = lambda start, end: {
+            '2024-06-03': {'EUR': 4.97},
+            '2025-06-02': {'EUR': 5.07, 'USD': 4.50},
+        }
+
+        results = convert_many([
+            (100, 'EUR', 'RON', '2024-06-03'),
+            (100, 'EUR', 'RON', '2025-06-02'),
+            (450, 'USD', 'EUR', '2025-06-02'),
+            (100, 'GBP', 'RON', '2025-06-02'),
+            (10, 'RON', 'RON', 'not-a-date'),
+        ])
+
+        assert results[0] == (497.0, 4.97)
+        assert results[1] == (507.0, 5.07)
+        assert results[2] == (round(450 * 4.50 / 5.07, 2), round(4.50 / 5.07, 6))
+        assert results[3] == (None, None)
+        assert results[4] == (10, 1.0)
+
+    def test_loads_each_year_once(self, rate_repo):
+        rate_repo.rates_between.return_value = {'2025-06-02': {'EUR': 5.07}}
+
+        convert_many([(i, 'EUR', 'RON', f'2025-06-{d:02d}') for i, d in enumerate(range(2, 9))])
+
+        assert rate_repo.rates_between.call_count == 1
+
+    def test_empty(self):
+        assert convert_many([]) == []
+
+
+# ============== SYNC TESTS ==============
+
+class TestSyncRates:
+    """Tests for sync_rates() — the sync_bnr_rates job body."""
+
+    def test_backfills_years_in_use_without_rates(self, rate_repo):
+        from datetime import date
+        year = datetime.now().year
+        rate_repo.stored_years.return_value = {year}
+        rate_repo.invoice_years.return_value = {2004, year - 2, year - 1, year}
+        rate_repo.latest_date.return_value = date.today()
+        rate_repo.upsert.return_value = 3
+
+        with patch('core.services.currency_converter._fetch_rates_for_year',
+                   side_effect=lambda y: {f'{y}-03-03': {'EUR': 4.9}}) as fetch_year, \
+             patch('core.services.currency_converter._fetch_xml',
+                   return_value={f'{year}-03-04': {'EUR': 5.0}}) as fetch_current:
+            result = sync_rates()
+
+        assert [c[0][0] for c in fetch_year.call_args_list] == [year - 2, year - 1]
+        fetch_current.assert_called_once_with(BNR_CURRENT_URL)
+        assert set(rate_repo.upsert.call_args[0][0]) == {
+            f'{year - 2}-03-03', f'{year - 1}-03-03', f'{year}-03-04'}
+        assert result == {'years': [year - 2, year - 1], 'rates': 3}
+
+    def test_refetches_current_year_when_stale(self, rate_repo):
+        from datetime import date, timedelta
+        year = datetime.now().year
+        rate_repo.stored_years.return_value = {year}
+        rate_repo.invoice_years.return_value = set()
+        rate_repo.latest_date.return_value = date.today() - timedelta(days=12)
+
+        with patch('core.services.currency_converter._fetch_rates_for_year', return_value={}) as fetch_year, \
+             patch('core.services.currency_converter._fetch_xml') as fetch_current:
+            sync_rates()
+
+        fetch_year.assert_called_once_with(year)
+        fetch_current.assert_not_called()  # the year fetch includes today's feed
+
+    def test_explicit_years_and_cache_refresh(self, rate_repo):
+        rate_repo.rates_between.return_value = {}
+        assert get_exchange_rate('EUR', '2024-03-01') is None  # cached as empty
+
+        with patch('core.services.currency_converter._fetch_rates_for_year',
+                   return_value={'2024-03-01': {'EUR': 4.97}}):
+            sync_rates([2024])
+
+        rate_repo.stored_years.assert_not_called()
+        rate_repo.rates_between.return_value = {'2024-03-01': {'EUR': 4.97}}
+        assert get_exchange_rate('EUR', '2024-03-01') == 4.97
+
 
 class TestClearCache:
     """Tests for clear_cache() function."""
 
-    @patch('core.services.currency_converter._fetch_rates_for_year')
-    def test_clears_cache(self, mock_fetch):
-        """clear_cache should force re-fetch"""
-        mock_fetch.return_value = {'2025-12-15': {'EUR': 4.97}}
+    def test_clears_cache(self, rate_repo):
+        """clear_cache should force a reload from the store"""
+        rate_repo.rates_between.return_value = {'2023-12-15': {'EUR': 4.97}}
 
         # First call
-        get_exchange_rate('EUR', '2025-12-15')
-        assert mock_fetch.call_count == 1
+        get_exchange_rate('EUR', '2023-12-15')
+        assert rate_repo.rates_between.call_count == 1
 
         # Clear and call again
         clear_cache()
-        get_exchange_rate('EUR', '2025-12-15')
-        assert mock_fetch.call_count == 2
+        get_exchange_rate('EUR', '2023-12-15')
+        assert rate_repo.rates_between.call_count == 2
 
 
 # ============== EDGE CASES ==============
@@ -376,16 +519,15 @@ class TestEdgeCases:
         rate = get_exchange_rate('EUR', '')
         assert rate is None
 
-    def test_currency_case_insensitive(self):
+    def test_currency_case_insensitive(self, rate_repo):
         """Currency codes should be case-insensitive"""
-        with patch('core.services.currency_converter._fetch_rates_for_year') as mock:
-            mock.return_value = {'2025-12-15': {'EUR': 4.97}}
+        rate_repo.rates_between.return_value = {'2025-12-15': {'EUR': 4.97}}
 
-            rate_upper = get_exchange_rate('EUR', '2025-12-15')
-            clear_cache()
-            rate_lower = get_exchange_rate('eur', '2025-12-15')
+        rate_upper = get_exchange_rate('EUR', '2025-12-15')
+        clear_cache()
+        rate_lower = get_exchange_rate('eur', '2025-12-15')
 
-            assert rate_upper == rate_lower
+        assert rate_upper == rate_lower == 4.97
 
     @patch('core.services.currency_converter.get_exchange_rate')
     def test_conversion_rounds_to_2_decimals(self, mock_rate):
@@ -6,7 +6,10 @@ import os
 
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'jarvis'))
 
-from marketing.services.formula_engine import extract_variables, evaluate, validate
+from marketing.services.formula_engine import (
+    extract_variables, evaluate, validate, compile_formula, evaluate_many,
+    cache_info, clear_cache,
+)
 
 
 # ---- extract_variables ----
@@ -159,3 +162,63 @@ class TestValidate:
         is_valid, error, variables = validate('abs(x)')
         assert is_valid is False
         assert 'Unsafe' in error
+
+
+# ---- compile_formula ----
+
+class TestCompileFormula:
+    def test_compiled_reusable(self):
+        f = compile_formula(' spent / leads ')
+        assert f.variables == ('spent', 'leads')
+        assert f.evaluate({'spent': 100, 'leads': 4}) == 25.0
+        assert f.evaluate({'spent': 9, 'leads': 3}) == 3.0
+
+    def test_undefined_variable_raised_at_evaluate(self):
+        f = compile_formula('a + b')
+        with pytest.raises(ValueError, match='Undefined variable: b'):
+            f.evaluate({'a': 1})
+
+    def test_unsafe_rejected_at_compile(self):
+        with pytest.raises(ValueError, match='Unsafe'):
+            compile_formula('abs(x)')
+
+    def test_cache_reuses_compiled_formula(self):
+        clear_cache()
+        first = compile_formula('spent / leads')
+        assert compile_formula('  spent / leads') is first
+        assert cache_info().hits == 1
+
+    def test_errors_not_cached(self):
+        clear_cache()
+        with pytest.raises(SyntaxError):
+            compile_formula('spent /')
+        assert cache_info().currsize == 0
+
+
+# ---- evaluate_many ----
+
+class TestEvaluateMany:
+    def test_columns(self):
+        result = evaluate_many('budget / cpc', {'budget': [100, 300], 'cpc': [2, 3]})
+        assert result == [50.0, 100.0]
+
+    def test_matches_scalar_evaluate(self):
+        cols = {'likes': [1, 5, 9], 'comments': [2, 0, 1], 'impressions': [10, 20, 40]}
+        formula = '(likes + comments) / impressions * 100'
+        rows = [dict(zip(cols, vals)) for vals in zip(*cols.values())]
+        assert evaluate_many(formula, cols) == [evaluate(formula, r) for r in rows]
+
+    def test_zero_division_per_row(self):
+        result = evaluate_many('a / b', {'a': [1, 2, 3], 'b': [1, 0, 3]}, zero_division=0.0)
+        assert result == [1.0, 0.0, 1.0]
+
+    def test_missing_column(self):
+        with pytest.raises(ValueError, match='Undefined variable: b'):
+            evaluate_many('a + b', {'a': [1]})
+
+    def test_length_mismatch(self):
+        with pytest.raises(ValueError, match='same length'):
+            evaluate_many('a + b', {'a': [1, 2], 'b': [1]})
+
+    def test_empty_columns(self):
+        assert evaluate_many('a * 2', {'a': []}) == []
@@ -0,0 +1,72 @@
+"""Tests for the batched, dependency-ordered KPI sync planner."""
+
+import sys
+import os
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'jarvis'))
+
+from marketing.services.kpi_sync import topological_order, compute_kpi_values
+
+
+class TestTopologicalOrder:
+    def test_dependencies_come_first(self):
+        # 3 depends on 2, 2 depends on 1
+        order, cyclic = topological_order([3, 2, 1], [(3, 2), (2, 1)])
+        assert order == [1, 2, 3]
+        assert cyclic == []
+
+    def test_external_dependencies_ignored(self):
+        order, _ = topological_order([5], [(5, 99)])
+        assert order == [5]
+
+    def test_cycle_still_evaluated(self):
+        order, cyclic = topological_order([1, 2, 3], [(1, 2), (2, 1)])
+        assert order[0] == 3
+        assert sorted(order) == [1, 2, 3]
+        assert cyclic == [1, 2]
+
+
+class TestComputeKpiValues:
+    def test_dependent_reads_fresh_value(self):
+        kpis = {
+            1: {'current_value': 0, 'formula': None},            # total spend
+            2: {'current_value': 10, 'formula': 'spent / leads'},  # CPL uses KPI 1
+        }
+        budget = [{'project_kpi_id': 1, 'role': 'input', 'total': 1000}]
+        deps = [{'project_kpi_id': 2, 'role': 'spent', 'depends_on_kpi_id': 1, 'current_value': 0}]
+        deals = [{'project_kpi_id': 2, 'role': 'leads', 'metric': 'count', 'has_clients': True,
+                  'deal_count': 4, 'sum_revenue': 0, 'sum_profit': 0, 'avg_price': 0}]
+
+        results = compute_kpi_values(kpis, budget, deps, deals)
+
+        assert results[1] == {'synced': True, 'value': 1000.0, 'changed': True}
+        assert results[2]['value'] == 250.0
+
+    def test_no_sources_not_synced(self):
+        results = compute_kpi_values({1: {'current_value': 5, 'formula': None}}, [], [], [])
+        assert results[1] == {'synced': False, 'reason': 'No linked sources'}
+
+    def test_deal_source_without_clients_contributes_nothing(self):
+        deals = [{'project_kpi_id': 1, 'role': 'input', 'metric': 'count', 'has_clients': False,
+                  'deal_count': 0, 'sum_revenue': 0, 'sum_profit': 0, 'avg_price': 0}]
+        results = compute_kpi_values({1: {'current_value': 0, 'formula': None}}, [], [], deals)
+        assert results[1]['synced'] is False
+
+    def test_division_by_zero_yields_zero(self):
+        kpis = {1: {'current_value': 3, 'formula': 'spent / leads'}}
+        budget = [{'project_kpi_id': 1, 'role': 'spent', 'total': 100},
+                  {'project_kpi_id': 1, 'role': 'leads', 'total': 0}]
+        assert compute_kpi_values(kpis, budget, [], [])[1] == {
+            'synced': True, 'value': 0, 'changed': True}
+
+    def test_formula_error_reported(self):
+        kpis = {1: {'current_value': 0, 'formula': 'spent / leads'}}
+        budget = [{'project_kpi_id': 1, 'role': 'spent', 'total': 100}]
+        result = compute_kpi_values(kpis, budget, [], [])[1]
+        assert result['synced'] is False
+        assert 'Undefined variable: leads' in result['reason']
+
+    def test_unchanged_value_flagged(self):
+        kpis = {1: {'current_value': 100, 'formula': None}}
+        budget = [{'project_kpi_id': 1, 'role': 'input', 'total': 100}]
+        assert compute_kpi_values(kpis, budget, [], [])[1]['changed'] is False